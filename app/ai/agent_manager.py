@@ -1,6 +1,7 @@
 import asyncio
 import logging
 from typing import Dict, Any, Optional
+from app.ai.nlp.intent_router import intent_router
 # from app.ai.agents.inventory_agent import InventoryAgent
 # from app.ai.agents.hr_agent import HRAgent
 # from app.ai.agents.purchase_agent import PurchaseAgent
@@ -68,30 +69,9 @@ class AIAgentManager:
     
     async def _determine_agent(self, command: str, context: Dict[str, Any]) -> str:
         """Determine which agent should handle the command"""
-        command_lower = command.lower()
-        
-        # Inventory related keywords
-        if any(keyword in command_lower for keyword in ["stock", "inventory", "item", "product", "reorder", "transfer"]):
-            return "inventory"
-        
-        # HR related keywords
-        if any(keyword in command_lower for keyword in ["employee", "salary", "attendance", "shift", "hr", "staff"]):
-            return "hr"
-        
-        # Purchase related keywords
-        if any(keyword in command_lower for keyword in ["purchase", "order", "supplier", "buy", "procurement"]):
-            return "purchase"
-        
-        # Logistics related keywords
-        if any(keyword in command_lower for keyword in ["shipment", "delivery", "driver", "vehicle", "logistics"]):
-            return "logistics"
-        
-        # Reporting related keywords
-        if any(keyword in command_lower for keyword in ["report", "analytics", "dashboard", "summary", "analysis"]):
-            return "reporting"
-        
-        # Default to inventory for general queries
-        return "inventory"
+        # Keyword routing over inventory, hr, purchase, logistics and reporting (in that order);
+        # defaults to inventory for general queries
+        return intent_router.classify(command).agent
     
     async def cleanup(self):
         """Cleanup all agents"""
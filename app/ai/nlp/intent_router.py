@@ -0,0 +1,189 @@
+"""
+Precompiled intent, entity and agent routing for chat messages.
+
+Messages are case-folded once and scanned by patterns compiled at import,
+without re.IGNORECASE (which roughly doubles matching cost):
+
+- intents: one zero-width lookahead over an alternation with a named group per
+  intent, so a single scan sees every position where any intent matches;
+- agents: every keyword merged into one prefix-factored alternation (a trie
+  the regex engine walks one character at a time, like an Aho-Corasick
+  automaton), so routing cost does not grow with the number of keywords;
+- entities: one compiled scan per entity type, values cut from the original
+  text.
+
+Classifications are cached per exact message text, so repeated utterances
+("check stock") and the second lookup of the same message skip the scans.
+"""
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+# First intent (in this order) with a matching pattern wins
+INTENT_PATTERNS: Dict[str, List[str]] = {
+    "check_stock": [
+        r"check\s+stock",
+        r"stock\s+level",
+        r"how\s+much.*stock",
+        r"inventory\s+status"
+    ],
+    "low_stock": [
+        r"low\s+stock",
+        r"running\s+low",
+        r"need\s+to\s+reorder",
+        r"stock\s+alert"
+    ],
+    "reorder": [
+        r"reorder",
+        r"purchase\s+more",
+        r"buy\s+more",
+        r"order\s+items"
+    ],
+    "add_employee": [
+        r"add\s+employee",
+        r"new\s+staff",
+        r"hire\s+someone",
+        r"register\s+employee"
+    ],
+    "calculate_salary": [
+        r"calculate\s+salary",
+        r"generate\s+payroll",
+        r"salary\s+calculation",
+        r"pay\s+calculation"
+    ]
+}
+
+# Group 1 of each pattern is the entity value
+ENTITY_PATTERNS: Dict[str, str] = {
+    "item": r"(?:item|product|stock)\s+([a-zA-Z0-9\s]+)",
+    "employee": r"(?:employee|staff|worker)\s+([a-zA-Z\s]+)",
+    "quantity": r"(\d+)\s*(?:pieces|units|kg|liters?|pcs)",
+    "date": r"(\d{1,2}[/-]\d{1,2}[/-]\d{4}|\d{4}[/-]\d{1,2}[/-]\d{1,2})",
+    "money": r"\$?(\d+(?:,\d{3})*(?:\.\d{2})?)"
+}
+
+# Substring keywords per agent; the first agent (in this order) with a hit handles the message
+AGENT_KEYWORDS: Dict[str, List[str]] = {
+    "inventory": ["stock", "inventory", "item", "product", "reorder", "transfer"],
+    "hr": ["employee", "salary", "attendance", "shift", "hr", "staff"],
+    "purchase": ["purchase", "order", "supplier", "buy", "procurement"],
+    "logistics": ["shipment", "delivery", "driver", "vehicle", "logistics"],
+    "reporting": ["report", "analytics", "dashboard", "summary", "analysis"],
+}
+
+DEFAULT_INTENT = "general_query"
+DEFAULT_AGENT = "inventory"
+CACHE_SIZE = 4096
+
+Entity = Tuple[str, str, int, int]  # (type, value, start, end)
+
+
+@dataclass(frozen=True)
+class Classification:
+    intent: str
+    agent: str
+    entities: Tuple[Entity, ...]
+
+    def entity_dicts(self) -> List[Dict[str, object]]:
+        return [
+            {"type": entity_type, "value": value, "start": start, "end": end}
+            for entity_type, value, start, end in self.entities
+        ]
+
+
+def keyword_trie(keywords: Iterable[str]) -> str:
+    """Regex alternation of `keywords` factored by common prefix; prefers the longest match"""
+    root: Dict[str, dict] = {}
+    for keyword in keywords:
+        node = root
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A keyword ending here may also continue into a longer one
+        return f"(?:{pattern})?" if "" in node else pattern
+
+    return build(root)
+
+
+class IntentRouter:
+    """Intent, entities and target agent for a message"""
+
+    def __init__(
+        self,
+        intent_patterns: Dict[str, List[str]] = INTENT_PATTERNS,
+        entity_patterns: Dict[str, str] = ENTITY_PATTERNS,
+        agent_keywords: Dict[str, List[str]] = AGENT_KEYWORDS,
+        cache_size: int = CACHE_SIZE,
+    ):
+        # Positional group names keep labels out of regex syntax; group i is intent i
+        self.intent_names = list(intent_patterns)
+        self.intent_regex = re.compile("(?=" + "|".join(
+            f"(?P<i{rank}>" + "|".join(f"(?:{pattern})" for pattern in patterns) + ")"
+            for rank, patterns in enumerate(intent_patterns.values())
+        ) + ")")
+        self._intent_rank = {f"i{rank}": rank for rank in range(len(self.intent_names))}
+
+        self.agent_names = list(agent_keywords)
+        keyword_rank: Dict[str, int] = {}
+        for rank, keywords in enumerate(agent_keywords.values()):
+            for keyword in keywords:
+                keyword_rank.setdefault(keyword.lower(), rank)
+        # The trie reports the longest keyword at a position; the shorter ones it contains matched too
+        self._keyword_rank = {
+            keyword: min(rank for other, rank in keyword_rank.items() if keyword.startswith(other))
+            for keyword in keyword_rank
+        }
+        self.keyword_regex = re.compile(f"(?=({keyword_trie(keyword_rank)}))")
+
+        self.entity_regexes = [(entity_type, re.compile(pattern)) for entity_type, pattern in entity_patterns.items()]
+
+        self.classify = lru_cache(maxsize=cache_size)(self._classify)
+
+    def intent(self, folded: str) -> str:
+        """First intent (in priority order) matching anywhere in case-folded text"""
+        best = None
+        for match in self.intent_regex.finditer(folded):
+            rank = self._intent_rank[match.lastgroup]
+            if best is None or rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return self.intent_names[best] if best is not None else DEFAULT_INTENT
+
+    def agent(self, folded: str) -> str:
+        """First agent (in priority order) with a keyword anywhere in case-folded text"""
+        best = None
+        for match in self.keyword_regex.finditer(folded):
+            rank = self._keyword_rank[match.group(1)]
+            if best is None or rank < best:
+                best = rank
+                if rank == 0:
+                    break
+        return self.agent_names[best] if best is not None else DEFAULT_AGENT
+
+    def entities(self, text: str, folded: str) -> Tuple[Entity, ...]:
+        # Values keep the user's casing unless folding changed the text length
+        source = text if len(folded) == len(text) else folded
+        return tuple(
+            (entity_type, source[match.start(1):match.end(1)].strip(), match.start(), match.end())
+            for entity_type, regex in self.entity_regexes
+            for match in regex.finditer(folded)
+        )
+
+    def _classify(self, text: str) -> Classification:
+        folded = text.lower()
+        return Classification(self.intent(folded), self.agent(folded), self.entities(text, folded))
+
+    def classify_many(self, texts: Iterable[str]) -> List[Classification]:
+        """Classify a batch; repeats within it and recently seen messages come from the cache"""
+        return [self.classify(text) for text in texts]
+
+
+intent_router = IntentRouter()
@@ -1,8 +1,10 @@
 import io
 import logging
 from typing import Optional
-import speech_recognition as sr
-from pydub import AudioSegment
+from app.utils.lazy_import import lazy_import
+
+sr = lazy_import("speech_recognition", "SpeechRecognition")
+pydub = lazy_import("pydub")
 
 logger = logging.getLogger(__name__)
 
@@ -10,16 +12,23 @@ class SpeechToText:
     """Convert speech to text"""
     
     def __init__(self):
-        self.recognizer = sr.Recognizer()
-        self.recognizer.energy_threshold = 300
-        self.recognizer.dynamic_energy_threshold = True
+        self._recognizer = None
+
+    @property
+    def recognizer(self):
+        # Created on first use so constructing the service doesn't load the voice stack
+        if self._recognizer is None:
+            self._recognizer = sr.Recognizer()
+            self._recognizer.energy_threshold = 300
+            self._recognizer.dynamic_energy_threshold = True
+        return self._recognizer
     
     async def transcribe(self, audio_data: bytes) -> str:
         """Transcribe audio data to text"""
         try:
             # Convert bytes to audio
             audio_io = io.BytesIO(audio_data)
-            audio_segment = AudioSegment.from_file(audio_io)
+            audio_segment = pydub.AudioSegment.from_file(audio_io)
             
             # Convert to WAV format
             wav_io = io.BytesIO()
@@ -1,12 +1,14 @@
 import io
 import logging
 from typing import Optional
-from gtts import gTTS
+from app.utils.lazy_import import lazy_import
 import tempfile
 import os
 
 logger = logging.getLogger(__name__)
 
+gtts = lazy_import("gtts", "gTTS")
+
 class TextToSpeech:
     """Convert text to speech"""
     
@@ -21,7 +23,7 @@ class TextToSpeech:
                 return None
             
             # Create TTS object
-            tts = gTTS(text=text, lang=self.language, slow=self.slow)
+            tts = gtts.gTTS(text=text, lang=self.language, slow=self.slow)
             
             # Save to temporary file
             with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as tmp_file:
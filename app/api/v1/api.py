@@ -11,7 +11,7 @@ from app.api.v1.endpoints.notification import notifications
 from app.api.v1.endpoints.organization import departments, locations
 from app.api.v1.endpoints.purchase import goods_receipts, po_payments, purchase_orders, suppliers
 from app.api.v1.endpoints.reports import reports
-from app.api.v1.endpoints.system import export
+from app.api.v1.endpoints.system import export, search
 from app.api.v1.endpoints.task import tasks, task_types, webhooks, mobile
 
 api_router = APIRouter()
@@ -90,4 +90,7 @@ api_router.include_router(reports.router, prefix="/reports", tags=["Reports"])
 api_router.include_router(notifications.router, prefix="/notifications", tags=["Notifications"])
 
 # Export routes
-api_router.include_router(export.router, prefix="/export", tags=["Data Export"])
\ No newline at end of file
+api_router.include_router(export.router, prefix="/export", tags=["Data Export"])
+
+# Search routes
+api_router.include_router(search.router, prefix="/search", tags=["Search"])
\ No newline at end of file
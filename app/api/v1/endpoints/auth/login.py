@@ -705,8 +705,8 @@ async def reset_password_otp(
             if not user:
                 raise HTTPException(status_code=404, detail="User not found.")
 
-            from app.core.security import get_password_hash
-            user.hashed_password = get_password_hash(data.new_password)
+            from app.core.security import get_password_hash_async
+            user.hashed_password = await get_password_hash_async(data.new_password)
             user.updated_at = datetime.utcnow()
             await session.commit()
 
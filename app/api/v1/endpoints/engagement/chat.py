@@ -11,7 +11,7 @@ from app.services.engagement.user_history_service import UserHistoryService
 from app.schemas.engagement.chat_schema import (
     ChatConversationCreate, ChatConversationUpdate, ChatConversationResponse,
     ChatConversationWithMessages, ChatConversationListResponse,
-    ChatMessageCreate, ChatMessageResponse, AddMessageRequest, ChatStats
+    ChatMessageCreate, ChatMessageResponse, ChatMessagePage, AddMessageRequest, ChatStats
 )
 from app.models.shared.enums import HistoryActionType, MessageRole
 
@@ -63,17 +63,16 @@ async def create_conversation(
 async def get_conversation(
     conversation_id: int,
     request: Request,
+    limit: int = Query(50, ge=1, le=200, description="Most recent messages to include"),
     session: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ):
-    """Get a conversation with all its messages"""
+    """Get a conversation with its most recent messages"""
     try:
         chat_service = ChatService(session)
         history_service = UserHistoryService(session)
         
-        conversation = await chat_service.get_conversation(
-            conversation_id, current_user.id, include_messages=True
-        )
+        conversation = await chat_service.get_conversation(conversation_id, current_user.id)
         
         if not conversation:
             raise HTTPException(
@@ -81,6 +80,10 @@ async def get_conversation(
                 detail="Conversation not found"
             )
         
+        messages, has_more = await chat_service.get_conversation_messages(
+            conversation_id, current_user.id, limit=limit
+        )
+        
         # Log to history
         await history_service.log_action(
             user_id=current_user.id,
@@ -94,13 +97,12 @@ async def get_conversation(
         )
         
         # Convert to response model
-        messages = [
-            ChatMessageResponse.model_validate(msg, from_attributes=True) 
-            for msg in sorted(conversation.messages, key=lambda x: x.created_at)
-        ]
-        
         response = ChatConversationWithMessages.model_validate(conversation, from_attributes=True)
-        response.messages = messages
+        response.messages = [
+            ChatMessageResponse.model_validate(msg, from_attributes=True) for msg in messages
+        ]
+        response.has_more = has_more
+        response.next_before_id = messages[0].id if has_more else None
         
         return response
         
@@ -113,6 +115,42 @@ async def get_conversation(
             detail="Error retrieving conversation"
         )
 
+@router.get("/conversations/{conversation_id}/messages", response_model=ChatMessagePage)
+async def get_conversation_messages(
+    conversation_id: int,
+    before_id: Optional[int] = Query(None, description="Load messages older than this message"),
+    limit: int = Query(50, ge=1, le=200),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Page backwards through a conversation's messages"""
+    try:
+        chat_service = ChatService(session)
+        page = await chat_service.get_conversation_messages(
+            conversation_id, current_user.id, before_id, limit
+        )
+        if page is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Conversation not found"
+            )
+        
+        messages, has_more = page
+        return ChatMessagePage(
+            messages=[ChatMessageResponse.model_validate(msg, from_attributes=True) for msg in messages],
+            has_more=has_more,
+            next_before_id=messages[0].id if has_more else None
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting conversation messages: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error retrieving messages"
+        )
+
 @router.post("/conversations/{conversation_id}/messages", response_model=ChatMessageResponse, status_code=status.HTTP_201_CREATED)
 async def add_message(
     conversation_id: int,
@@ -307,32 +345,6 @@ async def delete_conversation(
 #         )
 
 
-# @router.get("/conversations/{conversation_id}/messages", response_model=List[ChatMessageResponse])
-# async def get_conversation_messages(
-#     conversation_id: int,
-#     skip: int = Query(0, ge=0),
-#     limit: int = Query(100, ge=1, le=200),
-#     session: AsyncSession = Depends(get_async_session),
-#     current_user: User = Depends(get_current_user)
-# ):
-#     """Get messages for a specific conversation"""
-#     try:
-#         chat_service = ChatService(session)
-        
-#         messages = await chat_service.get_conversation_messages(
-#             conversation_id, current_user.id, skip, limit
-#         )
-        
-#         return [ChatMessageResponse.model_validate(msg, from_attributes=True) for msg in messages]
-        
-#     except Exception as e:
-#         logger.error(f"Error getting conversation messages: {e}")
-#         raise HTTPException(
-#             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-#             detail="Error retrieving messages"
-#         )
-
-
 # @router.get("/stats", response_model=ChatStats)
 # async def get_chat_stats(
 #     session: AsyncSession = Depends(get_async_session),
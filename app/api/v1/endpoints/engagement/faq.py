@@ -116,6 +116,24 @@ async def get_faq_categories(
             detail="Error retrieving categories"
         )
 
+@router.get("/ask", response_model=List[FAQResponse])
+async def ask_faq(
+    q: str = Query(..., min_length=2, max_length=1000, description="Free-text question"),
+    limit: int = Query(5, ge=1, le=20),
+    session: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Most relevant FAQs (own and public) for a free-text question, best first"""
+    try:
+        faq_service = FAQService(session)
+        return await faq_service.search_faqs(q, current_user.id, limit)
+    except Exception as e:
+        logger.error(f"Error searching FAQs: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Error searching FAQs"
+        )
+
 @router.get("/{faq_id}", response_model=FAQResponse)
 async def get_faq(
     faq_id: int,
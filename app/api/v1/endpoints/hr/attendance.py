@@ -46,6 +46,18 @@ async def get_attendance(
         user_id=current_user.id
     )
 
+@router.put("/{attendance_id}", response_model=AttendanceResponse)
+async def update_attendance(
+    attendance_id: int,
+    attendance: AttendanceUpdate,
+    session: AsyncSession = Depends(get_async_session),
+    current_user = Depends(get_current_user),
+    _permission = Depends(require_permission("attendance", "update"))
+):
+    """Manually correct an attendance record"""
+    service = AttendanceService(session)
+    return await service.update_attendance(attendance_id, attendance, current_user.id)
+
 @router.get("/employee/{employee_id}/summary")
 async def get_employee_attendance_summary(
     employee_id: int,
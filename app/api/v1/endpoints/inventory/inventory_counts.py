@@ -5,7 +5,7 @@ from app.api.dependencies import get_current_user, require_permission
 from app.core.database import get_async_session
 from app.schemas.common.pagination import PaginatedResponse
 from app.services.inventory.inventory_count_service import InventoryCountService
-from app.schemas.inventory.inventory_count import InventoryCount, InventoryCountCreate, InventoryCountItemCreate, InventoryCountUpdate
+from app.schemas.inventory.inventory_count import CountSheetPage, InventoryCount, InventoryCountCreate, InventoryCountItemCreate, InventoryCountUpdate
 from app.models.auth.user import User
 from app.core.exceptions import NotFoundError, ValidationError
 
@@ -86,6 +86,19 @@ async def get_inventory_counts(
     )
     return counts
 
+@router.get("/count-sheet/{location_id}", response_model=CountSheetPage)
+async def get_count_sheet(
+    location_id: int,
+    after_item_id: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    page_size: int = Query(500, ge=1, le=2000),
+    item_ids: Optional[List[int]] = Query(None),
+    db: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Count sheet for a location, pulled page by page"""
+    service = InventoryCountService(db)
+    return await service.get_count_sheet_page(location_id, item_ids, after_item_id, page_size)
+
 @router.get("/{count_id}", response_model=InventoryCount)
 async def get_inventory_count(
     count_id: int,
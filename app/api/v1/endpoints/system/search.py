@@ -0,0 +1,29 @@
+from typing import Any, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+
+from app.api.dependencies import get_current_user
+from app.core.database import get_async_session
+from app.models.auth.user import User
+from app.services.search.search_service import SearchService, TYPEAHEAD_ENTITIES
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.get("/typeahead")
+async def typeahead(
+    q: str = Query(..., min_length=1, max_length=100, description="What the user has typed so far"),
+    types: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(TYPEAHEAD_ENTITIES)}"),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """Top matches (type, id, label, code) across items, products, employees and suppliers"""
+    entity_types = [t.strip() for t in types.split(",") if t.strip()] if types else None
+    try:
+        results = await SearchService(db).typeahead(q, entity_types, limit)
+        return {"query": q, "results": results}
+    except Exception as e:
+        logger.error(f"Typeahead search failed: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error running search")
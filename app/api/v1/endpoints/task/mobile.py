@@ -2,10 +2,14 @@
 Enhanced Mobile-specific endpoints for task management
 Matching the mobile UI requirements from the provided image
 """
-from typing import Any, List, Dict, Optional
-from fastapi import APIRouter, Depends, HTTPException
+import hashlib
+import json
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_, desc, or_, select, func, case
+from sqlalchemy import and_, desc, select, func, case
 from sqlalchemy.orm import selectinload
 from datetime import datetime, time, timedelta, timezone
 
@@ -16,11 +20,14 @@ from app.models.auth.user_role import UserRole
 from app.models.task.task import Task
 from app.models.task.task_type import TaskType
 from app.models.shared.enums import TaskStatus, TaskPriority
+from app.services.task.task_dashboard_service import ROLE_TASK_FILTERS, TaskDashboardService
+from app.services.task.task_sync_service import TaskSyncService
 
 router = APIRouter()
 
 @router.get("/dashboard/summary")
 async def get_user_task_summary(
+    request: Request,
     db: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user)
 ) -> Any:
@@ -29,60 +36,25 @@ async def get_user_task_summary(
     Returns: Total, Pending, In Progress, Completed tasks with completion percentage
     """
     try:
-        # Get user's tasks base query
-        user_tasks_base = select(Task).where(
-            and_(
-                Task.assigned_to == current_user.id,
-                Task.is_active == True
-            )
-        )
-        
-        # Total tasks
-        total_result = await db.execute(
-            select(func.count()).select_from(Task).where(
+        # All four counts in one statement
+        counts_result = await db.execute(
+            select(
+                func.count().label("total"),
+                func.count().filter(Task.status == TaskStatus.PENDING).label("pending"),
+                func.count().filter(Task.status == TaskStatus.IN_PROGRESS).label("in_progress"),
+                func.count().filter(Task.status == TaskStatus.COMPLETED).label("completed")
+            ).select_from(Task).where(
                 and_(
                     Task.assigned_to == current_user.id,
                     Task.is_active == True
                 )
             )
         )
-        total_tasks = total_result.scalar() or 0
-        
-        # Pending tasks
-        pending_result = await db.execute(
-            select(func.count()).select_from(Task).where(
-                and_(
-                    Task.assigned_to == current_user.id,
-                    Task.is_active == True,
-                    Task.status == TaskStatus.PENDING
-                )
-            )
-        )
-        pending_tasks = pending_result.scalar() or 0
-        
-        # In progress tasks
-        in_progress_result = await db.execute(
-            select(func.count()).select_from(Task).where(
-                and_(
-                    Task.assigned_to == current_user.id,
-                    Task.is_active == True,
-                    Task.status == TaskStatus.IN_PROGRESS
-                )
-            )
-        )
-        in_progress_tasks = in_progress_result.scalar() or 0
-        
-        # Completed tasks
-        completed_result = await db.execute(
-            select(func.count()).select_from(Task).where(
-                and_(
-                    Task.assigned_to == current_user.id,
-                    Task.is_active == True,
-                    Task.status == TaskStatus.COMPLETED
-                )
-            )
-        )
-        completed_tasks = completed_result.scalar() or 0
+        counts = counts_result.one()
+        total_tasks = counts.total or 0
+        pending_tasks = counts.pending or 0
+        in_progress_tasks = counts.in_progress or 0
+        completed_tasks = counts.completed or 0
         
         # Calculate completion percentage
         completion_percentage = int((completed_tasks / total_tasks * 100)) if total_tasks > 0 else 0
@@ -93,7 +65,7 @@ async def get_user_task_summary(
                 return "201+"
             return str(count)
         
-        return {
+        return _conditional_response(request, {
             "user_name": current_user.full_name,
             "greeting": f"Hi, {current_user.full_name.split()[0]}!",
             "date": datetime.now().strftime("%A, %B %d, %Y"),
@@ -117,13 +89,14 @@ async def get_user_task_summary(
             },
             "completion_percentage": f"{completion_percentage}%",
             "completion_color": _get_progress_color(completion_percentage)
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching task summary: {str(e)}")
 
 @router.get("/dashboard/tasks")
 async def get_user_task_details(
+    request: Request,
     db: AsyncSession = Depends(get_async_session),
     current_user: User = Depends(get_current_user),
     limit: int = 10
@@ -134,9 +107,7 @@ async def get_user_task_details(
     """
     try:
         # Get pending and in-progress tasks
-        tasks_query = select(Task).options(
-            # Using selectinload for eager loading
-        ).join(TaskType).where(
+        tasks_query = select(Task, TaskType.category).join(TaskType).where(
             and_(
                 Task.assigned_to == current_user.id,
                 Task.is_active == True,
@@ -151,17 +122,9 @@ async def get_user_task_details(
         ).limit(limit)
         
         result = await db.execute(tasks_query)
-        tasks = result.scalars().all()
         
-        # Get task type information for each task
         formatted_tasks = []
-        for task in tasks:
-            # Get task type info
-            task_type_result = await db.execute(
-                select(TaskType).where(TaskType.id == task.task_type_id)
-            )
-            task_type = task_type_result.scalar_one_or_none()
-            
+        for task, category in result.all():
             # Calculate days until due or overdue
             days_info = None
             if task.due_date:
@@ -178,7 +141,7 @@ async def get_user_task_details(
                 "task_number": task.task_number,
                 "title": task.title,
                 "description": task.description,
-                "category": task_type.category if task_type else "GENERAL",
+                "category": category or "GENERAL",
                 "priority": task.priority.value,
                 "status": task.status.value,
                 "due_date": task.due_date.isoformat() if task.due_date else None,
@@ -199,7 +162,7 @@ async def get_user_task_details(
         # Count urgent tasks
         urgent_count = len([t for t in formatted_tasks if t["is_urgent"]])
         
-        return {
+        return _conditional_response(request, {
             "total_tasks": len(formatted_tasks),
             "urgent_count": urgent_count,
             "pending_count": len(pending_tasks),
@@ -210,11 +173,33 @@ async def get_user_task_details(
                 "all": formatted_tasks
             },
             "has_urgent": urgent_count > 0
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching task details: {str(e)}")
 
+@router.get("/sync")
+async def sync_tasks(
+    request: Request,
+    db: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous sync; omit for a full sync"),
+    limit: int = Query(200, ge=1, le=500, description="Maximum rows per stream")
+) -> Any:
+    """
+    Delta sync for the mobile task screens
+    Returns tasks, comments, assignments and notifications changed since `cursor`,
+    tombstones under `deleted`, and the cursor for the next call (repeat while `has_more`).
+    Unchanged state answers 304 to a matching If-None-Match.
+    """
+    try:
+        changes = await TaskSyncService(db).get_changes(current_user.id, cursor, limit)
+        return _conditional_response(request, changes)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error syncing tasks: {str(e)}")
+
 @router.get("/dashboard/department-overview")
 async def get_department_overview(
     db: AsyncSession = Depends(get_async_session),
@@ -239,57 +224,31 @@ async def get_department_overview(
         is_branch_manager = "BRANCH_MANAGER" in user_roles or current_user.is_superuser
         
         department_overview = []
+        dashboard_service = TaskDashboardService(db)
         
         if is_branch_manager:
-            # Branch managers see all department summaries
-            
-            # 1. Branch Manager Tasks
-            branch_tasks = await _get_tasks_by_role(db, "BRANCH_MANAGER")
-            branch_summary = await _calculate_department_summary(
-                branch_tasks, "Branch Manager", "👨‍💼", "branch_manager"
-            )
-            department_overview.append(branch_summary)
-            
-            # 2. Chef Tasks
-            chef_tasks = await _get_tasks_by_role(db, "CHEF")
-            chef_summary = await _calculate_department_summary(
-                chef_tasks, "Chef", "👨‍🍳", "chef"
-            )
-            department_overview.append(chef_summary)
-            
-            # 3. HR Manager Tasks
-            hr_tasks = await _get_tasks_by_role(db, "HR_MANAGER")
-            if hr_tasks:
-                hr_summary = await _calculate_department_summary(
-                    hr_tasks, "HR Manager", "👤", "hr_manager"
-                )
-                department_overview.append(hr_summary)
-            
-            # 4. Inventory Manager Tasks
-            inventory_tasks = await _get_tasks_by_role(db, "INVENTORY_MANAGER")
-            if inventory_tasks:
-                inventory_summary = await _calculate_department_summary(
-                    inventory_tasks, "Inventory Manager", "📦", "inventory_manager"
-                )
-                department_overview.append(inventory_summary)
-            
-            # 5. Staff Tasks (General)
-            staff_tasks = await _get_general_staff_tasks(db)
-            staff_summary = await _calculate_department_summary(
-                staff_tasks, "Staff", "👥", "staff"
+            # Branch managers see all department summaries, counted in one statement
+            roles = [
+                ("BRANCH_MANAGER", "Branch Manager", "👨‍💼", "branch_manager", True),
+                ("CHEF", "Chef", "👨‍🍳", "chef", True),
+                ("HR_MANAGER", "HR Manager", "👤", "hr_manager", False),
+                ("INVENTORY_MANAGER", "Inventory Manager", "📦", "inventory_manager", False),
+                ("STAFF", "Staff", "👥", "staff", True),
+            ]
+            counts = await dashboard_service.get_role_task_counts(
+                {key: ROLE_TASK_FILTERS[key] for key, *_ in roles}
             )
-            department_overview.append(staff_summary)
+            for key, role_name, icon, role_key, always in roles:
+                if always or counts[key]["total"]:
+                    department_overview.append(
+                        _calculate_department_summary(counts[key], role_name, icon, role_key)
+                    )
             
         else:
             # Non-branch managers see only their own tasks
-            user_tasks_query = select(Task).where(
-                and_(
-                    Task.assigned_to == current_user.id,
-                    Task.is_active == True
-                )
+            counts = await dashboard_service.get_role_task_counts(
+                {"my_tasks": Task.assigned_to == current_user.id}
             )
-            user_result = await db.execute(user_tasks_query)
-            user_tasks = user_result.scalars().all()
             
             # Determine user's primary role
             primary_role = "Staff"
@@ -307,8 +266,8 @@ async def get_department_overview(
                 primary_role = "Inventory Manager"
                 role_icon = "📦"
             
-            user_summary = await _calculate_department_summary(
-                user_tasks, f"My Tasks ({primary_role})", role_icon, "my_tasks"
+            user_summary = _calculate_department_summary(
+                counts["my_tasks"], f"My Tasks ({primary_role})", role_icon, "my_tasks"
             )
             department_overview.append(user_summary)
         
@@ -324,73 +283,24 @@ async def get_department_overview(
 
 # Helper functions
 
-async def _get_tasks_by_role(db: AsyncSession, role_name: str) -> List[Task]:
-    """Get tasks relevant to a specific role"""
-    if role_name == "BRANCH_MANAGER":
-        # Branch manager sees high priority, approval tasks, and category-specific tasks
-        query = select(Task).join(TaskType).where(
-            and_(
-                Task.is_active == True,
-                or_(
-                    TaskType.category.in_(["INVENTORY", "PURCHASE", "OPERATIONS"]),
-                    Task.priority.in_([TaskPriority.HIGH, TaskPriority.URGENT]),
-                    TaskType.requires_approval == True
-                )
-            )
-        )
-    elif role_name == "CHEF":
-        # Chef sees operations and maintenance tasks
-        query = select(Task).join(TaskType).where(
-            and_(
-                Task.is_active == True,
-                or_(
-                    TaskType.category.in_(["OPERATIONS", "MAINTENANCE"]),
-                    Task.reference_type.in_(["LOW_STOCK_ALERT", "EQUIPMENT_MAINTENANCE", "MENU_PLANNING"])
-                )
-            )
-        )
-    elif role_name == "HR_MANAGER":
-        # HR manager sees HR category tasks
-        query = select(Task).join(TaskType).where(
-            and_(
-                Task.is_active == True,
-                TaskType.category == "HR"
-            )
-        )
-    elif role_name == "INVENTORY_MANAGER":
-        # Inventory manager sees inventory tasks
-        query = select(Task).join(TaskType).where(
-            and_(
-                Task.is_active == True,
-                TaskType.category == "INVENTORY"
-            )
-        )
-    else:
-        return []
-    
-    result = await db.execute(query)
-    return result.scalars().all()
-
-async def _get_general_staff_tasks(db: AsyncSession) -> List[Task]:
-    """Get general staff tasks"""
-    query = select(Task).join(TaskType).where(
-        and_(
-            Task.is_active == True,
-            TaskType.category.in_(["OPERATIONS", "CUSTOMER_SERVICE"]),
-            Task.priority.in_([TaskPriority.LOW, TaskPriority.MEDIUM])
-        )
-    )
-    result = await db.execute(query)
-    return result.scalars().all()
+def _conditional_response(request: Request, payload: Dict[str, Any]) -> Response:
+    """JSON response with an ETag; 304 without a body when the client already has it"""
+    content = jsonable_encoder(payload)
+    etag = '"' + hashlib.sha1(json.dumps(content, sort_keys=True).encode()).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=content, headers=headers)
 
-async def _calculate_department_summary(
-    tasks: List[Task], 
+def _calculate_department_summary(
+    counts: Dict[str, int], 
     role_name: str, 
     icon: str, 
     role_key: str
 ) -> Dict[str, Any]:
-    """Calculate department summary statistics"""
-    total_tasks = len(tasks)
+    """Department summary from counts computed in SQL"""
+    total_tasks = counts["total"]
     
     if total_tasks == 0:
         return {
@@ -409,10 +319,10 @@ async def _calculate_department_summary(
             }
         }
     
-    pending_tasks = len([t for t in tasks if t.status == TaskStatus.PENDING])
-    in_progress_tasks = len([t for t in tasks if t.status == TaskStatus.IN_PROGRESS])
-    completed_tasks = len([t for t in tasks if t.status == TaskStatus.COMPLETED])
-    urgent_tasks = len([t for t in tasks if t.priority == TaskPriority.URGENT])
+    pending_tasks = counts["pending"]
+    in_progress_tasks = counts["in_progress"]
+    completed_tasks = counts["completed"]
+    urgent_tasks = counts["urgent"]
     
     # Calculate completion percentage
     progress_percentage = int((completed_tasks / total_tasks * 100)) if total_tasks > 0 else 0
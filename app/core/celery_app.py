@@ -1,5 +1,6 @@
 from celery import Celery
 from celery.schedules import crontab
+from kombu import Exchange, Queue
 from app.core.config import settings
 import sys
 
@@ -9,6 +10,7 @@ celery_app = Celery(
     broker=settings.CELERY_BROKER_URL,
     backend=settings.CELERY_RESULT_BACKEND,
     include=[
+        "app.workers.runtime",
         "app.workers.celery_tasks.hr_tasks",
         # "app.workers.celery_tasks.email_tasks",
         # "app.workers.celery_tasks.report_tasks",
@@ -17,6 +19,27 @@ celery_app = Celery(
     ]
 )
 
+# Queue topology
+# - realtime: short, latency-sensitive work (notifications, warnings, deadline checks)
+# - io_sync:  network-bound integrations (Foodics)
+# - batch:    heavy DB jobs (payroll, stock scans, digests, cleanup)
+# Run one worker per queue so each gets its own concurrency and prefetch, e.g.
+#   celery -A app.core.celery_app worker -Q realtime -c 4 --prefetch-multiplier=4
+#   celery -A app.core.celery_app worker -Q io_sync  -c 8 --prefetch-multiplier=1
+#   celery -A app.core.celery_app worker -Q batch    -c 2 --prefetch-multiplier=1 -O fair
+QUEUE_REALTIME = "realtime"
+QUEUE_IO_SYNC = "io_sync"
+QUEUE_BATCH = "batch"
+
+# Redis broker priorities: 0 is the highest, 9 the lowest
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+
+HR_TASKS = "app.workers.celery_tasks.hr_tasks"
+TASK_MANAGEMENT_TASKS = "app.workers.celery_tasks.task_management_tasks"
+ORDER_SYNC_TASKS = "app.workers.celery_tasks.order_sync_tasks"
+
 # Configure Celery
 celery_app.conf.update(
     task_serializer="json",
@@ -25,9 +48,41 @@ celery_app.conf.update(
     timezone="UTC",
     enable_utc=True,
     result_expires=3600,
-    # task_routes={
-    #     "app.workers.celery_tasks.*": {"queue": "main"},
-    # }
+    task_queues=(
+        Queue(QUEUE_REALTIME, Exchange(QUEUE_REALTIME), routing_key=QUEUE_REALTIME),
+        Queue(QUEUE_IO_SYNC, Exchange(QUEUE_IO_SYNC), routing_key=QUEUE_IO_SYNC),
+        Queue(QUEUE_BATCH, Exchange(QUEUE_BATCH), routing_key=QUEUE_BATCH),
+    ),
+    task_default_queue=QUEUE_REALTIME,
+    task_default_priority=PRIORITY_NORMAL,
+    broker_transport_options={
+        "priority_steps": list(range(10)),
+        "queue_order_strategy": "priority",
+    },
+    worker_prefetch_multiplier=1,
+    task_routes={
+        # Realtime
+        f"{HR_TASKS}.send_attendance_warnings": {"queue": QUEUE_REALTIME, "priority": PRIORITY_HIGH},
+        f"{HR_TASKS}.create_late_attendance_ticket": {"queue": QUEUE_REALTIME, "priority": PRIORITY_HIGH},
+        f"{TASK_MANAGEMENT_TASKS}.dispatch_task_deadlines": {"queue": QUEUE_REALTIME, "priority": PRIORITY_HIGH},
+        f"{TASK_MANAGEMENT_TASKS}.send_daily_hr_tasks": {"queue": QUEUE_REALTIME},
+        f"{TASK_MANAGEMENT_TASKS}.send_daily_inventory_tasks": {"queue": QUEUE_REALTIME},
+        # IO-bound sync
+        f"{ORDER_SYNC_TASKS}.*": {"queue": QUEUE_IO_SYNC},
+        # Heavy batch
+        f"{HR_TASKS}.process_daily_attendance": {"queue": QUEUE_BATCH},
+        f"{HR_TASKS}.generate_monthly_salaries": {"queue": QUEUE_BATCH, "priority": PRIORITY_LOW},
+        f"{HR_TASKS}.generate_location_salaries": {"queue": QUEUE_BATCH, "priority": PRIORITY_LOW},
+        f"{HR_TASKS}.aggregate_salary_results": {"queue": QUEUE_BATCH},
+        f"{TASK_MANAGEMENT_TASKS}.check_low_stock_and_create_tasks": {"queue": QUEUE_BATCH},
+        f"{TASK_MANAGEMENT_TASKS}.create_monthly_salary_tasks": {"queue": QUEUE_BATCH},
+        f"{TASK_MANAGEMENT_TASKS}.create_maintenance_tasks_for_all_locations": {"queue": QUEUE_BATCH},
+        f"{TASK_MANAGEMENT_TASKS}.send_daily_task_digests": {"queue": QUEUE_BATCH},
+        f"{TASK_MANAGEMENT_TASKS}.send_task_digest_batch": {"queue": QUEUE_BATCH, "priority": PRIORITY_LOW},
+        f"{TASK_MANAGEMENT_TASKS}.aggregate_digest_results": {"queue": QUEUE_BATCH},
+        f"{TASK_MANAGEMENT_TASKS}.generate_task_analytics_cache": {"queue": QUEUE_BATCH},
+        f"{TASK_MANAGEMENT_TASKS}.cleanup_completed_tasks": {"queue": QUEUE_BATCH, "priority": PRIORITY_LOW},
+    },
 )
 
 # Windows-specific configuration
@@ -82,22 +137,14 @@ celery_app.conf.beat_schedule = {
         'task': 'app.workers.celery_tasks.task_management_tasks.create_maintenance_tasks_for_all_locations',
         'schedule': 2592000.0,  # Monthly (30 days)
     },
-    'check-overdue-tasks': {
-        'task': 'app.workers.celery_tasks.task_management_tasks.check_overdue_tasks_and_notify',
-        'schedule': 3600.0,  # Every hour
-    },
-    'check-tasks-due-soon': {
-        'task': 'app.workers.celery_tasks.task_management_tasks.check_tasks_due_soon',
-        'schedule': 10800.0,  # Every 3 hours
+    'dispatch-task-deadlines': {
+        'task': 'app.workers.celery_tasks.task_management_tasks.dispatch_task_deadlines',
+        'schedule': settings.TASK_DEADLINE_POLL_SECONDS,  # Pops only the deadlines that are due
     },
     'send-daily-digests': {
         'task': 'app.workers.celery_tasks.task_management_tasks.send_daily_task_digests',
         'schedule': 86400.0,  # Daily
     },
-    'escalate-overdue-tasks': {
-        'task': 'app.workers.celery_tasks.task_management_tasks.escalate_overdue_high_priority_tasks',
-        'schedule': 43200.0,  # Every 12 hours
-    },
     'generate-analytics-cache': {
         'task': 'app.workers.celery_tasks.task_management_tasks.generate_task_analytics_cache',
         'schedule': 1800.0,  # Every 30 minutes
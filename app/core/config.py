@@ -27,6 +27,8 @@ class Settings(BaseSettings):
     REDIS_URL: str
     CELERY_BROKER_URL: str
     CELERY_RESULT_BACKEND: str
+    WORKER_DB_POOL_SIZE: int = 5
+    WORKER_DB_MAX_OVERFLOW: int = 5
 
     # === JWT ===
     SECRET_KEY: str
@@ -69,10 +71,24 @@ class Settings(BaseSettings):
     DEBUG: bool = False
     ENVIRONMENT: str = "development"
     LOG_LEVEL: str = "INFO"
+    N_PLUS_ONE_THRESHOLD: int = 10  # Same statement shape repeated this often in one request is logged
     TIMEZONE: str = "Asia/Dhaka"
+    REPORT_CACHE_ENABLED: bool = True
+    REPORT_CACHE_MAX_TTL: int = 1800  # Seconds; entries are invalidated by table writes well before this
+    DOCUMENT_NUMBER_BLOCK_SIZE: int = 20  # Document numbers each process reserves per round trip
+    TASK_DUE_SOON_HOURS: int = 24  # Assignees are reminded this long before a task is due
+    TASK_ESCALATION_HOURS: int = 48  # High/urgent tasks overdue this long are escalated
+    TASK_DEADLINE_POLL_SECONDS: float = 60.0  # How often due task deadlines are dispatched
+    EVENT_SINK_QUEUE_SIZE: int = 10000  # Buffered history/audit rows per process before spilling to Redis
+    EVENT_SINK_BATCH_SIZE: int = 500  # Rows per multi-row INSERT
+    EVENT_SINK_FLUSH_MS: int = 200  # Longest a buffered row waits before it is written
+    FAQ_INDEX_REFRESH_SECONDS: float = 5.0  # How often a worker checks for FAQ changes made by other workers
 
     # === Security ===
     BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 200
+    RATE_LIMIT_LOCAL_BATCH: int = 5
     SESSION_EXPIRE_HOURS: int = 24
 
     # === Business Rules ===
@@ -2,6 +2,9 @@
 from typing import AsyncIterator
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from app.core.config import settings
+from app.core.instrumentation import instrument_engine
+from app.core.table_versions import install_write_tracking
+from app.core.task_deadlines import install_deadline_tracking
 
 database_url = settings.DATABASE_URL
 
@@ -16,6 +19,10 @@ engine = create_async_engine(
     pool_pre_ping=True,
 )
 
+instrument_engine(engine)
+install_write_tracking()
+install_deadline_tracking()
+
 async_session_maker = async_sessionmaker(
     bind=engine,
     class_=AsyncSession,
@@ -0,0 +1,127 @@
+"""
+Document number allocation.
+
+Each (document type, day) has a row in `document_counters`. A process claims a
+block of numbers with one `INSERT ... ON CONFLICT DO UPDATE ... RETURNING` in
+its own short transaction and hands them out from memory, so creating a
+document costs no extra query most of the time and never scans the document
+table. Numbers are unique across processes; a restart or a rolled-back create
+leaves gaps, which is fine for document numbers.
+
+Claims run on a small engine of their own rather than the request pool: a
+request already holding a pooled connection never waits for a second one, and
+callers that find the block empty await the single claim in flight for it
+instead of queueing behind a lock.
+"""
+import asyncio
+import logging
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession, create_async_engine
+from app.core.config import settings
+from app.models.system.document_counter import DocumentCounter
+
+logger = logging.getLogger(__name__)
+
+# (prefix, separator before the sequence, minimum sequence digits)
+DOCUMENT_FORMATS: Dict[str, Tuple[str, str, int]] = {
+    "PO": ("PO", "", 3),
+    "GR": ("GR", "", 3),
+    "TR": ("TR-", "-", 4),
+    "RR": ("RR-", "-", 4),
+    "IC": ("IC-", "-", 4),
+    "SHP": ("SHP-", "-", 4),
+}
+
+# Connections for counter claims, per database; claims are one short statement each
+COUNTER_POOL_SIZE = 2
+
+# (document type, day) -> [next value, last value of the claimed block]
+_blocks: Dict[Tuple[str, date], List[int]] = {}
+# (document type, day) -> claim in flight for an exhausted block
+_claims: Dict[Tuple[str, date], asyncio.Future] = {}
+_counter_engines: Dict[str, AsyncEngine] = {}
+
+
+def format_document_number(document_type: str, day: date, sequence: int) -> str:
+    prefix, separator, digits = DOCUMENT_FORMATS[document_type]
+    return f"{prefix}{day.strftime('%Y%m%d')}{separator}{sequence:0{digits}d}"
+
+
+def _counter_engine(session: AsyncSession) -> AsyncEngine:
+    """Dedicated small engine on the database `session` is bound to"""
+    bind = session.bind
+    if bind is None:
+        from app.core.database import engine as bind
+    if isinstance(bind, AsyncConnection):
+        bind = bind.engine
+    url = bind.url.render_as_string(hide_password=False)
+    engine = _counter_engines.get(url)
+    if engine is None:
+        engine = create_async_engine(
+            bind.url, pool_size=COUNTER_POOL_SIZE, max_overflow=0, pool_recycle=3600, pool_pre_ping=True
+        )
+        _counter_engines[url] = engine
+    return engine
+
+
+async def _claim_block(session: AsyncSession, document_type: str, day: date, size: int) -> int:
+    """Reserve `size` numbers; returns the last one of the block"""
+    table = DocumentCounter.__table__
+    dialect = session.bind.dialect.name if session.bind is not None else "postgresql"
+    insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+    stmt = insert(table).values(document_type=document_type, period=day, last_value=size, is_deleted=False)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.document_type, table.c.period],
+        set_={"last_value": table.c.last_value + size},
+    ).returning(table.c.last_value)
+
+    if dialect == "sqlite":
+        # Single-connection test databases: stay in the caller's transaction
+        return (await session.execute(stmt)).scalar_one()
+
+    # Own transaction so the counter row lock is released immediately, not at the caller's commit
+    async with _counter_engine(session).begin() as conn:
+        return (await conn.execute(stmt)).scalar_one()
+
+
+async def _refill(session: AsyncSession, document_type: str, day: date):
+    """Claim a new block for (document_type, day) and make it current"""
+    key = (document_type, day)
+    try:
+        size = max(1, settings.DOCUMENT_NUMBER_BLOCK_SIZE)
+        last = await _claim_block(session, document_type, day, size)
+        # Drop blocks of earlier days
+        for stale in [k for k in _blocks if k[0] == document_type and k[1] != day]:
+            del _blocks[stale]
+        _blocks[key] = [last - size + 1, last]
+    finally:
+        _claims.pop(key, None)
+
+
+async def next_document_number(session: AsyncSession, document_type: str, day: Optional[date] = None) -> str:
+    """Next number for a document type, e.g. PO20250101001 or TR-20250101-0001"""
+    day = day or date.today()
+    key = (document_type, day)
+    while True:
+        # No await between the check and the increment, so no lock is needed
+        block = _blocks.get(key)
+        if block is not None and block[0] <= block[1]:
+            sequence = block[0]
+            block[0] += 1
+            return format_document_number(document_type, day, sequence)
+
+        claim = _claims.get(key)
+        if claim is None:
+            claim = asyncio.ensure_future(_refill(session, document_type, day))
+            _claims[key] = claim
+        # Shielded: a caller giving up must not cancel the claim others are waiting on
+        await asyncio.shield(claim)
+
+
+async def dispose_counter_engines():
+    """Close the claim connections (app shutdown)"""
+    for engine in _counter_engines.values():
+        await engine.dispose()
+    _counter_engines.clear()
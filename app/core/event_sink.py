@@ -0,0 +1,207 @@
+"""
+Buffered, append-only writer for log tables (user history, audit log).
+
+Request handlers only enqueue: `event_sink.emit(session, Model, row)` puts the
+row on a bounded in-process queue and returns. A background task drains the
+queue every EVENT_SINK_FLUSH_MS (or as soon as EVENT_SINK_BATCH_SIZE rows are
+waiting) and writes each table's rows as one multi-row INSERT in its own
+transaction, on the engine of the session that emitted them.
+
+Rows that cannot be written (queue full, database error, shutdown with the
+database unavailable) are appended to a Redis stream and replayed by the next
+flusher to start, so they survive restarts. Only a hard kill can lose the
+rows buffered at that moment, at most one flush interval's worth.
+"""
+import asyncio
+import json
+import logging
+from datetime import date, datetime, timezone
+from enum import Enum
+from typing import Any, Dict, List, Optional, Tuple, Type
+from sqlalchemy import Date, DateTime, Enum as SQLEnum, insert
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SPILL_STREAM = "event_sink:spill"
+REPLAY_LOCK = "event_sink:replay_lock"
+REPLAY_LOCK_MS = 60_000
+
+Event = Tuple[AsyncEngine, Type, Dict[str, Any]]
+
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _decode(model, row: Dict[str, Any]) -> Dict[str, Any]:
+    """Restore enum and datetime values from their JSON form using the column types"""
+    columns = model.__table__.columns
+    decoded = {}
+    for name, value in row.items():
+        column_type = columns[name].type if name in columns else None
+        if value is not None and isinstance(column_type, SQLEnum) and column_type.enum_class is not None:
+            value = column_type.enum_class[value]
+        elif value is not None and isinstance(column_type, DateTime):
+            value = datetime.fromisoformat(value)
+        elif value is not None and isinstance(column_type, Date):
+            value = date.fromisoformat(value)
+        decoded[name] = value
+    return decoded
+
+
+def _models() -> Dict[str, Type]:
+    from app.models.auth.audit_log import AuditLog
+    from app.models.engagement.user_history import UserHistory
+
+    return {model.__tablename__: model for model in (AuditLog, UserHistory)}
+
+
+class EventSink:
+    """Per-process queue plus flusher task, bound to the loop that first emits"""
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._spills: set = set()
+        self._batch: List[Event] = []
+        self._session_makers: Dict[AsyncEngine, async_sessionmaker] = {}
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._flusher is None or self._flusher.done():
+            if self._loop is not loop:
+                self._queue = asyncio.Queue(maxsize=settings.EVENT_SINK_QUEUE_SIZE)
+            self._loop = loop
+            self._flusher = loop.create_task(self._run())
+
+    def emit(self, session: AsyncSession, model, row: Dict[str, Any]):
+        """Queue one row for `model`'s table; never waits on the database"""
+        row = {"is_deleted": False, "created_at": datetime.now(timezone.utc), **row}
+        self._ensure_started()
+        try:
+            self._queue.put_nowait((session.bind, model, row))
+        except asyncio.QueueFull:
+            logger.warning(f"Event sink queue full; spilling a {model.__tablename__} row to Redis")
+            self._spill_later([(session.bind, model, row)])
+
+    async def close(self):
+        """Stop the flusher and write out everything still queued (app shutdown)"""
+        if self._flusher is None:
+            return
+        self._flusher.cancel()
+        try:
+            await self._flusher
+        except asyncio.CancelledError:
+            pass
+        self._flusher = None
+        # A batch interrupted mid-write is written again; duplicates beat gaps in an audit trail
+        pending, self._batch = self._batch, []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        await self._write(pending)
+        if self._spills:
+            await asyncio.gather(*self._spills, return_exceptions=True)
+
+    # ---------- Flushing ----------
+    async def _run(self):
+        await self._replay_spilled()
+        interval = settings.EVENT_SINK_FLUSH_MS / 1000
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + interval
+            while len(batch) < settings.EVENT_SINK_BATCH_SIZE:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self._batch = batch
+            await self._write(batch)
+            self._batch = []
+
+    async def _write(self, events: List[Event]):
+        """One transaction and one multi-row INSERT per (engine, table)"""
+        groups: Dict[Tuple[AsyncEngine, Type], List[Dict[str, Any]]] = {}
+        for engine, model, row in events:
+            groups.setdefault((engine, model), []).append(row)
+
+        for (engine, model), rows in groups.items():
+            try:
+                session_maker = self._session_makers.get(engine)
+                if session_maker is None:
+                    session_maker = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+                    self._session_makers[engine] = session_maker
+                async with session_maker() as session:
+                    await session.execute(insert(model), rows)
+                    await session.commit()
+            except Exception as e:
+                logger.error(f"Error writing {len(rows)} {model.__tablename__} rows: {str(e)}")
+                await self._spill([(engine, model, row) for row in rows])
+
+    # ---------- Redis fallback ----------
+    def _spill_later(self, events: List[Event]):
+        task = asyncio.get_running_loop().create_task(self._spill(events))
+        self._spills.add(task)
+        task.add_done_callback(self._spills.discard)
+
+    async def _spill(self, events: List[Event]):
+        from app.core.redis import redis_client
+
+        try:
+            client = await redis_client.get_client()
+            pipe = client.pipeline(transaction=False)
+            for _, model, row in events:
+                pipe.xadd(SPILL_STREAM, {
+                    "table": model.__tablename__,
+                    "row": json.dumps({name: _encode(value) for name, value in row.items()}),
+                })
+            await pipe.execute()
+        except Exception as e:
+            logger.error(f"Dropped {len(events)} log rows; Redis spill failed: {str(e)}")
+
+    async def _replay_spilled(self):
+        """Write rows spilled by earlier processes to the default database, then delete them"""
+        from app.core.redis import redis_client
+        from app.core.database import engine
+
+        try:
+            client = await redis_client.get_client()
+            if not await client.set(REPLAY_LOCK, "1", nx=True, px=REPLAY_LOCK_MS):
+                return
+            try:
+                models = _models()
+                # Stop at the current tail: rows re-spilled during replay wait for the next start
+                tail = await client.xrevrange(SPILL_STREAM, count=1)
+                if not tail:
+                    return
+                start, end = "-", tail[0][0]
+                while True:
+                    entries = await client.xrange(SPILL_STREAM, min=start, max=end, count=settings.EVENT_SINK_BATCH_SIZE)
+                    if not entries:
+                        break
+                    start = f"({entries[-1][0]}"
+                    events = []
+                    for _, fields in entries:
+                        model = models.get(fields.get("table"))
+                        if model is not None:
+                            events.append((engine, model, _decode(model, json.loads(fields["row"]))))
+                    # Failures are re-spilled by _write, so the entries can go either way
+                    await self._write(events)
+                    await client.xdel(SPILL_STREAM, *(entry_id for entry_id, _ in entries))
+                    logger.info(f"Replayed {len(events)} spilled log rows")
+            finally:
+                await client.delete(REPLAY_LOCK)
+        except Exception as e:
+            logger.warning(f"Could not replay spilled log rows: {str(e)}")
+
+
+event_sink = EventSink()
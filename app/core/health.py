@@ -0,0 +1,126 @@
+"""
+Runtime health and capacity stats for /health and /metrics.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict
+from sqlalchemy import text
+from app.core.celery_app import QUEUE_BATCH, QUEUE_IO_SYNC, QUEUE_REALTIME
+from app.core.config import settings
+from app.core.database import engine
+from app.core.instrumentation import pool_stats
+from app.core.metrics import metrics_registry
+from app.core.security import password_hasher
+
+logger = logging.getLogger(__name__)
+
+CELERY_QUEUES = (QUEUE_REALTIME, QUEUE_IO_SYNC, QUEUE_BATCH)
+# Kombu's Redis transport stores priority levels 1-9 in separate lists
+CELERY_PRIORITY_SEP = "\x06\x16"
+HEALTH_CHECK_TIMEOUT = 2.0
+
+_broker = None
+
+
+async def _check_database() -> Dict[str, Any]:
+    try:
+        async with engine.connect() as conn:
+            await asyncio.wait_for(conn.execute(text("SELECT 1")), HEALTH_CHECK_TIMEOUT)
+        return {"status": "connected", "pool": pool_stats(engine)}
+    except Exception as e:
+        logger.error(f"Health check - database error: {str(e)}")
+        return {"status": "error", "error": str(e), "pool": pool_stats(engine)}
+
+
+async def _check_redis() -> Dict[str, Any]:
+    from app.core.redis import redis_client
+    try:
+        client = await redis_client.get_client()
+        await asyncio.wait_for(client.ping(), HEALTH_CHECK_TIMEOUT)
+        return {"status": "connected"}
+    except Exception as e:
+        logger.error(f"Health check - redis error: {str(e)}")
+        return {"status": "error", "error": str(e)}
+
+
+async def celery_queue_depths() -> Dict[str, int]:
+    """Pending messages per Celery queue (all priority levels)"""
+    global _broker
+    import redis.asyncio as redis
+
+    if _broker is None:
+        _broker = redis.from_url(settings.CELERY_BROKER_URL)
+    pipe = _broker.pipeline(transaction=False)
+    for queue in CELERY_QUEUES:
+        pipe.llen(queue)
+        for priority in range(1, 10):
+            pipe.llen(f"{queue}{CELERY_PRIORITY_SEP}{priority}")
+    counts = await asyncio.wait_for(pipe.execute(), HEALTH_CHECK_TIMEOUT)
+
+    depths = {}
+    per_queue = len(counts) // len(CELERY_QUEUES)
+    for index, queue in enumerate(CELERY_QUEUES):
+        depths[queue] = sum(counts[index * per_queue:(index + 1) * per_queue])
+    return depths
+
+
+async def _check_celery() -> Dict[str, Any]:
+    try:
+        return {"status": "connected", "queues": await celery_queue_depths()}
+    except Exception as e:
+        logger.error(f"Health check - celery broker error: {str(e)}")
+        return {"status": "error", "error": str(e)}
+
+
+async def collect_health() -> Dict[str, Any]:
+    """Check every dependency concurrently and report pool/queue stats"""
+    database, redis_status, celery = await asyncio.gather(
+        _check_database(), _check_redis(), _check_celery()
+    )
+    components = {
+        "database": database,
+        "redis": redis_status,
+        "celery": celery,
+        "password_hasher": password_hasher.stats(),
+    }
+    healthy = database["status"] == "connected" and redis_status["status"] == "connected"
+    return {
+        "status": "healthy" if healthy else "degraded",
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "components": components,
+    }
+
+
+async def render_metrics() -> str:
+    """Prometheus text output including broker queue depths"""
+    lines = [metrics_registry.render().rstrip("\n")]
+    try:
+        depths = await celery_queue_depths()
+        lines.append("# HELP celery_queue_depth Pending messages per Celery queue")
+        lines.append("# TYPE celery_queue_depth gauge")
+        for queue, depth in depths.items():
+            lines.append(f'celery_queue_depth{{queue="{queue}"}} {depth}')
+    except Exception as e:
+        logger.warning(f"Could not read Celery queue depths: {str(e)}")
+    return "\n".join(lines) + "\n"
+
+
+# Scrape-time gauges
+metrics_registry.gauge(
+    "db_pool_connections", "Database connection pool occupancy",
+    lambda: {(name,): value for name, value in pool_stats(engine).items()},
+    ("state",),
+)
+metrics_registry.gauge(
+    "password_hash_queue_depth", "Password hashing requests waiting for a worker thread",
+    lambda: {(): password_hasher.stats()["queue_depth"]},
+)
+metrics_registry.gauge(
+    "password_hash_in_flight", "Password hashing requests currently running",
+    lambda: {(): password_hasher.stats()["in_flight"]},
+)
+metrics_registry.gauge(
+    "password_hash_avg_wait_ms", "Average time spent waiting for a password hashing thread",
+    lambda: {(): password_hasher.stats()["avg_wait_ms"]},
+)
@@ -0,0 +1,145 @@
+"""
+Per-request SQL instrumentation built on SQLAlchemy engine events.
+
+Every statement executed while a request is active is counted and timed in a
+request-scoped context. Repeated statements with the same shape (N+1 patterns)
+are logged once per request together with the application stack that issued them.
+"""
+import logging
+import re
+import time
+import traceback
+from collections import Counter as ShapeCounter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core.config import settings
+from app.core.metrics import db_statement_duration_seconds, db_statements_total
+
+logger = logging.getLogger(__name__)
+
+_PARAM_RE = re.compile(r"(\$\d+|%\(\w+\)s|\?|:\w+)")
+_IN_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a statement so calls that differ only by parameters compare equal"""
+    shape = _PARAM_RE.sub("?", statement)
+    shape = _IN_LIST_RE.sub("(?)", shape)
+    return _WHITESPACE_RE.sub(" ", shape).strip()
+
+
+@dataclass
+class RequestQueryStats:
+    """Statement counts and DB time collected for one request"""
+    route: str = ""
+    statements: int = 0
+    db_time: float = 0.0
+    shapes: ShapeCounter = field(default_factory=ShapeCounter)
+    reported_shapes: Set[str] = field(default_factory=set)
+    started_at: float = field(default_factory=time.perf_counter)
+    scope: Optional[dict] = None
+
+    @property
+    def route_label(self) -> str:
+        """Route template (e.g. /items/{item_id}) for metric labels; raw paths give one series per id"""
+        if self.scope is None:
+            return self.route
+        # The router records the matched route in the shared ASGI scope
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+    @property
+    def repeated_shapes(self) -> Dict[str, int]:
+        threshold = settings.N_PLUS_ONE_THRESHOLD
+        return {shape: count for shape, count in self.shapes.items() if count >= threshold}
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def start_request_stats(route: str = "", scope: Optional[dict] = None) -> RequestQueryStats:
+    """Begin collecting statement stats for the current request/task"""
+    stats = RequestQueryStats(route=route, scope=scope)
+    _current_stats.set(stats)
+    return stats
+
+
+def get_request_stats() -> Optional[RequestQueryStats]:
+    return _current_stats.get()
+
+
+def _app_stack() -> str:
+    """Stack frames from application code only"""
+    frames = [
+        frame for frame in traceback.extract_stack()[:-3]
+        if "/app/" in frame.filename.replace("\\", "/") and "instrumentation.py" not in frame.filename
+    ]
+    return "".join(traceback.format_list(frames[-8:]))
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("query_start_time")
+    if not start_times:
+        return
+    elapsed = time.perf_counter() - start_times.pop()
+
+    stats = _current_stats.get()
+    route = stats.route if stats else ""
+    db_statements_total.inc(route=stats.route_label if stats else "")
+    db_statement_duration_seconds.observe(elapsed)
+
+    if stats is None:
+        return
+
+    stats.statements += 1
+    stats.db_time += elapsed
+
+    shape = statement_shape(statement)
+    stats.shapes[shape] += 1
+    count = stats.shapes[shape]
+    if count == settings.N_PLUS_ONE_THRESHOLD and shape not in stats.reported_shapes:
+        stats.reported_shapes.add(shape)
+        logger.warning(
+            f"Possible N+1 on {route or 'unknown route'}: statement repeated {count} times: "
+            f"{shape[:300]}\n{_app_stack()}"
+        )
+
+
+def instrument_engine(engine) -> None:
+    """Attach statement timing listeners to an engine (sync or async)"""
+    sync_engine: Engine = getattr(engine, "sync_engine", engine)
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def pool_stats(engine) -> Dict[str, int]:
+    """Connection pool occupancy for an engine"""
+    pool = getattr(engine, "sync_engine", engine).pool
+    stats: Dict[str, int] = {}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    return stats
+
+
+def server_timing_header(stats: RequestQueryStats, total_seconds: float) -> str:
+    """Build a Server-Timing header value for the request"""
+    parts: List[str] = [
+        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.statements} queries"',
+        f"app;dur={max(0.0, total_seconds - stats.db_time) * 1000:.1f}",
+        f"total;dur={total_seconds * 1000:.1f}",
+    ]
+    if stats.reported_shapes:
+        parts.append(f'n1;desc="{len(stats.reported_shapes)} repeated statements"')
+    return ", ".join(parts)
@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple, Dict, Any
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt hashing/verification on a dedicated bounded thread pool.
+    - bcrypt releases the GIL, so threads give real parallelism without pickling overhead.
+    - Callers wait in FIFO order on a semaphore sized to the pool, so bursts queue fairly.
+    - When the waiting queue is full the request is rejected with 503 instead of piling up.
+    """
+
+    def __init__(
+        self,
+        context: CryptContext,
+        max_workers: int = 4,
+        max_queue: int = 200,
+    ):
+        self.context = context
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        # Metrics
+        self._waiting = 0
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._rehashed = 0
+        self._total_wait_ms = 0.0
+        self._total_run_ms = 0.0
+        self._max_wait_ms = 0.0
+        self._max_run_ms = 0.0
+
+    def _ensure_started(self):
+        """Create the executor and semaphore lazily on the running loop"""
+        loop = asyncio.get_running_loop()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="password-hasher",
+            )
+        if self._semaphore is None or self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+            self._loop = loop
+
+    async def _run(self, fn, *args):
+        """Queue a blocking bcrypt call and run it on the pool"""
+        self._ensure_started()
+
+        if self._waiting >= self.max_queue:
+            self._rejected += 1
+            logger.warning(f"Password hasher queue full ({self._waiting} waiting)")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        queued_at = time.perf_counter()
+        self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self._waiting -= 1
+
+        started_at = time.perf_counter()
+        self._in_flight += 1
+        try:
+            return await self._loop.run_in_executor(self._executor, fn, *args)
+        finally:
+            finished_at = time.perf_counter()
+            self._in_flight -= 1
+            self._semaphore.release()
+            self._record(started_at - queued_at, finished_at - started_at)
+
+    def _record(self, wait_seconds: float, run_seconds: float):
+        wait_ms = wait_seconds * 1000
+        run_ms = run_seconds * 1000
+        self._completed += 1
+        self._total_wait_ms += wait_ms
+        self._total_run_ms += run_ms
+        self._max_wait_ms = max(self._max_wait_ms, wait_ms)
+        self._max_run_ms = max(self._max_run_ms, run_ms)
+
+    async def hash(self, password: str) -> str:
+        """Hash a password off the event loop"""
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password off the event loop"""
+        return await self._run(self.context.verify, plain_password, hashed_password)
+
+    async def verify_and_update(
+        self, plain_password: str, hashed_password: str
+    ) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password and return a replacement hash when the stored one
+        uses outdated settings (e.g. BCRYPT_ROUNDS changed).
+        """
+        verified, new_hash = await self._run(
+            self.context.verify_and_update, plain_password, hashed_password
+        )
+        if verified and new_hash:
+            self._rehashed += 1
+        return verified, new_hash
+
+    def stats(self) -> Dict[str, Any]:
+        """Current queue depth and latency metrics"""
+        completed = self._completed or 1
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "queue_depth": self._waiting,
+            "in_flight": self._in_flight,
+            "completed": self._completed,
+            "rejected": self._rejected,
+            "rehashed": self._rehashed,
+            "avg_wait_ms": round(self._total_wait_ms / completed, 2),
+            "avg_run_ms": round(self._total_run_ms / completed, 2),
+            "max_wait_ms": round(self._max_wait_ms, 2),
+            "max_run_ms": round(self._max_run_ms, 2),
+        }
+
+    def shutdown(self):
+        """Stop the worker threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
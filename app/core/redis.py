@@ -29,6 +29,12 @@ class RedisClient:
             await self.redis.close()
             logger.info("Redis disconnected")
     
+    async def get_client(self) -> redis.Redis:
+        """Get the underlying connected client (for pipelines and scripts)"""
+        if not self.redis:
+            await self.connect()
+        return self.redis
+    
     async def get(self, key: str):
         """Get value by key"""
         if not self.redis:
@@ -0,0 +1,118 @@
+"""
+Per-table write-version counters in Redis.
+
+Every committed ORM write to a versioned table bumps `tblver:<table>`. Caches
+store the versions they were computed against and treat any change as a miss,
+so invalidation does not depend on each service remembering to clear keys.
+
+Writes are collected from flushes and from insert/update/delete statements run
+through a Session (ORM-enabled or `Table.insert()`-style); the bump is sent once
+per commit, after the commit succeeds.
+
+Not tracked: `text()` SQL (even through a Session, it names no table) and
+anything executed on a Connection/AsyncConnection directly, e.g. migrations,
+the bulk data generator or psql. Cached reports over such writes stay stale
+until their TTL unless the writer calls `bump_table_versions` itself.
+"""
+import asyncio
+import logging
+from typing import Iterable, List, Set
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+TABLE_VERSION_PREFIX = "tblver:"
+
+# Tables read by cached reports (facts plus the dimensions they join)
+VERSIONED_TABLES = frozenset({
+    "stock_levels",
+    "stock_movements",
+    "purchase_orders",
+    "purchase_order_items",
+    "attendances",
+    "employee_month_attendance",
+    "salaries",
+    "shipments",
+    "shipment_items",
+    "items",
+    "categories",
+    "locations",
+    "employees",
+    "departments",
+    "suppliers",
+    "drivers",
+    "vehicles",
+})
+
+_WRITTEN_TABLES_KEY = "written_tables"
+_pending_bumps: Set[asyncio.Task] = set()
+_installed = False
+
+
+def _record(session: Session, tables: Iterable[str]):
+    written = {table for table in tables if table in VERSIONED_TABLES}
+    if written:
+        session.info.setdefault(_WRITTEN_TABLES_KEY, set()).update(written)
+
+
+def _after_flush(session: Session, flush_context):
+    objects = list(session.new) + list(session.dirty) + list(session.deleted)
+    _record(session, (getattr(getattr(obj, "__table__", None), "name", None) for obj in objects))
+
+
+def _do_orm_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _record(orm_execute_state.session, [table.name])
+
+
+def _after_commit(session: Session):
+    tables = session.info.pop(_WRITTEN_TABLES_KEY, None)
+    if not tables:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(bump_table_versions(tables))
+    _pending_bumps.add(task)
+    task.add_done_callback(_pending_bumps.discard)
+
+
+def _after_rollback(session: Session):
+    session.info.pop(_WRITTEN_TABLES_KEY, None)
+
+
+def install_write_tracking():
+    """Register the session hooks once per process"""
+    global _installed
+    if _installed:
+        return
+    event.listen(Session, "after_flush", _after_flush)
+    event.listen(Session, "do_orm_execute", _do_orm_execute)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
+    _installed = True
+
+
+async def bump_table_versions(tables: Iterable[str]):
+    """Increment the version of each table (one round trip)"""
+    from app.core.redis import redis_client
+
+    tables = sorted(set(tables))
+    try:
+        client = await redis_client.get_client()
+        pipe = client.pipeline(transaction=False)
+        for table in tables:
+            pipe.incr(f"{TABLE_VERSION_PREFIX}{table}")
+        await pipe.execute()
+    except Exception as e:
+        # Cached entries still expire on their TTL
+        logger.warning(f"Could not bump table versions for {tables}: {str(e)}")
+
+
+def table_version_keys(tables: Iterable[str]) -> List[str]:
+    """Redis keys holding the versions of `tables`, for callers batching the read into their own pipeline"""
+    return [f"{TABLE_VERSION_PREFIX}{table}" for table in tables]
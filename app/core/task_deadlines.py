@@ -0,0 +1,236 @@
+"""
+Due-date scheduler for tasks.
+
+Every open task with a due date has up to three instants in one Redis sorted
+set, scored by epoch seconds: `<id>:due_soon` (due date minus
+TASK_DUE_SOON_HOURS), `<id>:overdue` (the due date) and, for high and urgent
+tasks, `<id>:escalate` (due date plus TASK_ESCALATION_HOURS).
+
+Entries are kept in step with the tasks table by session hooks: a flush that
+creates a task or changes its due date, status, priority, assignee or active
+flag recomputes that task's entries, and the change is sent once per commit,
+after the commit succeeds. Completing or cancelling a task removes its
+entries (ZREM, O(log n) each). A poller atomically pops only the entries
+whose instant has passed, so each alert fires once, close to its instant.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.shared.enums import TaskPriority, TaskStatus
+
+logger = logging.getLogger(__name__)
+
+DEADLINES_KEY = "task_deadlines"
+KINDS = ("due_soon", "overdue", "escalate")
+CLOSED_STATUSES = (TaskStatus.COMPLETED, TaskStatus.CANCELLED)
+ESCALATED_PRIORITIES = (TaskPriority.HIGH, TaskPriority.URGENT)
+# Columns whose change moves or cancels a task's deadlines
+WATCHED_ATTRIBUTES = ("due_date", "status", "priority", "assigned_to", "is_active", "is_deleted")
+
+# Pop the due entries and remove them in one step so concurrent pollers never share an entry
+_POP_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'WITHSCORES', 'LIMIT', 0, ARGV[2])
+for i = 1, #due, 2 do
+    redis.call('ZREM', KEYS[1], due[i])
+end
+return due
+"""
+
+_CHANGES_KEY = "task_deadline_changes"
+_pending_updates: Set[asyncio.Task] = set()
+_installed = False
+
+
+def _epoch(value: datetime) -> float:
+    """Naive datetimes in this codebase are UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def member(task_id: int, kind: str) -> str:
+    return f"{task_id}:{kind}"
+
+
+def parse_member(value: str) -> Tuple[int, str]:
+    task_id, kind = value.split(":", 1)
+    return int(task_id), kind
+
+
+def deadline_entries(
+    task_id: int,
+    due_date: Optional[datetime],
+    status,
+    priority,
+    assigned_to: Optional[int],
+    is_active: Optional[bool] = True,
+    is_deleted: Optional[bool] = False,
+) -> Dict[str, float]:
+    """The instants a task should fire at, keyed by sorted-set member"""
+    if due_date is None or is_active is False or is_deleted or status in CLOSED_STATUSES:
+        return {}
+
+    due = _epoch(due_date)
+    entries: Dict[str, float] = {}
+    if assigned_to:
+        # Notifications go to the assignee; an unassigned task picks these up when assigned
+        entries[member(task_id, "due_soon")] = due - settings.TASK_DUE_SOON_HOURS * 3600
+        entries[member(task_id, "overdue")] = due
+    if priority in ESCALATED_PRIORITIES:
+        entries[member(task_id, "escalate")] = due + settings.TASK_ESCALATION_HOURS * 3600
+    return entries
+
+
+def task_deadline_entries(task) -> Dict[str, float]:
+    return deadline_entries(
+        task.id,
+        task.due_date,
+        task.status,
+        task.priority,
+        task.assigned_to,
+        task.is_active,
+        task.is_deleted,
+    )
+
+
+# ---------- Session hooks ----------
+
+def _is_task(obj) -> bool:
+    return getattr(getattr(obj, "__table__", None), "name", None) == "tasks"
+
+
+def _after_flush(session: Session, flush_context):
+    for obj in list(session.new) + list(session.dirty):
+        if not _is_task(obj) or obj.id is None:
+            continue
+        if obj not in session.new:
+            attrs = inspect(obj).attrs
+            if not any(attrs[name].history.has_changes() for name in WATCHED_ATTRIBUTES):
+                continue
+        session.info.setdefault(_CHANGES_KEY, {})[obj.id] = task_deadline_entries(obj)
+    for obj in session.deleted:
+        if _is_task(obj) and obj.id is not None:
+            session.info.setdefault(_CHANGES_KEY, {})[obj.id] = {}
+
+
+def _after_commit(session: Session):
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if not changes:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(schedule_task_deadlines(changes))
+    _pending_updates.add(task)
+    task.add_done_callback(_pending_updates.discard)
+
+
+def _after_rollback(session: Session):
+    session.info.pop(_CHANGES_KEY, None)
+
+
+def install_deadline_tracking():
+    """Register the session hooks once per process"""
+    global _installed
+    if _installed:
+        return
+    event.listen(Session, "after_flush", _after_flush)
+    event.listen(Session, "after_commit", _after_commit)
+    event.listen(Session, "after_rollback", _after_rollback)
+    _installed = True
+
+
+# ---------- Redis operations ----------
+
+async def schedule_task_deadlines(changes: Dict[int, Dict[str, float]]):
+    """Replace the entries of each task (an empty dict cancels them) in one transaction"""
+    from app.core.redis import redis_client
+
+    try:
+        client = await redis_client.get_client()
+        pipe = client.pipeline(transaction=True)
+        for task_id, entries in changes.items():
+            pipe.zrem(DEADLINES_KEY, *(member(task_id, kind) for kind in KINDS))
+            if entries:
+                pipe.zadd(DEADLINES_KEY, entries)
+        await pipe.execute()
+    except Exception as e:
+        # The poller re-validates against the table, and rebuild_task_deadlines repairs gaps
+        logger.warning(f"Could not schedule deadlines for tasks {sorted(changes)}: {str(e)}")
+
+
+async def pop_due_deadlines(now: float, limit: int) -> List[Tuple[str, float]]:
+    """Atomically remove and return up to `limit` entries due at or before `now`"""
+    from app.core.redis import redis_client
+
+    client = await redis_client.get_client()
+    raw = await client.eval(_POP_DUE_SCRIPT, 1, DEADLINES_KEY, now, limit)
+    return [(raw[i], float(raw[i + 1])) for i in range(0, len(raw), 2)]
+
+
+async def requeue_deadlines(entries: Dict[str, float]):
+    """Put popped entries back (a failed dispatch, or an instant that moved later)"""
+    from app.core.redis import redis_client
+
+    if not entries:
+        return
+    client = await redis_client.get_client()
+    await client.zadd(DEADLINES_KEY, entries)
+
+
+async def rebuild_task_deadlines(session, include_past: bool = False) -> int:
+    """Re-register every open task's entries (after a Redis loss or first deploy); returns entries written"""
+    from sqlalchemy import select
+    from app.core.redis import redis_client
+    from app.models.task.task import Task
+
+    now = datetime.now(timezone.utc).timestamp()
+    client = await redis_client.get_client()
+    written = 0
+    result = await session.stream(
+        select(Task.id, Task.due_date, Task.status, Task.priority, Task.assigned_to, Task.is_active, Task.is_deleted)
+        .where(
+            Task.due_date.isnot(None),
+            Task.status.notin_(CLOSED_STATUSES),
+            Task.is_active == True,
+        )
+        .execution_options(yield_per=1000)
+    )
+    async for rows in result.partitions():
+        entries: Dict[str, float] = {}
+        for row in rows:
+            for name, score in deadline_entries(*row).items():
+                if include_past or score > now:
+                    entries[name] = score
+        if entries:
+            await client.zadd(DEADLINES_KEY, entries)
+            written += len(entries)
+    logger.info(f"Registered {written} task deadline entries")
+    return written
+
+
+if __name__ == "__main__":
+    import argparse
+
+    async def main():
+        """Rebuild the task deadline set from the tasks table (python -m app.core.task_deadlines)"""
+        from app.core.database import async_session_maker, engine
+
+        parser = argparse.ArgumentParser(description="Re-register task due-soon, overdue and escalation instants")
+        parser.add_argument("--include-past", action="store_true", help="Also register instants already passed (they fire on the next poll)")
+        args = parser.parse_args()
+
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+        try:
+            async with async_session_maker() as session:
+                written = await rebuild_task_deadlines(session, args.include_past)
+            print(f"✅ Registered {written:,} task deadline entries.")
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
@@ -0,0 +1,592 @@
+"""
+Bulk synthetic data generator for local performance work.
+
+Extends the permission/role/task-type seeds with production-shaped volumes:
+hierarchical categories, multi-level recipes, Foodics-shaped orders, a stock
+movement ledger that adds up to StockLevel, shifts, offdays, attendance and
+salaries. Output is deterministic for a given --seed and --scale.
+
+Rows are streamed with COPY on Postgres (multi-row INSERT elsewhere) using
+pre-assigned ids, and independent tables load concurrently.
+
+Usage:
+    python app/db/seeds/bulk_data.py --scale medium --seed 42
+"""
+import os
+import sys
+import argparse
+import asyncio
+
+# Add project root to Python path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, project_root)
+
+import calendar
+import logging
+import random
+import time as time_module
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from app.models.inventory.category import Category
+from app.models.inventory.item import Item
+from app.models.inventory.item_ingredient import ItemIngredient
+from app.models.inventory.stock_level import StockLevel
+from app.models.inventory.stock_movement import StockMovement
+from app.models.inventory.product import Product
+from app.models.inventory.product_item import ProductItem
+from app.models.inventory.order import Order
+from app.models.inventory.order_product import OrderProduct
+from app.models.organization.location import Location
+from app.models.organization.department import Department
+from app.models.hr.employee import Employee
+from app.models.hr.shift_type import ShiftType
+from app.models.hr.user_shift import UserShift
+from app.models.hr.offday import Offday
+from app.models.hr.attendance import Attendance
+from app.models.hr.salary import Salary
+from app.models.shared.enums import AttendanceStatus, OffdayType, StockMovementType, UnitType
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 20_000
+CODE_PREFIX = "GEN"
+
+# Foodics order status codes used by FoodicsOrderService
+ORDER_STATUS_CLOSED = 4
+ORDER_STATUS_RETURNED = 5
+ORDER_STATUS_CANCELLED = 7
+
+
+@dataclass(frozen=True)
+class GeneratorScale:
+    locations: int
+    top_categories: int
+    items: int
+    products: int
+    stock_movements: int
+    orders: int
+    employees: int
+    months: int
+
+
+# xlarge is roughly 50M rows in total (orders + order products + movements + attendance dominate)
+SCALES: Dict[str, GeneratorScale] = {
+    "small": GeneratorScale(locations=5, top_categories=5, items=200, products=50,
+                            stock_movements=20_000, orders=5_000, employees=100, months=1),
+    "medium": GeneratorScale(locations=20, top_categories=10, items=2_000, products=300,
+                             stock_movements=500_000, orders=200_000, employees=1_000, months=2),
+    "large": GeneratorScale(locations=50, top_categories=12, items=10_000, products=1_000,
+                            stock_movements=3_000_000, orders=1_000_000, employees=5_000, months=3),
+    "xlarge": GeneratorScale(locations=150, top_categories=15, items=25_000, products=3_000,
+                             stock_movements=20_000_000, orders=9_000_000, employees=15_000, months=12),
+}
+
+
+class BulkLoader:
+    """Streams row tuples into a table with COPY (Postgres) or chunked multi-row INSERTs"""
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.use_copy = engine.dialect.name == "postgresql"
+        self.row_counts: Dict[str, int] = {}
+
+    async def next_id(self, model) -> int:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(select(func.coalesce(func.max(model.id), 0)))
+            return result.scalar() + 1
+
+    async def load(self, model, columns: Sequence[str], rows: Iterable[tuple]) -> int:
+        table = model.__table__
+        started = time_module.perf_counter()
+        count = 0
+        async with self.engine.begin() as conn:
+            if self.use_copy:
+                raw = await conn.get_raw_connection()
+                driver = raw.driver_connection
+            for chunk in _chunks(rows, CHUNK_SIZE):
+                if self.use_copy:
+                    await driver.copy_records_to_table(table.name, records=chunk, columns=list(columns))
+                else:
+                    await conn.execute(insert(table), [dict(zip(columns, row)) for row in chunk])
+                count += len(chunk)
+            if self.use_copy and "id" in columns:
+                # Keep the serial in step with the ids assigned here
+                await conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                    f"(SELECT COALESCE(MAX(id), 1) FROM {table.name}))"
+                ))
+
+        self.row_counts[table.name] = self.row_counts.get(table.name, 0) + count
+        elapsed = time_module.perf_counter() - started
+        logger.info(f"Loaded {count:,} rows into {table.name} in {elapsed:.1f}s")
+        return count
+
+
+def _chunks(rows: Iterable[tuple], size: int) -> Iterator[List[tuple]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _rng(seed: int, stream: str) -> random.Random:
+    """Independent stream per table so changing one volume doesn't reshuffle the rest"""
+    return random.Random(f"{seed}:{stream}")
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _money(rng: random.Random, low: int, high: int) -> Decimal:
+    return Decimal(rng.randint(low * 100, high * 100)) / 100
+
+
+class BulkDataGenerator:
+    """Generates and loads one dataset; ids are assigned up front so child rows need no lookups"""
+
+    def __init__(self, engine: AsyncEngine, scale: GeneratorScale, seed: int = 42, today: Optional[date] = None):
+        self.loader = BulkLoader(engine)
+        self.scale = scale
+        self.seed = seed
+        self.today = today or date.today()
+        self.period_start = (self.today.replace(day=1) - timedelta(days=1)).replace(day=1)
+        for _ in range(scale.months - 1):
+            self.period_start = (self.period_start - timedelta(days=1)).replace(day=1)
+
+    async def _ids(self, model, count: int) -> List[int]:
+        start = await self.loader.next_id(model)
+        return list(range(start, start + count))
+
+    # =================== ORGANIZATION ===================
+
+    async def load_organization(self):
+        rng = _rng(self.seed, "organization")
+        self.location_ids = await self._ids(Location, self.scale.locations)
+        self.kitchen_ids = set(self.location_ids[:max(1, len(self.location_ids) // 10)])
+        await self.loader.load(
+            Location,
+            ("id", "foodics_guid", "name", "location_type", "city", "country", "is_active", "is_deleted"),
+            (
+                (
+                    location_id, _uuid(rng), f"{CODE_PREFIX} Branch {index}",
+                    "CENTRAL_KITCHEN" if location_id in self.kitchen_ids else "BRANCH",
+                    rng.choice(["Dhaka", "Chittagong", "Sylhet", "Khulna"]), "Bangladesh", True, False,
+                )
+                for index, location_id in enumerate(self.location_ids)
+            ),
+        )
+
+        self.department_ids = await self._ids(Department, 8)
+        await self.loader.load(
+            Department,
+            ("id", "name", "is_active", "is_deleted"),
+            ((department_id, f"{CODE_PREFIX} Department {index}", True, False)
+             for index, department_id in enumerate(self.department_ids)),
+        )
+
+    # =================== CATALOG ===================
+
+    async def load_catalog(self):
+        rng = _rng(self.seed, "catalog")
+        scale = self.scale
+
+        # Two-level category tree
+        top_ids = await self._ids(Category, scale.top_categories)
+        child_ids = list(range(top_ids[-1] + 1, top_ids[-1] + 1 + scale.top_categories * 4))
+        category_rows = [(category_id, f"{CODE_PREFIX} Category {index}", None, True, False)
+                         for index, category_id in enumerate(top_ids)]
+        category_rows += [(category_id, f"{CODE_PREFIX} Category {index}.{index % 4}", top_ids[index // 4], True, False)
+                          for index, category_id in enumerate(child_ids)]
+        await self.loader.load(Category, ("id", "name", "parent_id", "is_active", "is_deleted"), category_rows)
+
+        # Items: 70% raw, 20% intermediate (made of raw), 10% finished (made of intermediate + raw)
+        self.item_ids = await self._ids(Item, scale.items)
+        raw_count = int(scale.items * 0.7)
+        intermediate_count = int(scale.items * 0.2)
+        self.raw_item_ids = self.item_ids[:raw_count]
+        intermediate_ids = self.item_ids[raw_count:raw_count + intermediate_count]
+        finished_ids = self.item_ids[raw_count + intermediate_count:]
+        self.item_cost: Dict[int, Decimal] = {}
+        item_rows = []
+        for index, item_id in enumerate(self.item_ids):
+            cost = _money(rng, 1, 100)
+            self.item_cost[item_id] = cost
+            composite = index >= raw_count
+            item_rows.append((
+                item_id, f"{CODE_PREFIX}-{index:08d}", f"Item {index}", rng.choice(child_ids),
+                UnitType.PCS.name, cost, cost * Decimal("1.4"), composite, composite,
+                rng.random() < 0.3, Decimal(10), Decimal(500), Decimal(rng.randint(10, 60)), True, False,
+            ))
+        await self.loader.load(
+            Item,
+            ("id", "item_code", "name", "category_id", "unit_type", "unit_cost", "selling_price", "has_ingredient",
+             "is_it_kitchen", "is_perishable", "minimum_stock_level", "maximum_stock_level", "reorder_point",
+             "is_active", "is_deleted"),
+            item_rows,
+        )
+
+        def ingredient_rows(start_id: int) -> Iterator[tuple]:
+            next_id = start_id
+            levels = [(intermediate_ids, self.raw_item_ids), (finished_ids, intermediate_ids + self.raw_item_ids)]
+            for parents, sources in levels:
+                for item_id in parents:
+                    for ingredient_id in rng.sample(sources, min(len(sources), rng.randint(2, 6))):
+                        yield (next_id, item_id, ingredient_id, Decimal(rng.randint(1, 500)) / 100,
+                               UnitType.PCS.name, True, False)
+                        next_id += 1
+
+        await self.loader.load(
+            ItemIngredient,
+            ("id", "item_id", "ingredient_item_id", "quantity", "unit_type", "is_active", "is_deleted"),
+            ingredient_rows(await self.loader.next_id(ItemIngredient)),
+        )
+
+        # Products are sold through Foodics and consume intermediate/finished items
+        self.product_ids = await self._ids(Product, scale.products)
+        self.product_info: Dict[int, Tuple[uuid.UUID, str, Decimal]] = {}
+        product_rows = []
+        for index, product_id in enumerate(self.product_ids):
+            guid, name, price = _uuid(rng), f"Product {index}", _money(rng, 5, 50)
+            self.product_info[product_id] = (guid, name, price)
+            product_rows.append((product_id, guid, f"{CODE_PREFIX}-P{index:06d}", name, rng.choice(child_ids),
+                                 price, price * Decimal("0.35"), True, True, False))
+        await self.loader.load(
+            Product,
+            ("id", "product_guid", "product_code", "name", "category_id", "selling_price", "cost_price",
+             "is_available", "is_active", "is_deleted"),
+            product_rows,
+        )
+
+        recipe_sources = (finished_ids + intermediate_ids) or self.item_ids
+
+        def product_item_rows(start_id: int) -> Iterator[tuple]:
+            next_id = start_id
+            for product_id in self.product_ids:
+                for item_id in rng.sample(recipe_sources, min(len(recipe_sources), rng.randint(2, 5))):
+                    yield (next_id, product_id, item_id, UnitType.PCS.name,
+                           Decimal(rng.randint(1, 300)) / 100, self.item_cost[item_id], False)
+                    next_id += 1
+
+        await self.loader.load(
+            ProductItem,
+            ("id", "product_id", "item_id", "unit_type", "quantity", "unit_cost", "is_deleted"),
+            product_item_rows(await self.loader.next_id(ProductItem)),
+        )
+
+    # =================== INVENTORY LEDGER ===================
+
+    async def load_stock_ledger(self):
+        """Stock movements, then stock levels equal to the running balance of those movements"""
+        rng = _rng(self.seed, "stock_ledger")
+        balances: Dict[Tuple[int, int], Decimal] = {}
+        outbound_types = [StockMovementType.OUTBOUND.name, StockMovementType.CONSUME.name,
+                          StockMovementType.WASTE.name, StockMovementType.TRANSFER.name]
+        horizon_minutes = (self.today - self.period_start).days * 24 * 60
+
+        def movement_rows(start_id: int) -> Iterator[tuple]:
+            # Timestamps ascend so the ledger balance never goes negative along the timeline
+            step = horizon_minutes / max(1, self.scale.stock_movements)
+            movement_start = datetime.combine(self.period_start, time(0, 0), tzinfo=timezone.utc)
+            for index in range(self.scale.stock_movements):
+                key = (rng.choice(self.item_ids), rng.choice(self.location_ids))
+                balance = balances.get(key, Decimal(0))
+                quantity = Decimal(rng.randint(1, 50))
+                if balance < quantity or rng.random() < 0.35:
+                    movement_type, signed = StockMovementType.INBOUND.name, quantity * 4
+                    quantity = signed
+                else:
+                    movement_type, signed = rng.choice(outbound_types), -quantity
+                balances[key] = balance + signed
+                unit_cost = self.item_cost[key[0]]
+                yield (start_id + index, key[0], key[1], movement_type, UnitType.PCS.name, quantity,
+                       unit_cost, unit_cost * quantity, "GENERATED",
+                       movement_start + timedelta(minutes=index * step), False)
+
+        await self.loader.load(
+            StockMovement,
+            ("id", "item_id", "location_id", "movement_type", "unit_type", "quantity", "unit_cost", "total_cost",
+             "reference_type", "movement_date", "is_deleted"),
+            movement_rows(await self.loader.next_id(StockMovement)),
+        )
+
+        def level_rows(start_id: int) -> Iterator[tuple]:
+            next_id = start_id
+            for item_id in self.item_ids:
+                for location_id in self.location_ids:
+                    stock = balances.get((item_id, location_id), Decimal(0))
+                    yield (next_id, item_id, location_id, stock, Decimal(0), stock, UnitType.PCS.name,
+                           Decimal(10), Decimal(500), False)
+                    next_id += 1
+
+        await self.loader.load(
+            StockLevel,
+            ("id", "item_id", "location_id", "current_stock", "reserved_stock", "available_stock", "unit_type",
+             "par_level_min", "par_level_max", "is_deleted"),
+            level_rows(await self.loader.next_id(StockLevel)),
+        )
+
+    # =================== ORDERS ===================
+
+    async def load_orders(self):
+        rng = _rng(self.seed, "orders")
+        order_start = await self.loader.next_id(Order)
+        order_product_start = await self.loader.next_id(OrderProduct)
+        days = max(1, (self.today - self.period_start).days)
+        order_lines: List[tuple] = []
+        line_ids = iter(range(order_product_start, order_product_start + self.scale.orders * 4))
+
+        def order_rows() -> Iterator[tuple]:
+            for index in range(self.scale.orders):
+                order_id = order_start + index
+                business_date = self.period_start + timedelta(days=index * days // self.scale.orders)
+                opened_at = datetime.combine(business_date, time(rng.randint(8, 22), rng.randint(0, 59)),
+                                             tzinfo=timezone.utc)
+                roll = rng.random()
+                status = (ORDER_STATUS_CANCELLED if roll < 0.03
+                          else ORDER_STATUS_RETURNED if roll < 0.05 else ORDER_STATUS_CLOSED)
+                subtotal = Decimal(0)
+                for _ in range(rng.randint(1, 4)):
+                    product_id = rng.choice(self.product_ids)
+                    guid, name, price = self.product_info[product_id]
+                    quantity = Decimal(rng.randint(1, 3))
+                    line_total = price * quantity
+                    subtotal += line_total
+                    order_lines.append((next(line_ids), order_id, product_id, guid, name,
+                                        quantity, price, line_total, Decimal(0), False))
+                discount = (subtotal * Decimal("0.10")).quantize(Decimal("0.01")) if rng.random() < 0.1 else Decimal(0)
+                yield (order_id, _uuid(rng), f"FD-{CODE_PREFIX}-{index}", index + 1, rng.randint(1, 4),
+                       rng.randint(1, 3), status, rng.randint(1, 4), subtotal, discount, Decimal(0),
+                       subtotal - discount, Decimal(0), business_date, opened_at,
+                       opened_at + timedelta(minutes=rng.randint(5, 60)), rng.choice(self.location_ids), True, False)
+
+        columns = ("id", "foodics_guid", "order_number", "reference", "order_type", "source", "status", "guests",
+                   "subtotal_price", "discount_amount", "rounding_amount", "total_price",
+                   "tax_exclusive_discount_amount", "business_date", "opened_at", "closed_at", "location_id",
+                   "is_synced", "is_deleted")
+        line_columns = ("id", "order_id", "product_id", "foodics_product_guid", "product_name", "quantity",
+                        "unit_price", "total_price", "discount_amount", "is_deleted")
+
+        # Alternate order chunks and their lines so memory stays bounded at large scales
+        for chunk in _chunks(order_rows(), CHUNK_SIZE * 5):
+            await self.loader.load(Order, columns, chunk)
+            await self.loader.load(OrderProduct, line_columns, order_lines)
+            order_lines.clear()
+
+    # =================== HR ===================
+
+    async def load_hr(self):
+        rng = _rng(self.seed, "hr")
+        shift_specs = [("Morning", time(8, 0), time(16, 0)), ("Evening", time(14, 0), time(22, 0)),
+                       ("Night", time(22, 0), time(6, 0))]
+        shift_ids = await self._ids(ShiftType, len(shift_specs))
+        await self.loader.load(
+            ShiftType,
+            ("id", "name", "start_time", "end_time", "break_duration_minutes", "late_grace_minutes", "is_active",
+             "is_deleted"),
+            ((shift_id, f"{CODE_PREFIX} {name}", start, end, 30, 15, True, False)
+             for shift_id, (name, start, end) in zip(shift_ids, shift_specs)),
+        )
+        shift_start = dict(zip(shift_ids, (spec[1] for spec in shift_specs)))
+
+        employee_ids = await self._ids(Employee, self.scale.employees)
+        employees = {}
+        employee_rows = []
+        for index, employee_id in enumerate(employee_ids):
+            basic = Decimal(rng.randint(200, 800) * 100)
+            housing, transport = basic * Decimal("0.2"), Decimal(2000)
+            employees[employee_id] = (basic, housing, transport, rng.choice(shift_ids), rng.randint(0, 6))
+            employee_rows.append((
+                employee_id, f"{CODE_PREFIX}{index:07d}", "Employee", f"{index}",
+                f"employee{index}@{CODE_PREFIX.lower()}.example.com",
+                self.period_start - timedelta(days=rng.randint(30, 2000)), rng.choice(self.department_ids),
+                rng.choice(self.location_ids), "Staff", basic, housing, transport, index % 25 == 0, True, True, False,
+            ))
+        await self.loader.load(
+            Employee,
+            ("id", "employee_id", "first_name", "last_name", "email", "hire_date", "department_id", "location_id",
+             "position", "basic_salary", "housing_allowance", "transport_allowance", "is_manager",
+             "is_fingerprint_registered", "is_active", "is_deleted"),
+            employee_rows,
+        )
+
+        user_shift_start = await self.loader.next_id(UserShift)
+        await self.loader.load(
+            UserShift,
+            ("id", "employee_id", "shift_type_id", "effective_date", "deduction_amount", "is_active", "is_deleted"),
+            ((user_shift_start + index, employee_id, employees[employee_id][3], self.period_start, Decimal(0), True,
+              False) for index, employee_id in enumerate(employee_ids)),
+        )
+
+        months = []
+        month = self.period_start
+        while month < self.today.replace(day=1):
+            months.append(month)
+            month = (month + timedelta(days=32)).replace(day=1)
+
+        # One weekly offday per employee; attendance is generated for the remaining days
+        offday_start = await self.loader.next_id(Offday)
+        offday_rows = []
+        for employee_id in employee_ids:
+            weekday = employees[employee_id][4]
+            for month in months:
+                for day in range(1, calendar.monthrange(month.year, month.month)[1] + 1):
+                    offday = month.replace(day=day)
+                    if offday.weekday() == weekday:
+                        offday_rows.append((offday_start + len(offday_rows), employee_id, month.year, month.month,
+                                            offday, OffdayType.WEEKEND.name, True, False))
+        await self.loader.load(
+            Offday,
+            ("id", "employee_id", "year", "month", "offday_date", "offday_type", "is_active", "is_deleted"),
+            offday_rows,
+        )
+
+        # Per employee-month counters feed the salary rows
+        totals: Dict[Tuple[int, date], List[int]] = {}
+
+        def attendance_rows(start_id: int) -> Iterator[tuple]:
+            next_id = start_id
+            for month in months:
+                for day in range(1, calendar.monthrange(month.year, month.month)[1] + 1):
+                    attendance_date = month.replace(day=day)
+                    for employee_id in employee_ids:
+                        basic, housing, transport, shift_id, weekday = employees[employee_id]
+                        if attendance_date.weekday() == weekday:
+                            continue
+                        counters = totals.setdefault((employee_id, month), [0, 0, 0, 0])  # working, present, absent, late
+                        counters[0] += 1
+                        roll = rng.random()
+                        if roll < 0.04:
+                            counters[2] += 1
+                            yield (next_id, employee_id, attendance_date, None, None, None, Decimal(0), 0, 0,
+                                   AttendanceStatus.ABSENT.name, False, False, False, False, False)
+                        else:
+                            late = rng.randint(16, 90) if roll < 0.12 else 0
+                            overtime = Decimal(rng.randint(1, 3)) if rng.random() < 0.08 else Decimal(0)
+                            check_in = (datetime.combine(attendance_date, shift_start[shift_id], tzinfo=timezone.utc)
+                                        + timedelta(minutes=late))
+                            hours = Decimal(8) + overtime
+                            counters[1] += 1
+                            counters[3] += 1 if late else 0
+                            yield (next_id, employee_id, attendance_date, check_in, check_in + timedelta(hours=float(hours)),
+                                   hours, overtime, late, 0,
+                                   (AttendanceStatus.LATE if late else AttendanceStatus.PRESENT).name,
+                                   True, True, False, False, False)
+                        next_id += 1
+
+        await self.loader.load(
+            Attendance,
+            ("id", "employee_id", "attendance_date", "check_in_time", "check_out_time", "total_hours",
+             "overtime_hours", "late_minutes", "early_leave_minutes", "status", "bio_check_in", "bio_check_out",
+             "is_holiday", "is_weekend", "is_deleted"),
+            attendance_rows(await self.loader.next_id(Attendance)),
+        )
+
+        def salary_rows(start_id: int) -> Iterator[tuple]:
+            next_id = start_id
+            for (employee_id, month), (working, present, absent, late) in sorted(totals.items()):
+                basic, housing, transport, _, _ = employees[employee_id]
+                gross = basic + housing + transport
+                per_day = (basic / working).quantize(Decimal("0.01")) if working else Decimal(0)
+                absent_deduction = per_day * absent
+                late_deduction = (per_day / 4).quantize(Decimal("0.01")) * (late // 3)
+                deductions = absent_deduction + late_deduction
+                yield (next_id, employee_id, month, basic, housing, transport, Decimal(0), Decimal(0), deductions,
+                       late_deduction, absent_deduction, Decimal(0), gross, gross - deductions, working, present,
+                       absent, late, "UNPAID", 1, False)
+                next_id += 1
+
+        await self.loader.load(
+            Salary,
+            ("id", "employee_id", "salary_month", "basic_salary", "housing_allowance", "transport_allowance",
+             "overtime_amount", "bonus", "total_deductions", "late_deductions", "absent_deductions",
+             "other_deductions", "gross_salary", "net_salary", "working_days", "present_days", "absent_days",
+             "late_days", "payment_status", "generated_by", "is_deleted"),
+            salary_rows(await self.loader.next_id(Salary)),
+        )
+
+    async def run(self) -> Dict[str, int]:
+        started = time_module.perf_counter()
+        await self.load_organization()
+        await self.load_catalog()
+        # Ledger, orders and HR only depend on the rows above
+        await asyncio.gather(self.load_stock_ledger(), self.load_orders(), self.load_hr())
+
+        # Attendance was copied in directly, so derive the monthly aggregate from it
+        from app.services.hr.attendance_month_service import AttendanceMonthService
+
+        async with AsyncSession(self.loader.engine) as session:
+            await AttendanceMonthService(session).rebuild()
+
+        if self.loader.use_copy:
+            async with self.loader.engine.begin() as conn:
+                await conn.execute(text("ANALYZE"))
+
+        total = sum(self.loader.row_counts.values())
+        logger.info(f"Generated {total:,} rows in {time_module.perf_counter() - started:.1f}s")
+        return dict(self.loader.row_counts)
+
+
+async def generated_data_exists(session: AsyncSession) -> bool:
+    result = await session.execute(select(Item.id).where(Item.item_code.like(f"{CODE_PREFIX}-%")).limit(1))
+    return result.scalar_one_or_none() is not None
+
+
+async def generate_bulk_data(
+    engine: AsyncEngine,
+    scale: str = "small",
+    seed: int = 42,
+    with_base_seeds: bool = True,
+) -> Dict[str, int]:
+    """Populate the database at the given scale; a no-op if generated data already exists"""
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_maker() as session:
+        if await generated_data_exists(session):
+            logger.info("Generated data already present, skipping")
+            return {}
+
+        if with_base_seeds:
+            from app.db.seeds.init_permission_data import seed as seed_permissions
+            from app.db.seeds.init_roles_data import seed_roles
+            from app.db.seeds.init_task_types import init_default_task_types
+
+            await seed_permissions(session)
+            await seed_roles(session)
+            await init_default_task_types(session)
+
+    return await BulkDataGenerator(engine, SCALES[scale], seed).run()
+
+
+if __name__ == "__main__":
+    async def main():
+        """Main function to run the bulk data generator"""
+        from app.core.database import engine
+
+        parser = argparse.ArgumentParser(description="Generate bulk synthetic data for performance work")
+        parser.add_argument("--scale", choices=list(SCALES), default="small")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--skip-base-seeds", action="store_true", help="Don't run permission/role/task type seeds")
+        args = parser.parse_args()
+
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+        try:
+            counts = await generate_bulk_data(engine, args.scale, args.seed, not args.skip_base_seeds)
+            for table, count in sorted(counts.items()):
+                print(f"{table}: {count:,}")
+            print("✅ Bulk data generation complete.")
+        except Exception as e:
+            logger.error(f"❌ Bulk data generation failed: {str(e)}")
+            raise
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
@@ -0,0 +1,47 @@
+import time
+import logging
+from fastapi import Request
+from starlette.middleware.base import BaseHTTPMiddleware
+from app.core.instrumentation import start_request_stats, server_timing_header
+from app.core.metrics import (
+    http_requests_total,
+    http_request_duration_seconds,
+    db_queries_per_request,
+    db_time_per_request_seconds,
+    db_n_plus_one_total,
+)
+
+logger = logging.getLogger(__name__)
+
+class InstrumentationMiddleware(BaseHTTPMiddleware):
+    """Collects per-request SQL stats, records metrics and adds a Server-Timing header"""
+
+    EXEMPT_ROUTES = [
+        "/metrics",
+        "/uploads",
+    ]
+
+    async def dispatch(self, request: Request, call_next):
+        if any(request.url.path.startswith(route) for route in self.EXEMPT_ROUTES):
+            return await call_next(request)
+
+        start_time = time.perf_counter()
+        stats = start_request_stats(route=request.url.path, scope=request.scope)
+
+        response = await call_next(request)
+
+        total = time.perf_counter() - start_time
+
+        # Use the route template (e.g. /items/{item_id}) so metrics don't explode per id
+        route_path = stats.route_label
+        stats.route = route_path
+
+        http_requests_total.inc(method=request.method, route=route_path, status=response.status_code)
+        http_request_duration_seconds.observe(total, method=request.method, route=route_path)
+        db_queries_per_request.observe(stats.statements, route=route_path)
+        db_time_per_request_seconds.observe(stats.db_time, route=route_path)
+        if stats.reported_shapes:
+            db_n_plus_one_total.inc(route=route_path)
+
+        response.headers["Server-Timing"] = server_timing_header(stats, total)
+        return response
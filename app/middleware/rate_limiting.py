@@ -1,33 +1,52 @@
 import logging
-from fastapi import Request, HTTPException, status
+from typing import Optional
+from fastapi import Request, status
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
+from app.auth.jwt_handler import decode_access_token
 from app.utils.rate_limiter import general_rate_limiter
 
 logger = logging.getLogger(__name__)
 
 class RateLimitingMiddleware(BaseHTTPMiddleware):
     """Rate limiting middleware"""
-    
+
     # Routes that don't require rate limiting
     EXEMPT_ROUTES = [
-        "/",
         "/health",
+        "/metrics",
         "/api/docs",
         "/api/redoc",
         "/api/openapi.json"
     ]
-    
+
+    @staticmethod
+    def _get_user_id(request: Request) -> Optional[int]:
+        """Read the user id from the bearer token (signature check only, no DB)"""
+        auth_header = request.headers.get("authorization", "")
+        if not auth_header.lower().startswith("bearer "):
+            return None
+        payload = decode_access_token(auth_header[7:])
+        try:
+            return int(payload["sub"]) if payload else None
+        except (KeyError, TypeError, ValueError):
+            return None
+
     async def dispatch(self, request: Request, call_next):
         # Check if route is exempt
-        if any(request.url.path.startswith(route) for route in self.EXEMPT_ROUTES):
+        if request.url.path == "/" or any(request.url.path.startswith(route) for route in self.EXEMPT_ROUTES):
             return await call_next(request)
-        
-        # Check rate limit
-        if await general_rate_limiter.is_rate_limited(request):
-            raise HTTPException(
+
+        # Check rate limit (per route, per IP and per user in one round trip)
+        result = await general_rate_limiter.hit(request, user_id=self._get_user_id(request))
+        if not result.allowed:
+            return JSONResponse(
                 status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Rate limit exceeded. Please slow down.",
-                headers={"Retry-After": "60"}
+                content={"detail": "Rate limit exceeded. Please slow down."},
+                headers=result.headers()
             )
-        
-        return await call_next(request)
+
+        response = await call_next(request)
+        for name, value in result.headers().items():
+            response.headers[name] = value
+        return response
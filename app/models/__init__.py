@@ -5,6 +5,7 @@ from app.models.auth.role import Role
 from app.models.auth.user_role import UserRole
 from app.models.auth.user import User
 from app.models.hr.attendance import Attendance
+from app.models.hr.attendance_month import EmployeeMonthAttendance
 from app.models.hr.employee import Employee
 from app.models.hr.holiday import Holiday
 from app.models.hr.offday import Offday
@@ -54,6 +55,7 @@ from app.models.task.task_type import TaskType
 from app.models.task.task_assignment import TaskAssignment
 from app.models.task.task_comment import TaskComment
 from app.models.task.task_attachment import TaskAttachment
+from app.models.system.document_counter import DocumentCounter
 
 
 __all__ = [
@@ -64,6 +66,7 @@ __all__ = [
     "UserRole",
     "User",
     "Attendance",
+    "EmployeeMonthAttendance",
     "Employee",
     "Holiday",
     "Offday",
@@ -112,5 +115,6 @@ __all__ = [
     "TaskType",
     "TaskAssignment",
     "TaskComment",
-    "TaskAttachment"
+    "TaskAttachment",
+    "DocumentCounter"
 ]
\ No newline at end of file
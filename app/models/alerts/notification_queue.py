@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Numeric, ForeignKey, Enum as SQLEnum, Date, Time, JSON
+from sqlalchemy import Index, text, Column, Integer, String, DateTime, Boolean, Text, Numeric, ForeignKey, Enum as SQLEnum, Date, Time, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import BaseModel
 
 class NotificationQueue(BaseModel):
     __tablename__ = 'notification_queue'
+    __table_args__ = (
+        # Delta sync reads changes in (change time, id) order
+        Index('ix_notification_queue_recipient_changed', 'recipient_id', text('coalesce(updated_at, created_at)'), 'id'),
+    )
     
     notification_type = Column(String(50), nullable=False)  # EMAIL, WHATSAPP, PUSH
     recipient_id = Column(Integer)  # User/Employee ID
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Enum as SQLEnum
+from sqlalchemy import Index, Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from app.db.base import BaseModel
 from app.models.shared.enums import MessageRole
@@ -24,6 +24,10 @@ class ChatConversation(BaseModel):
 
 class ChatMessage(BaseModel):
     __tablename__ = 'chat_messages'
+    __table_args__ = (
+        # History is read newest-first in (created_at, id) windows per conversation
+        Index('ix_chat_messages_conversation_created', 'conversation_id', 'created_at', 'id'),
+    )
     
     conversation_id = Column(Integer, ForeignKey('chat_conversations.id'), nullable=False)
     role = Column(SQLEnum(MessageRole), nullable=False)  # user, assistant
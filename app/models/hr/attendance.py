@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Numeric, ForeignKey, Enum as SQLEnum, Date, Time, JSON
+from sqlalchemy import Index, text, Column, Integer, String, DateTime, Boolean, Text, Numeric, ForeignKey, Enum as SQLEnum, Date, Time, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import BaseModel
@@ -6,6 +6,15 @@ from app.models.shared.enums import AttendanceStatus
 
 class Attendance(BaseModel):
     __tablename__ = 'attendances'
+    __table_args__ = (
+        # One live row per employee and day; check-in upserts against it
+        Index(
+            'uq_attendances_employee_date', 'employee_id', 'attendance_date',
+            unique=True,
+            postgresql_where=text('is_deleted = false'),
+            sqlite_where=text('is_deleted = 0'),
+        ),
+    )
     
     employee_id = Column(Integer, ForeignKey('employees.id'), nullable=False)
     attendance_date = Column(Date, nullable=False)
@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, Numeric, ForeignKey, Date, UniqueConstraint
+from sqlalchemy.orm import relationship
+from app.db.base import BaseModel
+
+class EmployeeMonthAttendance(BaseModel):
+    """Per employee-month attendance counters, maintained alongside Attendance writes"""
+    __tablename__ = 'employee_month_attendance'
+    __table_args__ = (
+        UniqueConstraint('employee_id', 'month', name='uq_employee_month_attendance_employee_month'),
+    )
+
+    employee_id = Column(Integer, ForeignKey('employees.id'), nullable=False, index=True)
+    month = Column(Date, nullable=False, index=True)  # First day of the month
+
+    # Day counts by status
+    record_count = Column(Integer, nullable=False, default=0)
+    present_days = Column(Integer, nullable=False, default=0)
+    late_days = Column(Integer, nullable=False, default=0)
+    left_early_days = Column(Integer, nullable=False, default=0)
+    checked_in_days = Column(Integer, nullable=False, default=0)
+    checked_out_days = Column(Integer, nullable=False, default=0)
+    absent_days = Column(Integer, nullable=False, default=0)  # Excludes weekend/holiday rows
+    weekend_days = Column(Integer, nullable=False, default=0)  # WEEKEND status or weekend flag
+    holiday_days = Column(Integer, nullable=False, default=0)  # HOLIDAY status or holiday flag
+    non_holiday_days = Column(Integer, nullable=False, default=0)
+
+    # Time totals
+    late_minutes = Column(Integer, nullable=False, default=0)
+    early_leave_minutes = Column(Integer, nullable=False, default=0)
+    hours_days = Column(Integer, nullable=False, default=0)  # Rows with total_hours recorded
+    total_hours = Column(Numeric(8, 2), nullable=False, default=0)
+    overtime_hours = Column(Numeric(8, 2), nullable=False, default=0)
+
+    # Relationships
+    employee = relationship("Employee")
+
+    @property
+    def worked_days(self) -> int:
+        """Days actually worked (PRESENT, LATE, LEFT_EARLY, CHECKED_OUT)"""
+        return self.present_days + self.late_days + self.left_early_days + self.checked_out_days
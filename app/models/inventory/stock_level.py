@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Numeric, ForeignKey, Enum as SQLEnum, Date, Time, JSON
+from sqlalchemy import Index, Column, Integer, String, DateTime, Boolean, Text, Numeric, ForeignKey, Enum as SQLEnum, Date, Time, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import BaseModel
@@ -18,6 +18,7 @@ class StockLevel(BaseModel):
     
     # Composite unique constraint
     __table_args__ = (
+        Index('ix_stock_levels_location_item', 'location_id', 'item_id'),
         {"extend_existing": True},
     )
 
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, BigInteger, String, Date, UniqueConstraint
+from app.db.base import BaseModel
+
+class DocumentCounter(BaseModel):
+    """Last number handed out per document type and day (see app.core.document_numbers)"""
+    __tablename__ = 'document_counters'
+    __table_args__ = (
+        UniqueConstraint('document_type', 'period', name='uq_document_counters_type_period'),
+    )
+
+    document_type = Column(String(20), nullable=False)  # PO, GR, TR, RR, IC, SHP
+    period = Column(Date, nullable=False)
+    last_value = Column(BigInteger, nullable=False, default=0)
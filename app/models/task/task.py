@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, Numeric, ForeignKey, Enum as SQLEnum, Date, Time, JSON
+from sqlalchemy import Index, text, Column, Integer, String, DateTime, Boolean, Text, Numeric, ForeignKey, Enum as SQLEnum, Date, Time, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import BaseModel
@@ -6,6 +6,10 @@ from app.models.shared.enums import TaskStatus, TaskPriority
 
 class Task(BaseModel):
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Delta sync reads changes in (change time, id) order
+        Index('ix_tasks_assignee_changed', 'assigned_to', text('coalesce(updated_at, created_at)'), 'id'),
+    )
     
     task_number = Column(String(50), unique=True, nullable=False, index=True)
     title = Column(String(200), nullable=False)
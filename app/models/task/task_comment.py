@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text, ForeignKey
+from sqlalchemy import Index, text, Column, Integer, String, DateTime, Boolean, Text, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base import BaseModel
 
 class TaskComment(BaseModel):
     __tablename__ = 'task_comments'
+    __table_args__ = (
+        # Delta sync reads changes in (change time, id) order
+        Index('ix_task_comments_changed', text('coalesce(updated_at, created_at)'), 'id'),
+    )
     
     task_id = Column(Integer, ForeignKey('tasks.id'), nullable=False)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
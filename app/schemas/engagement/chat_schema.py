@@ -56,6 +56,13 @@ class ChatConversationResponse(ChatConversationBase):
 
 class ChatConversationWithMessages(ChatConversationResponse):
     messages: List[ChatMessageResponse] = []
+    has_more: bool = False
+    next_before_id: Optional[int] = None  # Pass as before_id to load older messages
+
+class ChatMessagePage(BaseModel):
+    messages: List[ChatMessageResponse]
+    has_more: bool
+    next_before_id: Optional[int] = None
 
 class ChatConversationListResponse(BaseModel):
     conversations: List[ChatConversationResponse]
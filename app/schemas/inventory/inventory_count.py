@@ -83,3 +83,20 @@ class LocationRef(BaseModel):
 class InventoryCount(InventoryCountInDB):
     location: Optional[LocationRef] = None
     items: List[InventoryCountItem] = Field(default_factory=list)  # ✅
+
+
+class CountSheetLine(BaseModel):
+    item_id: int
+    item_name: str
+    item_code: Optional[str] = None
+    unit_type: Optional[UnitType] = None
+    unit_cost: Optional[Decimal] = None
+    system_quantity: Decimal
+    class Config:
+        from_attributes = True
+
+class CountSheetPage(BaseModel):
+    location_id: int
+    count_type: str = "FULL"
+    data: List[CountSheetLine] = Field(default_factory=list)
+    next_cursor: Optional[int] = None  # Pass as after_item_id for the next page; None on the last page
@@ -7,6 +7,7 @@ from app.ai.nlp.text_processor import TextProcessor
 from app.ai.voice.speech_to_text import SpeechToText
 from app.ai.voice.text_to_speech import TextToSpeech
 from app.core.redis import redis_client
+from app.services.engagement.faq_index import faq_index
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +37,7 @@ class ChatService:
                 "user_id": user_id,
                 "intent": processed.get("intent"),
                 "entities": processed.get("entities", []),
+                "faqs": await self._relevant_faqs(message, user_id),
                 "timestamp": datetime.utcnow()
             }
             
@@ -143,6 +145,15 @@ class ChatService:
         except Exception as e:
             logger.error(f"Error storing conversation: {str(e)}")
     
+    async def _relevant_faqs(self, message: str, user_id: int) -> List[Dict[str, Any]]:
+        """FAQs matching the message, for agents to ground their answer on"""
+        try:
+            hits = await faq_index.search(message, user_id, limit=3)
+            return [hit._asdict() for hit in hits]
+        except Exception as e:
+            logger.error(f"Error retrieving FAQs for chat: {str(e)}")
+            return []
+    
     async def _get_ai_manager(self) -> AIAgentManager:
         """Get AI manager from app state"""
         # This would be injected in real implementation
@@ -7,8 +7,9 @@ from sqlalchemy import select
 from app.models.auth.user import User
 from app.models.auth.refresh_token import RefreshToken
 from app.models.auth.audit_log import AuditLog
-from app.core.security import verify_password, create_access_token, create_refresh_token
+from app.core.security import verify_and_update_password, create_access_token, create_refresh_token
 from app.core.config import settings
+from app.core.event_sink import event_sink
 from app.services.auth.user_service import UserService
 
 logger = logging.getLogger(__name__)
@@ -49,10 +50,15 @@ class AuthService:
                 )
             
             # Verify password & handle failed login attempts
-            if not verify_password(password, user.hashed_password):
+            verified, new_hash = await verify_and_update_password(password, user.hashed_password)
+            if not verified:
                 await self._handle_failed_login(user, ip_address, user_agent)
                 return None
             
+            # Transparently upgrade hashes created with outdated rounds
+            if new_hash:
+                user.hashed_password = new_hash
+            
             # Reset failed attempts on successful login
             if user.failed_login_attempts > 0:
                 user.failed_login_attempts = 0
@@ -302,21 +308,20 @@ class AuthService:
         request_id: Optional[str] = None,
         session_id: Optional[str] = None
     ):
-        """Log audit event"""
+        """Log audit event (buffered; written by the event sink)"""
         try:
-            audit_log = AuditLog(
-                user_id=user_id,
-                action=action,
-                resource=resource,
-                resource_id=resource_id,
-                details=details,
-                ip_address=ip_address,
-                user_agent=user_agent,
-                endpoint = endpoint,
-                request_id = request_id,
-                session_id = session_id
-            )
-            self.session.add(audit_log)
-            await self.session.commit()
+            event_sink.emit(self.session, AuditLog, {
+                "user_id": user_id,
+                "action": action,
+                "resource": resource,
+                "resource_id": resource_id,
+                "details": details,
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "endpoint": endpoint,
+                "request_id": request_id,
+                "session_id": session_id,
+                "timestamp": datetime.now(timezone.utc),
+            })
         except Exception as e:
             logger.error(f"Error logging audit event: {str(e)}")
\ No newline at end of file
@@ -3,24 +3,27 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime, timedelta
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import func, select, and_, or_
+from sqlalchemy import func, select, and_
 from sqlalchemy.orm import selectinload
 from app.models.auth.user import User
 from app.models.auth.role import Role
 from app.models.auth.permission import Permission
 from app.models.auth.user_role import UserRole
 from app.models.auth.role_permission import RolePermission
-from app.core.security import get_password_hash, generate_password_reset_token
+from app.core.security import get_password_hash_async, generate_password_reset_token
 from app.models.organization.location import Location
 from app.schemas.auth.user import UserCreate, UserResponse, UserUpdate
-from openpyxl import Workbook
+from app.services.search.search_service import SEARCH_FIELDS, search_filter, search_rank
 from sqlalchemy import select
 from datetime import datetime
 from io import BytesIO
 from app.models.auth.user import User
+from app.utils.lazy_import import lazy_import
 
 logger = logging.getLogger(__name__)
 
+openpyxl = lazy_import("openpyxl")
+
 class UserService:
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -144,13 +147,15 @@ class UserService:
                     detail="Username already taken"
                 )
             
+            hashed_password = await get_password_hash_async(user_create.password)
+            
             # Create user
             db_user = User(
                 email=user_create.email,
                 username=user_create.username,
                 full_name=user_create.full_name,
                 location_id=user_create.location_id,
-                hashed_password=get_password_hash(user_create.password),
+                hashed_password=hashed_password,
                 phone=user_create.phone,
                 address=user_create.address,
                 is_verified=False  # Requires email verification
@@ -381,14 +386,7 @@ class UserService:
             conditions = []
             
             if search:
-                search_term = f"%{search}%"
-                conditions.append(
-                    or_(
-                        User.email.ilike(search_term),
-                        User.username.ilike(search_term),
-                        User.full_name.ilike(search_term)
-                    )
-                )
+                conditions.append(search_filter(self.session, SEARCH_FIELDS["user"], search))
             
             # Location manager restriction - handles multiple locations per manager
             if user_id:
@@ -419,6 +417,8 @@ class UserService:
             skip = (page_index - 1) * page_size
             
             # Get paginated data
+            if search:
+                query = query.order_by(search_rank(self.session, SEARCH_FIELDS["user"], search).desc())
             query = query.order_by(User.created_at.desc())
             query = query.offset(skip).limit(page_size)
             
@@ -472,13 +472,7 @@ class UserService:
             query = select(func.count(User.id)).where(User.is_deleted == False)
             
             if search:
-                query = query.where(
-                    or_(
-                        User.email.ilike(f"%{search}%"),
-                        User.username.ilike(f"%{search}%"),
-                        User.full_name.ilike(f"%{search}%")
-                    )
-                )
+                query = query.where(search_filter(self.session, SEARCH_FIELDS["user"], search))
             
             result = await self.session.execute(query)
             return result.scalar()
@@ -498,15 +492,15 @@ class UserService:
                 )
             
             # Verify current password
-            from app.core.security import verify_password
-            if not verify_password(current_password, user.hashed_password):
+            from app.core.security import verify_password_async
+            if not await verify_password_async(current_password, user.hashed_password):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Current password is incorrect"
                 )
             
             # Update password
-            user.hashed_password = get_password_hash(new_password)
+            user.hashed_password = await get_password_hash_async(new_password)
             user.updated_at = datetime.utcnow()
             
             await self.session.commit()
@@ -550,7 +544,7 @@ class UserService:
         )
         users = result.scalars().all()
 
-        wb = Workbook()
+        wb = openpyxl.Workbook()
         ws = wb.active
         ws.title = "Deleted Users" if deleted else "Users"
         self._write_users_sheet(ws, users)
@@ -1,9 +1,9 @@
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
+from sqlalchemy import select, func, desc, tuple_, update
 from sqlalchemy.orm import selectinload
 from app.models.engagement.chat import ChatConversation, ChatMessage
 from app.models.shared.enums import MessageRole
@@ -219,24 +219,30 @@ class ChatService:
     ) -> Optional[ChatMessage]:
         """Add a message to a conversation"""
         try:
-            # Verify conversation exists and belongs to user
-            conversation = await self.get_conversation(conversation_id, user_id)
-            if not conversation:
+            # Bumping the stats doubles as the ownership check
+            message_count = await self._record_message(conversation_id, user_id)
+            if message_count is None:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Conversation not found"
                 )
             
-            message = await self._add_message_to_conversation(
-                conversation_id, message_data, auto_commit=True
+            message = ChatMessage(
+                conversation_id=conversation_id,
+                role=message_data.role,
+                message=message_data.message,
+                chat_metadata=message_data.chat_metadata
             )
+            self.session.add(message)
             
             # Auto-generate title from first user message if needed
             if (auto_generate_title and 
                 message_data.role == MessageRole.USER and 
-                conversation.message_count <= 1):
-                await self._auto_generate_title(conversation, message_data.message)
+                message_count <= 1):
+                await self._auto_generate_title(conversation_id, message_data.message)
             
+            await self.session.commit()
+            await self.session.refresh(message)
             return message
             
         except HTTPException:
@@ -249,6 +255,26 @@ class ChatService:
                 detail="Error adding message"
             )
 
+    async def _record_message(self, conversation_id: int, user_id: Optional[int] = None) -> Optional[int]:
+        """Increment message_count and stamp last_message_at in one statement; returns the new count"""
+        query = (
+            update(ChatConversation)
+            .where(
+                ChatConversation.id == conversation_id,
+                ChatConversation.is_deleted == False
+            )
+            .values(
+                message_count=func.coalesce(ChatConversation.message_count, 0) + 1,
+                last_message_at=func.now()
+            )
+            .returning(ChatConversation.message_count)
+            .execution_options(synchronize_session=False)
+        )
+        if user_id is not None:
+            query = query.where(ChatConversation.user_id == user_id)
+        result = await self.session.execute(query)
+        return result.scalar_one_or_none()
+
     async def _add_message_to_conversation(
         self, 
         conversation_id: int, 
@@ -264,14 +290,7 @@ class ChatService:
         )
         
         self.session.add(message)
-        
-        # Update conversation stats
-        result = await self.session.execute(
-            select(ChatConversation).where(ChatConversation.id == conversation_id)
-        )
-        conversation = result.scalar_one()
-        conversation.message_count = (conversation.message_count or 0) + 1
-        conversation.last_message_at = datetime.utcnow()
+        await self._record_message(conversation_id)
         
         if auto_commit:
             await self.session.flush()
@@ -280,50 +299,61 @@ class ChatService:
         
         return message
 
-    async def _auto_generate_title(self, conversation: ChatConversation, message: str):
-        """Auto-generate conversation title from first message"""
-        try:
-            # Use first 50 characters of the message as title
-            title = message[:50].strip()
-            if len(message) > 50:
-                title += "..."
-            
-            conversation.title = title
-            await self.session.commit()
-            
-        except Exception as e:
-            logger.error(f"Error auto-generating title: {e}")
+    async def _auto_generate_title(self, conversation_id: int, message: str):
+        """Auto-generate conversation title from first message; committed by the caller"""
+        # Use first 50 characters of the message as title
+        title = message[:50].strip()
+        if len(message) > 50:
+            title += "..."
+        
+        await self.session.execute(
+            update(ChatConversation)
+            .where(ChatConversation.id == conversation_id)
+            .values(title=title)
+            .execution_options(synchronize_session=False)
+        )
 
     async def get_conversation_messages(
         self,
         conversation_id: int,
         user_id: int,
-        skip: int = 0,
-        limit: int = 100
-    ) -> List[ChatMessage]:
-        """Get messages for a conversation"""
-        try:
-            # Verify conversation belongs to user
-            conversation = await self.get_conversation(conversation_id, user_id)
-            if not conversation:
-                return []
-            
-            result = await self.session.execute(
-                select(ChatMessage)
-                .where(
-                    ChatMessage.conversation_id == conversation_id,
-                    ChatMessage.is_deleted == False
-                )
-                .order_by(ChatMessage.created_at)
-                .offset(skip)
-                .limit(limit)
+        before_id: Optional[int] = None,
+        limit: int = 50
+    ) -> Optional[Tuple[List[ChatMessage], bool]]:
+        """
+        Newest-first window of messages, returned oldest first, plus whether older
+        messages exist. Pass the oldest id of a window as `before_id` for the next
+        one. Returns None when the conversation is not the user's.
+        """
+        owned = await self.session.execute(
+            select(ChatConversation.id).where(
+                ChatConversation.id == conversation_id,
+                ChatConversation.user_id == user_id,
+                ChatConversation.is_deleted == False
             )
-            
-            return result.scalars().all()
-            
-        except Exception as e:
-            logger.error(f"Error getting conversation messages: {e}")
-            return []
+        )
+        if owned.scalar_one_or_none() is None:
+            return None
+        
+        # Keyset on (created_at, id) walks ix_chat_messages_conversation_created backwards
+        query = select(ChatMessage).where(
+            ChatMessage.conversation_id == conversation_id,
+            ChatMessage.is_deleted == False
+        )
+        if before_id is not None:
+            anchor = (
+                select(ChatMessage.created_at)
+                .where(ChatMessage.id == before_id, ChatMessage.conversation_id == conversation_id)
+                .scalar_subquery()
+            )
+            query = query.where(tuple_(ChatMessage.created_at, ChatMessage.id) < tuple_(anchor, before_id))
+        
+        result = await self.session.execute(
+            query.order_by(ChatMessage.created_at.desc(), ChatMessage.id.desc()).limit(limit + 1)
+        )
+        messages = result.scalars().all()
+        has_more = len(messages) > limit
+        return list(reversed(messages[:limit])), has_more
 
     async def update_message(
         self, 
@@ -371,56 +401,42 @@ class ChatService:
             now = datetime.utcnow()
             today = now.replace(hour=0, minute=0, second=0, microsecond=0)
 
-            # Total conversations
-            total_conv_result = await self.session.execute(
-                select(func.count(ChatConversation.id)).where(
-                    ChatConversation.user_id == user_id,
-                    ChatConversation.is_deleted == False
-                )
-            )
-            total_conversations = int(total_conv_result.scalar() or 0)
-
-            # Active conversations
-            active_conv_result = await self.session.execute(
-                select(func.count(ChatConversation.id)).where(
-                    ChatConversation.user_id == user_id,
-                    ChatConversation.is_active == True,
-                    ChatConversation.is_deleted == False
-                )
-            )
-            active_conversations = int(active_conv_result.scalar() or 0)
-
-            # Total messages
-            total_msg_result = await self.session.execute(
+            # Only conversations touched today can hold today's messages
+            messages_today = (
                 select(func.count(ChatMessage.id))
-                .join(ChatConversation)
+                .join(ChatConversation, ChatMessage.conversation_id == ChatConversation.id)
                 .where(
                     ChatConversation.user_id == user_id,
+                    ChatConversation.is_deleted == False,
+                    ChatConversation.last_message_at >= today,
+                    ChatMessage.created_at >= today,
                     ChatMessage.is_deleted == False
                 )
+                .scalar_subquery()
             )
-            total_messages = int(total_msg_result.scalar() or 0)
-
-            # Messages today
-            today_msg_result = await self.session.execute(
-                select(func.count(ChatMessage.id))
-                .join(ChatConversation)
-                .where(
+            result = await self.session.execute(
+                select(
+                    func.count(ChatConversation.id).label("total_conversations"),
+                    func.count(ChatConversation.id).filter(ChatConversation.is_active == True).label("active_conversations"),
+                    func.coalesce(func.sum(ChatConversation.message_count), 0).label("total_messages"),
+                    messages_today.label("messages_today")
+                ).where(
                     ChatConversation.user_id == user_id,
-                    ChatMessage.created_at >= today,
-                    ChatMessage.is_deleted == False
+                    ChatConversation.is_deleted == False
                 )
             )
-            messages_today = int(today_msg_result.scalar() or 0)
+            row = result.one()
+            total_conversations = int(row.total_conversations or 0)
+            total_messages = int(row.total_messages or 0)
 
             # Average messages per conversation
             avg_messages = total_messages / total_conversations if total_conversations > 0 else 0
 
             return {
                 "total_conversations": total_conversations,
-                "active_conversations": active_conversations,
+                "active_conversations": int(row.active_conversations or 0),
                 "total_messages": total_messages,
-                "messages_today": messages_today,
+                "messages_today": int(row.messages_today or 0),
                 "avg_messages_per_conversation": round(avg_messages, 2)
             }
 
@@ -432,4 +448,4 @@ class ChatService:
                 "total_messages": 0,
                 "messages_today": 0,
                 "avg_messages_per_conversation": 0.0
-            }
\ No newline at end of file
+            }
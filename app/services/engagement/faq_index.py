@@ -0,0 +1,312 @@
+"""
+In-process BM25 retrieval over FAQ questions, answers and tags.
+
+Each FAQ is tokenized once into weighted term counts. The index compiles them
+into a term-major sparse matrix (CSR by term: `indptr`, document rows and
+precomputed BM25 weights as NumPy arrays), so a query is a few array slices
+and one `bincount` over the matching postings: well under a millisecond for
+thousands of FAQs, with no model or download involved. A change marks the
+arrays stale; queries keep using them while a worker thread compiles the
+next ones, so no query pays for a rebuild once the index has been built.
+
+Workers share the tokenized FAQs through Redis: a hash of serialized
+documents plus a version counter bumped on every change. create/update/delete
+apply their FAQ to the local index and to that snapshot; other workers see the
+new version (checked at most every FAQ_INDEX_REFRESH_SECONDS) and reload the
+snapshot without re-tokenizing. Without Redis each process indexes from the
+database on its own.
+"""
+import asyncio
+import json
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from app.core.config import settings
+from app.utils.lazy_import import lazy_import
+
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = "faq_index:docs"
+VERSION_KEY = "faq_index:version"
+
+# BM25 parameters (standard defaults)
+K1 = 1.2
+B = 0.75
+
+# A question term counts double; tags sit between question and answer
+QUESTION_WEIGHT = 2.0
+TAGS_WEIGHT = 1.5
+ANSWER_WEIGHT = 1.0
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+STOPWORDS = frozenset(
+    "a about an and are as at be but by can could do does for from has have how i if in is it "
+    "its me my of on or our should so that the their them there these this to was we what when "
+    "where which who why will with would you your".split()
+)
+
+
+def _stem(token: str) -> str:
+    """Fold plurals and -ing forms so "items"/"item" and "ordering"/"order" match"""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 5 and token.endswith("ing"):
+        return token[:-3]
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercased word tokens without stopwords, lightly stemmed"""
+    if not text:
+        return []
+    return [_stem(token) for token in _TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+class FAQHit(NamedTuple):
+    faq_id: int
+    question: str
+    score: float
+
+
+@dataclass
+class FAQDocument:
+    """One indexed FAQ: who may see it and its weighted term counts"""
+    faq_id: int
+    user_id: int
+    is_public: bool
+    priority: int
+    question: str
+    terms: Dict[str, float]
+
+    @classmethod
+    def from_faq(cls, faq) -> "FAQDocument":
+        terms: Dict[str, float] = {}
+        for text, weight in ((faq.question, QUESTION_WEIGHT), (faq.tags, TAGS_WEIGHT), (faq.answer, ANSWER_WEIGHT)):
+            for token in tokenize(text):
+                terms[token] = terms.get(token, 0.0) + weight
+        return cls(faq.id, faq.user_id, bool(faq.is_public), faq.priority or 0, faq.question, terms)
+
+    def dumps(self) -> str:
+        return json.dumps({"u": self.user_id, "p": self.is_public, "r": self.priority, "q": self.question, "t": self.terms})
+
+    @classmethod
+    def loads(cls, faq_id: int, raw: str) -> "FAQDocument":
+        data = json.loads(raw)
+        return cls(faq_id, data["u"], data["p"], data["r"], data["q"], data["t"])
+
+
+def _is_indexed(faq) -> bool:
+    return bool(faq.is_active) and not faq.is_deleted
+
+
+class _Compiled:
+    """Immutable arrays for one state of the index"""
+
+    def __init__(self, docs: Iterable[FAQDocument]):
+        docs = list(docs)
+        self.faq_ids = np.array([doc.faq_id for doc in docs], dtype=np.int64)
+        self.owners = np.array([doc.user_id for doc in docs], dtype=np.int64)
+        self.public = np.array([doc.is_public for doc in docs], dtype=bool)
+        self.priorities = np.array([doc.priority for doc in docs], dtype=np.int64)
+        self.questions = [doc.question for doc in docs]
+
+        self.vocabulary: Dict[str, int] = {}
+        term_cols: List[int] = []
+        doc_rows: List[int] = []
+        frequencies: List[float] = []
+        for row, doc in enumerate(docs):
+            for term, frequency in doc.terms.items():
+                term_cols.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+                doc_rows.append(row)
+                frequencies.append(frequency)
+
+        cols = np.array(term_cols, dtype=np.int64)
+        rows = np.array(doc_rows, dtype=np.int64)
+        tf = np.array(frequencies, dtype=np.float64)
+        lengths = np.bincount(rows, weights=tf, minlength=len(docs))
+        avg_length = lengths.mean() if len(docs) else 1.0
+
+        df = np.bincount(cols, minlength=len(self.vocabulary))
+        idf = np.log1p((len(docs) - df + 0.5) / (df + 0.5))
+        norm = K1 * (1 - B + B * lengths[rows] / (avg_length or 1.0))
+        weights = idf[cols] * tf * (K1 + 1) / (tf + norm)
+
+        # Group postings by term so each query term is one contiguous slice
+        order = np.argsort(cols, kind="stable")
+        self.rows = rows[order]
+        self.weights = weights[order]
+        self.indptr = np.concatenate(([0], np.cumsum(df)))
+
+    def search(self, terms: Iterable[str], user_id: Optional[int], limit: int) -> List[FAQHit]:
+        cols = {self.vocabulary[term] for term in terms if term in self.vocabulary}
+        if not cols or limit <= 0:
+            return []
+        rows = np.concatenate([self.rows[self.indptr[col]:self.indptr[col + 1]] for col in cols])
+        weights = np.concatenate([self.weights[self.indptr[col]:self.indptr[col + 1]] for col in cols])
+        scores = np.bincount(rows, weights=weights, minlength=len(self.faq_ids))
+
+        visible = self.public | (self.owners == user_id) if user_id is not None else self.public
+        candidates = np.flatnonzero(visible & (scores > 0))
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        # Best score first; FAQ priority breaks ties
+        ranked = candidates[np.lexsort((-self.priorities[candidates], -scores[candidates]))]
+        return [FAQHit(int(self.faq_ids[i]), self.questions[i], round(float(scores[i]), 4)) for i in ranked]
+
+
+class FAQIndex:
+    """Process-wide FAQ index kept in step with the shared Redis snapshot"""
+
+    def __init__(self):
+        self._docs: Dict[int, FAQDocument] = {}
+        self._compiled: Optional[_Compiled] = None
+        self._stale = False
+        self._rebuild: Optional[asyncio.Task] = None
+        self._loaded = False
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+
+    # ---------- Local index ----------
+    def _set(self, doc: FAQDocument):
+        self._docs[doc.faq_id] = doc
+        self._stale = True
+
+    def _discard(self, faq_id: int):
+        if self._docs.pop(faq_id, None) is not None:
+            self._stale = True
+
+    def _replace(self, docs: Dict[int, FAQDocument]):
+        self._docs = docs
+        self._stale = True
+
+    def search_loaded(self, query: str, user_id: Optional[int] = None, limit: int = 5) -> List[FAQHit]:
+        """Top `limit` FAQs visible to `user_id` (own or public) for `query`, from what is loaded"""
+        if self._compiled is None:
+            self._stale = False
+            self._compiled = _Compiled(self._docs.values())
+        elif self._stale:
+            self._schedule_rebuild()
+        return self._compiled.search(tokenize(query), user_id, limit)
+
+    def _schedule_rebuild(self):
+        """Compile the current documents off the event loop; queries use the previous arrays meanwhile"""
+        if self._rebuild is not None and not self._rebuild.done():
+            # Changes made during this rebuild leave the index stale for the next one
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._stale = False
+            self._compiled = _Compiled(self._docs.values())
+            return
+        self._stale = False
+        self._rebuild = loop.create_task(self._compile(list(self._docs.values())))
+
+    async def _compile(self, docs: List[FAQDocument]):
+        try:
+            self._compiled = await asyncio.to_thread(_Compiled, docs)
+        except Exception as e:
+            self._stale = True
+            logger.warning(f"FAQ index rebuild failed, serving the previous one: {str(e)}")
+
+    async def search(self, query: str, user_id: Optional[int] = None, limit: int = 5) -> List[FAQHit]:
+        """Top `limit` FAQs for `query`, loading or refreshing the index first when due"""
+        await self.ensure_fresh()
+        return self.search_loaded(query, user_id, limit)
+
+    # ---------- Writes ----------
+    async def apply(self, faq):
+        """Index a created or updated FAQ (or drop it once inactive/deleted) here and in the snapshot"""
+        from app.core.redis import redis_client
+
+        doc = FAQDocument.from_faq(faq) if _is_indexed(faq) else None
+        if doc:
+            self._set(doc)
+        else:
+            self._discard(faq.id)
+
+        try:
+            client = await redis_client.get_client()
+            pipe = client.pipeline(transaction=True)
+            if doc:
+                pipe.hset(SNAPSHOT_KEY, str(doc.faq_id), doc.dumps())
+            else:
+                pipe.hdel(SNAPSHOT_KEY, str(faq.id))
+            pipe.incr(VERSION_KEY)
+            _, version = await pipe.execute()
+            # Only our own change since the last load: stay current without reloading
+            if self._version is not None and version == self._version + 1:
+                self._version = version
+        except Exception as e:
+            logger.warning(f"Could not publish FAQ {faq.id} to the shared index: {str(e)}")
+
+    # ---------- Loading ----------
+    async def ensure_fresh(self):
+        """Reload when another worker changed the snapshot; rate-limited to one check per interval"""
+        from app.core.redis import redis_client
+
+        now = time.monotonic()
+        if self._loaded and now - self._checked_at < settings.FAQ_INDEX_REFRESH_SECONDS:
+            return
+        self._checked_at = now
+
+        try:
+            client = await redis_client.get_client()
+            version = await client.get(VERSION_KEY)
+            if version is None:
+                await self._build_from_database(publish=True)
+            elif not self._loaded or int(version) != self._version:
+                await self._load_snapshot(client)
+        except Exception as e:
+            if not self._loaded:
+                logger.warning(f"FAQ index snapshot unavailable, indexing from the database: {str(e)}")
+                await self._build_from_database(publish=False)
+
+    async def _load_snapshot(self, client):
+        started = time.perf_counter()
+        pipe = client.pipeline(transaction=True)
+        pipe.get(VERSION_KEY)
+        pipe.hgetall(SNAPSHOT_KEY)
+        version, raw_docs = await pipe.execute()
+        self._replace({int(faq_id): FAQDocument.loads(int(faq_id), raw) for faq_id, raw in raw_docs.items()})
+        self._version = int(version or 0)
+        self._loaded = True
+        logger.info(f"Loaded FAQ index snapshot v{self._version}: {len(self._docs)} FAQs in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+    async def _build_from_database(self, publish: bool):
+        """Tokenize every active FAQ; with `publish`, seed the shared snapshot"""
+        from sqlalchemy import select
+        from app.core.database import async_session_maker
+        from app.core.redis import redis_client
+        from app.models.engagement.faq import FAQ
+
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(FAQ).where(FAQ.is_active == True, FAQ.is_deleted == False)
+            )
+            docs = {faq.id: FAQDocument.from_faq(faq) for faq in result.scalars()}
+
+        self._replace(docs)
+        self._version = None
+        self._loaded = True
+        logger.info(f"Indexed {len(docs)} FAQs from the database")
+
+        if publish:
+            client = await redis_client.get_client()
+            pipe = client.pipeline(transaction=True)
+            for doc in docs.values():
+                # HSETNX: a concurrent create/update already holds the newer document
+                pipe.hsetnx(SNAPSHOT_KEY, str(doc.faq_id), doc.dumps())
+            pipe.incr(VERSION_KEY)
+            await pipe.execute()
+            # Pick up whatever writers added meanwhile on the next check
+            self._checked_at = 0.0
+
+
+faq_index = FAQIndex()
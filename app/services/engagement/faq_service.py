@@ -7,6 +7,7 @@ from sqlalchemy import select, func, or_, desc
 from sqlalchemy.orm import selectinload
 from app.models.engagement.faq import FAQ
 from app.schemas.engagement.faq_schema import FAQCreate, FAQResponse, FAQUpdate
+from app.services.engagement.faq_index import faq_index
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +67,7 @@ class FAQService:
             await self.session.flush()
             await self.session.commit()
             await self.session.refresh(faq)
+            await faq_index.apply(faq)
             logger.info(f"FAQ created: {faq.id} by user {user_id}")
             return faq
         except Exception as e:
@@ -100,6 +102,7 @@ class FAQService:
             faq.updated_at = datetime.utcnow()
             await self.session.commit()
             await self.session.refresh(faq)
+            await faq_index.apply(faq)
             logger.info(f"FAQ updated: {faq.id} by user {user_id}")
             return faq
         except HTTPException:
@@ -131,6 +134,7 @@ class FAQService:
             faq.is_deleted = True
             faq.updated_at = datetime.utcnow()
             await self.session.commit()
+            await faq_index.apply(faq)
             logger.info(f"FAQ deleted: {faq.id} by user {user_id}")
             return True
         except Exception as e:
@@ -175,6 +179,25 @@ class FAQService:
             logger.error(f"Error getting user FAQs: {e}")
             return []
 
+    async def search_faqs(self, query: str, user_id: int, limit: int = 5) -> List[FAQ]:
+        """Best-matching FAQs for a free-text question: the user's own plus public ones"""
+        try:
+            hits = await faq_index.search(query, user_id, limit)
+            if not hits:
+                return []
+            result = await self.session.execute(
+                select(FAQ).where(
+                    FAQ.id.in_([hit.faq_id for hit in hits]),
+                    FAQ.is_active == True,
+                    FAQ.is_deleted == False
+                )
+            )
+            faqs = {faq.id: faq for faq in result.scalars().all()}
+            return [faqs[hit.faq_id] for hit in hits if hit.faq_id in faqs]
+        except Exception as e:
+            logger.error(f"Error searching FAQs: {e}")
+            return []
+
     async def count_user_faqs(
         self,
         user_id: int,
@@ -4,6 +4,7 @@ from datetime import datetime, timedelta
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, desc, and_
+from app.core.event_sink import event_sink
 from app.models.engagement.user_history import UserHistory
 from app.models.shared.enums import HistoryActionType
 from app.schemas.engagement.user_history_schema import UserHistoryCreate
@@ -62,7 +63,8 @@ class UserHistoryService:
         session_id: Optional[str] = None,
         ip_address: Optional[str] = None,
         user_agent: Optional[str] = None
-    ) -> UserHistory:
+    ):
+        """Record an action without waiting on the database; the row is written by the event sink"""
         data = UserHistoryCreate(
             action_type=action_type,
             resource_type=resource_type,
@@ -74,7 +76,7 @@ class UserHistoryService:
             ip_address=ip_address,
             user_agent=user_agent
         )
-        return await self.create_history(data, user_id)
+        event_sink.emit(self.session, UserHistory, {"user_id": user_id, **data.model_dump()})
 
     # ---------- Getters ----------
     async def get_user_histories(
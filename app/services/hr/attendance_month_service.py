@@ -0,0 +1,249 @@
+import logging
+from typing import Any, Dict, List, Optional
+from decimal import Decimal
+from datetime import date, timedelta
+from sqlalchemy import Date, and_, case, cast, delete, func, literal, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.hr.attendance import Attendance
+from app.models.hr.attendance_month import EmployeeMonthAttendance
+from app.models.shared.enums import AttendanceStatus
+
+logger = logging.getLogger(__name__)
+
+# Marks a month row that has not been fetched yet (None means fetched and absent)
+NOT_LOADED: Any = object()
+
+COUNTER_COLUMNS = (
+    "record_count",
+    "present_days",
+    "late_days",
+    "left_early_days",
+    "checked_in_days",
+    "checked_out_days",
+    "absent_days",
+    "weekend_days",
+    "holiday_days",
+    "non_holiday_days",
+    "late_minutes",
+    "early_leave_minutes",
+    "hours_days",
+    "total_hours",
+    "overtime_hours",
+)
+
+_STATUS_COUNTERS = {
+    AttendanceStatus.PRESENT: "present_days",
+    AttendanceStatus.LATE: "late_days",
+    AttendanceStatus.LEFT_EARLY: "left_early_days",
+    AttendanceStatus.CHECKED_IN: "checked_in_days",
+    AttendanceStatus.CHECKED_OUT: "checked_out_days",
+}
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def dialect_insert(session: AsyncSession):
+    """insert() construct with ON CONFLICT support for the session's database"""
+    dialect = session.bind.dialect.name if session.bind is not None else "postgresql"
+    return sqlite.insert if dialect == "sqlite" else postgresql.insert
+
+
+def attendance_contribution(attendance: Attendance) -> Dict[str, Any]:
+    """What one attendance row adds to its employee-month counters"""
+    counters: Dict[str, Any] = {column: 0 for column in COUNTER_COLUMNS}
+    if attendance is None or attendance.is_deleted:
+        return counters
+
+    status = AttendanceStatus(attendance.status)
+    counters["record_count"] = 1
+    if status in _STATUS_COUNTERS:
+        counters[_STATUS_COUNTERS[status]] = 1
+    if status == AttendanceStatus.ABSENT and not attendance.is_weekend and not attendance.is_holiday:
+        counters["absent_days"] = 1
+    if status == AttendanceStatus.WEEKEND or attendance.is_weekend:
+        counters["weekend_days"] = 1
+    if status == AttendanceStatus.HOLIDAY or attendance.is_holiday:
+        counters["holiday_days"] = 1
+    if not attendance.is_holiday:
+        counters["non_holiday_days"] = 1
+
+    counters["late_minutes"] = attendance.late_minutes or 0
+    counters["early_leave_minutes"] = attendance.early_leave_minutes or 0
+    if attendance.total_hours is not None:
+        counters["hours_days"] = 1
+        counters["total_hours"] = Decimal(str(attendance.total_hours))
+    counters["overtime_hours"] = Decimal(str(attendance.overtime_hours or 0))
+    return counters
+
+
+class AttendanceMonthService:
+    """Maintains and reads the employee_month_attendance aggregate"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _month_expression(self):
+        if self.session.bind is not None and self.session.bind.dialect.name == "sqlite":
+            return func.date(Attendance.attendance_date, "start of month")
+        # Inline literal so the SELECT and GROUP BY render identical expressions
+        return cast(func.date_trunc(text("'month'"), Attendance.attendance_date), Date)
+
+    # ---------- Incremental Maintenance ----------
+    async def apply_change(
+        self,
+        employee_id: int,
+        attendance_date: date,
+        before: Optional[Dict[str, Any]],
+        after: Optional[Dict[str, Any]],
+    ):
+        """Add (after - before) to the employee-month row; call before the surrounding commit"""
+        delta = {
+            column: (after or {}).get(column, 0) - (before or {}).get(column, 0)
+            for column in COUNTER_COLUMNS
+        }
+        if not any(delta.values()):
+            return
+
+        table = EmployeeMonthAttendance.__table__
+        stmt = dialect_insert(self.session)(table).values(
+            employee_id=employee_id,
+            month=month_start(attendance_date),
+            is_deleted=False,
+            **delta,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.employee_id, table.c.month],
+            set_={column: table.c[column] + stmt.excluded[column] for column in COUNTER_COLUMNS},
+        )
+        await self.session.execute(stmt)
+
+    async def record(self, attendance: Attendance, before: Optional[Dict[str, Any]] = None):
+        """Apply a new or edited attendance row; `before` is its contribution prior to the edit"""
+        await self.apply_change(
+            attendance.employee_id,
+            attendance.attendance_date,
+            before,
+            attendance_contribution(attendance),
+        )
+
+    # ---------- Rebuild ----------
+    async def rebuild(
+        self,
+        from_month: Optional[date] = None,
+        to_month: Optional[date] = None,
+        employee_id: Optional[int] = None,
+    ) -> int:
+        """Recompute rows from attendances (backfill / repair); returns the number of rows written"""
+        conditions = []
+        month_conditions = []
+        if from_month:
+            conditions.append(Attendance.attendance_date >= month_start(from_month))
+            month_conditions.append(EmployeeMonthAttendance.month >= month_start(from_month))
+        if to_month:
+            next_month = month_start(month_start(to_month).replace(day=28) + timedelta(days=4))
+            conditions.append(Attendance.attendance_date < next_month)
+            month_conditions.append(EmployeeMonthAttendance.month <= month_start(to_month))
+        if employee_id:
+            conditions.append(Attendance.employee_id == employee_id)
+            month_conditions.append(EmployeeMonthAttendance.employee_id == employee_id)
+
+        def count_when(condition):
+            return func.count(case((condition, 1), else_=None))
+
+        month = self._month_expression()
+        not_weekend = func.coalesce(Attendance.is_weekend, False) == False
+        not_holiday = func.coalesce(Attendance.is_holiday, False) == False
+        aggregate = (
+            select(
+                Attendance.employee_id,
+                month.label("month"),
+                literal(False).label("is_deleted"),
+                func.count(Attendance.id).label("record_count"),
+                count_when(Attendance.status == AttendanceStatus.PRESENT).label("present_days"),
+                count_when(Attendance.status == AttendanceStatus.LATE).label("late_days"),
+                count_when(Attendance.status == AttendanceStatus.LEFT_EARLY).label("left_early_days"),
+                count_when(Attendance.status == AttendanceStatus.CHECKED_IN).label("checked_in_days"),
+                count_when(Attendance.status == AttendanceStatus.CHECKED_OUT).label("checked_out_days"),
+                count_when(and_(Attendance.status == AttendanceStatus.ABSENT, not_weekend, not_holiday)).label("absent_days"),
+                count_when((Attendance.status == AttendanceStatus.WEEKEND) | (Attendance.is_weekend == True)).label("weekend_days"),
+                count_when((Attendance.status == AttendanceStatus.HOLIDAY) | (Attendance.is_holiday == True)).label("holiday_days"),
+                count_when(not_holiday).label("non_holiday_days"),
+                func.coalesce(func.sum(Attendance.late_minutes), 0).label("late_minutes"),
+                func.coalesce(func.sum(Attendance.early_leave_minutes), 0).label("early_leave_minutes"),
+                func.count(Attendance.total_hours).label("hours_days"),
+                func.coalesce(func.sum(Attendance.total_hours), 0).label("total_hours"),
+                func.coalesce(func.sum(Attendance.overtime_hours), 0).label("overtime_hours"),
+            )
+            .where(func.coalesce(Attendance.is_deleted, False) == False, *conditions)
+            .group_by(Attendance.employee_id, month)
+        )
+
+        table = EmployeeMonthAttendance.__table__
+        columns = ["employee_id", "month", "is_deleted", *COUNTER_COLUMNS]
+        try:
+            await self.session.execute(delete(EmployeeMonthAttendance).where(*month_conditions))
+            result = await self.session.execute(dialect_insert(self.session)(table).from_select(columns, aggregate))
+            await self.session.commit()
+            logger.info(f"Rebuilt {result.rowcount} employee-month attendance rows")
+            return result.rowcount
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"Error rebuilding employee-month attendance: {str(e)}")
+            raise
+
+    # ---------- Reads ----------
+    async def get_month(self, employee_id: int, month: date) -> Optional[EmployeeMonthAttendance]:
+        result = await self.session.execute(
+            select(EmployeeMonthAttendance).where(
+                EmployeeMonthAttendance.employee_id == employee_id,
+                EmployeeMonthAttendance.month == month_start(month),
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def resolve_month(self, employee_id: int, month: date, totals: Optional[EmployeeMonthAttendance] = NOT_LOADED) -> Optional[EmployeeMonthAttendance]:
+        """`totals` when a caller already loaded it (see get_months), otherwise fetch the row"""
+        if totals is NOT_LOADED:
+            return await self.get_month(employee_id, month)
+        return totals
+
+    async def get_months(self, employee_ids: List[int], month: date) -> Dict[int, EmployeeMonthAttendance]:
+        """Rows for many employees in one query, keyed by employee id"""
+        if not employee_ids:
+            return {}
+        result = await self.session.execute(
+            select(EmployeeMonthAttendance).where(
+                EmployeeMonthAttendance.employee_id.in_(employee_ids),
+                EmployeeMonthAttendance.month == month_start(month),
+            )
+        )
+        return {row.employee_id: row for row in result.scalars().all()}
+
+
+if __name__ == "__main__":
+    import argparse
+    import asyncio
+
+    async def main():
+        """Rebuild employee_month_attendance from attendances (python -m app.services.hr.attendance_month_service)"""
+        from app.core.database import async_session_maker, engine
+
+        parser = argparse.ArgumentParser(description="Rebuild the employee-month attendance aggregate")
+        parser.add_argument("--from-month", type=date.fromisoformat, help="YYYY-MM-DD; any day of the first month")
+        parser.add_argument("--to-month", type=date.fromisoformat, help="YYYY-MM-DD; any day of the last month")
+        parser.add_argument("--employee-id", type=int)
+        args = parser.parse_args()
+
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+        try:
+            async with async_session_maker() as session:
+                rows = await AttendanceMonthService(session).rebuild(args.from_month, args.to_month, args.employee_id)
+            print(f"✅ Rebuilt {rows:,} employee-month rows.")
+        finally:
+            await engine.dispose()
+
+    asyncio.run(main())
@@ -1,25 +1,25 @@
+import asyncio
 import logging
-from typing import Any, Optional, List, Dict
+from typing import Any, Optional, List, Dict, Tuple
 from datetime import date, datetime, timedelta, timezone
 from decimal import Decimal
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import and_, func, or_, select
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.models.hr.attendance import Attendance
 from app.models.hr.employee import Employee
-from app.models.hr.user_shift import UserShift
-from app.models.hr.shift_type import ShiftType
-from app.models.hr.holiday import Holiday
-from app.models.hr.offday import Offday
 from app.models.hr.ticket import Ticket
 from app.models.organization.location import Location
 from app.models.shared.enums import ApprovalRequestType, AttendanceStatus
-from app.schemas.hr.attendance_schema import AttendanceCreate, AttendanceResponse
+from app.schemas.hr.attendance_schema import AttendanceCreate, AttendanceResponse, AttendanceUpdate
 from app.schemas.hr.ticket_schema import TicketCreate
 from app.services.approval.approval_service import ApprovalService
+from app.services.hr.attendance_month_service import AttendanceMonthService, attendance_contribution, dialect_insert
 from app.services.hr.ticket_service import TicketService
+from app.services.hr.work_calendar_service import CalendarShift, WorkCalendarService
 from app.services.auth.user_service import UserService
 
 logger = logging.getLogger(__name__)
@@ -71,73 +71,65 @@ class AttendanceService:
         self.ticket_service = TicketService(session)
         self.user_service = UserService(session)
         self.approval_service = ApprovalService(session)
+        self.month_totals = AttendanceMonthService(session)
+        self.work_calendar = WorkCalendarService(session)
 
     # region Attendance Helper Methods
     async def _check_holiday(self, attendance_date: date) -> bool:
         """Check if the date is a company holiday"""
-        holiday_res = await self.session.execute(
-            select(Holiday).where(
-                Holiday.date == attendance_date, 
-                Holiday.is_active == True
-            )
-        )
-        return holiday_res.scalars().first() is not None
+        return await self.work_calendar.is_holiday(attendance_date)
 
     async def _check_weekend_offday(self, employee_id: int, attendance_date: date) -> bool:
         """Check if the date is a weekend/offday for the employee"""
-        offday_res = await self.session.execute(
-            select(Offday).where(
-                Offday.employee_id == employee_id,
-                Offday.offday_date == attendance_date,
-                Offday.is_active == True
-            )
-        )
-        return offday_res.scalars().first() is not None
+        return await self.work_calendar.is_offday(employee_id, attendance_date)
 
-    async def _get_employee_shift(self, employee_id: int, attendance_date: date):
+    async def _get_employee_shift(self, employee_id: int, attendance_date: date) -> Optional[CalendarShift]:
         """Get employee's shift information for the given date"""
-        shift_res = await self.session.execute(
-            select(UserShift)
-            .options(selectinload(UserShift.shift_type))
-            .join(ShiftType)
-            .where(
-                UserShift.employee_id == employee_id,
-                UserShift.is_active == True,
-                UserShift.effective_date <= attendance_date,
-                ((UserShift.end_date.is_(None)) | (UserShift.end_date >= attendance_date))
+        return await self.work_calendar.shift_on(employee_id, attendance_date)
+
+    async def _load_mark_state(self, employee_id: int, attendance_date: date):
+        """Active employee plus their rows for the date and the day before, in one statement"""
+        previous_date = attendance_date - timedelta(days=1)
+        result = await self.session.execute(
+            select(Employee, Attendance)
+            .outerjoin(
+                Attendance,
+                and_(
+                    Attendance.employee_id == Employee.id,
+                    Attendance.attendance_date.in_([attendance_date, previous_date]),
+                    Attendance.is_deleted == False
+                )
             )
+            .where(Employee.id == employee_id, Employee.is_active == True)
         )
-        return shift_res.scalars().first()
+        rows = result.all()
+        if not rows:
+            return None, None, None
 
-    async def _find_attendance_for_checkout(self, employee_id: int, attendance_date: date, check_out_time: datetime):
+        employee = rows[0][0]
+        by_date = {attendance.attendance_date: attendance for _, attendance in rows if attendance is not None}
+        for attendance in by_date.values():
+            set_committed_value(attendance, "employee", employee)
+        return employee, by_date.get(attendance_date), by_date.get(previous_date)
+
+    async def _find_attendance_for_checkout(
+        self,
+        employee_id: int,
+        attendance_date: date,
+        check_out_time: datetime,
+        current_day_attendance: Optional[Attendance],
+        previous_day_attendance: Optional[Attendance]
+    ):
         """
         Find the correct attendance record for check-out, handling night shifts
         """
-        # First try to find attendance for the current date
-        current_day_res = await self.session.execute(
-            select(Attendance).options(selectinload(Attendance.employee)).where(
-                Attendance.employee_id == employee_id,
-                Attendance.attendance_date == attendance_date
-            )
-        )
-        current_day_attendance = current_day_res.scalars().first()
-        
+        # First try the current date
         if current_day_attendance and current_day_attendance.check_in_time and not current_day_attendance.check_out_time:
             return current_day_attendance
         
-        # If not found or already checked out, look for previous day (night shift scenario)
-        previous_date = attendance_date - timedelta(days=1)
-        previous_day_res = await self.session.execute(
-            select(Attendance).options(selectinload(Attendance.employee)).where(
-                Attendance.employee_id == employee_id,
-                Attendance.attendance_date == previous_date,
-                Attendance.check_in_time.isnot(None),
-                Attendance.check_out_time.is_(None)
-            )
-        )
-        previous_day_attendance = previous_day_res.scalars().first()
-        
-        if previous_day_attendance:
+        # If not found or already checked out, look at the previous day (night shift scenario)
+        if previous_day_attendance and previous_day_attendance.check_in_time and not previous_day_attendance.check_out_time:
+            previous_date = previous_day_attendance.attendance_date
             # Verify this is indeed a night shift by checking the shift times
             user_shift = await self._get_employee_shift(employee_id, previous_date)
             if user_shift and is_night_shift(user_shift.shift_type.start_time, user_shift.shift_type.end_time):
@@ -155,6 +147,73 @@ class AttendanceService:
         
         return None
 
+    async def _upsert_attendance(self, values: Dict[str, Any]) -> Optional[Attendance]:
+        """
+        Insert the day's row in one statement. Returns None when the row already exists
+        and was left alone (e.g. a concurrent check-in won).
+        """
+        stmt = dialect_insert(self.session)(Attendance).values(is_deleted=False, **values)
+        result = await self.session.execute(
+            stmt.on_conflict_do_nothing(
+                index_elements=[Attendance.employee_id, Attendance.attendance_date],
+                index_where=Attendance.is_deleted == False
+            ).returning(Attendance),
+            execution_options={"populate_existing": True}
+        )
+        return result.scalar_one_or_none()
+
+    async def _check_in_attendance(
+        self, values: Dict[str, Any], update_fields: List[str]
+    ) -> Tuple[Optional[Attendance], Optional[Dict[str, Any]]]:
+        """
+        Insert the day's checked-in row, or fill `update_fields` into an existing row that has
+        no check-in yet (auto-marked absent/offday, possibly since the caller last read it).
+        Returns the row and the month counters it contributed before (None for a new row);
+        the row is None when the day already has a check-in.
+        """
+        attendance = await self._upsert_attendance(values)
+        if attendance is not None:
+            return attendance, None
+
+        # Lock the existing row so its counters are read from the state being replaced
+        result = await self.session.execute(
+            select(Attendance)
+            .where(
+                Attendance.employee_id == values["employee_id"],
+                Attendance.attendance_date == values["attendance_date"],
+                Attendance.is_deleted == False
+            )
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+        attendance = result.scalar_one_or_none()
+        if attendance is None or attendance.check_in_time is not None:
+            return None, None
+
+        before = attendance_contribution(attendance)
+        for field in update_fields:
+            setattr(attendance, field, values[field])
+        attendance.updated_at = datetime.now(timezone.utc)
+        await self.session.flush()
+        return attendance, before
+
+    async def _enqueue_late_ticket(self, employee_id: int, attendance_date: date, requested_by: int):
+        """Hand late-ticket creation to the realtime worker; create it inline if the broker is unreachable"""
+        try:
+            from app.core.celery_app import HR_TASKS, celery_app
+
+            await asyncio.to_thread(
+                celery_app.send_task,
+                f"{HR_TASKS}.create_late_attendance_ticket",
+                args=[employee_id, attendance_date.isoformat(), requested_by],
+                retry=False
+            )
+        except Exception as e:
+            logger.warning(f"Could not queue late ticket for employee {employee_id}, creating inline: {str(e)}")
+            user_shift = await self._get_employee_shift(employee_id, attendance_date)
+            if user_shift:
+                await self._create_late_ticket(employee_id, user_shift, attendance_date, requested_by)
+
     async def _check_existing_ticket(self, employee_id: int, attendance_date: date, ticket_type: str) -> bool:
         """Check if a ticket already exists for this employee on this date with this type"""
         result = await self.session.execute(
@@ -166,7 +225,7 @@ class AttendanceService:
         )
         return result.scalar_one_or_none() is not None
 
-    async def _create_late_ticket(self, employee_id: int, user_shift: UserShift, attendance_date: date, requested_by: int):
+    async def _create_late_ticket(self, employee_id: int, user_shift: CalendarShift, attendance_date: date, requested_by: int):
         """Create a ticket for late attendance"""
         try:
             # Check if ticket already exists for this date
@@ -295,12 +354,12 @@ class AttendanceService:
 
     # ---------- Mark Attendance ---------
     async def mark_attendance(self, data, user_id: int) -> AttendanceResponse:
+        """
+        Check-in/check-out hot path: one read for the employee and their recent rows, the
+        calendar from cache, one upsert plus the month counters, and late tickets after commit.
+        """
         try:
-            # Validate employee
-            emp_res = await self.session.execute(
-                select(Employee).where(Employee.id == data.employee_id, Employee.is_active == True)
-            )
-            employee = emp_res.scalar_one_or_none()
+            employee, current, previous = await self._load_mark_state(data.employee_id, data.attendance_date)
             if not employee:
                 raise HTTPException(status_code=400, detail="Employee not found")
 
@@ -311,13 +370,16 @@ class AttendanceService:
             # ========== CHECK-OUT LOGIC ==========
             if check_out_time and not check_in_time:
                 # This is a check-out operation
-                existing = await self._find_attendance_for_checkout(data.employee_id, data.attendance_date, check_out_time)
+                existing = await self._find_attendance_for_checkout(
+                    data.employee_id, data.attendance_date, check_out_time, current, previous
+                )
                 
                 if not existing:
+                    if current and current.check_out_time:
+                        raise HTTPException(status_code=400, detail="Already checked out for this shift.")
                     raise HTTPException(status_code=400, detail="No check-in record found for check-out. Please check-in first.")
-                
-                if existing.check_out_time:
-                    raise HTTPException(status_code=400, detail="Already checked out for this shift.")
+
+                before = attendance_contribution(existing)
 
                 # Get shift information for the attendance date (not current date)
                 user_shift = await self._get_employee_shift(data.employee_id, existing.attendance_date)
@@ -341,8 +403,6 @@ class AttendanceService:
                         existing.check_in_time,
                         check_out_time
                     )
-                    logger.info(f"Shift times for employee {employee.id} on {existing.attendance_date}: Start: {shift_start}, End: {shift_end}")
-                    logger.info(f"Check-in time: {existing.check_in_time} Check-out time: {check_out_time}")
 
                     existing.check_out_time = check_out_time
                     existing.bio_check_out = data.bio_check_out or False
@@ -381,47 +441,51 @@ class AttendanceService:
                         else:
                             existing.status = AttendanceStatus.PRESENT
 
+                # Set in Python so the row doesn't need re-reading after commit
+                existing.updated_at = datetime.now(timezone.utc)
+                existing.updated_by = user_id
+                await self.month_totals.record(existing, before)
                 await self.session.commit()
-                await self.session.refresh(existing, attribute_names=["employee", "created_at", "updated_at"])
                 logger.info(f"Checked out: Employee {employee.id}, Shift Date: {existing.attendance_date}, Check-out: {check_out_time}")
                 return AttendanceResponse.model_validate(existing, from_attributes=True)
 
             # ========== CHECK-IN LOGIC ==========
-            # Check holiday and weekend status for the attendance date
-            is_holiday = await self._check_holiday(data.attendance_date)
-            is_weekend = await self._check_weekend_offday(data.employee_id, data.attendance_date)
+            # Holiday and weekend status for the attendance date (cached calendar, no queries)
+            calendar = await self.work_calendar.get(data.employee_id, data.attendance_date)
+            is_holiday = calendar.is_holiday(data.attendance_date)
+            is_weekend = calendar.is_offday(data.attendance_date)
 
             # Handle weekend/holiday auto-marking
             if (is_weekend or is_holiday) and not check_in_time and not check_out_time:
-                status = AttendanceStatus.WEEKEND if is_weekend else AttendanceStatus.HOLIDAY
-                attendance = Attendance(
+                if current:
+                    return AttendanceResponse.model_validate(current, from_attributes=True)
+
+                offday_status = AttendanceStatus.WEEKEND if is_weekend else AttendanceStatus.HOLIDAY
+                attendance = await self._upsert_attendance(dict(
                     employee_id=data.employee_id,
                     attendance_date=data.attendance_date,
-                    status=status,
+                    status=offday_status,
                     is_holiday=is_holiday,
                     is_weekend=is_weekend,
-                    remarks=f"Auto-marked as {'weekend offday' if is_weekend else 'company holiday'}"
-                )
-                self.session.add(attendance)
+                    late_minutes=0,
+                    early_leave_minutes=0,
+                    overtime_hours=0,
+                    remarks=f"Auto-marked as {'weekend offday' if is_weekend else 'company holiday'}",
+                    created_by=user_id
+                ))
+                if attendance is None:
+                    raise HTTPException(status_code=409, detail="Attendance was marked concurrently, please retry")
+                set_committed_value(attendance, "employee", employee)
+                await self.month_totals.record(attendance)
                 await self.session.commit()
-                await self.session.refresh(attendance, attribute_names=["employee", "created_at", "updated_at"])
-                logger.info(f"Auto-marked: Employee {employee.id} as {status}")
+                logger.info(f"Auto-marked: Employee {employee.id} as {offday_status}")
                 return AttendanceResponse.model_validate(attendance, from_attributes=True)
 
-            # Check for existing attendance record
-            existing_res = await self.session.execute(
-                select(Attendance).options(selectinload(Attendance.employee)).where(
-                    Attendance.employee_id == data.employee_id,
-                    Attendance.attendance_date == data.attendance_date
-                )
-            )
-            existing = existing_res.scalars().first()
-
-            if existing and existing.check_in_time:
+            if current and current.check_in_time:
                 raise HTTPException(status_code=400, detail="Already checked in for this date")
 
             # Get shift information for calculations
-            user_shift = await self._get_employee_shift(data.employee_id, data.attendance_date)
+            user_shift = calendar.shift_on(data.attendance_date)
             
             # Initialize variables
             late_minutes = 0
@@ -451,20 +515,9 @@ class AttendanceService:
             elif is_holiday:
                 initial_status = AttendanceStatus.HOLIDAY
 
-            # Create or update attendance record
-            if existing:
-                # Update existing record
-                existing.check_in_time = check_in_time
-                existing.latitude = data.latitude
-                existing.longitude = data.longitude
-                existing.bio_check_in = data.bio_check_in or False
-                existing.late_minutes = late_minutes
-                existing.status = initial_status
-                existing.remarks = data.remarks
-                attendance = existing
-            else:
-                # Create new attendance record
-                attendance = Attendance(
+            # Create the row, or fill in the day's auto-marked row (even one marked after the read above)
+            attendance, before = await self._check_in_attendance(
+                dict(
                     employee_id=data.employee_id,
                     attendance_date=data.attendance_date,
                     check_in_time=check_in_time,
@@ -474,17 +527,28 @@ class AttendanceService:
                     is_holiday=is_holiday,
                     is_weekend=is_weekend,
                     late_minutes=late_minutes,
+                    early_leave_minutes=0,
+                    overtime_hours=0,
                     status=initial_status,
-                    remarks=data.remarks
-                )
-                self.session.add(attendance)
+                    remarks=data.remarks,
+                    created_by=user_id,
+                    updated_by=user_id
+                ),
+                update_fields=[
+                    "check_in_time", "latitude", "longitude", "bio_check_in",
+                    "late_minutes", "status", "remarks", "updated_by"
+                ]
+            )
+            if attendance is None:
+                raise HTTPException(status_code=400, detail="Already checked in for this date")
 
+            set_committed_value(attendance, "employee", employee)
+            await self.month_totals.record(attendance, before)
             await self.session.commit()
-            await self.session.refresh(attendance, attribute_names=["employee", "created_at", "updated_at"])
             
-            # Create late ticket if employee is late and has user_shift
+            # Late ticket (and its notifications) are created off the request path
             if is_late and user_shift and not is_weekend and not is_holiday:
-                await self._create_late_ticket(data.employee_id, user_shift, data.attendance_date, user_id)
+                await self._enqueue_late_ticket(data.employee_id, data.attendance_date, user_id)
             
             logger.info(f"Checked in: Employee {employee.id} - Status: {initial_status}, Date: {data.attendance_date}, Late: {is_late}")
             return AttendanceResponse.model_validate(attendance, from_attributes=True)
@@ -589,27 +653,21 @@ class AttendanceService:
             start = date(year, month, 1)
             end = (start.replace(month=month % 12 + 1, day=1) - timedelta(days=1)) if month < 12 else date(year, 12, 31)
 
-            result = await self.session.execute(
-                select(Attendance).where(
-                    Attendance.employee_id == employee_id,
-                    Attendance.attendance_date.between(start, end)
-                )
-            )
-            records = result.scalars().all()
+            totals = await self.month_totals.get_month(employee_id, start)
 
             total_days = (end - start).days + 1
-            present = len([r for r in records if r.status in [AttendanceStatus.PRESENT, AttendanceStatus.LATE, AttendanceStatus.LEFT_EARLY, AttendanceStatus.CHECKED_OUT]])
-            absent = len([r for r in records if r.status == AttendanceStatus.ABSENT])
-            late = len([r for r in records if r.status == AttendanceStatus.LATE])
-            weekend_days = len([r for r in records if r.status == AttendanceStatus.WEEKEND])
-            holiday_days = len([r for r in records if r.status == AttendanceStatus.HOLIDAY])
+            present = totals.worked_days if totals else 0
+            absent = totals.absent_days if totals else 0
+            late = totals.late_days if totals else 0
+            weekend_days = totals.weekend_days if totals else 0
+            holiday_days = totals.holiday_days if totals else 0
             
             # Working days calculation (exclude weekends and holidays)
             working_days = total_days - weekend_days - holiday_days
             working_attendance = present  # Present days in working days
             
-            total_hours = sum([r.total_hours or 0 for r in records if r.total_hours])
-            overtime = sum([r.overtime_hours or 0 for r in records if r.overtime_hours])
+            total_hours = totals.total_hours if totals else 0
+            overtime = totals.overtime_hours if totals else 0
 
             return {
                 "employee_id": employee_id,
@@ -632,6 +690,44 @@ class AttendanceService:
             logger.error(f"Error summarizing attendance: {e}")
             return {}
 
+    # ---------- Manual Edit ----------
+    async def update_attendance(self, attendance_id: int, data: AttendanceUpdate, user_id: int) -> AttendanceResponse:
+        try:
+            result = await self.session.execute(
+                select(Attendance).options(selectinload(Attendance.employee)).where(
+                    Attendance.id == attendance_id,
+                    Attendance.is_deleted == False
+                )
+            )
+            attendance = result.scalar_one_or_none()
+            if not attendance:
+                raise HTTPException(status_code=404, detail="Attendance record not found")
+
+            before = attendance_contribution(attendance)
+            update_data = data.model_dump(exclude_unset=True)
+            if "check_out_time" in update_data:
+                update_data["check_out_time"] = ensure_utc(update_data["check_out_time"])
+            for field, value in update_data.items():
+                setattr(attendance, field, value)
+
+            if attendance.check_in_time and attendance.check_out_time:
+                duration = ensure_utc(attendance.check_out_time) - ensure_utc(attendance.check_in_time)
+                attendance.total_hours = round(duration.total_seconds() / 3600, 2)
+            attendance.updated_by = user_id
+
+            await self.month_totals.record(attendance, before)
+            await self.session.commit()
+            await self.session.refresh(attendance, attribute_names=["employee", "created_at", "updated_at"])
+            logger.info(f"Attendance {attendance_id} updated by user {user_id}")
+            return AttendanceResponse.model_validate(attendance, from_attributes=True)
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"Error updating attendance: {e}")
+            raise HTTPException(status_code=500, detail="Error updating attendance")
+
     # ---------- AI Automation (Updated) ----------
     async def process_daily_attendance(self, process_date: date, user_id: int) -> Dict:
         try:
@@ -646,18 +742,23 @@ class AttendanceService:
             weekend_marked = 0
             holiday_marked = 0
 
+            # Calendars for today and the previous day (night shifts) in one pass
+            previous_date = process_date - timedelta(days=1)
+            await self.work_calendar.load([emp.id for emp in employees], [process_date, previous_date])
+
             # Check if it's a company holiday
             is_company_holiday = await self._check_holiday(process_date)
 
             for emp in employees:
                 # Check if attendance already exists
                 exist = await self.session.execute(
-                    select(Attendance).where(
+                    select(Attendance.id).where(
                         Attendance.employee_id == emp.id,
-                        Attendance.attendance_date == process_date
+                        Attendance.attendance_date == process_date,
+                        Attendance.is_deleted == False
                     )
                 )
-                if exist.scalar_one_or_none():
+                if exist.first():
                     continue
 
                 # Check if it's employee's weekend
@@ -665,38 +766,32 @@ class AttendanceService:
 
                 # Determine status and mark accordingly
                 if is_company_holiday:
-                    self.session.add(Attendance(
-                        employee_id=emp.id,
-                        attendance_date=process_date,
+                    values = dict(
                         status=AttendanceStatus.HOLIDAY,
                         is_holiday=True,
                         is_weekend=False,
                         remarks="Auto-marked as company holiday"
-                    ))
-                    holiday_marked += 1
+                    )
                 elif is_employee_weekend:
-                    self.session.add(Attendance(
-                        employee_id=emp.id,
-                        attendance_date=process_date,
+                    values = dict(
                         status=AttendanceStatus.WEEKEND,
                         is_holiday=False,
                         is_weekend=True,
                         remarks="Auto-marked as weekend offday"
-                    ))
-                    weekend_marked += 1
+                    )
                 else:
                     # Check if this employee has a night shift that started previous day
                     # and is still ongoing (no check-out yet)
-                    previous_date = process_date - timedelta(days=1)
                     night_shift_res = await self.session.execute(
-                        select(Attendance).where(
+                        select(Attendance.id).where(
                             Attendance.employee_id == emp.id,
                             Attendance.attendance_date == previous_date,
                             Attendance.check_in_time.isnot(None),
-                            Attendance.check_out_time.is_(None)
+                            Attendance.check_out_time.is_(None),
+                            Attendance.is_deleted == False
                         )
                     )
-                    ongoing_night_shift = night_shift_res.scalar_one_or_none()
+                    ongoing_night_shift = night_shift_res.first()
                     
                     if ongoing_night_shift:
                         # Verify it's actually a night shift
@@ -707,18 +802,31 @@ class AttendanceService:
                             continue
                     
                     # Regular working day - mark as absent
-                    self.session.add(Attendance(
-                        employee_id=emp.id,
-                        attendance_date=process_date,
+                    values = dict(
                         status=AttendanceStatus.ABSENT,
                         is_holiday=False,
                         is_weekend=False,
                         remarks="Auto-marked as absent"
-                    ))
+                    )
+
+                # ON CONFLICT DO NOTHING: a check-in landing since the check above keeps its row
+                attendance = await self._upsert_attendance(dict(
+                    employee_id=emp.id,
+                    attendance_date=process_date,
+                    created_by=user_id,
+                    **values
+                ))
+                if attendance is None:
+                    continue
+                await self.month_totals.record(attendance)
+
+                if attendance.status == AttendanceStatus.HOLIDAY:
+                    holiday_marked += 1
+                elif attendance.status == AttendanceStatus.WEEKEND:
+                    weekend_marked += 1
+                else:
                     absent_marked += 1
-                    
                     # Create absent ticket after marking absent
-                    await self.session.flush()  # Flush to ensure attendance is saved before creating ticket
                     await self._create_absent_ticket(emp.id, process_date, user_id)
 
             await self.session.commit()
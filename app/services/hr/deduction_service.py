@@ -6,11 +6,11 @@ from sqlalchemy import select, func, and_, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
+from app.models.hr.attendance_month import EmployeeMonthAttendance
 from app.models.hr.deduction import DeductionType, EmployeeDeduction, SalaryDeduction
 from app.models.hr.employee import Employee
-from app.models.hr.attendance import Attendance
 from app.models.organization.location import Location
-from app.models.shared.enums import DeductionStatus, AttendanceStatus
+from app.models.shared.enums import DeductionStatus
 from app.schemas.hr.deduction_schema import (
     DeductionTypeCreate, DeductionTypeUpdate,
     EmployeeDeductionCreate, EmployeeDeductionUpdate,
@@ -18,6 +18,7 @@ from app.schemas.hr.deduction_schema import (
 )
 from fastapi import HTTPException
 from app.services.auth.user_service import UserService
+from app.services.hr.attendance_month_service import NOT_LOADED, AttendanceMonthService
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +26,7 @@ class DeductionService:
     def __init__(self, session: AsyncSession):
         self.session = session
         self.user_service = UserService(session)
+        self.month_totals = AttendanceMonthService(session)
 
     # ======================================= Deduction Type CRUD ============================================ #
     async def create_deduction_type(self, data: DeductionTypeCreate) -> DeductionType:
@@ -285,10 +287,16 @@ class DeductionService:
         return deduction
 
     # ====================================== MAIN CALCULATION METHOD =========================================== #
-    async def calculate_monthly_deductions(self, employee_id: int, salary_month: date) -> Tuple[Decimal, List[Dict]]:
+    async def calculate_monthly_deductions(
+        self,
+        employee_id: int,
+        salary_month: date,
+        totals: Optional[EmployeeMonthAttendance] = NOT_LOADED
+    ) -> Tuple[Decimal, List[Dict]]:
         """
         Calculate total deductions for an employee for a specific month.
         Handles both existing deductions (manual + carryover auto) and new auto-deductions.
+        `totals` is the employee's month attendance row when the caller already loaded it.
         """
         total_deduction = Decimal('0')
         deduction_details = []
@@ -316,8 +324,9 @@ class DeductionService:
                     })
         
         # 2. Calculate and create new auto-deductions for current month
+        totals = await self.month_totals.resolve_month(employee_id, salary_month, totals)
         new_auto_deductions = await self._calculate_and_create_new_auto_deductions(
-            employee_id, salary_month
+            employee_id, salary_month, totals
         )
         
         total_deduction += new_auto_deductions['total']
@@ -344,7 +353,12 @@ class DeductionService:
         )
         return result.scalars().all()
 
-    async def _calculate_and_create_new_auto_deductions(self, employee_id: int, salary_month: date) -> Dict:
+    async def _calculate_and_create_new_auto_deductions(
+        self,
+        employee_id: int,
+        salary_month: date,
+        totals: Optional[EmployeeMonthAttendance] = NOT_LOADED
+    ) -> Dict:
         """
         Calculate new auto-deductions (absent, late) for current month and create EmployeeDeduction records.
         This is the KEY method that handles your scenario!
@@ -363,7 +377,7 @@ class DeductionService:
         
         # Calculate and create ABSENT deduction
         if 'absent' in auto_types:
-            absent_amount = await self._calculate_absent_deductions(employee_id, salary_month)
+            absent_amount = await self._calculate_absent_deductions(employee_id, salary_month, totals)
             if absent_amount > 0:
                 # Get employee's monthly limit preference for absent deductions
                 monthly_limit = await self._get_employee_auto_deduction_limit(
@@ -404,7 +418,7 @@ class DeductionService:
         
         # Calculate and create LATE deduction (same logic)
         if 'late' in auto_types:
-            late_amount = await self._calculate_late_deductions(employee_id, salary_month)
+            late_amount = await self._calculate_late_deductions(employee_id, salary_month, totals)
             if late_amount > 0:
                 monthly_limit = await self._get_employee_auto_deduction_limit(
                     employee_id, 'late'
@@ -497,20 +511,11 @@ class DeductionService:
         logger.info(f"Applied {len(deduction_details)} deductions to salary {salary_id}")
 
     # Helper methods for calculating actual deduction amounts
-    async def _calculate_late_deductions(self, employee_id: int, salary_month: date) -> Decimal:
-        from calendar import monthrange
-        
-        last_day = monthrange(salary_month.year, salary_month.month)[1]
-        start_date = salary_month.replace(day=1)
-        end_date = salary_month.replace(day=last_day)
-        
-        late_count = await self.session.scalar(
-            select(func.count()).where(
-                Attendance.employee_id == employee_id,
-                Attendance.attendance_date.between(start_date, end_date),
-                Attendance.status == AttendanceStatus.LATE
-            )
-        )
+    async def _calculate_late_deductions(
+        self, employee_id: int, salary_month: date, totals: Optional[EmployeeMonthAttendance] = NOT_LOADED
+    ) -> Decimal:
+        totals = await self.month_totals.resolve_month(employee_id, salary_month, totals)
+        late_count = totals.late_days if totals else 0
         
         late_type = await self.session.scalar(
             select(DeductionType).where(DeductionType.name.ilike('late'))
@@ -519,21 +524,14 @@ class DeductionService:
         amount_per_late = late_type.default_amount if late_type else Decimal('50')
         return Decimal(late_count or 0) * amount_per_late
 
-    async def _calculate_absent_deductions(self, employee_id: int, salary_month: date) -> Decimal:
+    async def _calculate_absent_deductions(
+        self, employee_id: int, salary_month: date, totals: Optional[EmployeeMonthAttendance] = NOT_LOADED
+    ) -> Decimal:
         from calendar import monthrange
         
         last_day = monthrange(salary_month.year, salary_month.month)[1]
-        start_date = salary_month.replace(day=1)
-        end_date = salary_month.replace(day=last_day)
-        
-        absent_count = await self.session.scalar(
-            select(func.count()).where(
-                Attendance.employee_id == employee_id,
-                Attendance.attendance_date.between(start_date, end_date),
-                Attendance.status == AttendanceStatus.ABSENT,
-                Attendance.is_holiday == False
-            )
-        )
+        totals = await self.month_totals.resolve_month(employee_id, salary_month, totals)
+        absent_count = totals.absent_days if totals else 0
         
         if absent_count and absent_count > 0:
             employee = await self.session.get(Employee, employee_id)
@@ -3,7 +3,7 @@ from typing import Any, Dict, Optional, List
 from datetime import datetime
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import and_, select, func, or_
+from sqlalchemy import and_, select, func
 from sqlalchemy.orm import selectinload
 
 from app.models.hr.employee import Employee
@@ -11,6 +11,7 @@ from app.models.organization.department import Department
 from app.models.organization.location import Location
 from app.schemas.hr.employee_schema import EmployeeCreate, EmployeeUpdate
 from app.services.auth.user_service import UserService
+from app.services.search.search_service import SEARCH_FIELDS, search_filter, search_rank
 
 logger = logging.getLogger(__name__)
 
@@ -223,16 +224,7 @@ class EmployeeService:
                 conditions.append(Employee.is_manager == is_manager)
             
             if search:
-                like = f"%{search}%"
-                conditions.append(
-                    or_(
-                        Employee.first_name.ilike(like),
-                        Employee.last_name.ilike(like),
-                        Employee.employee_id.ilike(like),
-                        Employee.email.ilike(like),
-                        Employee.phone.ilike(like),
-                    )
-                )
+                conditions.append(search_filter(self.session, SEARCH_FIELDS["employee"], search))
             
             # Location manager restriction
             if user_id:
@@ -259,6 +251,8 @@ class EmployeeService:
             skip = (page_index - 1) * page_size
             
             # Get paginated data
+            if search:
+                query = query.order_by(search_rank(self.session, SEARCH_FIELDS["employee"], search).desc())
             query = query.order_by(Employee.created_at.desc())
             query = query.offset(skip).limit(page_size)
             
@@ -8,6 +8,7 @@ from app.models.hr.holiday import Holiday
 from app.schemas.hr.holiday_schema import HolidayCreate, HolidayUpdate
 from app.core.exceptions import NotFoundError, ValidationError
 from app.core.logging import logger
+from app.services.hr.work_calendar_service import invalidate_work_calendars
 
 class HolidayService:
     def __init__(self, db: AsyncSession):
@@ -29,6 +30,7 @@ class HolidayService:
             holiday = Holiday(**holiday_data.dict())
             self.db.add(holiday)
             await self.db.commit()
+            await invalidate_work_calendars()
             await self.db.refresh(holiday)
 
             logger.info(f"Holiday created: {holiday.name} on {holiday.date} by user {current_user_id}")
@@ -135,6 +137,7 @@ class HolidayService:
             setattr(holiday, field, value)
 
         await self.db.commit()
+        await invalidate_work_calendars()
         await self.db.refresh(holiday)
 
         logger.info(f"Holiday updated: {holiday.name} by user {current_user_id}")
@@ -154,6 +157,7 @@ class HolidayService:
         holiday.is_active = False
         holiday.is_deleted = True
         await self.db.commit()
+        await invalidate_work_calendars()
 
         logger.info(f"Holiday deleted: {holiday.name} by user {current_user_id}")
         return True
@@ -15,6 +15,7 @@ from app.schemas.hr.offday_schema import (
 from app.core.exceptions import NotFoundError, ValidationError
 from app.core.logging import logger
 from app.services.auth.user_service import UserService
+from app.services.hr.work_calendar_service import WorkCalendarService, invalidate_work_calendars
 
 class OffdayService:
     def __init__(self, db: AsyncSession):
@@ -47,6 +48,7 @@ class OffdayService:
             offday = Offday(**offday_data.dict())
             self.db.add(offday)
             await self.db.commit()
+            await invalidate_work_calendars([offday_data.employee_id])
             await self.db.refresh(offday, attribute_names=["employee"])
 
             logger.info(f"offday created for employee {offday_data.employee_id} on {offday_data.offday_date} by user {current_user_id}")
@@ -96,6 +98,7 @@ class OffdayService:
                 offdays.append(offday)
 
             await self.db.commit()
+            await invalidate_work_calendars([bulk_data.employee_id])
 
             # Refresh and return response
             for offday in offdays:
@@ -264,6 +267,7 @@ class OffdayService:
             offday.month = offday_data.offday_date.month
 
         await self.db.commit()
+        await invalidate_work_calendars([offday.employee_id])
         await self.db.refresh(offday)
 
         logger.info(f"offday updated: ID {offday_id} by user {current_user_id}")
@@ -279,8 +283,10 @@ class OffdayService:
         if not offday:
             raise NotFoundError(f"offday with ID {offday_id} not found")
 
+        employee_id = offday.employee_id
         await self.db.delete(offday)
         await self.db.commit()
+        await invalidate_work_calendars([employee_id])
 
         logger.info(f"offday hard deleted: ID {offday_id} by user {current_user_id}")
         return True
@@ -295,6 +301,7 @@ class OffdayService:
             )
         )
         await self.db.commit()
+        await invalidate_work_calendars([employee_id])
 
         logger.info(f"All offdays deleted for employee {employee_id} in {year}-{month} by user {current_user_id}")
         return True
@@ -302,13 +309,6 @@ class OffdayService:
     async def is_employee_offday(self, employee_id: int, check_date: date) -> bool:
         """Check if a specific date is an offday for an employee"""
         try:
-            result = await self.db.execute(
-                select(Offday).where(
-                    Offday.employee_id == employee_id,
-                    Offday.offday_date == check_date,
-                    Offday.is_active == True
-                )
-            )
-            return result.scalar_one_or_none() is not None
+            return await WorkCalendarService(self.db).is_offday(employee_id, check_date)
         except Exception:
             return False
\ No newline at end of file
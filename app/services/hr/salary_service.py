@@ -8,13 +8,14 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.auth.role import Role
+from app.models.hr.attendance_month import EmployeeMonthAttendance
 from app.models.hr.deduction import SalaryDeduction
 from app.models.hr.salary import Salary
 from app.models.hr.employee import Employee
-from app.models.hr.attendance import Attendance
 from app.models.organization.location import Location
-from app.models.shared.enums import SalaryPaymentStatus, AttendanceStatus
+from app.models.shared.enums import SalaryPaymentStatus
 from app.schemas.hr.salary_schema import SalaryCreate
+from app.services.hr.attendance_month_service import NOT_LOADED, AttendanceMonthService
 from app.services.hr.deduction_service import DeductionService
 from app.services.auth.user_service import UserService
 from fastapi import HTTPException
@@ -25,10 +26,17 @@ class SalaryService:
     def __init__(self, session: AsyncSession):
         self.session = session
         self.deduction_service = DeductionService(session)
+        self.month_totals = AttendanceMonthService(session)
         self.user_service = UserService(session)
 
-    async def generate_monthly_salary(self, employee_id: int, salary_month: date, current_user_id: int) -> Salary:
-        """Generate monthly salary with integrated deduction calculation"""
+    async def generate_monthly_salary(
+        self,
+        employee_id: int,
+        salary_month: date,
+        current_user_id: int,
+        totals: Optional[EmployeeMonthAttendance] = NOT_LOADED
+    ) -> Salary:
+        """Generate monthly salary with integrated deduction calculation; `totals` is the preloaded attendance month"""
         today = date.today()
         # if today.day < 25 and today.month == salary_month.month:
         #     raise HTTPException(status_code=400, detail="Salary can only be generated from 25th of the month")
@@ -55,8 +63,11 @@ class SalaryService:
                 detail=f"Salary already generated for {salary_month.strftime('%B %Y')}"
             )
 
+        # Employee-month attendance row, read once for summary, overtime and deductions
+        totals = await self.month_totals.resolve_month(employee_id, salary_month, totals)
+
         # Calculate attendance summary with proper working days calculation
-        summary = await self._attendance_summary(employee_id, salary_month)
+        summary = self._attendance_summary(salary_month, totals)
         
         # Calculate per-day salary rates
         monthly_basic = employee.basic_salary or Decimal('0')
@@ -80,14 +91,14 @@ class SalaryService:
         prorated_transport = daily_transport * Decimal(str(present_days))
         
         # Calculate overtime
-        overtime = await self._calculate_overtime(employee_id, salary_month)
+        overtime = self._calculate_overtime(employee, totals)
         
         # Calculate gross salary (prorated base + overtime)
         gross = prorated_basic + prorated_housing + prorated_transport + overtime
         
         # Calculate deductions using updated deduction service (handles carryover automatically)
         total_deductions, deduction_details = await self.deduction_service.calculate_monthly_deductions(
-            employee_id, salary_month
+            employee_id, salary_month, totals
         )
         
         # Extract individual deduction amounts for backward compatibility
@@ -136,7 +147,7 @@ class SalaryService:
         )
         return salary
     
-    async def _attendance_summary(self, employee_id: int, salary_month: date) -> Dict:
+    def _attendance_summary(self, salary_month: date, totals: Optional[EmployeeMonthAttendance]) -> Dict:
         """
         Calculate attendance summary with proper working days calculation.
         Working days = Total days - Weekends - Holidays
@@ -144,44 +155,24 @@ class SalaryService:
         """
         start, end = self._month_range(salary_month)
         
-        # Get all attendance records for the month
-        res = await self.session.execute(
-            select(Attendance).where(
-                Attendance.employee_id == employee_id,
-                Attendance.attendance_date.between(start, end)
-            )
-        )
-        records = res.scalars().all()
-        
         # Calculate total calendar days
         total_days = (end - start).days + 1
         
-        # Count weekends and holidays
-        weekend_days = len([r for r in records if r.status == AttendanceStatus.WEEKEND or r.is_weekend])
-        holiday_days = len([r for r in records if r.status == AttendanceStatus.HOLIDAY or r.is_holiday])
+        # Weekends and holidays (status or flag)
+        weekend_days = totals.weekend_days if totals else 0
+        holiday_days = totals.holiday_days if totals else 0
         
         # Working days = Total days - Weekends - Holidays
         working_days = total_days - weekend_days - holiday_days
         
-        # Present days = Days actually worked (excluding weekends/holidays/absents)
-        present_days = len([
-            r for r in records 
-            if r.status in [
-                AttendanceStatus.PRESENT, 
-                AttendanceStatus.LATE, 
-                AttendanceStatus.LEFT_EARLY, 
-                AttendanceStatus.CHECKED_OUT
-            ]
-        ])
+        # Present days = Days actually worked (PRESENT, LATE, LEFT_EARLY, CHECKED_OUT)
+        present_days = totals.worked_days if totals else 0
         
         # Absent days (excluding weekends and holidays)
-        absent_days = len([
-            r for r in records 
-            if r.status == AttendanceStatus.ABSENT and not r.is_weekend and not r.is_holiday
-        ])
+        absent_days = totals.absent_days if totals else 0
         
         # Late days
-        late_days = len([r for r in records if r.status == AttendanceStatus.LATE])
+        late_days = totals.late_days if totals else 0
         
         # Validation: present + absent should not exceed working days
         # If there are unrecorded days, they're considered absent
@@ -198,20 +189,9 @@ class SalaryService:
             "late_days": late_days
         }
 
-    async def _calculate_overtime(self, employee_id: int, salary_month: date) -> Decimal:
+    def _calculate_overtime(self, emp: Employee, totals: Optional[EmployeeMonthAttendance]) -> Decimal:
         """Calculate overtime amount for the month"""
-        start, end = self._month_range(salary_month)
-        
-        overtime_res = await self.session.execute(
-            select(func.sum(Attendance.overtime_hours)).where(
-                Attendance.employee_id == employee_id,
-                Attendance.attendance_date.between(start, end)
-            )
-        )
-        total_ot = overtime_res.scalar() or 0
-
-        emp_res = await self.session.execute(select(Employee).where(Employee.id == employee_id))
-        emp = emp_res.scalar_one_or_none()
+        total_ot = totals.overtime_hours if totals else 0
 
         if emp and emp.basic_salary and total_ot > 0:
             # Calculate hourly rate based on basic salary
@@ -227,7 +207,8 @@ class SalaryService:
         salary_month: date, 
         location_id: Optional[int], 
         department_id: Optional[int], 
-        current_user_id: int
+        current_user_id: int,
+        employee_ids: Optional[List[int]] = None
     ) -> Dict:
         """Generate salary for multiple employees with integrated deduction calculation"""
         query = select(Employee).where(Employee.is_active == True)
@@ -236,9 +217,14 @@ class SalaryService:
             query = query.where(Employee.location_id == location_id)
         if department_id:
             query = query.where(Employee.department_id == department_id)
+        if employee_ids is not None:
+            query = query.where(Employee.id.in_(employee_ids))
 
         res = await self.session.execute(query)
         employees = res.scalars().all()
+
+        # Every employee's attendance month in one query instead of one per employee
+        month_rows = await self.month_totals.get_months([emp.id for emp in employees], salary_month)
         
         stats = {
             "successful": 0, 
@@ -267,7 +253,7 @@ class SalaryService:
                     continue
                 
                 # Generate salary
-                salary = await self.generate_monthly_salary(emp.id, salary_month, current_user_id)
+                salary = await self.generate_monthly_salary(emp.id, salary_month, current_user_id, month_rows.get(emp.id))
                 stats["successful"] += 1
                 stats["total_deductions"] += float(salary.total_deductions)
                 stats["total_gross"] += float(salary.gross_salary)
@@ -16,6 +16,7 @@ from app.models.organization.location import Location
 from app.schemas.hr.shift_schema import BulkShiftAndOffdayAssignment, BulkShiftAndOffdayResult, BulkShiftAssignmentResult, BulkUserShiftCreate, EmployeeAssignmentResult, EmployeeShiftDetail, EmployeeShiftSummary, ShiftTypeCreate, ShiftTypeUpdate, UserShiftCreate, UserShiftUpdate
 from app.utils.validators.validation_utils import is_valid_shift
 from app.services.auth.user_service import UserService
+from app.services.hr.work_calendar_service import invalidate_work_calendars
 
 logger = logging.getLogger(__name__)
 
@@ -166,6 +167,7 @@ class ShiftService:
                 shift_type.updated_at = datetime.utcnow()
 
             await self.session.commit()
+            await invalidate_work_calendars()
             await self.session.refresh(shift_type)
             logger.info(f"Shift type updated: {shift_type.name} by user {current_user_id}")
             return shift_type
@@ -257,6 +259,7 @@ class ShiftService:
             self.session.add(user_shift)
 
             await self.session.commit()
+            await invalidate_work_calendars([data.employee_id])
             await self.session.refresh(user_shift, attribute_names=["shift_type"])
 
             logger.info(f"Shift assigned: Employee {employee.employee_id} -> {shift_type.name} by user {current_user_id}")
@@ -390,6 +393,7 @@ class ShiftService:
             
             # Commit all changes
             await self.session.commit()
+            await invalidate_work_calendars(data.employee_ids)
             
             logger.info(
                 f"Bulk shift assignment completed by user {current_user_id}: "
@@ -575,6 +579,7 @@ class ShiftService:
             
             # Commit all changes
             await self.session.commit()
+            await invalidate_work_calendars(employee_ids)
             
             logger.info(
                 f"Bulk shift and offday assignment completed by user {current_user_id}: "
@@ -625,6 +630,7 @@ class ShiftService:
                 user_shift.updated_at = datetime.utcnow()
 
             await self.session.commit()
+            await invalidate_work_calendars([user_shift.employee_id])
             await self.session.refresh(user_shift)
             
             logger.info(f"User shift {user_shift_id} updated by user {current_user_id}")
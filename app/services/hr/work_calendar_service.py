@@ -0,0 +1,387 @@
+"""
+Employee work calendars: holidays, offdays and shift assignments per month.
+
+Each (employee, month) is materialized once into two day bitsets (holidays,
+offdays) and a sorted list of shift intervals, so attendance and payroll can
+ask "is this a working day", "which shift applies at T" or "how many working
+days in this range" with bit operations and a bisect instead of one query per
+employee per date.
+
+Calendars are cached in process and in Redis. Entries carry the calendar epoch
+(bumped by holiday and shift-type writes) and the employee's version (bumped
+by that employee's offday and shift writes); a version mismatch is a miss.
+"""
+import bisect
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.hr.holiday import Holiday
+from app.models.hr.offday import Offday
+from app.models.hr.shift_type import ShiftType
+from app.models.hr.user_shift import UserShift
+
+logger = logging.getLogger(__name__)
+
+EPOCH_KEY = "workcal:epoch"
+EMPLOYEE_VERSION_PREFIX = "workcal:emp:"
+CALENDAR_PREFIX = "workcal:cal:"
+CALENDAR_TTL = 7 * 24 * 3600
+LOCAL_CACHE_SIZE = 20_000
+
+# (employee_id, month) -> ((epoch, employee_version), calendar)
+_local_cache: "OrderedDict[Tuple[int, date], Tuple[Tuple[int, int], EmployeeMonthCalendar]]" = OrderedDict()
+
+
+def month_start(value: date) -> date:
+    return value.replace(day=1)
+
+
+def month_end(value: date) -> date:
+    return month_start(month_start(value).replace(day=28) + timedelta(days=4)) - timedelta(days=1)
+
+
+@dataclass(frozen=True)
+class ShiftWindow:
+    """The ShiftType fields attendance needs (same attribute names)"""
+    id: int
+    name: str
+    start_time: time
+    end_time: time
+    late_grace_minutes: int
+
+    @property
+    def is_night_shift(self) -> bool:
+        return self.end_time <= self.start_time
+
+
+@dataclass(frozen=True)
+class CalendarShift:
+    """A UserShift assignment; exposes `shift_type` and `deduction_amount` like the ORM row"""
+    user_shift_id: int
+    effective_date: date
+    end_date: Optional[date]
+    deduction_amount: Decimal
+    shift_type: ShiftWindow
+
+    def covers(self, day: date) -> bool:
+        return self.effective_date <= day and (self.end_date is None or self.end_date >= day)
+
+
+@dataclass
+class EmployeeMonthCalendar:
+    employee_id: int
+    month: date
+    days: int
+    holiday_bits: int
+    offday_bits: int
+    shifts: Tuple[CalendarShift, ...]  # Sorted by effective_date
+
+    def __post_init__(self):
+        # Not a dataclass field: rebuilt from `shifts`, never serialized
+        self._shift_starts = [shift.effective_date for shift in self.shifts]
+
+    def _bit(self, day: date) -> int:
+        return 1 << (day.day - 1)
+
+    @property
+    def working_bits(self) -> int:
+        return ((1 << self.days) - 1) & ~(self.holiday_bits | self.offday_bits)
+
+    def is_holiday(self, day: date) -> bool:
+        return bool(self.holiday_bits & self._bit(day))
+
+    def is_offday(self, day: date) -> bool:
+        return bool(self.offday_bits & self._bit(day))
+
+    def is_working_day(self, day: date) -> bool:
+        return bool(self.working_bits & self._bit(day))
+
+    def count_working_days(self, start: date, end: date) -> int:
+        """Working days between start and end (inclusive), clipped to this month"""
+        first = max(start, self.month).day
+        last = min(end, month_end(self.month)).day
+        if last < first:
+            return 0
+        mask = ((1 << last) - 1) & ~((1 << (first - 1)) - 1)
+        return (self.working_bits & mask).bit_count()
+
+    def shift_on(self, day: date) -> Optional[CalendarShift]:
+        """Latest assignment effective on `day`"""
+        index = bisect.bisect_right(self._shift_starts, day)
+        for shift in reversed(self.shifts[:index]):
+            if shift.covers(day):
+                return shift
+        return None
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {
+            "employee_id": self.employee_id,
+            "month": self.month.isoformat(),
+            "days": self.days,
+            "holiday_bits": self.holiday_bits,
+            "offday_bits": self.offday_bits,
+            "shifts": [
+                [
+                    shift.user_shift_id,
+                    shift.effective_date.isoformat(),
+                    shift.end_date.isoformat() if shift.end_date else None,
+                    str(shift.deduction_amount),
+                    shift.shift_type.id,
+                    shift.shift_type.name,
+                    shift.shift_type.start_time.isoformat(),
+                    shift.shift_type.end_time.isoformat(),
+                    shift.shift_type.late_grace_minutes,
+                ]
+                for shift in self.shifts
+            ],
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "EmployeeMonthCalendar":
+        shifts = tuple(
+            CalendarShift(
+                user_shift_id=row[0],
+                effective_date=date.fromisoformat(row[1]),
+                end_date=date.fromisoformat(row[2]) if row[2] else None,
+                deduction_amount=Decimal(row[3]),
+                shift_type=ShiftWindow(row[4], row[5], time.fromisoformat(row[6]), time.fromisoformat(row[7]), row[8]),
+            )
+            for row in payload["shifts"]
+        )
+        return cls(
+            employee_id=payload["employee_id"],
+            month=date.fromisoformat(payload["month"]),
+            days=payload["days"],
+            holiday_bits=payload["holiday_bits"],
+            offday_bits=payload["offday_bits"],
+            shifts=shifts,
+        )
+
+
+def _calendar_key(employee_id: int, month: date) -> str:
+    return f"{CALENDAR_PREFIX}{employee_id}:{month.strftime('%Y-%m')}"
+
+
+def _remember(key: Tuple[int, date], stamp: Tuple[int, int], calendar: EmployeeMonthCalendar):
+    _local_cache[key] = (stamp, calendar)
+    _local_cache.move_to_end(key)
+    while len(_local_cache) > LOCAL_CACHE_SIZE:
+        _local_cache.popitem(last=False)
+
+
+async def invalidate_work_calendars(employee_ids: Optional[Iterable[int]] = None):
+    """Invalidate calendars for these employees, or for everyone when None (holidays, shift types)"""
+    from app.core.redis import redis_client
+
+    employee_ids = None if employee_ids is None else sorted(set(employee_ids))
+    if employee_ids is None:
+        _local_cache.clear()
+    else:
+        for key in [key for key in _local_cache if key[0] in employee_ids]:
+            _local_cache.pop(key, None)
+
+    try:
+        client = await redis_client.get_client()
+        pipe = client.pipeline(transaction=False)
+        if employee_ids is None:
+            pipe.incr(EPOCH_KEY)
+        else:
+            for employee_id in employee_ids:
+                pipe.incr(f"{EMPLOYEE_VERSION_PREFIX}{employee_id}")
+        await pipe.execute()
+    except Exception as e:
+        # Other processes keep serving their cached calendars until the Redis entry expires
+        logger.warning(f"Could not invalidate work calendars: {str(e)}")
+
+
+class WorkCalendarService:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._calendars: Dict[Tuple[int, date], EmployeeMonthCalendar] = {}
+        self._holidays: Dict[date, int] = {}
+
+    # ---------- Loading ----------
+    async def load(self, employee_ids: Iterable[int], months: Iterable[date]) -> None:
+        """Make calendars for every (employee, month) available without further round trips"""
+        employee_ids = sorted(set(employee_ids))
+        for month in sorted({month_start(m) for m in months}):
+            missing = [emp_id for emp_id in employee_ids if (emp_id, month) not in self._calendars]
+            if missing:
+                await self._load_month(missing, month)
+
+    async def _load_month(self, employee_ids: List[int], month: date):
+        from app.core.redis import redis_client
+
+        try:
+            client = await redis_client.get_client()
+            raw = await client.mget([EPOCH_KEY] + [f"{EMPLOYEE_VERSION_PREFIX}{emp_id}" for emp_id in employee_ids])
+        except Exception as e:
+            logger.warning(f"Work calendar cache unavailable, reading from database: {str(e)}")
+            for calendar in await self._build(employee_ids, month):
+                self._calendars[(calendar.employee_id, month)] = calendar
+            return
+
+        epoch = int(raw[0] or 0)
+        stamps = {emp_id: (epoch, int(version or 0)) for emp_id, version in zip(employee_ids, raw[1:])}
+
+        # Process-local hits
+        remote = []
+        for emp_id in employee_ids:
+            cached = _local_cache.get((emp_id, month))
+            if cached and cached[0] == stamps[emp_id]:
+                self._calendars[(emp_id, month)] = cached[1]
+                self._holidays.setdefault(month, cached[1].holiday_bits)
+            else:
+                remote.append(emp_id)
+        if not remote:
+            return
+
+        # Redis hits
+        to_build = []
+        try:
+            blobs = await client.mget([_calendar_key(emp_id, month) for emp_id in remote])
+        except Exception as e:
+            logger.warning(f"Could not read cached work calendars: {str(e)}")
+            blobs = [None] * len(remote)
+        for emp_id, blob in zip(remote, blobs):
+            entry = json.loads(blob) if blob else None
+            if entry and tuple(entry["stamp"]) == stamps[emp_id]:
+                calendar = EmployeeMonthCalendar.from_payload(entry["calendar"])
+                self._calendars[(emp_id, month)] = calendar
+                self._holidays.setdefault(month, calendar.holiday_bits)
+                _remember((emp_id, month), stamps[emp_id], calendar)
+            else:
+                to_build.append(emp_id)
+        if not to_build:
+            return
+
+        # Build the rest from the database in one pass
+        built = await self._build(to_build, month)
+        try:
+            pipe = client.pipeline(transaction=False)
+            for calendar in built:
+                stamp = stamps[calendar.employee_id]
+                pipe.set(
+                    _calendar_key(calendar.employee_id, month),
+                    json.dumps({"stamp": list(stamp), "calendar": calendar.to_payload()}),
+                    ex=CALENDAR_TTL,
+                )
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not cache work calendars: {str(e)}")
+        for calendar in built:
+            self._calendars[(calendar.employee_id, month)] = calendar
+            _remember((calendar.employee_id, month), stamps[calendar.employee_id], calendar)
+
+    async def _build(self, employee_ids: List[int], month: date) -> List[EmployeeMonthCalendar]:
+        """Materialize calendars for many employees with three queries"""
+        first, last = month_start(month), month_end(month)
+        holiday_bits = await self._holiday_bits(month)
+
+        offday_res = await self.session.execute(
+            select(Offday.employee_id, Offday.offday_date).where(
+                Offday.employee_id.in_(employee_ids),
+                Offday.offday_date.between(first, last),
+                Offday.is_active == True
+            )
+        )
+        offday_bits: Dict[int, int] = {}
+        for employee_id, offday_date in offday_res.all():
+            offday_bits[employee_id] = offday_bits.get(employee_id, 0) | (1 << (offday_date.day - 1))
+
+        shift_res = await self.session.execute(
+            select(UserShift, ShiftType)
+            .join(ShiftType, UserShift.shift_type_id == ShiftType.id)
+            .where(
+                UserShift.employee_id.in_(employee_ids),
+                UserShift.is_active == True,
+                UserShift.effective_date <= last,
+                ((UserShift.end_date.is_(None)) | (UserShift.end_date >= first))
+            )
+            .order_by(UserShift.effective_date, UserShift.id)
+        )
+        shifts: Dict[int, List[CalendarShift]] = {}
+        for user_shift, shift_type in shift_res.all():
+            shifts.setdefault(user_shift.employee_id, []).append(CalendarShift(
+                user_shift_id=user_shift.id,
+                effective_date=user_shift.effective_date,
+                end_date=user_shift.end_date,
+                deduction_amount=user_shift.deduction_amount or Decimal("0.00"),
+                shift_type=ShiftWindow(
+                    shift_type.id,
+                    shift_type.name,
+                    shift_type.start_time,
+                    shift_type.end_time,
+                    shift_type.late_grace_minutes or 0,
+                ),
+            ))
+
+        return [
+            EmployeeMonthCalendar(
+                employee_id=employee_id,
+                month=first,
+                days=last.day,
+                holiday_bits=holiday_bits,
+                offday_bits=offday_bits.get(employee_id, 0),
+                shifts=tuple(shifts.get(employee_id, ())),
+            )
+            for employee_id in employee_ids
+        ]
+
+    async def _holiday_bits(self, month: date) -> int:
+        month = month_start(month)
+        if month not in self._holidays:
+            res = await self.session.execute(
+                select(Holiday.date).where(
+                    Holiday.date.between(month, month_end(month)),
+                    Holiday.is_active == True
+                )
+            )
+            bits = 0
+            for (holiday_date,) in res.all():
+                bits |= 1 << (holiday_date.day - 1)
+            self._holidays[month] = bits
+        return self._holidays[month]
+
+    async def get(self, employee_id: int, day: date) -> EmployeeMonthCalendar:
+        key = (employee_id, month_start(day))
+        if key not in self._calendars:
+            await self._load_month([employee_id], key[1])
+        return self._calendars[key]
+
+    # ---------- Queries ----------
+    async def is_holiday(self, day: date) -> bool:
+        """Company holiday (same for every employee)"""
+        return bool(await self._holiday_bits(day) & (1 << (day.day - 1)))
+
+    async def is_offday(self, employee_id: int, day: date) -> bool:
+        return (await self.get(employee_id, day)).is_offday(day)
+
+    async def is_working_day(self, employee_id: int, day: date) -> bool:
+        return (await self.get(employee_id, day)).is_working_day(day)
+
+    async def shift_on(self, employee_id: int, day: date) -> Optional[CalendarShift]:
+        return (await self.get(employee_id, day)).shift_on(day)
+
+    async def shift_at(self, employee_id: int, moment: datetime) -> Optional[CalendarShift]:
+        """Shift in progress at `moment`, including a night shift that began the previous day"""
+        today = moment.date()
+        previous = await self.shift_on(employee_id, today - timedelta(days=1))
+        if previous and previous.shift_type.is_night_shift and moment.time() < previous.shift_type.end_time:
+            return previous
+        return await self.shift_on(employee_id, today)
+
+    async def count_working_days(self, employee_id: int, start: date, end: date) -> int:
+        total = 0
+        month = month_start(start)
+        while month <= end:
+            total += (await self.get(employee_id, month)).count_working_days(start, end)
+            month = month_end(month) + timedelta(days=1)
+        return total
@@ -2,12 +2,13 @@ from typing import Any, Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-from sqlalchemy import and_, func, or_
+from sqlalchemy import and_, func
 
 from app.models.inventory.item import Item
 from app.models.inventory.category import Category
 from app.schemas.inventory.category import CategoryCreate, CategoryUpdate
 from app.core.exceptions import NotFoundError, ValidationError
+from app.services.search.search_service import SEARCH_FIELDS, search_filter, search_rank
 
 class CategoryService:
     def __init__(self, db: AsyncSession):
@@ -66,12 +67,7 @@ class CategoryService:
             ).where(Category.is_active == True)
             
             if search:
-                query = query.where(
-                    or_(
-                        Category.name.ilike(f"%{search}%"),
-                        Category.description.ilike(f"%{search}%")
-                    )
-                )
+                query = query.where(search_filter(self.db, SEARCH_FIELDS["category"], search))
             
             # Get total count
             count_query = select(func.count()).select_from(query.subquery())
@@ -82,6 +78,8 @@ class CategoryService:
             skip = (page_index - 1) * page_size
             
             # Get paginated data
+            if search:
+                query = query.order_by(search_rank(self.db, SEARCH_FIELDS["category"], search).desc(), Category.id)
             query = query.offset(skip).limit(page_size)
             result = await self.db.execute(query)
             categories = result.scalars().all()
@@ -4,16 +4,21 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
 from sqlalchemy import and_, desc, func
+from app.models.shared.enums import StockMovementType
 from app.models.inventory.inventory_count import InventoryCount
 from app.models.inventory.inventory_count_item import InventoryCountItem
 from app.models.inventory.item import Item
 from app.models.inventory.stock_level import StockLevel
 from app.models.organization.location import Location
-from app.schemas.inventory.inventory_count import InventoryCountCreate, InventoryCountUpdate, InventoryCountItemCreate
+from app.schemas.inventory.inventory_count import (
+    CountSheetLine, CountSheetPage, InventoryCountCreate, InventoryCountUpdate, InventoryCountItemCreate
+)
 from app.core.exceptions import NotFoundError, ValidationError
-from datetime import date
+from datetime import datetime
 
+from app.core.document_numbers import next_document_number
 from app.services.auth.user_service import UserService
+from app.services.inventory.stock_posting import aggregate_deltas, apply_stock_deltas, insert_stock_movements, lock_stock_levels
 
 class InventoryCountService:
     def __init__(self, db: AsyncSession):
@@ -56,16 +61,7 @@ class InventoryCountService:
 
     async def _generate_count_number(self) -> str:
         """Generate unique count number"""
-        today = date.today()
-        prefix = f"IC-{today.strftime('%Y%m%d')}"
-        
-        result = await self.db.execute(
-            select(func.count(InventoryCount.id))
-            .where(InventoryCount.count_number.like(f"{prefix}%"))
-        )
-        count = result.scalar() + 1
-        
-        return f"{prefix}-{count:04d}"
+        return await next_document_number(self.db, "IC")
 
     async def add_item_to_count(
         self, 
@@ -261,69 +257,99 @@ class InventoryCountService:
         if inventory_count.status == "COMPLETED":
             raise ValidationError("Inventory count already completed")
 
-        # Create stock adjustments for variances if requested
-        if create_adjustments:
-            from app.services.inventory.stock_movement_service import StockMovementService
-            from app.models.shared.enums import StockMovementType
-            
-            movement_service = StockMovementService(self.db)
-            
-            for item in inventory_count.items:
-                if item.variance_quantity != 0:
-                    # Create adjustment movement
-                    await movement_service.create_stock_movement(
-                        movement_data={
-                            'item_id': item.item_id,
-                            'location_id': inventory_count.location_id,
-                            'movement_type': StockMovementType.ADJUSTMENT,
-                            'quantity': abs(item.variance_quantity),
-                            'unit_cost': item.unit_cost,
-                            'reference_type': 'INVENTORY_COUNT',
-                            'reference_id': inventory_count.id,
-                            'batch_number': item.batch_number,
-                            'expiry_date': item.expiry_date,
-                            'remarks': f"Inventory count adjustment: {item.variance_quantity}"
-                        },
-                        current_user_id=current_user_id,
-                        auto_update_stock=True
-                    )
+        try:
+            # Post all variances at once: one movement batch, one stock update
+            if create_adjustments:
+                await self._post_variances(inventory_count, current_user_id)
 
-        inventory_count.status = "COMPLETED"
-        inventory_count.verified_by = current_user_id
-        inventory_count.updated_by = current_user_id
+            inventory_count.status = "COMPLETED"
+            inventory_count.verified_by = current_user_id
+            inventory_count.updated_by = current_user_id
+
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
 
-        await self.db.commit()
         await self.db.refresh(inventory_count)
         return inventory_count
 
-    async def generate_count_sheet(self, location_id: int, item_ids: Optional[List[int]] = None) -> InventoryCountCreate:
-        """Generate inventory count sheet with current system quantities"""
-        # Get current stock levels for location
-        query = select(StockLevel, Item).join(Item).where(
-            and_(
-                StockLevel.location_id == location_id,
-                Item.is_active == True
+    async def _post_variances(self, inventory_count: InventoryCount, current_user_id: int):
+        """Write adjustment movements and apply variances to stock (signed, so shortages reduce stock)"""
+        variances = [item for item in inventory_count.items if item.variance_quantity != 0]
+        if not variances:
+            return
+
+        location_id = inventory_count.location_id
+        deltas = aggregate_deltas((item.item_id, location_id, item.variance_quantity) for item in variances)
+        await lock_stock_levels(self.db, deltas.keys())
+
+        now = datetime.utcnow()
+        await insert_stock_movements(self.db, [
+            {
+                "item_id": item.item_id,
+                "location_id": location_id,
+                "movement_type": StockMovementType.ADJUSTMENT,
+                "quantity": item.variance_quantity,
+                "unit_cost": item.unit_cost,
+                "total_cost": item.unit_cost * item.variance_quantity if item.unit_cost else None,
+                "reference_type": 'INVENTORY_COUNT',
+                "reference_id": inventory_count.id,
+                "batch_number": item.batch_number,
+                "expiry_date": item.expiry_date,
+                "remarks": f"Inventory count adjustment: {item.variance_quantity}",
+                "performed_by": current_user_id,
+                "movement_date": now,
+                "created_by": current_user_id
+            }
+            for item in variances
+        ])
+
+        posted = await apply_stock_deltas(self.db, deltas, current_user_id)
+        unposted = [item_id for item_id, _ in deltas.keys() - posted]
+        if unposted:
+            raise ValidationError(f"Stock is lower than the counted shortage for items {sorted(unposted)}; recount before completing")
+
+    async def get_count_sheet_page(
+        self,
+        location_id: int,
+        item_ids: Optional[List[int]] = None,
+        after_item_id: Optional[int] = None,
+        page_size: int = 500
+    ) -> CountSheetPage:
+        """One page of the count sheet (current system quantities), keyset-paged by item id"""
+        query = (
+            select(
+                Item.id.label("item_id"),
+                Item.name.label("item_name"),
+                Item.item_code,
+                Item.unit_type,
+                Item.unit_cost,
+                StockLevel.current_stock.label("system_quantity")
+            )
+            .join(Item, Item.id == StockLevel.item_id)
+            .where(
+                and_(
+                    StockLevel.location_id == location_id,
+                    StockLevel.is_deleted == False,
+                    Item.is_active == True
+                )
             )
+            .order_by(StockLevel.item_id)
+            .limit(page_size)
         )
-        
+
         if item_ids:
-            query = query.where(Item.id.in_(item_ids))
-            
+            query = query.where(StockLevel.item_id.in_(item_ids))
+        if after_item_id:
+            query = query.where(StockLevel.item_id > after_item_id)
+
         result = await self.db.execute(query)
-        stock_data = result.all()
-
-        count_items = []
-        for stock_level, item in stock_data:
-            count_items.append(InventoryCountItemCreate(
-                item_id=item.id,
-                system_quantity=stock_level.current_stock,
-                counted_quantity=0,  # To be filled during count
-                unit_cost=item.unit_cost
-            ))
-
-        return InventoryCountCreate(
+        lines = [CountSheetLine.model_validate(row, from_attributes=True) for row in result.all()]
+
+        return CountSheetPage(
             location_id=location_id,
-            count_date=date.today(),
             count_type="FULL" if not item_ids else "PARTIAL",
-            items=count_items
-        )
\ No newline at end of file
+            data=lines,
+            next_cursor=lines[-1].item_id if len(lines) == page_size else None
+        )
@@ -2,7 +2,7 @@ from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-from sqlalchemy import and_, func, or_
+from sqlalchemy import and_, func
 from app.models.inventory.item import Item
 from app.models.inventory.item_ingredient import ItemIngredient
 from app.models.inventory.stock_level import StockLevel
@@ -13,6 +13,7 @@ from app.core.exceptions import NotFoundError, ValidationError
 import uuid
 
 from app.schemas.inventory.item_ingredient_schema import ItemIngredientCreate
+from app.services.search.search_service import SEARCH_FIELDS, apply_search, search_filter
 
 class ItemService:
     def __init__(self, db: AsyncSession):
@@ -95,15 +96,6 @@ class ItemService:
                 selectinload(Item.stock_levels)
             ).where(Item.is_active == True)
             
-            if search:
-                base_query = base_query.where(
-                    or_(
-                        Item.name.ilike(f"%{search}%"),
-                        Item.item_code.ilike(f"%{search}%"),
-                        Item.description.ilike(f"%{search}%")
-                    )
-                )
-            
             if category_id:
                 base_query = base_query.where(Item.category_id == category_id)
                 
@@ -115,6 +107,9 @@ class ItemService:
                     StockLevel.current_stock <= Item.reorder_point
                 )
             
+            if search:
+                base_query = base_query.where(search_filter(self.db, SEARCH_FIELDS["item"], search))
+            
             # Get total count from base_query
             count_query = select(func.count()).select_from(base_query.subquery())
             total_result = await self.db.execute(count_query)
@@ -122,7 +117,10 @@ class ItemService:
             
             # Calculate offset and get data (order by created_at desc)
             skip = (page_index - 1) * page_size
-            data_query = base_query.order_by(Item.created_at.desc()).offset(skip).limit(page_size)
+            # Best matches first when searching
+            data_query = apply_search(
+                self.db, base_query, SEARCH_FIELDS["item"], search, Item.created_at.desc()
+            ).offset(skip).limit(page_size)
             result = await self.db.execute(data_query)
             items = result.scalars().all()
             
@@ -2,7 +2,7 @@ from typing import List, Optional, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
-from sqlalchemy import and_, func, or_, update
+from sqlalchemy import and_, func, update
 from decimal import Decimal
 from app.models.inventory.product import Product
 from app.models.inventory.product_item import ProductItem
@@ -10,6 +10,7 @@ from app.models.inventory.item import Item
 from app.models.inventory.category import Category
 from app.schemas.inventory.product_schema import ProductCreate, ProductUpdate, ProductItemCreate
 from app.core.exceptions import NotFoundError, ValidationError
+from app.services.search.search_service import SEARCH_FIELDS, search_filter, search_rank
 import uuid
 
 class ProductService:
@@ -244,13 +245,7 @@ class ProductService:
             ).where(Product.is_active == True)
             
             if search:
-                query = query.where(
-                    or_(
-                        Product.name.ilike(f"%{search}%"),
-                        Product.product_code.ilike(f"%{search}%"),
-                        Product.description.ilike(f"%{search}%")
-                    )
-                )
+                query = query.where(search_filter(self.db, SEARCH_FIELDS["product"], search))
             
             if category_id:
                 query = query.where(Product.category_id == category_id)
@@ -265,6 +260,8 @@ class ProductService:
             
             # Calculate offset and get data
             skip = (page_index - 1) * page_size
+            if search:
+                query = query.order_by(search_rank(self.db, SEARCH_FIELDS["product"], search).desc(), Product.id)
             query = query.offset(skip).limit(page_size)
             result = await self.db.execute(query)
             products = result.scalars().unique().all()
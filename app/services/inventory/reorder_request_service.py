@@ -14,6 +14,7 @@ from app.models.organization.location import Location
 from app.schemas.inventory.reorder_request import ReorderRequestCreate, ReorderRequestUpdate, ReorderRequestItemCreate
 from app.core.exceptions import NotFoundError, ValidationError
 from app.models.shared.enums import ReorderRequestStatus
+from app.core.document_numbers import next_document_number
 from app.services.auth.user_service import UserService
 from app.services.task.task_integration_service import TaskIntegrationService
 
@@ -74,17 +75,7 @@ class ReorderRequestService:
 
     async def _generate_request_number(self) -> str:
         """Generate unique request number"""
-        today = date.today()
-        prefix = f"RR-{today.strftime('%Y%m%d')}"
-        
-        # Get last number for today
-        result = await self.db.execute(
-            select(func.count(ReorderRequest.id))
-            .where(ReorderRequest.request_number.like(f"{prefix}%"))
-        )
-        count = result.scalar() + 1
-        
-        return f"{prefix}-{count:04d}"
+        return await next_document_number(self.db, "RR")
 
     async def add_item_to_reorder_request(self, request_id: int, item_data: ReorderRequestItemCreate, current_user_id: int) -> bool:
         """Add item to existing reorder request"""
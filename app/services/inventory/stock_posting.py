@@ -0,0 +1,137 @@
+"""
+Set-based stock posting.
+
+Documents that touch many lines (goods receipts, transfers, counts) post their
+stock effects with a fixed number of statements instead of one read-modify-write
+per line: deltas are aggregated per (item, location), applied with a single
+`UPDATE ... FROM (VALUES ...)`, missing stock rows are inserted in one
+multi-row INSERT, and movements are written in one batch. Postings that must
+not interleave lock their stock rows first, always in (item_id, location_id)
+order, so two documents touching the same items cannot deadlock.
+"""
+import logging
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import Integer, Numeric, column, func, insert, or_, select, tuple_, update, values
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.inventory.stock_level import StockLevel
+from app.models.inventory.stock_movement import StockMovement
+
+logger = logging.getLogger(__name__)
+
+StockKey = Tuple[int, int]  # (item_id, location_id)
+
+
+def aggregate_deltas(lines: Iterable[Tuple[int, int, Decimal]]) -> Dict[StockKey, Decimal]:
+    """Sum (item_id, location_id, quantity) lines per stock row, dropping zero totals"""
+    deltas: Dict[StockKey, Decimal] = {}
+    for item_id, location_id, quantity in lines:
+        key = (item_id, location_id)
+        deltas[key] = deltas.get(key, Decimal("0")) + Decimal(str(quantity))
+    return {key: quantity for key, quantity in deltas.items() if quantity != 0}
+
+
+async def lock_stock_levels(session: AsyncSession, keys: Iterable[StockKey]) -> Dict[StockKey, Any]:
+    """SELECT ... FOR UPDATE the stock rows in key order; returns current/reserved stock per key"""
+    keys = sorted(set(keys))
+    if not keys:
+        return {}
+    result = await session.execute(
+        select(StockLevel.item_id, StockLevel.location_id, StockLevel.current_stock, StockLevel.reserved_stock)
+        .where(
+            tuple_(StockLevel.item_id, StockLevel.location_id).in_(keys),
+            StockLevel.is_deleted == False,
+        )
+        .order_by(StockLevel.item_id, StockLevel.location_id)
+        .with_for_update(of=StockLevel)
+    )
+    return {(row.item_id, row.location_id): row for row in result}
+
+
+async def apply_stock_deltas(
+    session: AsyncSession,
+    deltas: Dict[StockKey, Decimal],
+    user_id: int,
+    create_missing: bool = True,
+    reserved: Optional[Dict[StockKey, Decimal]] = None,
+) -> Set[StockKey]:
+    """
+    Add each delta to current and available stock in one statement. Negative
+    deltas only apply where current stock covers them. `reserved` changes the
+    reservation of the same rows (floored at zero) and available stock follows
+    it. Rows missing for positive deltas are created when `create_missing`.
+    Returns the keys posted.
+    """
+    if not deltas:
+        return set()
+
+    reserved = reserved or {}
+    delta = values(
+        column("item_id", Integer),
+        column("location_id", Integer),
+        column("quantity", Numeric(10, 2)),
+        column("reserved", Numeric(10, 2)),
+        name="delta",
+    ).data([
+        (item_id, location_id, quantity, reserved.get((item_id, location_id), Decimal("0")))
+        for (item_id, location_id), quantity in deltas.items()
+    ])
+
+    new_reserved = func.greatest(func.coalesce(StockLevel.reserved_stock, 0) + delta.c.reserved, 0)
+    stock_values = dict(
+        current_stock=StockLevel.current_stock + delta.c.quantity,
+        available_stock=StockLevel.available_stock + delta.c.quantity,
+        updated_by=user_id,
+        updated_at=func.now(),
+    )
+    if reserved:
+        stock_values["reserved_stock"] = new_reserved
+        stock_values["available_stock"] = StockLevel.current_stock + delta.c.quantity - new_reserved
+
+    result = await session.execute(
+        update(StockLevel)
+        .where(
+            StockLevel.item_id == delta.c.item_id,
+            StockLevel.location_id == delta.c.location_id,
+            StockLevel.is_deleted == False,
+            or_(delta.c.quantity >= 0, StockLevel.current_stock + delta.c.quantity >= 0),
+        )
+        .values(**stock_values)
+        .returning(StockLevel.item_id, StockLevel.location_id)
+        .execution_options(synchronize_session=False)
+    )
+    posted = {(row.item_id, row.location_id) for row in result}
+
+    missing = [key for key, quantity in deltas.items() if key not in posted and quantity > 0]
+    if create_missing and missing:
+        await session.execute(
+            insert(StockLevel),
+            [
+                {
+                    "item_id": item_id,
+                    "location_id": location_id,
+                    "current_stock": deltas[(item_id, location_id)],
+                    "available_stock": deltas[(item_id, location_id)],
+                    "reserved_stock": Decimal("0"),
+                    "par_level_min": Decimal("0"),
+                    "par_level_max": Decimal("0"),
+                    "is_deleted": False,
+                    "created_by": user_id,
+                    "updated_by": user_id,
+                }
+                for item_id, location_id in missing
+            ],
+        )
+        posted.update(missing)
+    return posted
+
+
+async def insert_stock_movements(session: AsyncSession, movements: List[Dict[str, Any]]):
+    """Write movement rows in one batched INSERT"""
+    if not movements:
+        return
+    await session.execute(
+        insert(StockMovement),
+        [{"is_deleted": False, **movement} for movement in movements],
+    )
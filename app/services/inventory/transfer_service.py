@@ -1,5 +1,6 @@
+import logging
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
@@ -9,12 +10,15 @@ from app.models.inventory.transfer_item import TransferItem
 from app.models.inventory.item import Item
 from app.models.inventory.stock_level import StockLevel
 from app.models.organization.location import Location
-from app.schemas.inventory.stock_movement import StockMovementCreate
 from app.schemas.inventory.transfer import TransferCreate, TransferItemCreate
 from app.core.exceptions import NotFoundError, ValidationError
 from app.models.shared.enums import TransferStatus, StockMovementType
 from datetime import datetime, date
+from app.core.document_numbers import next_document_number
 from app.services.auth.user_service import UserService
+from app.services.inventory.stock_posting import aggregate_deltas, apply_stock_deltas, insert_stock_movements, lock_stock_levels
+
+logger = logging.getLogger(__name__)
 
 class TransferService:
     def __init__(self, db: AsyncSession):
@@ -169,18 +173,9 @@ class TransferService:
 
     async def _generate_transfer_number(self) -> str:
         """Generate unique transfer number"""
-        today = date.today()
-        prefix = f"TR-{today.strftime('%Y%m%d')}"
-        
-        result = await self.db.execute(
-            select(func.count(Transfer.id))
-            .where(Transfer.transfer_number.like(f"{prefix}%"))
-        )
-        count = result.scalar() + 1
-        
-        return f"{prefix}-{count:04d}"
+        return await next_document_number(self.db, "TR")
 
-    async def get_transfer_by_id(self, transfer_id: int) -> Optional[Transfer]:
+    async def get_transfer_by_id(self, transfer_id: int, populate_existing: bool = False) -> Optional[Transfer]:
         result = await self.db.execute(
             select(Transfer)
             .options(
@@ -193,6 +188,7 @@ class TransferService:
                 )
             )
             .where(Transfer.id == transfer_id)
+            .execution_options(populate_existing=populate_existing)
         )
         return result.scalar_one_or_none()
 
@@ -307,39 +303,46 @@ class TransferService:
         if transfer.status != TransferStatus.IN_TRANSIT:
             raise ValidationError("Only approved transfers can be sent")
 
-        # Update sent quantities and create stock movements
-        from app.services.inventory.stock_movement_service import StockMovementService
-        movement_service = StockMovementService(self.db)
+        if transfer.sent_date:
+            raise ValidationError("Transfer has already been sent")
 
-        for item in transfer.items:
-            if item.item_id in sent_quantities:
-                item.sent_quantity = sent_quantities[item.item_id]
+        try:
+            lines = self._posting_lines(transfer, sent_quantities)
+
+            # Lock source stock rows and check they cover the quantities sent
+            source = transfer.from_location_id
+            deltas = aggregate_deltas((item.item_id, source, -quantity) for item, quantity in lines)
+            locked = await lock_stock_levels(self.db, deltas.keys())
+            for item, quantity in lines:
+                stock = locked.get((item.item_id, source))
+                if not stock or stock.current_stock < -deltas[(item.item_id, source)]:
+                    raise ValidationError(f"Insufficient stock at source location for item {item.item.name}")
+
+            # Outbound movements, then source stock (releasing the reservation made at approval)
+            await insert_stock_movements(self.db, [
+                self._transfer_movement(transfer, item, quantity, source, StockMovementType.TRANSFER,
+                                        f"Transfer to {transfer.to_location.name}", current_user_id)
+                for item, quantity in lines
+            ])
+            reserved = aggregate_deltas((item.item_id, source, -item.requested_quantity) for item, _ in lines)
+            posted = await apply_stock_deltas(self.db, deltas, current_user_id, create_missing=False, reserved=reserved)
+            if len(posted) != len(deltas):
+                raise ValidationError("Stock changed while sending the transfer, please retry")
+
+            for item, quantity in lines:
+                item.sent_quantity = quantity
                 item.updated_by = current_user_id
+            transfer.sent_by = current_user_id
+            transfer.sent_date = datetime.utcnow()
+            transfer.updated_by = current_user_id
 
-                # Create outbound movement from source location
-                await movement_service.create_stock_movement(
-                    movement_data=StockMovementCreate(**{
-                        'item_id': item.item_id,
-                        'location_id': transfer.from_location_id,
-                        'movement_type': StockMovementType.TRANSFER,
-                        'quantity': item.sent_quantity,
-                        'unit_cost': item.unit_cost,
-                        'reference_type': 'TRANSFER',
-                        'reference_id': transfer.id,
-                        'batch_number': item.batch_number,
-                        'expiry_date': item.expiry_date,
-                        'remarks': f"Transfer to {transfer.to_location.name}"
-                    }),
-                    current_user_id=current_user_id,
-                    auto_update_stock=True
-                )
-        transfer.sent_by = current_user_id
-        transfer.sent_date = datetime.utcnow()
-        transfer.updated_by = current_user_id
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
 
-        await self.db.commit()
-        await self.db.refresh(transfer)
-        return transfer
+        await self._create_low_stock_tasks({item.item_id for item, _ in lines}, source, current_user_id)
+        return await self.get_transfer_by_id(transfer_id, populate_existing=True)
 
     async def receive_transfer(self, transfer_id: int, received_quantities: Dict[int, Decimal], current_user_id: int) -> Transfer:
         """Mark transfer as received with actual received quantities"""
@@ -347,44 +350,108 @@ class TransferService:
         if not transfer:
             raise NotFoundError("Transfer not found")
 
-        if transfer.status != TransferStatus.IN_TRANSIT:
+        if transfer.status != TransferStatus.IN_TRANSIT or not transfer.sent_date:
             raise ValidationError("Only sent transfers can be received")
 
-        # Update received quantities and create stock movements
-        from app.services.inventory.stock_movement_service import StockMovementService
-        movement_service = StockMovementService(self.db)
-
-        for item in transfer.items:
-            if item.item_id in received_quantities:
-                item.received_quantity = received_quantities[item.item_id]
+        try:
+            lines = self._posting_lines(transfer, received_quantities)
+
+            # Lock destination stock rows, then inbound movements and stock in one statement each
+            destination = transfer.to_location_id
+            deltas = aggregate_deltas((item.item_id, destination, quantity) for item, quantity in lines)
+            await lock_stock_levels(self.db, deltas.keys())
+            await insert_stock_movements(self.db, [
+                self._transfer_movement(transfer, item, quantity, destination, StockMovementType.INBOUND,
+                                        f"Transfer from {transfer.from_location.name}", current_user_id)
+                for item, quantity in lines
+            ])
+            await apply_stock_deltas(self.db, deltas, current_user_id)
+
+            for item, quantity in lines:
+                item.received_quantity = quantity
                 item.updated_by = current_user_id
+            transfer.status = TransferStatus.COMPLETED
+            transfer.received_by = current_user_id
+            transfer.received_date = datetime.utcnow()
+            transfer.updated_by = current_user_id
 
-                # Create inbound movement to destination location
-                await movement_service.create_stock_movement(
-                    movement_data=StockMovementCreate(**{
-                        'item_id': item.item_id,
-                        'location_id': transfer.to_location_id,
-                        'movement_type': StockMovementType.INBOUND,
-                        'quantity': item.received_quantity,
-                        'unit_cost': item.unit_cost,
-                        'reference_type': 'TRANSFER',
-                        'reference_id': transfer.id,
-                        'batch_number': item.batch_number,
-                        'expiry_date': item.expiry_date,
-                        'remarks': f"Transfer from {transfer.from_location.name}"
-                    }),
-                    current_user_id=current_user_id,
-                    auto_update_stock=True
-                )
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
 
-        transfer.status = TransferStatus.COMPLETED
-        transfer.received_by = current_user_id
-        transfer.received_date = datetime.utcnow()
-        transfer.updated_by = current_user_id
+        return await self.get_transfer_by_id(transfer_id, populate_existing=True)
 
-        await self.db.commit()
-        await self.db.refresh(transfer)
-        return transfer
+    def _posting_lines(self, transfer: Transfer, quantities: Dict[int, Decimal]) -> List[Tuple[TransferItem, Decimal]]:
+        """Transfer items being posted with their quantities, validated up front"""
+        lines = []
+        for item in transfer.items:
+            if item.item_id in quantities:
+                quantity = Decimal(str(quantities[item.item_id]))
+                if quantity <= 0:
+                    raise ValidationError("Quantity must be greater than zero")
+                lines.append((item, quantity))
+        return lines
+
+    def _transfer_movement(
+        self,
+        transfer: Transfer,
+        item: TransferItem,
+        quantity: Decimal,
+        location_id: int,
+        movement_type: StockMovementType,
+        remarks: str,
+        current_user_id: int
+    ) -> Dict[str, Any]:
+        return {
+            "item_id": item.item_id,
+            "location_id": location_id,
+            "movement_type": movement_type,
+            "quantity": quantity,
+            "unit_cost": item.unit_cost,
+            "total_cost": item.unit_cost * quantity if item.unit_cost else None,
+            "reference_type": 'TRANSFER',
+            "reference_id": transfer.id,
+            "batch_number": item.batch_number,
+            "expiry_date": item.expiry_date,
+            "remarks": remarks,
+            "performed_by": current_user_id,
+            "movement_date": datetime.utcnow(),
+            "created_by": current_user_id
+        }
+
+    async def _create_low_stock_tasks(self, item_ids: Set[int], location_id: int, current_user_id: int):
+        """Raise low stock tasks for posted items now at or below their reorder point"""
+        try:
+            result = await self.db.execute(
+                select(StockLevel.item_id, StockLevel.current_stock, Item.reorder_point)
+                .join(Item, Item.id == StockLevel.item_id)
+                .where(
+                    StockLevel.item_id.in_(item_ids),
+                    StockLevel.location_id == location_id,
+                    StockLevel.is_deleted == False,
+                    Item.is_active == True,
+                    Item.reorder_point > 0,
+                    StockLevel.current_stock <= Item.reorder_point
+                )
+            )
+            rows = result.all()
+            if not rows:
+                return
+
+            from app.services.task.task_integration_service import TaskIntegrationService
+            task_integration = TaskIntegrationService(self.db)
+            for item_id, current_stock, reorder_point in rows:
+                await task_integration.automation_service.create_low_stock_alert_task(
+                    item_id=item_id,
+                    location_id=location_id,
+                    current_stock=float(current_stock),
+                    reorder_point=float(reorder_point),
+                    user_id=current_user_id
+                )
+        except Exception as e:
+            # Log but don't fail the transfer
+            logger.error(f"Failed to create low stock tasks: {str(e)}")
 
     async def cancel_transfer(self, transfer_id: int, reason: str, current_user_id: int) -> Transfer:
         """Cancel transfer and release reserved stock"""
@@ -395,26 +462,38 @@ class TransferService:
         if transfer.status in [TransferStatus.COMPLETED, TransferStatus.CANCELLED]:
             raise ValidationError("Cannot cancel completed or already cancelled transfer")
 
-        # Release reserved stock if transfer was approved
-        if transfer.status == TransferStatus.IN_TRANSIT:
-            from app.services.inventory.stock_level_service import StockLevelService
-            stock_service = StockLevelService(self.db)
-
-            for item in transfer.items:
-                await stock_service.release_reservation(
-                    item_id=item.item_id,
-                    location_id=transfer.from_location_id,
-                    quantity=item.requested_quantity,
-                    current_user_id=current_user_id
+        try:
+            if transfer.status == TransferStatus.IN_TRANSIT:
+                # Sending released the reservation of the lines it shipped; those go back to the source instead
+                source = transfer.from_location_id
+                shipped = [(item, item.sent_quantity) for item in transfer.items if transfer.sent_date and item.sent_quantity]
+                shipped_ids = {item.id for item, _ in shipped}
+                returned = aggregate_deltas((item.item_id, source, quantity) for item, quantity in shipped)
+                released = aggregate_deltas(
+                    (item.item_id, source, -item.requested_quantity)
+                    for item in transfer.items if item.id not in shipped_ids
                 )
 
-        transfer.status = TransferStatus.CANCELLED
-        transfer.notes = f"{transfer.notes or ''}\n\nCancellation reason: {reason}"
-        transfer.updated_by = current_user_id
-
-        await self.db.commit()
-        await self.db.refresh(transfer)
-        return transfer
+                # Returned stock and released reservations in one statement, committed with the status
+                deltas = {key: returned.get(key, Decimal("0")) for key in set(returned) | set(released)}
+                await lock_stock_levels(self.db, deltas.keys())
+                await insert_stock_movements(self.db, [
+                    self._transfer_movement(transfer, item, quantity, source, StockMovementType.INBOUND,
+                                            f"Transfer to {transfer.to_location.name} cancelled", current_user_id)
+                    for item, quantity in shipped
+                ])
+                await apply_stock_deltas(self.db, deltas, current_user_id, reserved=released)
+
+            transfer.status = TransferStatus.CANCELLED
+            transfer.notes = f"{transfer.notes or ''}\n\nCancellation reason: {reason}"
+            transfer.updated_by = current_user_id
+
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+
+        return await self.get_transfer_by_id(transfer_id, populate_existing=True)
 
 def transfer_none():
     return None
\ No newline at end of file
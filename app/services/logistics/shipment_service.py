@@ -22,6 +22,7 @@ from app.schemas.logistics.shipment_schema import (
     ShipmentCreate, ShipmentUpdate, ShipmentResponse,
     ShipmentItemCreate, OTPVerificationRequest
 )
+from app.core.document_numbers import next_document_number
 from app.services.auth.user_service import UserService
 from app.services.task.task_integration_service import TaskIntegrationService
 
@@ -32,12 +33,9 @@ class ShipmentService:
         self.session = session
         self.user_service = UserService(session)
 
-    def generate_shipment_number(self) -> str:
+    async def generate_shipment_number(self) -> str:
         """Generate unique shipment number"""
-        prefix = "SHP"
-        timestamp = datetime.now().strftime("%Y%m%d")
-        random_suffix = ''.join(random.choices(string.digits, k=4))
-        return f"{prefix}-{timestamp}-{random_suffix}"
+        return await next_document_number(self.session, "SHP")
 
     def generate_otp(self) -> str:
         """Generate 6-digit OTP"""
@@ -65,11 +63,7 @@ class ShipmentService:
                 await self._validate_vehicle(shipment_data.vehicle_id)
 
             # Generate shipment number and OTPs
-            shipment_number = self.generate_shipment_number()
-            
-            # Check uniqueness
-            while await self._shipment_number_exists(shipment_number):
-                shipment_number = self.generate_shipment_number()
+            shipment_number = await self.generate_shipment_number()
 
             # Create shipment
             shipment_dict = shipment_data.dict(exclude={'items'})
@@ -921,13 +915,6 @@ class ShipmentService:
             )
         return item
 
-    async def _shipment_number_exists(self, shipment_number: str) -> bool:
-        """Check if shipment number already exists"""
-        result = await self.session.execute(
-            select(Shipment).where(Shipment.shipment_number == shipment_number)
-        )
-        return result.scalar_one_or_none() is not None
-
     async def _create_tracking_update(self, shipment_id: int, 
                                       status: ShipmentStatus, notes: str, user_id: int, 
                                       location: Optional[str] = None, latitude: Optional[float] = None, longitude: Optional[float] = None):
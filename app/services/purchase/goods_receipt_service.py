@@ -1,9 +1,9 @@
 import logging
-from typing import Optional, List, Dict, Any
-from datetime import datetime, date
+from typing import Optional, List, Dict, Any, Set, Tuple
+from datetime import date
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, update
+from sqlalchemy import Integer, Numeric, and_, case, column, func, insert, literal, or_, select, update, values
 from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
 
@@ -13,7 +13,6 @@ from app.models.purchase.goods_receipt_item import GoodsReceiptItem
 from app.models.purchase.purchase_order import PurchaseOrder
 from app.models.purchase.purchase_order_item import PurchaseOrderItem
 from app.models.inventory.stock_level import StockLevel
-from app.models.inventory.stock_movement import StockMovement
 from app.models.shared.enums import PurchaseOrderStatus, StockMovementType
 from app.schemas.purchase.goods_receipt_schema import (
     GoodsReceiptCreate,
@@ -21,7 +20,10 @@ from app.schemas.purchase.goods_receipt_schema import (
     GoodsReceiptResponse,
     GoodsReceiptUpdate
 )
+from app.core.document_numbers import next_document_number
 from app.services.auth.user_service import UserService
+from app.services.search.search_service import SEARCH_FIELDS, search_filter, search_rank
+from app.services.inventory.stock_posting import aggregate_deltas, apply_stock_deltas, insert_stock_movements
 from app.services.task.task_service import TaskService
 from app.models.shared.enums import TaskStatus, ReferenceType
 
@@ -34,27 +36,7 @@ class GoodsReceiptService:
 
     async def generate_receipt_number(self) -> str:
         """Generate unique goods receipt number"""
-        try:
-            today = date.today()
-            prefix = f"GR{today.strftime('%Y%m%d')}"
-            
-            # Get the latest receipt number for today
-            result = await self.session.execute(
-                select(func.max(GoodsReceipt.receipt_number))
-                .where(GoodsReceipt.receipt_number.like(f"{prefix}%"))
-            )
-            latest_receipt = result.scalar()
-            
-            if latest_receipt:
-                sequence = int(latest_receipt[-3:]) + 1
-            else:
-                sequence = 1
-                
-            return f"{prefix}{sequence:03d}"
-            
-        except Exception as e:
-            logger.error(f"Error generating receipt number: {str(e)}")
-            return f"GR{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        return await next_document_number(self.session, "GR")
 
     async def create_goods_receipt(
         self,
@@ -109,15 +91,11 @@ class GoodsReceiptService:
             self.session.add(goods_receipt)
             await self.session.flush()  # Get the ID
 
-            # Process receipt items
-            receipt_items = []
+            # Validate all lines against the PO, indexed once
+            po_items = {poi.id: poi for poi in purchase_order.items}
+            received: Dict[int, Decimal] = {}
             for item_data in receipt_data.items:
-                # Find the corresponding PO item
-                po_item = next(
-                    (poi for poi in purchase_order.items if poi.id == item_data.purchase_order_item_id),
-                    None
-                )
-                
+                po_item = po_items.get(item_data.purchase_order_item_id)
                 if not po_item:
                     raise HTTPException(
                         status_code=status.HTTP_404_NOT_FOUND,
@@ -125,44 +103,65 @@ class GoodsReceiptService:
                     )
 
                 # Validate received quantity doesn't exceed remaining quantity
-                remaining_qty = po_item.quantity - po_item.received_quantity
+                remaining_qty = po_item.quantity - po_item.received_quantity - received.get(po_item.id, Decimal('0'))
                 if item_data.received_quantity > remaining_qty:
                     raise HTTPException(
                         status_code=status.HTTP_400_BAD_REQUEST,
                         detail=f"Received quantity ({item_data.received_quantity}) exceeds remaining quantity ({remaining_qty}) for item {po_item.item.name}"
                     )
+                received[po_item.id] = received.get(po_item.id, Decimal('0')) + item_data.received_quantity
+
+            # Receipt items, stock movements, stock levels and PO lines, one statement each
+            lines = [(item_data, po_items[item_data.purchase_order_item_id]) for item_data in receipt_data.items]
+            await self.session.execute(insert(GoodsReceiptItem), [
+                {
+                    "goods_receipt_id": goods_receipt.id,
+                    "purchase_order_item_id": po_item.id,
+                    "item_id": po_item.item_id,
+                    "ordered_quantity": po_item.quantity,
+                    "received_quantity": item_data.received_quantity,
+                    "unit_cost": po_item.unit_cost,
+                    "batch_number": item_data.batch_number,
+                    "expiry_date": item_data.expiry_date,
+                    "is_deleted": False,
+                    "created_by": user_id
+                }
+                for item_data, po_item in lines
+            ])
+            await insert_stock_movements(self.session, [
+                {
+                    "item_id": po_item.item_id,
+                    "location_id": receipt_data.location_id,
+                    "movement_type": StockMovementType.INBOUND,
+                    "quantity": item_data.received_quantity,
+                    "unit_cost": po_item.unit_cost,
+                    "reference_type": 'goods_receipt',
+                    "reference_id": goods_receipt.id,
+                    "batch_number": item_data.batch_number,
+                    "expiry_date": item_data.expiry_date,
+                    "remarks": f"Goods receipt - {item_data.batch_number}" if item_data.batch_number else "Goods receipt",
+                    "created_by": user_id
+                }
+                for item_data, po_item in lines
+            ])
+            await apply_stock_deltas(
+                self.session,
+                aggregate_deltas(
+                    (po_item.item_id, receipt_data.location_id, item_data.received_quantity)
+                    for item_data, po_item in lines
+                ),
+                user_id
+            )
 
-                # Create receipt item
-                receipt_item = GoodsReceiptItem(
-                    goods_receipt_id=goods_receipt.id,
-                    purchase_order_item_id=item_data.purchase_order_item_id,
-                    item_id=po_item.item_id,
-                    ordered_quantity=po_item.quantity,
-                    received_quantity=item_data.received_quantity,
-                    unit_cost=po_item.unit_cost,
-                    batch_number=item_data.batch_number,
-                    expiry_date=item_data.expiry_date,
-                    created_by=user_id
-                )
-                receipt_items.append(receipt_item)
-
-                # Update PO item received quantity
-                po_item.received_quantity += item_data.received_quantity
-
-                # Update stock levels
-                await self._update_stock_levels(
-                    item_id=po_item.item_id,
-                    location_id=receipt_data.location_id,
-                    quantity=item_data.received_quantity,
-                    unit_cost=po_item.unit_cost,
-                    user_id=user_id,
-                    reference_id=goods_receipt.id,
-                    batch_number=item_data.batch_number,
-                    expiry_date=item_data.expiry_date
+            # Guarded in SQL as well, so concurrent receipts cannot over-receive a line
+            posted = await self._post_received_quantities(purchase_order.id, received, user_id)
+            if posted != len(received):
+                await self.session.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Purchase order lines were received concurrently, please reload and retry"
                 )
 
-            self.session.add_all(receipt_items)
-
             # Check if PO is fully received
             await self._check_po_completion(purchase_order.id)
 
@@ -172,12 +171,11 @@ class GoodsReceiptService:
             await self._complete_po_approval_task(purchase_order.id, user_id)
             
             # CHECK AND UPDATE LOW STOCK TASKS
-            for receipt_item in receipt_items:
-                await self._check_and_complete_low_stock_task(
-                    receipt_item.item_id,
-                    receipt_data.location_id,
-                    user_id
-                )
+            await self._complete_low_stock_tasks(
+                {po_item.item_id for _, po_item in lines},
+                receipt_data.location_id,
+                user_id
+            )
 
              # Reload PO with items eagerly
             result = await self.session.execute(
@@ -189,6 +187,7 @@ class GoodsReceiptService:
                     selectinload(GoodsReceipt.items).selectinload(GoodsReceiptItem.item)
                 )
                 .where(GoodsReceipt.id == goods_receipt.id)
+                .execution_options(populate_existing=True)
             )
 
             logger.info(f"Goods receipt created: {receipt_number} by user {user_id}")
@@ -265,12 +264,10 @@ class GoodsReceiptService:
                 query = query.where(GoodsReceipt.receipt_date <= end_date)
             
             if search:
-                search_filter = or_(
-                    GoodsReceipt.receipt_number.ilike(f"%{search}%"),
-                    GoodsReceipt.location.name.ilike(f"%{search}%"),
-                    GoodsReceipt.notes.ilike(f"%{search}%")
+                query = (
+                    query.outerjoin(Location, GoodsReceipt.location_id == Location.id)
+                    .where(search_filter(self.session, SEARCH_FIELDS["goods_receipt"], search))
                 )
-                query = query.where(search_filter)
 
             # Location manager restriction - handles multiple locations per manager
             if user_id:
@@ -290,6 +287,8 @@ class GoodsReceiptService:
 
             # Calculate offset and apply pagination
             skip = (page_index - 1) * page_size
+            if search:
+                query = query.order_by(search_rank(self.session, SEARCH_FIELDS["goods_receipt"], search).desc())
             query = query.offset(skip).limit(page_size).order_by(GoodsReceipt.receipt_date.desc())
             result = await self.session.execute(query)
             receipts = result.scalars().all()
@@ -358,32 +357,26 @@ class GoodsReceiptService:
                     detail="Goods receipt not found"
                 )
 
-            # Reverse stock movements for all items
-            for receipt_item in receipt.items:
-                # Reverse stock level update
-                await self._reverse_stock_levels(
-                    item_id=receipt_item.item_id,
-                    location_id=receipt.location_id,
-                    quantity=receipt_item.received_quantity,
-                    user_id=user_id,
-                    reference_id=receipt.id
-                )
+            # Reverse stock for all items in one pass
+            deltas = aggregate_deltas(
+                (receipt_item.item_id, receipt.location_id, -receipt_item.received_quantity)
+                for receipt_item in receipt.items
+            )
+            await self._reverse_stock_levels(deltas, user_id, receipt.id)
 
-                # Update PO item received quantity
-                po_item_result = await self.session.execute(
-                    select(PurchaseOrderItem).where(
-                        PurchaseOrderItem.id == receipt_item.purchase_order_item_id
-                    )
+            # Update PO item received quantities
+            received: Dict[int, Decimal] = {}
+            for receipt_item in receipt.items:
+                received[receipt_item.purchase_order_item_id] = (
+                    received.get(receipt_item.purchase_order_item_id, Decimal('0')) - receipt_item.received_quantity
                 )
-                po_item = po_item_result.scalar_one_or_none()
-                if po_item:
-                    po_item.received_quantity -= receipt_item.received_quantity
+            await self._post_received_quantities(receipt.purchase_order_id, received, user_id)
 
             # Soft delete the receipt
             receipt.is_deleted = True
             
             # Check PO status again
-            await self._check_po_completion(receipt.purchase_order.id)
+            await self._check_po_completion(receipt.purchase_order_id)
             
             await self.session.commit()
 
@@ -397,157 +390,117 @@ class GoodsReceiptService:
             logger.error(f"Error deleting goods receipt: {str(e)}")
             return False
 
-    async def _update_stock_levels(
-        self,
-        item_id: int,
-        location_id: int,
-        quantity: Decimal,
-        unit_cost: Decimal,
-        user_id: int,
-        reference_id: int,
-        batch_number: Optional[str] = None,
-        expiry_date: Optional[date] = None
-    ):
-        """Update stock levels and create stock movement"""
+    async def _reverse_stock_levels(self, deltas: Dict[Tuple[int, int], Decimal], user_id: int, reference_id: int):
+        """Reverse stock level changes (deltas are negative)"""
         try:
-            # Get or create stock level
-            stock_result = await self.session.execute(
-                select(StockLevel).where(
-                    and_(
-                        StockLevel.item_id == item_id,
-                        StockLevel.location_id == location_id,
-                        StockLevel.is_deleted == False
-                    )
-                )
-            )
-            stock_level = stock_result.scalar_one_or_none()
-
-            if not stock_level:
-                # Create new stock level
-                stock_level = StockLevel(
-                    item_id=item_id,
-                    location_id=location_id,
-                    current_stock=quantity,
-                    available_stock=quantity,
-                    reserved_stock=Decimal('0'),
-                    par_level_min=Decimal('0'),
-                    par_level_max=Decimal('0'),
-                    updated_by=user_id
-                )
-                self.session.add(stock_level)
-            else:
-                # Update existing stock level
-                stock_level.current_stock += quantity
-                stock_level.available_stock += quantity
-                # Update unit cost with weighted average
-                # total_value = (stock_level.current_stock - quantity) * stock_level.unit_cost + quantity * unit_cost
-                # stock_level.unit_cost = total_value / stock_level.current_stock if stock_level.current_stock > 0 else unit_cost
-
-            # Create stock movement record
-            stock_movement = StockMovement(
-                item_id=item_id,
-                location_id=location_id,
-                movement_type=StockMovementType.INBOUND,
-                quantity=quantity,
-                unit_cost=unit_cost,
-                reference_type='goods_receipt',
-                reference_id=reference_id,
-                batch_number=batch_number,
-                expiry_date=expiry_date,
-                remarks=f"Goods receipt - {batch_number}" if batch_number else "Goods receipt",
-                updated_by=user_id
-            )
-            self.session.add(stock_movement)
-
-        except Exception as e:
-            logger.error(f"Error updating stock levels: {str(e)}")
-            raise
+            if not deltas:
+                return
 
-    async def _reverse_stock_levels(
-        self,
-        item_id: int,
-        location_id: int,
-        quantity: Decimal,
-        user_id: int,
-        reference_id: int
-    ):
-        """Reverse stock level changes"""
-        try:
-            # Get stock level
+            # Get stock levels
+            item_ids = {item_id for item_id, _ in deltas}
+            location_ids = {location_id for _, location_id in deltas}
             stock_result = await self.session.execute(
-                select(StockLevel).where(
+                select(StockLevel.item_id, StockLevel.location_id, StockLevel.current_stock).where(
                     and_(
-                        StockLevel.item_id == item_id,
-                        StockLevel.location_id == location_id,
+                        StockLevel.item_id.in_(item_ids),
+                        StockLevel.location_id.in_(location_ids),
                         StockLevel.is_deleted == False
                     )
                 )
             )
-            stock_level = stock_result.scalar_one_or_none()
+            current = {(row.item_id, row.location_id): row.current_stock for row in stock_result}
 
-            if stock_level:
+            # Items without a stock level have nothing to reverse
+            deltas = {key: quantity for key, quantity in deltas.items() if key in current}
+            for key, quantity in deltas.items():
                 # Check if we have enough stock to reverse
-                if stock_level.current_stock < quantity:
+                if current[key] < -quantity:
                     raise HTTPException(
                         status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Insufficient stock to reverse receipt. Current: {stock_level.current_stock}, Required: {quantity}"
+                        detail=f"Insufficient stock to reverse receipt. Current: {current[key]}, Required: {-quantity}"
                     )
 
-                # Update stock level
-                stock_level.current_stock -= quantity
-                stock_level.available_stock -= quantity
-
-                # Create reverse stock movement
-                stock_movement = StockMovement(
-                    item_id=item_id,
-                    location_id=location_id,
-                    movement_type=StockMovementType.ADJUSTMENT,
-                    quantity=-quantity,  # Negative quantity for reversal
-                    reference_type='goods_receipt_reversal',
-                    reference_id=reference_id,
-                    remarks="Goods receipt reversal",
-                    created_by=user_id
+            posted = await apply_stock_deltas(self.session, deltas, user_id, create_missing=False)
+            if len(posted) != len(deltas):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Stock changed while reversing the receipt, please retry"
                 )
-                self.session.add(stock_movement)
+
+            # Create reverse stock movements
+            await insert_stock_movements(self.session, [
+                {
+                    "item_id": item_id,
+                    "location_id": location_id,
+                    "movement_type": StockMovementType.ADJUSTMENT,
+                    "quantity": quantity,  # Negative quantity for reversal
+                    "reference_type": 'goods_receipt_reversal',
+                    "reference_id": reference_id,
+                    "remarks": "Goods receipt reversal",
+                    "created_by": user_id
+                }
+                for (item_id, location_id), quantity in deltas.items()
+            ])
 
         except Exception as e:
             logger.error(f"Error reversing stock levels: {str(e)}")
             raise
 
-    async def _check_po_completion(self, purchase_order_id: int):
-        """Check if purchase order is fully received"""
-        try:
-            # Explicitly load the purchase order with its items
-            po_result = await self.session.execute(
-                select(PurchaseOrder)
-                .options(selectinload(PurchaseOrder.items))
-                .where(PurchaseOrder.id == purchase_order_id)
+    async def _post_received_quantities(self, purchase_order_id: int, received: Dict[int, Decimal], user_id: int) -> int:
+        """Add quantities to PO lines' received_quantity in one UPDATE; returns lines updated"""
+        if not received:
+            return 0
+        lines = values(
+            column("id", Integer),
+            column("quantity", Numeric(10, 2)),
+            name="received"
+        ).data(list(received.items()))
+
+        result = await self.session.execute(
+            update(PurchaseOrderItem)
+            .where(
+                PurchaseOrderItem.id == lines.c.id,
+                PurchaseOrderItem.purchase_order_id == purchase_order_id,
+                or_(lines.c.quantity <= 0, PurchaseOrderItem.received_quantity + lines.c.quantity <= PurchaseOrderItem.quantity)
             )
-            purchase_order = po_result.scalar_one_or_none()
-            
-            if not purchase_order:
-                logger.warning(f"Purchase order {purchase_order_id} not found")
-                return
-        
-            # Check if all items are fully received
-            all_received = all(
-                item.received_quantity >= item.quantity
-                for item in purchase_order.items
+            .values(
+                received_quantity=PurchaseOrderItem.received_quantity + lines.c.quantity,
+                updated_by=user_id
             )
+            .returning(PurchaseOrderItem.id)
+            .execution_options(synchronize_session=False)
+        )
+        return len(result.all())
 
-            # Check if any items are partially received
-            any_received = any(
-                item.received_quantity > Decimal('0')
-                for item in purchase_order.items
+    async def _check_po_completion(self, purchase_order_id: int):
+        """Set the PO status from its lines, computed in SQL"""
+        try:
+            po_lines = and_(
+                PurchaseOrderItem.purchase_order_id == purchase_order_id,
+                func.coalesce(PurchaseOrderItem.is_deleted, False) == False
+            )
+            open_line = select(PurchaseOrderItem.id).where(
+                po_lines, PurchaseOrderItem.received_quantity < PurchaseOrderItem.quantity
+            ).exists()
+            any_received = select(PurchaseOrderItem.id).where(
+                po_lines, PurchaseOrderItem.received_quantity > 0
+            ).exists()
+
+            status_type = PurchaseOrder.status.type
+            await self.session.execute(
+                update(PurchaseOrder)
+                .where(PurchaseOrder.id == purchase_order_id)
+                .values(status=case(
+                    (~open_line, literal(PurchaseOrderStatus.COMPLETED, status_type)),
+                    (any_received, literal(PurchaseOrderStatus.PARTIALLY_RECEIVED, status_type)),
+                    else_=PurchaseOrder.status
+                ))
+                .execution_options(synchronize_session=False)
             )
-
-            if all_received:
-                purchase_order.status = PurchaseOrderStatus.COMPLETED
-            elif any_received:
-                purchase_order.status = PurchaseOrderStatus.PARTIALLY_RECEIVED
 
         except Exception as e:
             logger.error(f"Error checking PO completion: {str(e)}")
+            raise
 
     async def get_pending_receipts_for_po(self, po_id: int) -> List[Dict[str, Any]]:
         """Get pending items for receiving from a purchase order"""
@@ -619,59 +572,52 @@ class GoodsReceiptService:
         except Exception as e:
             logger.error(f"Failed to complete PO task: {str(e)}")
     
-    async def _check_and_complete_low_stock_task(
+    async def _complete_low_stock_tasks(
         self, 
-        item_id: int, 
+        item_ids: Set[int], 
         location_id: int,
         user_id: int
     ):
-        """Check and complete low stock tasks after receiving goods"""
+        """Complete low stock tasks for received items now above their reorder point"""
         try:
             from app.models.task.task import Task
-            from app.models.inventory.stock_level import StockLevel
             from app.models.inventory.item import Item
             
-            # Check current stock level
-            stock_result = await self.session.execute(
-                select(StockLevel, Item)
-                .join(Item)
+            if not item_ids:
+                return
+
+            # Open low stock tasks whose stock is now above reorder point, in one query
+            task_result = await self.session.execute(
+                select(Task.id, StockLevel.current_stock)
+                .join(
+                    StockLevel,
+                    and_(
+                        StockLevel.item_id == Task.reference_id,
+                        StockLevel.location_id == Task.location_id,
+                        StockLevel.is_deleted == False
+                    )
+                )
+                .join(Item, Item.id == StockLevel.item_id)
                 .where(
                     and_(
-                        StockLevel.item_id == item_id,
-                        StockLevel.location_id == location_id
+                        Task.reference_type == ReferenceType.LOW_STOCK_ALERT.value,
+                        Task.reference_id.in_(item_ids),
+                        Task.location_id == location_id,
+                        Task.status != TaskStatus.COMPLETED,
+                        Task.is_active == True,
+                        StockLevel.current_stock > Item.reorder_point
                     )
                 )
             )
-            result = stock_result.first()
-            
-            if result:
-                stock_level, item = result
-                
-                # If stock is now above reorder point
-                if stock_level.current_stock > item.reorder_point:
-                    # Find and complete related low stock task
-                    task_result = await self.session.execute(
-                        select(Task).where(
-                            and_(
-                                Task.reference_type == ReferenceType.LOW_STOCK_ALERT.value,
-                                Task.reference_id == item_id,
-                                Task.location_id == location_id,
-                                Task.status != TaskStatus.COMPLETED,
-                                Task.is_active == True
-                            )
-                        )
-                    )
-                    task = task_result.scalar_one_or_none()
-                    
-                    if task:
-                        task_service = TaskService(self.session)
-                        await task_service.update_task_status(
-                            task_id=task.id,
-                            status=TaskStatus.COMPLETED,
-                            user_id=user_id,
-                            notes=f"Stock replenished. Current: {stock_level.current_stock}"
-                        )
+
+            task_service = TaskService(self.session)
+            for task_id, current_stock in task_result.all():
+                await task_service.update_task_status(
+                    task_id=task_id,
+                    status=TaskStatus.COMPLETED,
+                    user_id=user_id,
+                    notes=f"Stock replenished. Current: {current_stock}"
+                )
                         
         except Exception as e:
-            logger.error(f"Failed to complete low stock task: {str(e)}")
-    
\ No newline at end of file
+            logger.error(f"Failed to complete low stock tasks: {str(e)}")
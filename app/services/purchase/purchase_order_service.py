@@ -4,7 +4,7 @@ from typing import Optional, List, Dict, Any
 from datetime import datetime, date
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func, update
+from sqlalchemy import select, and_, func, update
 from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
 
@@ -20,7 +20,9 @@ from app.schemas.purchase.purchase_order_schema import (
     PurchaseOrderUpdate, 
     PurchaseOrderItemCreate
 )
+from app.core.document_numbers import next_document_number
 from app.services.auth.user_service import UserService
+from app.services.search.search_service import SEARCH_FIELDS, search_filter, search_rank
 from app.services.task.task_integration_service import TaskIntegrationService
 
 logger = logging.getLogger(__name__)
@@ -32,29 +34,7 @@ class PurchaseOrderService:
 
     async def generate_po_number(self) -> str:
         """Generate unique purchase order number"""
-        try:
-            today = date.today()
-            prefix = f"PO{today.strftime('%Y%m%d')}"
-            
-            # Get the latest PO number for today
-            result = await self.session.execute(
-                select(func.max(PurchaseOrder.po_number))
-                .where(PurchaseOrder.po_number.like(f"{prefix}%"))
-            )
-            latest_po = result.scalar()
-            
-            if latest_po:
-                # Extract sequence number and increment
-                sequence = int(latest_po[-3:]) + 1
-            else:
-                sequence = 1
-                
-            return f"{prefix}{sequence:03d}"
-            
-        except Exception as e:
-            logger.error(f"Error generating PO number: {str(e)}")
-            # Fallback to timestamp-based number
-            return f"PO{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        return await next_document_number(self.session, "PO")
 
     async def create_purchase_order(
         self, 
@@ -415,11 +395,7 @@ class PurchaseOrderService:
                 query = query.where(PurchaseOrder.order_date <= end_date)
             
             if search:
-                search_filter = or_(
-                    PurchaseOrder.po_number.ilike(f"%{search}%"),
-                    PurchaseOrder.notes.ilike(f"%{search}%")
-                )
-                query = query.where(search_filter)
+                query = query.where(search_filter(self.session, SEARCH_FIELDS["purchase_order"], search))
 
             # Location manager restriction - handles multiple locations per manager
             if user_id:
@@ -439,6 +415,8 @@ class PurchaseOrderService:
 
             # Calculate offset and apply pagination
             skip = (page_index - 1) * page_size
+            if search:
+                query = query.order_by(search_rank(self.session, SEARCH_FIELDS["purchase_order"], search).desc())
             query = query.offset(skip).limit(page_size).order_by(PurchaseOrder.order_date.desc())
             result = await self.session.execute(query)
             purchase_orders = result.scalars().all()
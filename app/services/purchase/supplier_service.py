@@ -1,13 +1,14 @@
 import logging
 from typing import Optional, List, Dict, Any
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import select, and_, func
 from sqlalchemy.orm import selectinload
 from fastapi import HTTPException, status
 from app.models.purchase.supplier import Supplier
 from app.models.purchase.item_supplier import ItemSupplier
 from app.models.inventory.item import Item
 from app.schemas.purchase.supplier_schema import SupplierCreate, SupplierUpdate
+from app.services.search.search_service import SEARCH_FIELDS, search_filter, search_rank
 
 logger = logging.getLogger(__name__)
 
@@ -86,12 +87,7 @@ class SupplierService:
 
             # Apply filters
             if search:
-                search_filter = or_(
-                    Supplier.name.ilike(f"%{search}%"),
-                    Supplier.supplier_code.ilike(f"%{search}%"),
-                    Supplier.contact_person.ilike(f"%{search}%")
-                )
-                query = query.where(search_filter)
+                query = query.where(search_filter(self.session, SEARCH_FIELDS["supplier"], search))
 
             if is_active is not None:
                 query = query.where(Supplier.is_active == is_active)
@@ -103,6 +99,8 @@ class SupplierService:
 
             # Calculate offset and apply pagination
             skip = (page_index - 1) * page_size
+            if search:
+                query = query.order_by(search_rank(self.session, SEARCH_FIELDS["supplier"], search).desc())
             query = query.offset(skip).limit(page_size).order_by(Supplier.name)
             result = await self.session.execute(query)
             suppliers = result.scalars().all()
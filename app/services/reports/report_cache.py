@@ -0,0 +1,210 @@
+# app/services/reports/report_cache.py
+"""
+Read-through cache for ReportService.
+
+Entries are keyed by (report, normalized params, user scope) and stored
+zlib-compressed in Redis together with the write versions of the tables the
+report reads. A lookup fetches the entry and the current versions in one
+pipeline; any version change is a miss. TTLs are only a ceiling.
+
+Concurrent identical requests compute once: callers in the same process share
+one in-flight future, and across processes a short Redis lock makes others
+wait for the first result instead of hitting Postgres.
+"""
+import asyncio
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from app.core.config import settings
+from app.core.table_versions import table_version_keys
+from app.schemas.common.pagination import PaginatedResponse
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "report_cache:"
+LOCK_PREFIX = "report_cache_lock:"
+LOCK_TTL_MS = 30_000
+LOCK_WAIT_SECONDS = 10.0
+LOCK_POLL_SECONDS = 0.05
+# Exports request whole reports; those are not worth holding in Redis
+MAX_CACHED_PAGE_SIZE = 500
+
+# Tables each report reads, and the TTL ceiling in seconds
+REPORTS: Dict[str, Tuple[Tuple[str, ...], int]] = {
+    "stock_levels": (("stock_levels", "items", "locations", "categories"), 120),
+    "stock_movements": (("stock_movements", "items", "locations"), 120),
+    "low_stock_alerts": (("stock_levels", "items", "locations", "categories"), 120),
+    "purchase_orders_summary": (("purchase_orders", "purchase_order_items", "suppliers"), 600),
+    "demand_forecast": (("stock_movements", "items", "locations", "categories"), 1800),
+    "attendance_summary": (("attendances", "employee_month_attendance", "employees", "departments", "locations"), 600),
+    "salary_summary": (("salaries", "employees", "departments", "locations"), 1800),
+    "shipment_tracking": (("shipments", "shipment_items", "locations", "drivers", "employees", "vehicles"), 300),
+}
+
+_binary_client = None
+_in_flight: Dict[str, asyncio.Future] = {}
+
+
+async def _client():
+    """Binary-safe connection (the shared client decodes responses as text)"""
+    global _binary_client
+    import redis.asyncio as redis
+
+    if _binary_client is None:
+        _binary_client = redis.from_url(settings.REDIS_URL)
+    return _binary_client
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return value.strip().lower()
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def cache_key(report: str, params: Dict[str, Any], user_scope: Optional[int]) -> str:
+    normalized = {name: _normalize(value) for name, value in params.items() if value not in (None, "")}
+    # Reports default their date ranges to "today", so the day is part of the shape
+    normalized["_today"] = date.today().isoformat()
+    digest = hashlib.sha1(
+        json.dumps([normalized, user_scope], sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f"{CACHE_PREFIX}{report}:{digest}"
+
+
+def _encode(versions: Dict[str, int], payload: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps({"versions": versions, "payload": payload}, default=str).encode(), 6)
+
+
+def _decode(blob: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(blob))
+
+
+async def _lookup(key: str, tables: Tuple[str, ...]) -> Tuple[Optional[Dict[str, Any]], Dict[str, int]]:
+    """Fetch the entry and current table versions in one round trip"""
+    client = await _client()
+    pipe = client.pipeline(transaction=False)
+    pipe.get(key)
+    pipe.mget(table_version_keys(tables))
+    blob, raw_versions = await pipe.execute()
+    versions = {table: int(value or 0) for table, value in zip(tables, raw_versions)}
+    if blob is None:
+        return None, versions
+    entry = _decode(blob)
+    if entry["versions"] != versions:
+        return None, versions
+    return entry["payload"], versions
+
+
+async def _wait_for_peer(key: str, tables: Tuple[str, ...]) -> Optional[Dict[str, Any]]:
+    """Another process holds the lock; poll for its result"""
+    client = await _client()
+    deadline = asyncio.get_running_loop().time() + LOCK_WAIT_SECONDS
+    while asyncio.get_running_loop().time() < deadline:
+        await asyncio.sleep(LOCK_POLL_SECONDS)
+        payload, _ = await _lookup(key, tables)
+        if payload is not None:
+            return payload
+        if not await client.exists(f"{LOCK_PREFIX}{key}"):
+            return None
+    return None
+
+
+async def _compute_and_store(
+    report: str,
+    key: str,
+    tables: Tuple[str, ...],
+    ttl: int,
+    compute: Callable[[], Awaitable[PaginatedResponse]],
+) -> PaginatedResponse:
+    try:
+        payload, versions = await _lookup(key, tables)
+    except Exception as e:
+        logger.warning(f"Report cache unavailable for {report}: {str(e)}")
+        return await compute()
+    if payload is not None:
+        return PaginatedResponse[Dict](**payload)
+
+    client = await _client()
+    lock_key = f"{LOCK_PREFIX}{key}"
+    try:
+        locked = await client.set(lock_key, b"1", nx=True, px=LOCK_TTL_MS)
+        if not locked:
+            payload = await _wait_for_peer(key, tables)
+            if payload is not None:
+                return PaginatedResponse[Dict](**payload)
+    except Exception as e:
+        logger.warning(f"Report cache lock failed for {report}: {str(e)}")
+        locked = False
+
+    try:
+        result = await compute()
+        try:
+            # Versions were read before computing: a write landing meanwhile makes this entry stale, never wrong
+            blob = _encode(versions, result.model_dump())
+            await client.set(key, blob, ex=min(ttl, settings.REPORT_CACHE_MAX_TTL))
+        except Exception as e:
+            logger.warning(f"Could not store report cache entry for {report}: {str(e)}")
+        return result
+    finally:
+        if locked:
+            try:
+                await client.delete(lock_key)
+            except Exception:
+                pass
+
+
+def cached_report(report: str):
+    """Serve a ReportService method through the cache; `user_id` is the scope"""
+    tables, ttl = REPORTS[report]
+
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        async def wrapper(self, *args, **kwargs):
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = dict(bound.arguments)
+            params.pop("self")
+
+            if not settings.REPORT_CACHE_ENABLED or params.get("page_size", 0) > MAX_CACHED_PAGE_SIZE:
+                return await fn(self, *args, **kwargs)
+
+            user_scope = params.pop("user_id", None)
+            key = cache_key(report, params, user_scope)
+
+            # Single flight within the process
+            pending = _in_flight.get(key)
+            if pending is not None:
+                return await asyncio.shield(pending)
+
+            future = asyncio.get_running_loop().create_future()
+            _in_flight[key] = future
+            try:
+                result = await _compute_and_store(report, key, tables, ttl, lambda: fn(self, *args, **kwargs))
+                future.set_result(result)
+                return result
+            except Exception as e:
+                future.set_exception(e)
+                # Mark retrieved so an unawaited failure isn't reported as "never retrieved"
+                future.exception()
+                raise
+            finally:
+                _in_flight.pop(key, None)
+
+        return wrapper
+
+    return decorator
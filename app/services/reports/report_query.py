@@ -0,0 +1,84 @@
+# app/services/reports/report_query.py
+"""
+Shared page + total executor for report queries.
+
+Reports used to build every query twice: once wrapped in COUNT(*) and once for
+the page. The executor returns both from a single statement by adding
+`count(*) OVER ()` to the page query. Where the page can be served by an index
+top-N scan and a window count would force materializing the whole result, it
+runs the page and the count concurrently on separate connections instead.
+
+Statements are plain SQLAlchemy selects with bound parameters, so each report
+shape compiles once (SQLAlchemy's compiled cache) and is reused as a prepared
+statement per connection by asyncpg.
+"""
+import asyncio
+import logging
+from enum import Enum
+from typing import Any, List, Tuple
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.sql import Select
+
+logger = logging.getLogger(__name__)
+
+TOTAL_COUNT_LABEL = "_total_count"
+
+
+class CountStrategy(str, Enum):
+    WINDOW = "window"          # one statement, count(*) OVER ()
+    CONCURRENT = "concurrent"  # page and count in parallel on two connections
+
+
+def count_statement(query: Select) -> Select:
+    """COUNT(*) over a query, ignoring its ordering and pagination"""
+    return select(func.count()).select_from(query.order_by(None).limit(None).offset(None).subquery())
+
+
+class ReportQueryExecutor:
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def fetch_page(
+        self,
+        query: Select,
+        page_index: int,
+        page_size: int,
+        strategy: CountStrategy = CountStrategy.WINDOW,
+    ) -> Tuple[List[Any], int]:
+        """Return (rows for the page, total row count) for an ordered report query"""
+        offset = (page_index - 1) * page_size
+
+        engine = self.session.bind
+        if strategy == CountStrategy.CONCURRENT and isinstance(engine, AsyncEngine):
+            return await self._fetch_concurrently(engine, query, offset, page_size)
+
+        windowed = query.add_columns(func.count().over().label(TOTAL_COUNT_LABEL)).offset(offset).limit(page_size)
+        result = await self.session.execute(windowed)
+        rows = result.fetchall()
+        if rows:
+            return rows, rows[0]._mapping[TOTAL_COUNT_LABEL]
+        if offset == 0:
+            return [], 0
+
+        # Past the last page there is no row to carry the window count
+        total_result = await self.session.execute(count_statement(query))
+        return [], total_result.scalar() or 0
+
+    async def _fetch_concurrently(
+        self,
+        engine: AsyncEngine,
+        query: Select,
+        offset: int,
+        limit: int,
+    ) -> Tuple[List[Any], int]:
+        async def run(statement: Select) -> List[Any]:
+            async with engine.connect() as conn:
+                result = await conn.execute(statement)
+                return result.fetchall()
+
+        rows, count_rows = await asyncio.gather(
+            run(query.offset(offset).limit(limit)),
+            run(count_statement(query)),
+        )
+        return rows, (count_rows[0][0] if count_rows else 0) or 0
@@ -4,7 +4,7 @@ from typing import Dict, Any, List, Optional
 from datetime import date, datetime, timedelta
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import distinct, select, and_, or_, func, text, desc, asc, case, cast, Integer
+from sqlalchemy import distinct, select, and_, func, text, desc, asc, case, cast, Integer
 from sqlalchemy.orm import selectinload
 from app.models.inventory.item import Item
 from app.models.inventory.stock_level import StockLevel
@@ -21,22 +21,28 @@ from app.models.purchase.supplier import Supplier
 from app.models.purchase.goods_receipt import GoodsReceipt
 from app.models.hr.employee import Employee
 from app.models.hr.attendance import Attendance
+from app.models.hr.attendance_month import EmployeeMonthAttendance
 from app.models.hr.salary import Salary
 from app.models.logistics.shipment import Shipment
 from app.models.task.task import Task
 from app.models.shared.enums import StockMovementType, PurchaseOrderStatus, AttendanceStatus, TaskStatus
 from app.schemas.common.pagination import PaginatedResponse
 from app.services.auth.user_service import UserService
+from app.services.reports.report_cache import cached_report
+from app.services.reports.report_query import CountStrategy, ReportQueryExecutor
+from app.services.search.search_service import SearchField, employee_full_name, search_filter
 
 logger = logging.getLogger(__name__)
 
 class ReportService:
     def __init__(self, session: AsyncSession):
         self.session = session
-        self.user_service = UserService(session)  
+        self.user_service = UserService(session)
+        self.report_query = ReportQueryExecutor(session)
 
     # =================== INVENTORY REPORTS ===================
     
+    @cached_report("stock_levels")
     async def get_stock_levels_report(
         self,
         page_index: int = 1,
@@ -107,14 +113,12 @@ class ReportService:
                         conditions.append(StockLevel.current_stock >= StockLevel.par_level_max)
                 
                 if search:
-                    conditions.append(
-                        or_(
-                            Item.name.ilike(f"%{search}%"),
-                            Item.item_code.ilike(f"%{search}%"),
-                            Category.name.ilike(f"%{search}%"),
-                            Location.name.ilike(f"%{search}%")
-                        )
-                    )
+                    conditions.append(search_filter(self.session, [
+                        SearchField(Item.name),
+                        SearchField(Item.item_code),
+                        SearchField(Category.name),
+                        SearchField(Location.name),
+                    ], search))
                 
                 # Location manager restriction - handles multiple locations per manager
                 if user_id:
@@ -129,18 +133,6 @@ class ReportService:
                 
                 query = query.where(and_(*conditions))
 
-                # Get total count with proper query structure
-                count_query = (
-                    select(func.count(StockLevel.id))
-                    .select_from(StockLevel)
-                    .join(Item, StockLevel.item_id == Item.id)
-                    .join(Location, StockLevel.location_id == Location.id)
-                    .outerjoin(Category, Item.category_id == Category.id)
-                    .where(and_(*conditions))
-                )
-                total_result = await self.session.execute(count_query)
-                total_count = total_result.scalar() or 0
-
                 # Apply sorting
                 sort_column = {
                     "item_name": Item.name,
@@ -155,13 +147,9 @@ class ReportService:
                 else:
                     query = query.order_by(asc(sort_column))
 
-                # Apply pagination
+                # Page and total count in one statement
                 offset = (page_index - 1) * page_size
-                query = query.offset(offset).limit(page_size)
-
-                # Execute query
-                result = await self.session.execute(query)
-                rows = result.fetchall()
+                rows, total_count = await self.report_query.fetch_page(query, page_index, page_size)
 
                 # Format data
                 data = []
@@ -196,6 +184,7 @@ class ReportService:
                 logger.error(f"Error in stock levels report: {str(e)}")
                 raise
 
+    @cached_report("stock_movements")
     async def get_stock_movements_report(
         self,
         page_index: int = 1,
@@ -255,15 +244,13 @@ class ReportService:
                 conditions.append(StockMovement.movement_type == movement_type)
             
             if search:
-                conditions.append(
-                    or_(
-                        Item.name.ilike(f"%{search}%"),
-                        Item.item_code.ilike(f"%{search}%"),
-                        Location.name.ilike(f"%{search}%"),
-                        StockMovement.remarks.ilike(f"%{search}%"),
-                        StockMovement.batch_number.ilike(f"%{search}%")
-                    )
-                )
+                conditions.append(search_filter(self.session, [
+                    SearchField(Item.name),
+                    SearchField(Item.item_code),
+                    SearchField(Location.name),
+                    SearchField(StockMovement.remarks),
+                    SearchField(StockMovement.batch_number),
+                ], search))
             
             # Location manager restriction - handles multiple locations per manager
             if user_id:
@@ -278,24 +265,13 @@ class ReportService:
             
             query = query.where(and_(*conditions))
 
-            # Get total count with proper query structure
-            count_query = (
-                select(func.count(StockMovement.id))
-                .select_from(StockMovement)
-                .join(Item, StockMovement.item_id == Item.id)
-                .join(Location, StockMovement.location_id == Location.id)
-                .where(and_(*conditions))
-            )
-            total_result = await self.session.execute(count_query)
-            total_count = total_result.scalar() or 0
-
-            # Apply pagination and sorting
+            # The page is an index top-N on movement_date while the count scans the whole
+            # range, so run them side by side rather than forcing a full window count
             offset = (page_index - 1) * page_size
-            query = query.order_by(desc(StockMovement.movement_date)).offset(offset).limit(page_size)
-
-            # Execute query
-            result = await self.session.execute(query)
-            rows = result.fetchall()
+            query = query.order_by(desc(StockMovement.movement_date))
+            rows, total_count = await self.report_query.fetch_page(
+                query, page_index, page_size, strategy=CountStrategy.CONCURRENT
+            )
 
             # Format data
             data = []
@@ -329,6 +305,7 @@ class ReportService:
             logger.error(f"Error in stock movements report: {str(e)}")
             raise
 
+    @cached_report("low_stock_alerts")
     async def get_low_stock_alerts_report(
         self,
         page_index: int = 1,
@@ -395,14 +372,12 @@ class ReportService:
 
             # Enhanced search functionality
             if search:
-                conditions.append(
-                    or_(
-                        Item.name.ilike(f"%{search}%"),
-                        Item.item_code.ilike(f"%{search}%"),
-                        Category.name.ilike(f"%{search}%"),
-                        Location.name.ilike(f"%{search}%")
-                    )
-                )
+                conditions.append(search_filter(self.session, [
+                    SearchField(Item.name),
+                    SearchField(Item.item_code),
+                    SearchField(Category.name),
+                    SearchField(Location.name),
+                ], search))
             
             # Location manager restriction - handles multiple locations per manager
             if user_id:
@@ -417,18 +392,6 @@ class ReportService:
             
             query = query.where(and_(*conditions))
 
-            # Get total count with proper query structure
-            count_query = (
-                select(func.count(StockLevel.id))
-                .select_from(StockLevel)
-                .join(Item, StockLevel.item_id == Item.id)
-                .join(Location, StockLevel.location_id == Location.id)
-                .outerjoin(Category, Item.category_id == Category.id)
-                .where(and_(*conditions))
-            )
-            total_result = await self.session.execute(count_query)
-            total_count = total_result.scalar() or 0
-
             # Apply pagination and sorting (critical items first)
             offset = (page_index - 1) * page_size
             query = query.order_by(
@@ -438,11 +401,8 @@ class ReportService:
                     else_=3
                 ),
                 StockLevel.current_stock
-            ).offset(offset).limit(page_size)
-
-            # Execute query
-            result = await self.session.execute(query)
-            rows = result.fetchall()
+            )
+            rows, total_count = await self.report_query.fetch_page(query, page_index, page_size)
 
             # Format data
             data = []
@@ -485,6 +445,7 @@ class ReportService:
 
     # =================== PURCHASE REPORTS ===================
 
+    @cached_report("purchase_orders_summary")
     async def get_purchase_orders_summary_report(
         self,
         page_index: int = 1,
@@ -549,26 +510,16 @@ class ReportService:
                 query = query.where(PurchaseOrder.status == status)
             
             if search:
-                query = query.where(
-                    or_(
-                        PurchaseOrder.po_number.ilike(f"%{search}%"),
-                        Supplier.name.ilike(f"%{search}%"),
-                        Supplier.supplier_code.ilike(f"%{search}%")
-                    )
-                )
-
-            # Get total count
-            count_query = select(func.count()).select_from(query.subquery())
-            total_result = await self.session.execute(count_query)
-            total_count = total_result.scalar()
+                query = query.where(search_filter(self.session, [
+                    SearchField(PurchaseOrder.po_number),
+                    SearchField(Supplier.name),
+                    SearchField(Supplier.supplier_code),
+                ], search))
 
             # Apply pagination and sorting
             offset = (page_index - 1) * page_size
-            query = query.order_by(desc(PurchaseOrder.order_date)).offset(offset).limit(page_size)
-
-            # Execute query
-            result = await self.session.execute(query)
-            rows = result.fetchall()
+            query = query.order_by(desc(PurchaseOrder.order_date))
+            rows, total_count = await self.report_query.fetch_page(query, page_index, page_size)
 
             # Format data
             data = []
@@ -607,6 +558,7 @@ class ReportService:
 
     # =================== DEMAND FORECAST REPORT ===================
 
+    @cached_report("demand_forecast")
     async def get_demand_forecast_report(
         self,
         page_index: int = 1,
@@ -677,26 +629,17 @@ class ReportService:
 
             # Enhanced search functionality
             if search:
-                search_filter = or_(
-                    Item.name.ilike(f"%{search}%"),
-                    Item.item_code.ilike(f"%{search}%"),
-                    Category.name.ilike(f"%{search}%"),
-                    Location.name.ilike(f"%{search}%")
-                )
-                query = query.where(search_filter)
-
-            # Get total count
-            count_query = select(func.count()).select_from(query.subquery())
-            total_result = await self.session.execute(count_query)
-            total_count = total_result.scalar()
+                query = query.where(search_filter(self.session, [
+                    SearchField(Item.name),
+                    SearchField(Item.item_code),
+                    SearchField(Category.name),
+                    SearchField(Location.name),
+                ], search))
 
             # Apply pagination
             offset = (page_index - 1) * page_size
-            query = query.order_by(desc("historical_demand")).offset(offset).limit(page_size)
-
-            # Execute query
-            result = await self.session.execute(query)
-            rows = result.fetchall()
+            query = query.order_by(desc("historical_demand"))
+            rows, total_count = await self.report_query.fetch_page(query, page_index, page_size)
 
             # Format data with forecast calculations
             data = []
@@ -750,6 +693,7 @@ class ReportService:
 
     # =================== HR ATTENDANCE REPORTS ===================
 
+    @cached_report("attendance_summary")
     async def get_attendance_summary_report(
         self,
         page_index: int = 1,
@@ -771,66 +715,84 @@ class ReportService:
             if not to_date:
                 to_date = datetime.now().date()
 
-            # Build query with comprehensive attendance metrics
-            query = select(
-                Employee.id.label("employee_id"),
-                Employee.employee_id.label("employee_code"),
-                (Employee.first_name + ' ' + Employee.last_name).label("employee_name"),
-                Department.name.label("department_name"),
-                Location.name.label("location_name"),
-                
-                # Attendance counts
-                func.count(Attendance.id).label("total_attendance_records"),
-                func.count(
-                    case((Attendance.status == AttendanceStatus.PRESENT, 1), else_=None)
-                ).label("present_days"),
-                func.count(
-                    case((Attendance.status == AttendanceStatus.ABSENT, 1), else_=None)
-                ).label("absent_days"),
-                func.count(
-                    case((Attendance.status == AttendanceStatus.LATE, 1), else_=None)
-                ).label("late_days"),
-                func.count(
-                    case((Attendance.status == AttendanceStatus.LEFT_EARLY, 1), else_=None)
-                ).label("early_leave_days"),
-                
-                # Time calculations
-                func.sum(Attendance.total_hours).label("total_hours_worked"),
-                func.sum(Attendance.overtime_hours).label("total_overtime_hours"),
-                func.avg(Attendance.total_hours).label("avg_daily_hours"),
-                func.sum(Attendance.late_minutes).label("total_late_minutes"),
-                func.sum(Attendance.early_leave_minutes).label("total_early_leave_minutes"),
+            if self._covers_whole_months(from_date, to_date):
+                # Whole months: read the maintained employee-month rows instead of raw attendances
+                query = self._attendance_month_summary_query(from_date, to_date)
+                present_count = func.sum(EmployeeMonthAttendance.present_days)
+                record_count = func.sum(EmployeeMonthAttendance.record_count)
+            else:
+                # Build query with comprehensive attendance metrics
+                query = select(
+                    Employee.id.label("employee_id"),
+                    Employee.employee_id.label("employee_code"),
+                    (Employee.first_name + ' ' + Employee.last_name).label("employee_name"),
+                    Department.name.label("department_name"),
+                    Location.name.label("location_name"),
                 
-                # Working days calculation
-                func.count(
-                    distinct(
+                    # Attendance counts
+                    func.count(Attendance.id).label("total_attendance_records"),
+                    func.count(
+                        case((Attendance.status == AttendanceStatus.PRESENT, 1), else_=None)
+                    ).label("present_days"),
+                    func.count(
                         case(
-                            (Attendance.is_holiday == False, Attendance.attendance_date),
+                            (
+                                and_(
+                                    Attendance.status == AttendanceStatus.ABSENT,
+                                    Attendance.is_weekend.is_not(True),
+                                    Attendance.is_holiday.is_not(True)
+                                ),
+                                1
+                            ),
                             else_=None
                         )
-                    )
-                ).label("total_working_days")
+                    ).label("absent_days"),
+                    func.count(
+                        case((Attendance.status == AttendanceStatus.LATE, 1), else_=None)
+                    ).label("late_days"),
+                    func.count(
+                        case((Attendance.status == AttendanceStatus.LEFT_EARLY, 1), else_=None)
+                    ).label("early_leave_days"),
                 
-            ).select_from(Employee)\
-            .join(Attendance, Employee.id == Attendance.employee_id)\
-            .outerjoin(Department, Employee.department_id == Department.id)\
-            .outerjoin(Location, Employee.location_id == Location.id)\
-            .where(
-                and_(
-                    Employee.is_deleted == False,
-                    Employee.is_active == True,
-                    Attendance.is_deleted == False,
-                    Attendance.attendance_date >= from_date,
-                    Attendance.attendance_date <= to_date
+                    # Time calculations
+                    func.sum(Attendance.total_hours).label("total_hours_worked"),
+                    func.sum(Attendance.overtime_hours).label("total_overtime_hours"),
+                    func.avg(Attendance.total_hours).label("avg_daily_hours"),
+                    func.sum(Attendance.late_minutes).label("total_late_minutes"),
+                    func.sum(Attendance.early_leave_minutes).label("total_early_leave_minutes"),
+                
+                    # Working days calculation
+                    func.count(
+                        distinct(
+                            case(
+                                (Attendance.is_holiday.is_not(True), Attendance.attendance_date),
+                                else_=None
+                            )
+                        )
+                    ).label("total_working_days")
+                
+                ).select_from(Employee)\
+                .join(Attendance, Employee.id == Attendance.employee_id)\
+                .outerjoin(Department, Employee.department_id == Department.id)\
+                .outerjoin(Location, Employee.location_id == Location.id)\
+                .where(
+                    and_(
+                        Employee.is_deleted == False,
+                        Employee.is_active == True,
+                        Attendance.is_deleted == False,
+                        Attendance.attendance_date >= from_date,
+                        Attendance.attendance_date <= to_date
+                    )
+                ).group_by(
+                    Employee.id,
+                    Employee.employee_id,
+                    Employee.first_name,
+                    Employee.last_name,
+                    Department.name,
+                    Location.name
                 )
-            ).group_by(
-                Employee.id,
-                Employee.employee_id,
-                Employee.first_name,
-                Employee.last_name,
-                Department.name,
-                Location.name
-            )
+                present_count = func.count(case((Attendance.status == AttendanceStatus.PRESENT, 1), else_=None))
+                record_count = func.count(Attendance.id)
 
             # Apply filters
             if department_id:
@@ -843,40 +805,25 @@ class ReportService:
                 # Filter for employees with specific attendance patterns
                 if attendance_status == "POOR":
                     # Employees with attendance < 80%
-                    query = query.having(
-                        (func.count(case((Attendance.status == AttendanceStatus.PRESENT, 1), else_=None)) / 
-                        func.count(Attendance.id) * 100) < 80
-                    )
+                    query = query.having((present_count / record_count * 100) < 80)
                 elif attendance_status == "EXCELLENT":
                     # Employees with attendance >= 95%
-                    query = query.having(
-                        (func.count(case((Attendance.status == AttendanceStatus.PRESENT, 1), else_=None)) / 
-                        func.count(Attendance.id) * 100) >= 95
-                    )
+                    query = query.having((present_count / record_count * 100) >= 95)
 
              # Enhanced search functionality
             if search:
-                search_filter = or_(
-                    Employee.first_name.ilike(f"%{search}%"),
-                    Employee.last_name.ilike(f"%{search}%"),
-                    (Employee.first_name + ' ' + Employee.last_name).ilike(f"%{search}%"),
-                    Employee.employee_id.ilike(f"%{search}%"),
-                    Department.name.ilike(f"%{search}%")
-                )
-                query = query.where(search_filter)
-
-            # Get total count
-            count_query = select(func.count()).select_from(query.subquery())
-            total_result = await self.session.execute(count_query)
-            total_count = total_result.scalar()
+                query = query.where(search_filter(self.session, [
+                    SearchField(Employee.first_name),
+                    SearchField(Employee.last_name),
+                    SearchField(employee_full_name()),
+                    SearchField(Employee.employee_id),
+                    SearchField(Department.name),
+                ], search))
 
             # Apply pagination and sorting
             offset = (page_index - 1) * page_size
-            query = query.order_by(Employee.first_name).offset(offset).limit(page_size)
-
-            # Execute query
-            result = await self.session.execute(query)
-            rows = result.fetchall()
+            query = query.order_by(Employee.first_name)
+            rows, total_count = await self.report_query.fetch_page(query, page_index, page_size)
 
             # Calculate total business days in the period for accurate percentages
             business_days = self._calculate_business_days(from_date, to_date)
@@ -938,6 +885,55 @@ class ReportService:
             logger.error(f"Error in attendance summary report: {str(e)}")
             raise
 
+    def _covers_whole_months(self, from_date: date, to_date: date) -> bool:
+        """True when the range starts on the 1st and runs to a month end (or to today)"""
+        if from_date.day != 1 or to_date < from_date:
+            return False
+        return (to_date + timedelta(days=1)).day == 1 or to_date >= date.today()
+
+    def _attendance_month_summary_query(self, from_date: date, to_date: date):
+        """Attendance summary columns summed over employee_month_attendance rows"""
+        return select(
+            Employee.id.label("employee_id"),
+            Employee.employee_id.label("employee_code"),
+            (Employee.first_name + ' ' + Employee.last_name).label("employee_name"),
+            Department.name.label("department_name"),
+            Location.name.label("location_name"),
+            func.sum(EmployeeMonthAttendance.record_count).label("total_attendance_records"),
+            func.sum(EmployeeMonthAttendance.present_days).label("present_days"),
+            func.sum(EmployeeMonthAttendance.absent_days).label("absent_days"),
+            func.sum(EmployeeMonthAttendance.late_days).label("late_days"),
+            func.sum(EmployeeMonthAttendance.left_early_days).label("early_leave_days"),
+            func.sum(EmployeeMonthAttendance.total_hours).label("total_hours_worked"),
+            func.sum(EmployeeMonthAttendance.overtime_hours).label("total_overtime_hours"),
+            (
+                func.sum(EmployeeMonthAttendance.total_hours) /
+                func.nullif(func.sum(EmployeeMonthAttendance.hours_days), 0)
+            ).label("avg_daily_hours"),
+            func.sum(EmployeeMonthAttendance.late_minutes).label("total_late_minutes"),
+            func.sum(EmployeeMonthAttendance.early_leave_minutes).label("total_early_leave_minutes"),
+            func.sum(EmployeeMonthAttendance.non_holiday_days).label("total_working_days")
+        ).select_from(Employee)\
+        .join(EmployeeMonthAttendance, Employee.id == EmployeeMonthAttendance.employee_id)\
+        .outerjoin(Department, Employee.department_id == Department.id)\
+        .outerjoin(Location, Employee.location_id == Location.id)\
+        .where(
+            and_(
+                Employee.is_deleted == False,
+                Employee.is_active == True,
+                EmployeeMonthAttendance.month >= from_date.replace(day=1),
+                EmployeeMonthAttendance.month <= to_date.replace(day=1),
+                EmployeeMonthAttendance.record_count > 0
+            )
+        ).group_by(
+            Employee.id,
+            Employee.employee_id,
+            Employee.first_name,
+            Employee.last_name,
+            Department.name,
+            Location.name
+        )
+
     def _calculate_business_days(self, from_date: date, to_date: date) -> int:
         """Calculate business days between two dates"""
         try:
@@ -956,6 +952,7 @@ class ReportService:
 
     # =================== HR SALARY REPORTS ===================
 
+    @cached_report("salary_summary")
     async def get_salary_summary_report(
         self,
         page_index: int = 1,
@@ -1038,20 +1035,14 @@ class ReportService:
 
             # Enhanced search functionality
             if search:
-                search_filter = or_(
-                    Employee.first_name.ilike(f"%{search}%"),
-                    Employee.last_name.ilike(f"%{search}%"),
-                    (Employee.first_name + ' ' + Employee.last_name).ilike(f"%{search}%"),
-                    Employee.employee_id.ilike(f"%{search}%"),
-                    Department.name.ilike(f"%{search}%"),
-                    Employee.position.ilike(f"%{search}%")
-                )
-                query = query.where(search_filter)
-
-            # Get total count
-            count_query = select(func.count()).select_from(query.subquery())
-            total_result = await self.session.execute(count_query)
-            total_count = total_result.scalar()
+                query = query.where(search_filter(self.session, [
+                    SearchField(Employee.first_name),
+                    SearchField(Employee.last_name),
+                    SearchField(employee_full_name()),
+                    SearchField(Employee.employee_id),
+                    SearchField(Department.name),
+                    SearchField(Employee.position),
+                ], search))
 
             # Apply sorting
             sort_column = {
@@ -1074,11 +1065,8 @@ class ReportService:
             query = query.order_by(
                 Employee.department_id,
                 Employee.first_name
-            ).offset(offset).limit(page_size)
-
-            # Execute query
-            result = await self.session.execute(query)
-            rows = result.fetchall()
+            )
+            rows, total_count = await self.report_query.fetch_page(query, page_index, page_size)
 
             # Format data
             data = []
@@ -1170,6 +1158,7 @@ class ReportService:
 
     # =================== LOGISTICS SHIPMENT TRACKING REPORTS ===================
 
+    @cached_report("shipment_tracking")
     async def get_shipment_tracking_report(
         self,
         page_index: int = 1,
@@ -1273,30 +1262,21 @@ class ReportService:
 
             # Enhanced search functionality
             if search:
-                search_filter = or_(
-                    Shipment.shipment_number.ilike(f"%{search}%"),
-                    (Employee.first_name + ' ' + Employee.last_name).ilike(f"%{search}%"),
-                    Employee.first_name.ilike(f"%{search}%"),
-                    Employee.last_name.ilike(f"%{search}%"),
-                    Vehicle.vehicle_number.ilike(f"%{search}%"),
-                    Location.name.ilike(f"%{search}%"),
-                    ToLocation.name.ilike(f"%{search}%"),
-                    Shipment.notes.ilike(f"%{search}%")
-                )
-                query = query.where(search_filter)
-
-            # Get total count
-            count_query = select(func.count()).select_from(query.subquery())
-            total_result = await self.session.execute(count_query)
-            total_count = total_result.scalar()
+                query = query.where(search_filter(self.session, [
+                    SearchField(Shipment.shipment_number),
+                    SearchField(employee_full_name()),
+                    SearchField(Employee.first_name),
+                    SearchField(Employee.last_name),
+                    SearchField(Vehicle.vehicle_number),
+                    SearchField(Location.name),
+                    SearchField(ToLocation.name),
+                    SearchField(Shipment.notes),
+                ], search))
 
             # Apply pagination and sorting
             offset = (page_index - 1) * page_size
-            query = query.order_by(desc(Shipment.shipment_date)).offset(offset).limit(page_size)
-
-            # Execute query
-            result = await self.session.execute(query)
-            rows = result.fetchall()
+            query = query.order_by(desc(Shipment.shipment_date))
+            rows, total_count = await self.report_query.fetch_page(query, page_index, page_size)
 
             # Format data
             data = []
@@ -0,0 +1,209 @@
+"""
+Ranked search shared by list services, reports and typeahead.
+
+Name and code columns match by substring with ILIKE, which PostgreSQL serves
+from pg_trgm GIN indexes instead of scanning; long text columns (descriptions)
+match by full-text search against expression indexes on
+`to_tsvector('simple', coalesce(column, ''))`. Results rank by trigram
+similarity and text rank, with a bonus for prefix hits. The indexes live in
+migrations 9c5e2d7a4f18 and e3b8d5f1a9c7 only: SQLite (tests) has neither
+extension, and there the same helpers fall back to ILIKE and prefix ranking.
+"""
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from sqlalchemy import case, func, literal, literal_column, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.auth.user import User
+from app.models.hr.employee import Employee
+from app.models.inventory.category import Category
+from app.models.inventory.item import Item
+from app.models.inventory.product import Product
+from app.models.organization.location import Location
+from app.models.purchase.goods_receipt import GoodsReceipt
+from app.models.purchase.purchase_order import PurchaseOrder
+from app.models.purchase.supplier import Supplier
+
+logger = logging.getLogger(__name__)
+
+TRIGRAM = "trigram"
+FULL_TEXT = "text"
+# Regconfig inline so the expression matches the index definition exactly
+_TS_CONFIG = literal_column("'simple'::regconfig")
+# Below this length trigrams cannot use the index; typeahead matches prefixes only
+MIN_TRIGRAM_LENGTH = 3
+
+
+@dataclass(frozen=True)
+class SearchField:
+    """A searchable column or expression and its weight in the rank"""
+    column: Any
+    weight: float = 1.0
+    kind: str = TRIGRAM
+
+
+def employee_full_name():
+    """first_name || ' ' || last_name, rendered to match its trigram index"""
+    return Employee.first_name + literal_column("' '") + Employee.last_name
+
+
+SEARCH_FIELDS: Dict[str, List[SearchField]] = {
+    "item": [
+        SearchField(Item.name, 1.0),
+        SearchField(Item.item_code, 1.0),
+        SearchField(Item.description, 0.3, FULL_TEXT),
+    ],
+    "product": [
+        SearchField(Product.name, 1.0),
+        SearchField(Product.product_code, 1.0),
+        SearchField(Product.description, 0.3, FULL_TEXT),
+    ],
+    "employee": [
+        SearchField(employee_full_name(), 1.0),
+        SearchField(Employee.first_name, 0.8),
+        SearchField(Employee.last_name, 0.8),
+        SearchField(Employee.employee_id, 1.0),
+        SearchField(Employee.email, 0.5),
+        SearchField(Employee.phone, 0.5),
+    ],
+    "supplier": [
+        SearchField(Supplier.name, 1.0),
+        SearchField(Supplier.supplier_code, 1.0),
+        SearchField(Supplier.contact_person, 0.5),
+    ],
+    "category": [
+        SearchField(Category.name, 1.0),
+        SearchField(Category.description, 0.3, FULL_TEXT),
+    ],
+    "purchase_order": [
+        SearchField(PurchaseOrder.po_number, 1.0),
+        SearchField(PurchaseOrder.notes, 0.3, FULL_TEXT),
+    ],
+    # Listings join the receipt's location to search its name
+    "goods_receipt": [
+        SearchField(GoodsReceipt.receipt_number, 1.0),
+        SearchField(Location.name, 0.5),
+        SearchField(GoodsReceipt.notes, 0.3, FULL_TEXT),
+    ],
+    "user": [
+        SearchField(User.email, 1.0),
+        SearchField(User.username, 1.0),
+        SearchField(User.full_name, 1.0),
+    ],
+}
+
+# Typeahead: (model, label, code, live condition) per entity type
+TYPEAHEAD_ENTITIES = {
+    "item": (Item, Item.name, Item.item_code, Item.is_active == True),
+    "product": (Product, Product.name, Product.product_code, Product.is_active == True),
+    "employee": (Employee, employee_full_name(), Employee.employee_id, Employee.is_active == True),
+    "supplier": (Supplier, Supplier.name, Supplier.supplier_code, (Supplier.is_active == True) & (Supplier.is_deleted == False)),
+}
+
+
+def _is_postgres(session: AsyncSession) -> bool:
+    return session.bind is None or session.bind.dialect.name == "postgresql"
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _tsvector(column):
+    return func.to_tsvector(_TS_CONFIG, func.coalesce(column, literal_column("''")))
+
+
+def _prefix_match(column, term: str):
+    return func.lower(column).like(f"{_escape_like(term.lower())}%", escape="\\")
+
+
+def search_filter(session: AsyncSession, fields: Sequence[SearchField], term: str):
+    """Rows where any field matches `term`"""
+    term = term.strip()
+    pattern = f"%{_escape_like(term)}%"
+    postgres = _is_postgres(session)
+    conditions = []
+    for field in fields:
+        if field.kind == FULL_TEXT and postgres:
+            conditions.append(_tsvector(field.column).op("@@")(func.plainto_tsquery(_TS_CONFIG, term)))
+        else:
+            conditions.append(field.column.ilike(pattern, escape="\\"))
+    return or_(*conditions)
+
+
+def search_rank(session: AsyncSession, fields: Sequence[SearchField], term: str):
+    """Relevance of a row for `term`; higher is better"""
+    term = term.strip()
+    if not _is_postgres(session):
+        return case(
+            (or_(*[_prefix_match(field.column, term) for field in fields if field.kind == TRIGRAM]), 1),
+            else_=0,
+        )
+
+    parts = []
+    for field in fields:
+        if field.kind == FULL_TEXT:
+            parts.append(field.weight * func.ts_rank(_tsvector(field.column), func.plainto_tsquery(_TS_CONFIG, term)))
+        else:
+            parts.append(field.weight * func.coalesce(func.similarity(field.column, term), 0))
+            parts.append(case((_prefix_match(field.column, term), field.weight), else_=0))
+    rank = parts[0]
+    for part in parts[1:]:
+        rank = rank + part
+    return rank
+
+
+def apply_search(session: AsyncSession, query, fields: Sequence[SearchField], term: Optional[str], *order_by):
+    """Filter `query` by `term` and order by rank (then `order_by`); unchanged without a term"""
+    if not term or not term.strip():
+        return query.order_by(*order_by) if order_by else query
+    return query.where(search_filter(session, fields, term)).order_by(
+        search_rank(session, fields, term).desc(), *order_by
+    )
+
+
+class SearchService:
+    """Cross-entity typeahead"""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def typeahead(self, term: str, types: Optional[Iterable[str]] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """Top `limit` matches across entity types in one statement: type, id, label, code, score"""
+        term = term.strip()
+        types = [entity for entity in (types or TYPEAHEAD_ENTITIES) if entity in TYPEAHEAD_ENTITIES]
+        if not term or not types:
+            return []
+
+        parts = []
+        for entity in types:
+            model, label, code, live = TYPEAHEAD_ENTITIES[entity]
+            fields = [SearchField(label), SearchField(code)]
+            if len(term) < MIN_TRIGRAM_LENGTH:
+                condition = or_(_prefix_match(label, term), _prefix_match(code, term))
+            else:
+                condition = search_filter(self.session, fields, term)
+            score = search_rank(self.session, fields, term)
+            parts.append(
+                select(
+                    literal(entity).label("type"),
+                    model.id.label("id"),
+                    label.label("label"),
+                    code.label("code"),
+                    score.label("score"),
+                )
+                .where(live, condition)
+                .order_by(score.desc())
+                .limit(limit)
+                .subquery()
+            )
+
+        combined = union_all(*[select(part) for part in parts]).subquery()
+        result = await self.session.execute(
+            select(combined).order_by(combined.c.score.desc(), combined.c.label).limit(limit)
+        )
+        return [
+            {"type": row.type, "id": row.id, "label": row.label, "code": row.code, "score": float(row.score or 0)}
+            for row in result
+        ]
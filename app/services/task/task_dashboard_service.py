@@ -1,12 +1,37 @@
 from typing import Dict, Any, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import func, and_, or_, desc, case, select
-from datetime import datetime, timedelta, date
+from datetime import datetime, timedelta, date, timezone
 from app.models.task.task import Task
 from app.models.task.task_type import TaskType
 from app.models.auth import User
 from app.models.shared.enums import TaskStatus, TaskPriority
 
+# Which tasks each dashboard role sees (tasks joined to their task type)
+ROLE_TASK_FILTERS = {
+    "BRANCH_MANAGER": or_(
+        TaskType.category.in_(["INVENTORY", "PURCHASE", "OPERATIONS"]),
+        Task.priority.in_([TaskPriority.HIGH, TaskPriority.URGENT]),
+        TaskType.requires_approval == True
+    ),
+    "CHEF": or_(
+        TaskType.category.in_(["OPERATIONS", "MAINTENANCE"]),
+        Task.reference_type.in_(["LOW_STOCK_ALERT", "EQUIPMENT_MAINTENANCE", "MENU_PLANNING"])
+    ),
+    "STAFF": and_(
+        TaskType.category.in_(["OPERATIONS", "CUSTOMER_SERVICE"]),
+        Task.priority.in_([TaskPriority.LOW, TaskPriority.MEDIUM])
+    ),
+    "HR_MANAGER": TaskType.category == "HR",
+    "INVENTORY_MANAGER": TaskType.category == "INVENTORY",
+    "WAREHOUSE_MANAGER": or_(
+        TaskType.category.in_(["INVENTORY", "LOGISTICS"]),
+        Task.reference_type.in_(["TRANSFER_REQUEST", "STOCK_COUNT"])
+    ),
+}
+
+TASK_COUNT_METRICS = ("total", "pending", "in_progress", "completed", "urgent", "overdue")
+
 class TaskDashboardService:
     """Service for task dashboard and analytics"""
     
@@ -15,56 +40,53 @@ class TaskDashboardService:
 
     async def get_department_overview(self, department_id: Optional[int] = None) -> Dict[str, Any]:
         """Get department task overview by roles"""
-        
-        # Base query for tasks
-        base_query = select(Task).where(Task.is_active == True)
-        
-        if department_id:
-            base_query = base_query.where(Task.department_id == department_id)
-        
-        # Get role-based task summaries
-        role_summaries = {}
-        
-        # Branch Manager tasks
-        branch_manager_tasks = await self._get_branch_manager_tasks(base_query)
-        role_summaries["Branch Manager"] = await self._calculate_role_summary(
-            branch_manager_tasks, "Branch Manager", "👨‍💼"
-        )
-        
-        # Chef tasks  
-        chef_tasks = await self._get_chef_tasks(base_query)
-        role_summaries["Chef"] = await self._calculate_role_summary(
-            chef_tasks, "Chef", "👨‍🍳"
-        )
-        
-        # Staff tasks
-        staff_tasks = await self._get_staff_tasks(base_query)
-        role_summaries["Staff"] = await self._calculate_role_summary(
-            staff_tasks, "Staff", "👥"
+        conditions = [Task.department_id == department_id] if department_id else []
+        counts = await self.get_role_task_counts(ROLE_TASK_FILTERS, conditions)
+
+        # Role-based task summaries; the specialist roles only when they have tasks
+        roles = [
+            ("BRANCH_MANAGER", "Branch Manager", "👨‍💼", True),
+            ("CHEF", "Chef", "👨‍🍳", True),
+            ("STAFF", "Staff", "👥", True),
+            ("HR_MANAGER", "HR Manager", "👨‍💼", False),
+            ("INVENTORY_MANAGER", "Inventory Manager", "📦", False),
+            ("WAREHOUSE_MANAGER", "Warehouse Manager", "🏭", False),
+        ]
+        return {
+            role_name: self._calculate_role_summary(counts[key], role_name, icon)
+            for key, role_name, icon, always in roles
+            if always or counts[key]["total"]
+        }
+
+    async def get_role_task_counts(self, role_filters: Dict[str, Any], conditions: Optional[List[Any]] = None) -> Dict[str, Dict[str, int]]:
+        """Task counts per role filter, all roles in one statement (COUNT(*) FILTER per role and metric)"""
+        metrics = {
+            "total": None,
+            "pending": Task.status == TaskStatus.PENDING,
+            "in_progress": Task.status == TaskStatus.IN_PROGRESS,
+            "completed": Task.status == TaskStatus.COMPLETED,
+            "urgent": Task.priority == TaskPriority.URGENT,
+            "overdue": and_(
+                Task.due_date < func.now(),
+                Task.status.notin_([TaskStatus.COMPLETED, TaskStatus.CANCELLED])
+            ),
+        }
+        columns = [
+            func.count().filter(predicate if metric is None else and_(predicate, metric)).label(f"{key}__{name}")
+            for key, predicate in role_filters.items()
+            for name, metric in metrics.items()
+        ]
+        result = await self.db.execute(
+            select(*columns)
+            .select_from(Task)
+            .join(TaskType, TaskType.id == Task.task_type_id)
+            .where(Task.is_active == True, *(conditions or []))
         )
-        
-        # HR Manager tasks
-        hr_tasks = await self._get_hr_manager_tasks(base_query)
-        if hr_tasks:
-            role_summaries["HR Manager"] = await self._calculate_role_summary(
-                hr_tasks, "HR Manager", "👨‍💼"
-            )
-        
-        # Inventory Manager tasks
-        inventory_tasks = await self._get_inventory_manager_tasks(base_query)
-        if inventory_tasks:
-            role_summaries["Inventory Manager"] = await self._calculate_role_summary(
-                inventory_tasks, "Inventory Manager", "📦"
-            )
-        
-        # Warehouse Manager tasks
-        warehouse_tasks = await self._get_warehouse_manager_tasks(base_query)
-        if warehouse_tasks:
-            role_summaries["Warehouse Manager"] = await self._calculate_role_summary(
-                warehouse_tasks, "Warehouse Manager", "🏭"
-            )
-        
-        return role_summaries
+        row = result.one()._mapping
+        return {
+            key: {name: row[f"{key}__{name}"] or 0 for name in TASK_COUNT_METRICS}
+            for key in role_filters
+        }
 
     async def get_task_analytics(self, days: int = 30, user_id: Optional[int] = None, department_id: Optional[int] = None) -> Dict[str, Any]:
         """Get task analytics for specified period"""
@@ -362,148 +384,109 @@ class TaskDashboardService:
             ]
         }
 
-    async def get_overdue_tasks_summary(self, department_id: Optional[int] = None) -> Dict[str, Any]:
-        """Get summary of overdue tasks"""
+    async def get_overdue_tasks_summary(self, department_id: Optional[int] = None, limit: int = 5) -> Dict[str, Any]:
+        """Get summary of overdue tasks: totals computed in SQL, only the top `limit` cards per group"""
         overdue_conditions = [
-            Task.due_date < datetime.utcnow(),
+            Task.due_date < func.now(),
             Task.status.notin_([TaskStatus.COMPLETED, TaskStatus.CANCELLED]),
             Task.is_active == True
         ]
         
         if department_id:
             overdue_conditions.append(Task.department_id == department_id)
-        
-        overdue_result = await self.db.execute(
-            select(Task).where(and_(*overdue_conditions))
-        )
-        overdue_tasks = overdue_result.scalars().all()
-        
-        # Group by assignee
-        by_assignee = {}
-        for task in overdue_tasks:
-            if task.assigned_to:
-                if task.assigned_to not in by_assignee:
-                    assignee_result = await self.db.execute(
-                        select(User).where(User.id == task.assigned_to)
-                    )
-                    assignee = assignee_result.scalar_one_or_none()
-                    by_assignee[task.assigned_to] = {
-                        "name": assignee.full_name if assignee else "Unknown",
-                        "tasks": []
-                    }
-                by_assignee[task.assigned_to]["tasks"].append({
-                    "id": task.id,
-                    "title": task.title,
-                    "priority": task.priority.value,
-                    "due_date": task.due_date.isoformat(),
-                    "days_overdue": (datetime.utcnow() - task.due_date).days
-                })
-        
-        # Group by priority
-        by_priority = {}
-        for task in overdue_tasks:
-            priority = task.priority.value
-            if priority not in by_priority:
-                by_priority[priority] = []
-            by_priority[priority].append({
-                "id": task.id,
-                "title": task.title,
-                "assignee": task.assignee.full_name if task.assignee else "Unassigned",
-                "due_date": task.due_date.isoformat(),
-                "days_overdue": (datetime.utcnow() - task.due_date).days
-            })
-        
-        return {
-            "total_overdue": len(overdue_tasks),
-            "by_assignee": by_assignee,
-            "by_priority": by_priority,
-            "critical_overdue": len([t for t in overdue_tasks if t.priority == TaskPriority.URGENT]),
-            "avg_days_overdue": sum([(datetime.utcnow() - t.due_date).days for t in overdue_tasks]) / len(overdue_tasks) if overdue_tasks else 0
-        }
-
-    async def _get_branch_manager_tasks(self, base_query) -> List[Task]:
-        """Get tasks relevant to branch managers"""
-        result = await self.db.execute(
-            base_query.join(TaskType).where(
-                or_(
-                    TaskType.category.in_(["INVENTORY", "PURCHASE", "OPERATIONS"]),
-                    Task.priority.in_([TaskPriority.HIGH, TaskPriority.URGENT]),
-                    TaskType.requires_approval == True
-                )
-            )
-        )
-        return result.scalars().all()
 
-    async def _get_chef_tasks(self, base_query) -> List[Task]:
-        """Get tasks relevant to chefs"""
-        result = await self.db.execute(
-            base_query.join(TaskType).where(
-                or_(
-                    TaskType.category.in_(["OPERATIONS", "MAINTENANCE"]),
-                    Task.reference_type.in_(["LOW_STOCK_ALERT", "EQUIPMENT_MAINTENANCE", "MENU_PLANNING"])
-                )
-            )
-        )
-        return result.scalars().all()
+        days_overdue = func.floor(func.extract('epoch', func.now() - Task.due_date) / 86400)
 
-    async def _get_staff_tasks(self, base_query) -> List[Task]:
-        """Get general staff tasks"""
-        result = await self.db.execute(
-            base_query.join(TaskType).where(
-                and_(
-                    TaskType.category.in_(["OPERATIONS", "CUSTOMER_SERVICE"]),
-                    Task.priority.in_([TaskPriority.LOW, TaskPriority.MEDIUM])
-                )
-            )
-        )
-        return result.scalars().all()
-
-    async def _get_hr_manager_tasks(self, base_query) -> List[Task]:
-        """Get HR manager tasks"""
-        result = await self.db.execute(
-            base_query.join(TaskType).where(TaskType.category == "HR")
+        # Totals and per-priority counts
+        totals_result = await self.db.execute(
+            select(
+                func.count().label('total'),
+                func.avg(days_overdue).label('avg_days'),
+                *[func.count().filter(Task.priority == priority).label(priority.value) for priority in TaskPriority]
+            ).where(and_(*overdue_conditions))
         )
-        return result.scalars().all()
+        totals = totals_result.one()._mapping
 
-    async def _get_inventory_manager_tasks(self, base_query) -> List[Task]:
-        """Get inventory manager tasks"""
-        result = await self.db.execute(
-            base_query.join(TaskType).where(TaskType.category == "INVENTORY")
+        # Per-assignee counts
+        assignee_result = await self.db.execute(
+            select(Task.assigned_to, User.full_name, func.count().label('task_count'))
+            .join(User, User.id == Task.assigned_to)
+            .where(and_(*overdue_conditions))
+            .group_by(Task.assigned_to, User.full_name)
         )
-        return result.scalars().all()
+        by_assignee = {
+            row.assigned_to: {"name": row.full_name or "Unknown", "count": row.task_count, "tasks": []}
+            for row in assignee_result
+        }
 
-    async def _get_warehouse_manager_tasks(self, base_query) -> List[Task]:
-        """Get warehouse manager tasks"""
-        result = await self.db.execute(
-            base_query.join(TaskType).where(
-                or_(
-                    TaskType.category.in_(["INVENTORY", "LOGISTICS"]),
-                    Task.reference_type.in_(["TRANSFER_REQUEST", "STOCK_COUNT"])
-                )
+        # Most overdue cards per priority and per assignee, in one ranked query
+        ranked = (
+            select(
+                Task.id,
+                Task.title,
+                Task.priority,
+                Task.due_date,
+                Task.assigned_to,
+                User.full_name.label('assignee_name'),
+                func.row_number().over(partition_by=Task.priority, order_by=Task.due_date).label('priority_rank'),
+                func.row_number().over(partition_by=Task.assigned_to, order_by=Task.due_date).label('assignee_rank')
             )
+            .outerjoin(User, User.id == Task.assigned_to)
+            .where(and_(*overdue_conditions))
+            .subquery()
+        )
+        cards_result = await self.db.execute(
+            select(ranked)
+            .where(or_(ranked.c.priority_rank <= limit, ranked.c.assignee_rank <= limit))
+            .order_by(ranked.c.due_date)
         )
-        return result.scalars().all()
 
-    async def _calculate_role_summary(self, tasks: List[Task], role_name: str, icon: str = "") -> Dict[str, Any]:
-        """Calculate summary statistics for role tasks"""
-        total_tasks = len(tasks)
-        pending_tasks = len([t for t in tasks if t.status == TaskStatus.PENDING])
-        in_progress_tasks = len([t for t in tasks if t.status == TaskStatus.IN_PROGRESS])
-        completed_tasks = len([t for t in tasks if t.status == TaskStatus.COMPLETED])
-        urgent_tasks = len([t for t in tasks if t.priority == TaskPriority.URGENT])
-        overdue_tasks = len([t for t in tasks if t.due_date and t.due_date < datetime.utcnow() and t.status not in [TaskStatus.COMPLETED, TaskStatus.CANCELLED]])
+        now = datetime.now(timezone.utc)
+        by_priority: Dict[str, List[Dict[str, Any]]] = {}
+        for card in cards_result:
+            days = (now - card.due_date).days
+            if card.priority_rank <= limit:
+                by_priority.setdefault(card.priority.value, []).append({
+                    "id": card.id,
+                    "title": card.title,
+                    "assignee": card.assignee_name or "Unassigned",
+                    "due_date": card.due_date.isoformat(),
+                    "days_overdue": days
+                })
+            if card.assigned_to in by_assignee and card.assignee_rank <= limit:
+                by_assignee[card.assigned_to]["tasks"].append({
+                    "id": card.id,
+                    "title": card.title,
+                    "priority": card.priority.value,
+                    "due_date": card.due_date.isoformat(),
+                    "days_overdue": days
+                })
         
-        progress = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
+        return {
+            "total_overdue": totals['total'],
+            "by_assignee": by_assignee,
+            "by_priority": by_priority,
+            "by_priority_counts": {
+                priority.value: totals[priority.value] for priority in TaskPriority if totals[priority.value]
+            },
+            "critical_overdue": totals[TaskPriority.URGENT.value],
+            "avg_days_overdue": float(totals['avg_days'] or 0)
+        }
+
+    def _calculate_role_summary(self, counts: Dict[str, int], role_name: str, icon: str = "") -> Dict[str, Any]:
+        """Calculate summary statistics for role task counts"""
+        total_tasks = counts["total"]
+        progress = (counts["completed"] / total_tasks * 100) if total_tasks > 0 else 0
         
         return {
             "role": role_name,
             "icon": icon,
             "total_tasks": total_tasks,
-            "pending": pending_tasks,
-            "completed": completed_tasks,
-            "in_progress": in_progress_tasks,
-            "urgent": urgent_tasks,
-            "overdue": overdue_tasks,
+            "pending": counts["pending"],
+            "completed": counts["completed"],
+            "in_progress": counts["in_progress"],
+            "urgent": counts["urgent"],
+            "overdue": counts["overdue"],
             "progress": round(progress, 0),
             "progress_color": self._get_progress_color(progress)
         }
@@ -58,6 +58,7 @@ class TaskService:
         # Handle assignment
         # logger.info(f"Creating task {db_task.id} with assignment to {task_data.assigned_to}")
         if task_data.assigned_to:
+            db_task.assigned_to = task_data.assigned_to
             await self._assign_task(db_task.id, task_data.assigned_to, created_by)
         elif task_type.auto_assign_enabled:
             await self._auto_assign_task(db_task)
@@ -77,6 +78,7 @@ class TaskService:
         for field, value in task_data.model_dump(exclude_unset=True).items():
             if field == "assigned_to" and value:
                 await self._assign_task(task_id, value, user_id)
+                db_task.assigned_to = value
             else:
                 setattr(db_task, field, value)
         
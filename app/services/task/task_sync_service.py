@@ -0,0 +1,224 @@
+"""
+Delta sync for mobile task and notification clients.
+
+A client keeps an opaque cursor holding one keyset position per stream
+(tasks, comments, assignments, notifications): the last change time
+(`coalesce(updated_at, created_at)`) and id it has seen. Each sync returns only
+rows changed after those positions, plus tombstones for rows the client must
+drop (deleted or deactivated rows, and tasks reassigned to someone else).
+
+Change times are transaction start times, so a slow transaction can commit a
+row older than rows already returned. Cursors therefore never move past
+`now - SYNC_SETTLE_SECONDS`; rows newer than that are sent again on the next
+sync, which clients apply idempotently by id.
+"""
+import base64
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import and_, func, literal, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import ValidationError
+from app.models.alerts.notification_queue import NotificationQueue
+from app.models.task.task import Task
+from app.models.task.task_assignment import TaskAssignment
+from app.models.task.task_comment import TaskComment
+from app.models.task.task_type import TaskType
+
+logger = logging.getLogger(__name__)
+
+SYNC_STREAMS = ("tasks", "comments", "assignments", "notifications")
+SYNC_SETTLE_SECONDS = 5
+
+Position = Tuple[datetime, int]
+
+
+def changed_at(model):
+    """When a row last changed; inserts leave updated_at empty"""
+    return func.coalesce(model.updated_at, model.created_at)
+
+
+def encode_cursor(positions: Dict[str, Position]) -> str:
+    data = {stream: [ts.isoformat(), row_id] for stream, (ts, row_id) in positions.items()}
+    return base64.urlsafe_b64encode(json.dumps(data, sort_keys=True).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Position]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return {
+            stream: (datetime.fromisoformat(ts), int(row_id))
+            for stream, (ts, row_id) in data.items()
+            if stream in SYNC_STREAMS
+        }
+    except Exception:
+        raise ValidationError("Invalid sync cursor")
+
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _enum_value(value):
+    return getattr(value, "value", value)
+
+
+class TaskSyncService:
+    """Computes per-user change sets since a sync cursor"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _changed_since(self, stmt, model, position: Optional[Position], limit: int, live_condition=None):
+        """Rows of `stmt` changed after `position` in (changed_at, id) order; returns (rows, has_more)"""
+        changed = changed_at(model)
+        stmt = stmt.add_columns(changed.label("changed_at"))
+        if position is not None:
+            stmt = stmt.where(tuple_(changed, model.id) > tuple_(literal(position[0]), literal(position[1])))
+        elif live_condition is not None:
+            # First sync: the client has nothing to delete
+            stmt = stmt.where(live_condition)
+        result = await self.db.execute(stmt.order_by(changed, model.id).limit(limit + 1))
+        rows = result.all()
+        return rows[:limit], len(rows) > limit
+
+    async def get_changes(self, user_id: int, cursor: Optional[str] = None, limit: int = 200) -> Dict[str, Any]:
+        """Changes for the user's tasks, comments, assignments and notifications since `cursor`"""
+        positions = decode_cursor(cursor) if cursor else {}
+        horizon = datetime.now(timezone.utc) - timedelta(seconds=SYNC_SETTLE_SECONDS)
+
+        task_rows, more_tasks = await self._changed_since(
+            select(Task, TaskType.category)
+            .outerjoin(TaskType, Task.task_type_id == TaskType.id)
+            .where(Task.assigned_to == user_id),
+            Task,
+            positions.get("tasks"),
+            limit,
+            and_(Task.is_deleted == False, Task.is_active == True),
+        )
+        comment_rows, more_comments = await self._changed_since(
+            select(TaskComment)
+            .join(Task, TaskComment.task_id == Task.id)
+            .where(Task.assigned_to == user_id),
+            TaskComment,
+            positions.get("comments"),
+            limit,
+            and_(TaskComment.is_deleted == False, TaskComment.is_active == True),
+        )
+        assignment_rows, more_assignments = await self._changed_since(
+            select(TaskAssignment, Task.assigned_to.label("current_assignee"))
+            .join(Task, TaskAssignment.task_id == Task.id)
+            .where(TaskAssignment.assigned_to == user_id),
+            TaskAssignment,
+            positions.get("assignments"),
+            limit,
+            and_(TaskAssignment.is_deleted == False, TaskAssignment.is_active == True),
+        )
+        notification_rows, more_notifications = await self._changed_since(
+            select(NotificationQueue).where(
+                NotificationQueue.recipient_id == user_id,
+                NotificationQueue.notification_type == "UI_NOTIFICATION",
+            ),
+            NotificationQueue,
+            positions.get("notifications"),
+            limit,
+            NotificationQueue.is_deleted == False,
+        )
+
+        deleted: Dict[str, List[int]] = {stream: [] for stream in SYNC_STREAMS}
+        changes: Dict[str, List[Dict[str, Any]]] = {stream: [] for stream in SYNC_STREAMS}
+
+        for task, category, _ in task_rows:
+            if task.is_deleted or task.is_active is False:
+                deleted["tasks"].append(task.id)
+            else:
+                changes["tasks"].append(self._task_payload(task, category))
+
+        for comment, _ in comment_rows:
+            if comment.is_deleted or comment.is_active is False:
+                deleted["comments"].append(comment.id)
+            else:
+                changes["comments"].append({
+                    "id": comment.id,
+                    "task_id": comment.task_id,
+                    "user_id": comment.user_id,
+                    "comment": comment.comment,
+                    "is_internal": comment.is_internal,
+                    "created_at": _iso(comment.created_at),
+                    "updated_at": _iso(comment.updated_at),
+                })
+
+        for assignment, current_assignee, _ in assignment_rows:
+            if assignment.is_deleted:
+                deleted["assignments"].append(assignment.id)
+                continue
+            changes["assignments"].append({
+                "id": assignment.id,
+                "task_id": assignment.task_id,
+                "assigned_by": assignment.assigned_by,
+                "assigned_at": _iso(assignment.assigned_at),
+                "unassigned_at": _iso(assignment.unassigned_at),
+                "notes": assignment.notes,
+                "is_active": assignment.is_active,
+            })
+            # Reassigned away: the task leaves this user's list
+            if not assignment.is_active and current_assignee != user_id:
+                deleted["tasks"].append(assignment.task_id)
+
+        for notification, _ in notification_rows:
+            if notification.is_deleted:
+                deleted["notifications"].append(notification.id)
+            else:
+                changes["notifications"].append({
+                    "id": notification.id,
+                    "type": notification.reference_type,
+                    "title": notification.subject,
+                    "message": notification.message,
+                    "data": notification.template_data or {},
+                    "timestamp": _iso(notification.created_at),
+                    "read": notification.status == "SENT",
+                })
+
+        rows_by_stream = {
+            "tasks": task_rows,
+            "comments": comment_rows,
+            "assignments": assignment_rows,
+            "notifications": notification_rows,
+        }
+        next_positions = dict(positions)
+        for stream, rows in rows_by_stream.items():
+            if not rows:
+                continue
+            last = rows[-1]
+            position = min((last.changed_at, last[0].id), (horizon, 0))
+            if stream not in positions or position > positions[stream]:
+                next_positions[stream] = position
+
+        deleted["tasks"] = sorted(set(deleted["tasks"]))
+        return {
+            "cursor": encode_cursor(next_positions) if next_positions else cursor,
+            "has_more": any((more_tasks, more_comments, more_assignments, more_notifications)),
+            **changes,
+            "deleted": deleted,
+        }
+
+    def _task_payload(self, task: Task, category: Optional[str]) -> Dict[str, Any]:
+        return {
+            "id": task.id,
+            "task_number": task.task_number,
+            "title": task.title,
+            "description": task.description,
+            "category": category or "GENERAL",
+            "priority": _enum_value(task.priority),
+            "status": _enum_value(task.status),
+            "due_date": _iso(task.due_date),
+            "started_at": _iso(task.started_at),
+            "completed_at": _iso(task.completed_at),
+            "created_at": _iso(task.created_at),
+            "updated_at": _iso(task.updated_at),
+            "estimated_hours": float(task.estimated_hours) if task.estimated_hours else None,
+            "tags": task.tags.split(",") if task.tags else [],
+        }
@@ -1,5 +1,4 @@
 import csv
-import pandas as pd
 from io import StringIO, BytesIO
 from pathlib import Path
 from typing import List, Dict, Any, Optional
@@ -9,9 +8,12 @@ from fastapi.responses import StreamingResponse
 import logging
 from decimal import Decimal, InvalidOperation
 import re
+from app.utils.lazy_import import lazy_import
 
 logger = logging.getLogger(__name__)
 
+pd = lazy_import("pandas")
+
 class DataExportService:
     def __init__(self):
         self.export_dir = Path("uploads/exports")
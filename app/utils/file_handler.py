@@ -4,12 +4,14 @@ import aiofiles
 from pathlib import Path
 from typing import Optional, Dict, Set
 from fastapi import UploadFile, HTTPException, status
-from PIL import Image
 import logging
 import mimetypes
+from app.utils.lazy_import import lazy_import
 
 logger = logging.getLogger(__name__)
 
+Image = lazy_import("PIL.Image", "Pillow")
+
 class FileUploadService:
     def __init__(self):
         self.upload_dir = Path("uploads")
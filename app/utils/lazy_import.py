@@ -0,0 +1,71 @@
+"""
+Lazy module facades for heavy optional dependencies.
+
+`pd = lazy_import("pandas")` binds a placeholder at import time; the real module
+is only imported on first attribute access. This keeps pandas, openpyxl, PIL,
+qrcode and the voice stack out of API/worker startup unless a request needs them.
+"""
+import importlib
+import logging
+import threading
+import types
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Modules that must never be imported while the API or a worker boots
+HEAVY_MODULES = (
+    "pandas",
+    "openpyxl",
+    "PIL",
+    "qrcode",
+    "speech_recognition",
+    "pydub",
+    "gtts",
+    "torch",
+    "transformers",
+    "whisper",
+)
+
+
+class LazyModule(types.ModuleType):
+    """Placeholder that imports the named module on first attribute access"""
+
+    def __init__(self, name: str, install_hint: Optional[str] = None):
+        super().__init__(name)
+        self.__dict__["_lazy_name"] = name
+        self.__dict__["_lazy_hint"] = install_hint
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is not None:
+            return module
+        with self.__dict__["_lazy_lock"]:
+            module = self.__dict__["_lazy_module"]
+            if module is None:
+                name = self.__dict__["_lazy_name"]
+                try:
+                    module = importlib.import_module(name)
+                except ImportError as e:
+                    hint = self.__dict__["_lazy_hint"] or name.split(".")[0]
+                    raise ImportError(f"Optional dependency '{name}' is not installed (pip install {hint})") from e
+                logger.debug(f"Lazily imported {name}")
+                self.__dict__["_lazy_module"] = module
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__dict__["_lazy_module"] is not None
+
+    def __getattr__(self, item: str):
+        return getattr(self._load(), item)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name: str, install_hint: Optional[str] = None) -> LazyModule:
+    """Return a facade for `name` that defers the import until first use"""
+    return LazyModule(name, install_hint)
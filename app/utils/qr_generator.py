@@ -1,4 +1,3 @@
-import qrcode
 import json
 import uuid
 from pathlib import Path
@@ -8,9 +7,12 @@ from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.system.qr_code import QRCode
 import logging
+from app.utils.lazy_import import lazy_import
 
 logger = logging.getLogger(__name__)
 
+qrcode = lazy_import("qrcode")
+
 class QRCodeService:
     def __init__(self, session: AsyncSession):
         self.session = session
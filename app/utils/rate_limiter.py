@@ -1,253 +1,315 @@
-import json
 import time
 import logging
-from typing import Dict, List
-from collections import defaultdict, deque
-from fastapi import HTTPException, Path, status, Request
-from threading import Lock
-import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from fastapi import HTTPException, status, Request, Response
+from app.core.config import settings
+from app.core.redis import redis_client
 
 logger = logging.getLogger(__name__)
 
-class InMemoryRateLimiter:
-    """In-memory rate limiter for API endpoints"""
-    
-    def __init__(self, max_attempts: int = 100, window_seconds: int = 300):
-        self.max_attempts = max_attempts
-        self.window_seconds = window_seconds
-        # Use defaultdict with deque to store timestamps for each key
-        self._requests: Dict[str, deque] = defaultdict(deque)
-        self._lock = asyncio.Lock()
-        self._last_cleanup = time.time()
-        self._cleanup_interval = 60  # Cleanup every 60 seconds
-    
-    async def _cleanup_old_entries(self):
-        """Remove old entries to prevent memory leaks"""
-        current_time = time.time()
-        
-        # Only cleanup if enough time has passed
-        if current_time - self._last_cleanup < self._cleanup_interval:
-            return
-            
-        cutoff_time = current_time - self.window_seconds
-        keys_to_remove = []
-        
-        for key, timestamps in self._requests.items():
-            # Remove old timestamps
-            while timestamps and timestamps[0] <= cutoff_time:
-                timestamps.popleft()
-            
-            # If no recent requests, mark key for removal
-            if not timestamps:
-                keys_to_remove.append(key)
-        
-        # Remove empty keys
-        for key in keys_to_remove:
-            del self._requests[key]
-        
-        self._last_cleanup = current_time
-        
-        if keys_to_remove:
-            logger.debug(f"Cleaned up {len(keys_to_remove)} rate limit entries")
-    
-    async def check_rate_limit(self, key: str) -> bool:
-        """Check if rate limit is exceeded"""
-        try:
-            async with self._lock:
-                current_time = time.time()
-                cutoff_time = current_time - self.window_seconds
-                
-                # Get or create deque for this key
-                timestamps = self._requests[key]
-                
-                # Remove old timestamps
-                while timestamps and timestamps[0] <= cutoff_time:
-                    timestamps.popleft()
-                
-                # Check if limit exceeded
-                if len(timestamps) >= self.max_attempts:
+# GCRA (generic cell rate algorithm) evaluated atomically inside Redis.
+# Only one value (the theoretical arrival time) is stored per key, so a check
+# is O(1) regardless of the window size, and every worker shares the same budget.
+#
+# KEYS[1] = bucket key
+# ARGV[1] = limit, ARGV[2] = period in ms, ARGV[3] = cost (tokens requested)
+# Returns {allowed, remaining, retry_after_ms, reset_after_ms}
+GCRA_LUA = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+local emission = period / limit
+
+local tat = tonumber(redis.call('GET', key))
+if not tat or tat < now_ms then
+    tat = now_ms
+end
+
+local new_tat = tat + emission * cost
+local allow_at = new_tat - period
+local diff = now_ms - allow_at
+
+if diff < 0 then
+    local remaining = math.floor((now_ms - (tat - period)) / emission)
+    if remaining < 0 then remaining = 0 end
+    return {0, remaining, math.ceil(-diff), math.ceil(tat - now_ms)}
+end
+
+local ttl = math.ceil(new_tat - now_ms)
+redis.call('SET', key, new_tat, 'PX', ttl)
+return {1, math.floor(diff / emission), 0, ttl}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """A single limit, e.g. 100 requests per 60 seconds per IP"""
+    name: str
+    max_attempts: int
+    window_seconds: int
+    scope: str = "ip"  # ip | user | route
+
+    @property
+    def policy(self) -> str:
+        return f"{self.max_attempts};w={self.window_seconds}"
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of a check for one rule (or the most restrictive of several)"""
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: float
+    retry_after: float
+    rule: Optional[RateLimitRule] = None
+
+    def headers(self) -> Dict[str, str]:
+        """Standard RateLimit-* response headers"""
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(max(0, self.remaining)),
+            "RateLimit-Reset": str(max(0, int(round(self.reset_after)))),
+        }
+        if self.rule:
+            headers["RateLimit-Policy"] = self.rule.policy
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, int(round(self.retry_after))))
+        return headers
+
+
+class _LocalLease:
+    """Tokens pre-reserved in Redis that this process may hand out without a round trip"""
+    __slots__ = ("tokens", "expires_at", "last_remaining", "limit", "reset_at")
+
+    def __init__(self):
+        self.tokens = 0
+        self.expires_at = 0.0
+        self.last_remaining = 0
+        self.limit = 0
+        self.reset_at = 0.0
+
+
+class RedisRateLimiter:
+    """
+    Distributed rate limiter backed by a GCRA Lua script in Redis.
+    - All rules for a request are evaluated in one pipelined round trip.
+    - Hot keys with plenty of budget lease a small batch of tokens, so most
+      calls are served from the local cache without touching Redis.
+    - If Redis is unreachable the same algorithm runs in-process (per worker).
+    """
+
+    def __init__(
+        self,
+        rules: List[RateLimitRule],
+        prefix: str = "rate_limit",
+        local_batch: Optional[int] = None,
+        local_ttl_seconds: float = 1.0,
+        max_local_keys: int = 10000,
+    ):
+        self.rules = rules
+        self.prefix = prefix
+        self.local_batch = settings.RATE_LIMIT_LOCAL_BATCH if local_batch is None else local_batch
+        self.local_ttl_seconds = local_ttl_seconds
+        self.max_local_keys = max_local_keys
+        self._leases: "OrderedDict[str, _LocalLease]" = OrderedDict()
+        self._fallback_tat: Dict[str, float] = {}
+        self._script = None
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    def _identifier(self, rule: RateLimitRule, request: Request, identifier: Optional[str], user_id: Optional[int]) -> Optional[str]:
+        ip = identifier or (request.client.host if request.client else "unknown")
+        if rule.scope == "user":
+            return f"user:{user_id}" if user_id is not None else None
+        if rule.scope == "route":
+            return f"route:{request.url.path}:{ip}"
+        return f"ip:{ip}"
+
+    def _build_keys(
+        self, request: Request, identifier: Optional[str] = None, user_id: Optional[int] = None
+    ) -> List[Tuple[RateLimitRule, str]]:
+        keys = []
+        for rule in self.rules:
+            ident = self._identifier(rule, request, identifier, user_id)
+            if ident is not None:
+                keys.append((rule, f"{self.prefix}:{rule.name}:{ident}"))
+        return keys
+
+    # ------------------------------------------------------------------
+    # Local lease cache
+    # ------------------------------------------------------------------
+
+    def _take_local(self, key: str, now: float) -> Optional[RateLimitResult]:
+        lease = self._leases.get(key)
+        if not lease or lease.tokens <= 0 or lease.expires_at <= now:
+            return None
+        lease.tokens -= 1
+        self._leases.move_to_end(key)
+        return RateLimitResult(
+            allowed=True,
+            limit=lease.limit,
+            remaining=lease.last_remaining + lease.tokens,
+            reset_after=max(0.0, lease.reset_at - now),
+            retry_after=0.0,
+        )
+
+    def _lease_size(self, key: str, rule: RateLimitRule) -> int:
+        """Lease extra tokens only when the key is far from its limit"""
+        if self.local_batch <= 0:
+            return 0
+        lease = self._leases.get(key)
+        if not lease or lease.last_remaining < self.local_batch * 2:
+            return 0
+        return min(self.local_batch, rule.max_attempts // 10)
+
+    def _store_lease(self, key: str, rule: RateLimitRule, leased: int, result: RateLimitResult, now: float):
+        lease = self._leases.get(key)
+        if lease is None:
+            lease = _LocalLease()
+            self._leases[key] = lease
+            if len(self._leases) > self.max_local_keys:
+                self._leases.popitem(last=False)
+        self._leases.move_to_end(key)
+        lease.limit = rule.max_attempts
+        lease.last_remaining = result.remaining
+        lease.reset_at = now + result.reset_after
+        if result.allowed and leased:
+            lease.tokens = leased
+            lease.expires_at = now + min(self.local_ttl_seconds, rule.window_seconds)
+        else:
+            lease.tokens = 0
+
+    # ------------------------------------------------------------------
+    # Evaluation
+    # ------------------------------------------------------------------
+
+    async def _eval_redis(self, checks: List[Tuple[RateLimitRule, str, int]]) -> List[Tuple[int, int, int, int]]:
+        client = await redis_client.get_client()
+        if self._script is None:
+            self._script = client.register_script(GCRA_LUA)
+        pipe = client.pipeline(transaction=False)
+        for rule, key, cost in checks:
+            await self._script(
+                keys=[key],
+                args=[rule.max_attempts, rule.window_seconds * 1000, cost],
+                client=pipe,
+            )
+        return await pipe.execute()
+
+    def _eval_local(self, rule: RateLimitRule, key: str, cost: int, now: float) -> Tuple[int, int, int, int]:
+        """Same GCRA maths as the Lua script, used when Redis is unavailable"""
+        now_ms = now * 1000
+        period = rule.window_seconds * 1000
+        emission = period / rule.max_attempts
+        tat = max(self._fallback_tat.get(key, now_ms), now_ms)
+        new_tat = tat + emission * cost
+        diff = now_ms - (new_tat - period)
+        if diff < 0:
+            remaining = max(0, int((now_ms - (tat - period)) // emission))
+            return 0, remaining, int(-diff) + 1, int(tat - now_ms) + 1
+        self._fallback_tat[key] = new_tat
+        if len(self._fallback_tat) > self.max_local_keys:
+            self._fallback_tat = {k: v for k, v in self._fallback_tat.items() if v > now_ms}
+        return 1, int(diff // emission), 0, int(new_tat - now_ms) + 1
+
+    async def check(self, keys: List[Tuple[RateLimitRule, str]]) -> RateLimitResult:
+        """Consume one token from every rule and return the most restrictive result"""
+        now = time.time()
+        results: List[RateLimitResult] = []
+        pending: List[Tuple[RateLimitRule, str, int]] = []
+
+        for rule, key in keys:
+            local = self._take_local(key, now)
+            if local is not None:
+                local.rule = rule
+                results.append(local)
+            else:
+                pending.append((rule, key, 1 + self._lease_size(key, rule)))
+
+        if pending:
+            try:
+                raw = await self._eval_redis(pending)
+            except Exception as e:
+                logger.warning(f"Redis rate limiter unavailable, using local fallback: {str(e)}")
+                raw = [self._eval_local(rule, key, cost, now) for rule, key, cost in pending]
+
+            for (rule, key, cost), (allowed, remaining, retry_ms, reset_ms) in zip(pending, raw):
+                result = RateLimitResult(
+                    allowed=bool(allowed),
+                    limit=rule.max_attempts,
+                    remaining=int(remaining),
+                    reset_after=int(reset_ms) / 1000,
+                    retry_after=int(retry_ms) / 1000,
+                    rule=rule,
+                )
+                self._store_lease(key, rule, cost - 1, result, now)
+                if not result.allowed:
                     logger.warning(f"Rate limit exceeded for key: {key}")
-                    return False
-                
-                # Add current timestamp
-                timestamps.append(current_time)
-                
-                # Periodic cleanup
-                await self._cleanup_old_entries()
-                
-                return True
-                
-        except Exception as e:
-            logger.error(f"Rate limit check error: {str(e)}")
-            return True  # Allow on error
-    
+                results.append(result)
+
+        if not results:
+            return RateLimitResult(allowed=True, limit=0, remaining=0, reset_after=0, retry_after=0)
+
+        denied = [r for r in results if not r.allowed]
+        if denied:
+            return max(denied, key=lambda r: r.retry_after)
+        return min(results, key=lambda r: r.remaining)
+
+    async def hit(
+        self, request: Request, identifier: Optional[str] = None, user_id: Optional[int] = None
+    ) -> RateLimitResult:
+        """Check all rules that apply to this request"""
+        return await self.check(self._build_keys(request, identifier, user_id))
+
     async def is_rate_limited(self, request: Request, identifier: str = None) -> bool:
         """Check if request should be rate limited"""
-        if not identifier:
-            identifier = request.client.host if request.client else "unknown"
-        
-        key = f"rate_limit:{request.url.path}:{identifier}"
-        return not await self.check_rate_limit(key)
-    
-    async def get_rate_limit_info(self, key: str) -> dict:
-        """Get current rate limit info for debugging"""
-        async with self._lock:
-            current_time = time.time()
-            cutoff_time = current_time - self.window_seconds
-            
-            timestamps = self._requests[key]
-            
-            # Remove old timestamps for accurate count
-            while timestamps and timestamps[0] <= cutoff_time:
-                timestamps.popleft()
-            
-            remaining_attempts = max(0, self.max_attempts - len(timestamps))
-            reset_time = timestamps[0] + self.window_seconds if timestamps else current_time
-            
-            return {
-                "current_requests": len(timestamps),
-                "max_attempts": self.max_attempts,
-                "remaining_attempts": remaining_attempts,
-                "window_seconds": self.window_seconds,
-                "reset_time": reset_time
-            }
-
-# Updated rate limiter instances
-login_rate_limiter = InMemoryRateLimiter(max_attempts=100, window_seconds=300)  # 5 attempts per 5 minutes
-general_rate_limiter = InMemoryRateLimiter(max_attempts=100, window_seconds=60)  # 100 requests per minute
-
-async def check_login_rate_limit(request: Request):
+        result = await self.hit(request, identifier)
+        return not result.allowed
+
+
+# Rate limiter instances (budgets are shared by every worker through Redis)
+login_rate_limiter = RedisRateLimiter(
+    rules=[
+        RateLimitRule("login_route", max_attempts=100, window_seconds=300, scope="route"),
+    ],
+    prefix="rate_limit:login",
+)
+general_rate_limiter = RedisRateLimiter(
+    rules=[
+        RateLimitRule("route", max_attempts=100, window_seconds=60, scope="route"),
+        RateLimitRule("ip", max_attempts=1000, window_seconds=60, scope="ip"),
+        RateLimitRule("user", max_attempts=600, window_seconds=60, scope="user"),
+    ],
+    prefix="rate_limit:general",
+)
+
+async def check_login_rate_limit(request: Request, response: Response):
     """Check login rate limit"""
-    identifier = request.client.host if request.client else "unknown"
-    
-    if await login_rate_limiter.is_rate_limited(request, identifier):
-        # Get rate limit info for better error messages
-        key = f"rate_limit:{request.url.path}:{identifier}"
-        rate_info = await login_rate_limiter.get_rate_limit_info(key)
-        
+    result = await login_rate_limiter.hit(request)
+    if not result.allowed:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail=f"Too many login attempts. Please try again in {int(rate_info['reset_time'] - time.time())} seconds."
+            detail=f"Too many login attempts. Please try again in {max(1, int(round(result.retry_after)))} seconds.",
+            headers=result.headers()
         )
+    response.headers.update(result.headers())
 
-async def check_general_rate_limit(request: Request):
+async def check_general_rate_limit(request: Request, response: Response):
     """Check general API rate limit"""
-    identifier = request.client.host if request.client else "unknown"
-    
-    if await general_rate_limiter.is_rate_limited(request, identifier):
-        key = f"rate_limit:{request.url.path}:{identifier}"
-        rate_info = await general_rate_limiter.get_rate_limit_info(key)
-        
+    result = await general_rate_limiter.hit(request)
+    if not result.allowed:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail=f"Rate limit exceeded. {rate_info['remaining_attempts']} requests remaining."
+            detail=f"Rate limit exceeded. Please try again in {max(1, int(round(result.retry_after)))} seconds.",
+            headers=result.headers()
         )
-
-
-# Alternative sliding window implementation using a different approach
-class SlidingWindowRateLimiter:
-    """Sliding window rate limiter with more precise control"""
-    
-    def __init__(self, max_attempts: int = 5, window_seconds: int = 300):
-        self.max_attempts = max_attempts
-        self.window_seconds = window_seconds
-        # Store list of timestamps for each key
-        self._requests: Dict[str, List[float]] = defaultdict(list)
-        self._lock = asyncio.Lock()
-    
-    async def check_rate_limit(self, key: str) -> bool:
-        """Check if rate limit is exceeded using sliding window"""
-        try:
-            async with self._lock:
-                current_time = time.time()
-                cutoff_time = current_time - self.window_seconds
-                
-                # Get existing requests for this key
-                requests = self._requests[key]
-                
-                # Filter out old requests
-                self._requests[key] = [req_time for req_time in requests if req_time > cutoff_time]
-                
-                # Check if limit exceeded
-                if len(self._requests[key]) >= self.max_attempts:
-                    return False
-                
-                # Add current request
-                self._requests[key].append(current_time)
-                return True
-                
-        except Exception as e:
-            logger.error(f"Rate limit check error: {str(e)}")
-            return True
-
-# Optional: File-based persistent rate limiter (for single-instance deployments)
-class FileBasedRateLimiter:
-    """File-based rate limiter that persists across restarts"""
-    
-    def __init__(self, max_attempts: int = 5, window_seconds: int = 300, storage_file: str = "rate_limits.json"):
-        self.max_attempts = max_attempts
-        self.window_seconds = window_seconds
-        self.storage_file = Path(storage_file)
-        self._lock = asyncio.Lock()
-        self._requests: Dict[str, List[float]] = {}
-        self._load_from_file()
-    
-    def _load_from_file(self):
-        """Load rate limit data from file"""
-        try:
-            if self.storage_file.exists():
-                with open(self.storage_file, 'r') as f:
-                    data = json.load(f)
-                    self._requests = {k: v for k, v in data.items()}
-        except Exception as e:
-            logger.error(f"Error loading rate limit data: {e}")
-            self._requests = {}
-    
-    async def _save_to_file(self):
-        """Save rate limit data to file"""
-        try:
-            with open(self.storage_file, 'w') as f:
-                # Only save recent data to prevent file from growing too large
-                current_time = time.time()
-                cutoff_time = current_time - self.window_seconds
-                
-                filtered_data = {}
-                for key, timestamps in self._requests.items():
-                    recent_timestamps = [t for t in timestamps if t > cutoff_time]
-                    if recent_timestamps:
-                        filtered_data[key] = recent_timestamps
-                
-                json.dump(filtered_data, f)
-        except Exception as e:
-            logger.error(f"Error saving rate limit data: {e}")
-    
-    async def check_rate_limit(self, key: str) -> bool:
-        """Check if rate limit is exceeded"""
-        try:
-            async with self._lock:
-                current_time = time.time()
-                cutoff_time = current_time - self.window_seconds
-                
-                # Get existing requests
-                requests = self._requests.get(key, [])
-                
-                # Filter out old requests
-                recent_requests = [req_time for req_time in requests if req_time > cutoff_time]
-                
-                # Check limit
-                if len(recent_requests) >= self.max_attempts:
-                    return False
-                
-                # Add current request
-                recent_requests.append(current_time)
-                self._requests[key] = recent_requests
-                
-                # Periodically save to file
-                if int(current_time) % 10 == 0:  # Save every 10 seconds
-                    await self._save_to_file()
-                
-                return True
-                
-        except Exception as e:
-            logger.error(f"Rate limit check error: {str(e)}")
-            return True
\ No newline at end of file
+    response.headers.update(result.headers())
@@ -47,9 +47,9 @@ class TaskNotificationService:
                 tasks_by_user[task.assigned_to].append(task)
         
         # Send notifications to each user
+        assignees = await self._get_users(tasks_by_user.keys())
         for user_id, user_tasks in tasks_by_user.items():
-            result = await self.db.execute(select(User).where(User.id == user_id))
-            assignee = result.scalar_one_or_none()
+            assignee = assignees.get(user_id)
             if assignee:
                 await self._send_overdue_notification(assignee, user_tasks)
     
@@ -83,9 +83,9 @@ class TaskNotificationService:
                 tasks_by_user[task.assigned_to].append(task)
         
         # Send notifications to each user
+        assignees = await self._get_users(tasks_by_user.keys())
         for user_id, user_tasks in tasks_by_user.items():
-            result = await self.db.execute(select(User).where(User.id == user_id))
-            assignee = result.scalar_one_or_none()
+            assignee = assignees.get(user_id)
             if assignee:
                 await self._send_due_soon_notification(assignee, user_tasks, hours_until_due)
     
@@ -103,6 +103,14 @@ class TaskNotificationService:
             }
         )
     
+    async def _get_users(self, user_ids) -> dict:
+        """Load users in one query, keyed by id"""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        result = await self.db.execute(select(User).where(User.id.in_(user_ids)))
+        return {user.id: user for user in result.scalars().all()}
+    
     async def _send_email_notification(self, to_email: str, subject: str, template: str, context: dict):
         """Send email notification (implement based on your email service)"""
         # Implementation depends on your email service (SendGrid, AWS SES, etc.)
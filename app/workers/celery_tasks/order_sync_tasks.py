@@ -1,71 +1,69 @@
 """
 Order sync tasks - Celery background tasks for Foodics order synchronization
 """
-import asyncio
+from typing import List
 from app.core.celery_app import celery_app
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from app.core.config import settings
+from app.workers.fanout import dispatch_chord, sum_results
+from app.workers.runtime import async_task, worker_session
 
-# Create async engine for background tasks
-async_engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=False,
-    future=True,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    pool_size=5,
-    max_overflow=10
-)
-
-async_session_maker = async_sessionmaker(
-    bind=async_engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-)
-
-def run_async_task(coro):
-    """Helper function to run async coroutines in Celery tasks"""
-    try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        return loop.run_until_complete(coro)
-    except Exception as e:
-        print(f"Error in async task: {e}")
-        raise
-    finally:
-        loop.close()
-
-
-@celery_app.task(bind=True)
-def sync_foodics_orders_hourly(self):
+@async_task(bind=True)
+async def sync_foodics_orders_hourly(self):
     """
     Hourly task to sync orders from Foodics API for all locations.
-    This ensures the order data is always up-to-date.
+    Each Foodics branch is synced by its own subtask so a slow branch
+    doesn't hold up the others; results are aggregated by a chord callback.
     """
-    async def _sync_orders():
-        async with async_session_maker() as db:
-            try:
-                from app.services.inventory.foodics_order_service import FoodicsOrderService
-                
-                # Get Foodics API token
-                foodics_token = getattr(settings, 'FOODICS_API_TOKEN', None)
-                if not foodics_token:
-                    print("❌ Foodics API token not configured")
-                    return "Failed: Foodics API token not configured"
+    async with worker_session() as db:
+        try:
+            from app.models.organization.location import Location
+            from sqlalchemy import select, and_
+            
+            # Get Foodics API token
+            foodics_token = getattr(settings, 'FOODICS_API_TOKEN', None)
+            if not foodics_token:
+                print("❌ Foodics API token not configured")
+                return "Failed: Foodics API token not configured"
+            
+            result = await db.execute(
+                select(Location.id).where(
+                    and_(
+                        Location.is_active == True,
+                        Location.foodics_guid.isnot(None)
+                    )
+                )
+            )
+            location_ids = result.scalars().all()
+            
+            header = [sync_foodics_location_orders.s(location_id) for location_id in location_ids]
+            dispatched = dispatch_chord(header, aggregate_foodics_sync_results.s())
+            
+            return f"Dispatched Foodics sync for {dispatched['dispatched']} branches"
                 
-                # Create service and sync all locations
-                service = FoodicsOrderService(db, foodics_token)
-                result = await service.fetch_and_save_orders(location_id=None)  # Sync all locations
-                
-                if result["success"]:
-                    print(f"✅ Hourly order sync completed: {result['orders_synced']} orders synced")
-                    return f"Success: {result['orders_synced']} orders synced"
-                else:
-                    print(f"⚠️ Order sync completed with errors: {result['message']}")
-                    return f"Partial success: {result['message']}"
-                    
-            except Exception as e:
-                print(f"❌ Error in hourly order sync: {e}")
-                raise
+        except Exception as e:
+            print(f"❌ Error in hourly order sync: {e}")
+            raise
+
+@async_task(bind=True, acks_late=True)
+async def sync_foodics_location_orders(self, location_id: int):
+    """Sync Foodics orders for a single branch"""
+    async with worker_session() as db:
+        from app.services.inventory.foodics_order_service import FoodicsOrderService
+        
+        service = FoodicsOrderService(db, settings.FOODICS_API_TOKEN)
+        result = await service.fetch_and_save_orders(location_id=location_id)
+        result["location_id"] = location_id
+        return result
+
+@celery_app.task
+def aggregate_foodics_sync_results(results: List[dict]):
+    """Chord callback - combine per-branch sync results"""
+    totals = sum_results(results, ["orders_synced"])
+    failed = [r.get("location_id") for r in results if isinstance(r, dict) and not r.get("success")]
+    
+    if failed:
+        print(f"⚠️ Order sync completed with errors for locations {failed}: {totals['errors']}")
+        return f"Partial success: {totals['orders_synced']} orders synced, {len(failed)} branches failed"
     
-    return run_async_task(_sync_orders())
\ No newline at end of file
+    print(f"✅ Hourly order sync completed: {totals['orders_synced']} orders synced")
+    return f"Success: {totals['orders_synced']} orders synced"
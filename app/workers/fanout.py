@@ -0,0 +1,37 @@
+"""
+Helpers for splitting large jobs into subtasks and aggregating their results with chords.
+"""
+from typing import Any, Dict, Iterable, Iterator, List, Sequence
+from celery import chord
+
+
+def chunked(items: Sequence[Any], size: int) -> Iterator[List[Any]]:
+    """Yield consecutive slices of at most `size` items"""
+    for start in range(0, len(items), size):
+        yield list(items[start:start + size])
+
+
+def dispatch_chord(header: List, callback) -> Dict[str, Any]:
+    """Run `header` subtasks in parallel and feed their results to `callback`"""
+    if not header:
+        return {"dispatched": 0, "chord_id": None}
+    result = chord(header)(callback)
+    return {"dispatched": len(header), "chord_id": result.id}
+
+
+def sum_results(results: Iterable[Dict[str, Any]], keys: Iterable[str]) -> Dict[str, Any]:
+    """Add up numeric fields and collect errors from subtask result dicts"""
+    keys = list(keys)
+    totals: Dict[str, Any] = {key: 0 for key in keys}
+    errors: List[str] = []
+    chunks = 0
+    for result in results:
+        if not isinstance(result, dict):
+            continue
+        chunks += 1
+        for key in keys:
+            totals[key] += result.get(key, 0) or 0
+        errors.extend(result.get("errors", []))
+    totals["chunks"] = chunks
+    totals["errors"] = errors[:20]  # Limit errors shown
+    return totals
@@ -0,0 +1,159 @@
+"""
+Worker runtime - one long-lived event loop and one shared async engine per Celery worker process.
+
+Tasks used to spin up a fresh event loop per run, which left pooled asyncpg
+connections bound to a closed loop and forced a reconnect on every task.
+The runtime keeps a single loop alive in a background thread for the life of
+the worker process, so pooled connections are reused across tasks.
+"""
+import asyncio
+import functools
+import logging
+import os
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Coroutine, Optional
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from app.core.celery_app import celery_app
+from app.core.config import settings
+from app.core.instrumentation import instrument_engine
+from app.core.table_versions import install_write_tracking
+from app.core.task_deadlines import install_deadline_tracking
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerRuntime:
+    """Owns the worker's event loop thread and database engine"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._engine: Optional[AsyncEngine] = None
+        self._session_maker: Optional[async_sessionmaker] = None
+
+    @property
+    def started(self) -> bool:
+        return self._pid == os.getpid() and self._loop is not None and self._loop.is_running()
+
+    def start(self):
+        """Start the loop thread and create the engine (idempotent, fork-safe)"""
+        with self._lock:
+            if self.started:
+                return
+
+            # State inherited from a parent process across fork is unusable
+            self._loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def _run_loop():
+                asyncio.set_event_loop(self._loop)
+                self._loop.call_soon(ready.set)
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(target=_run_loop, name="worker-event-loop", daemon=True)
+            self._thread.start()
+            ready.wait()
+
+            self._engine = create_async_engine(
+                settings.DATABASE_URL,
+                echo=False,
+                future=True,
+                pool_size=settings.WORKER_DB_POOL_SIZE,
+                max_overflow=settings.WORKER_DB_MAX_OVERFLOW,
+                pool_timeout=30,
+                pool_recycle=1800,
+                pool_pre_ping=True,
+            )
+            instrument_engine(self._engine)
+            install_write_tracking()
+            install_deadline_tracking()
+            self._session_maker = async_sessionmaker(
+                bind=self._engine,
+                class_=AsyncSession,
+                expire_on_commit=False,
+            )
+            self._pid = os.getpid()
+            logger.info(f"Worker runtime started in process {self._pid}")
+
+    @property
+    def engine(self) -> AsyncEngine:
+        self.start()
+        return self._engine
+
+    @property
+    def session_maker(self) -> async_sessionmaker:
+        self.start()
+        return self._session_maker
+
+    def run(self, coro: Coroutine) -> Any:
+        """Run a coroutine on the worker loop and block until it finishes"""
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(coro, self._loop)
+        return future.result()
+
+    def shutdown(self):
+        """Dispose the engine and stop the loop"""
+        with self._lock:
+            if not self.started:
+                return
+            try:
+                asyncio.run_coroutine_threadsafe(self._engine.dispose(), self._loop).result(timeout=30)
+            except Exception as e:
+                logger.error(f"Error disposing worker engine: {str(e)}")
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=10)
+            self._loop.close()
+            logger.info(f"Worker runtime stopped in process {self._pid}")
+            self._loop = None
+            self._thread = None
+            self._engine = None
+            self._session_maker = None
+            self._pid = None
+
+
+worker_runtime = WorkerRuntime()
+
+
+@asynccontextmanager
+async def worker_session() -> AsyncIterator[AsyncSession]:
+    """Session bound to the shared worker engine"""
+    async with worker_runtime.session_maker() as session:
+        yield session
+
+
+def async_task(*task_args, **task_options):
+    """
+    Register an async function as a Celery task that runs on the worker loop.
+
+    Usage:
+        @async_task(bind=True)
+        async def my_task(self):
+            async with worker_session() as db:
+                ...
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return worker_runtime.run(fn(*args, **kwargs))
+        return celery_app.task(*task_args, **task_options)(wrapper)
+    return decorator
+
+
+@worker_process_init.connect
+def _init_worker_process(**kwargs):
+    worker_runtime.start()
+
+
+@worker_process_shutdown.connect
+def _shutdown_worker_process(**kwargs):
+    worker_runtime.shutdown()
+
+
+@worker_shutdown.connect
+def _shutdown_worker(**kwargs):
+    # Solo/threads pools never fire worker_process_shutdown
+    worker_runtime.shutdown()
@@ -1,9 +1,12 @@
 from fastapi import APIRouter, FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.staticfiles import StaticFiles
 from app.core.config import settings
 from app.api.v1.api import api_router
+from app.core.health import collect_health, render_metrics
+from app.middleware.instrumentation import InstrumentationMiddleware
 
 # Create FastAPI app
 app_config = {
@@ -25,6 +28,7 @@ app.add_middleware(
 )
 
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=["*"])
+app.add_middleware(InstrumentationMiddleware)
 
 # Mount static files
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
@@ -32,6 +36,15 @@ app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 # Include routers
 app.include_router(api_router, prefix="/api/v1")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    from app.core.document_numbers import dispose_counter_engines
+    from app.core.event_sink import event_sink
+    from app.core.security import password_hasher
+    await event_sink.close()
+    password_hasher.shutdown()
+    await dispose_counter_engines()
+
 @app.get("/")
 async def root():
     return {
@@ -44,16 +57,11 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {
-        "status": "healthy",
-        "timestamp": "2024-01-01T00:00:00Z",
-        "components": {
-            "database": "connected",
-            "redis": "connected", 
-            "ai_agents": "operational",
-            "celery": "running"
-        }
-    }
+    return await collect_health()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(await render_metrics(), media_type="text/plain; version=0.0.4")
 
 # ============================================================================
 # MOVE THESE FUNCTIONS OUTSIDE if __name__ == "__main__" for Windows
@@ -0,0 +1,94 @@
+"""add employee month attendance
+
+Revision ID: 3b7e91c4d2a6
+Revises: 72ff3fe30846
+Create Date: 2026-10-18 10:12:31.418302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e91c4d2a6'
+down_revision: Union[str, None] = '72ff3fe30846'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rebuilds the counters from live attendance rows; 8d41c7a5e0f3 reruns it after deduplicating
+MONTH_ATTENDANCE_BACKFILL = """
+    INSERT INTO employee_month_attendance (
+        employee_id, month, is_deleted, record_count, present_days, late_days, left_early_days,
+        checked_in_days, checked_out_days, absent_days, weekend_days, holiday_days, non_holiday_days,
+        late_minutes, early_leave_minutes, hours_days, total_hours, overtime_hours
+    )
+    SELECT
+        employee_id,
+        date_trunc('month', attendance_date)::date,
+        false,
+        count(*),
+        count(*) FILTER (WHERE status = 'PRESENT'),
+        count(*) FILTER (WHERE status = 'LATE'),
+        count(*) FILTER (WHERE status = 'LEFT_EARLY'),
+        count(*) FILTER (WHERE status = 'CHECKED_IN'),
+        count(*) FILTER (WHERE status = 'CHECKED_OUT'),
+        count(*) FILTER (WHERE status = 'ABSENT' AND NOT coalesce(is_weekend, false) AND NOT coalesce(is_holiday, false)),
+        count(*) FILTER (WHERE status = 'WEEKEND' OR is_weekend),
+        count(*) FILTER (WHERE status = 'HOLIDAY' OR is_holiday),
+        count(*) FILTER (WHERE NOT coalesce(is_holiday, false)),
+        coalesce(sum(late_minutes), 0),
+        coalesce(sum(early_leave_minutes), 0),
+        count(total_hours),
+        coalesce(sum(total_hours), 0),
+        coalesce(sum(overtime_hours), 0)
+    FROM attendances
+    WHERE NOT coalesce(is_deleted, false)
+    GROUP BY employee_id, date_trunc('month', attendance_date)
+"""
+
+
+def upgrade() -> None:
+    op.create_table('employee_month_attendance',
+    sa.Column('employee_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('record_count', sa.Integer(), nullable=False),
+    sa.Column('present_days', sa.Integer(), nullable=False),
+    sa.Column('late_days', sa.Integer(), nullable=False),
+    sa.Column('left_early_days', sa.Integer(), nullable=False),
+    sa.Column('checked_in_days', sa.Integer(), nullable=False),
+    sa.Column('checked_out_days', sa.Integer(), nullable=False),
+    sa.Column('absent_days', sa.Integer(), nullable=False),
+    sa.Column('weekend_days', sa.Integer(), nullable=False),
+    sa.Column('holiday_days', sa.Integer(), nullable=False),
+    sa.Column('non_holiday_days', sa.Integer(), nullable=False),
+    sa.Column('late_minutes', sa.Integer(), nullable=False),
+    sa.Column('early_leave_minutes', sa.Integer(), nullable=False),
+    sa.Column('hours_days', sa.Integer(), nullable=False),
+    sa.Column('total_hours', sa.Numeric(precision=8, scale=2), nullable=False),
+    sa.Column('overtime_hours', sa.Numeric(precision=8, scale=2), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('updated_by', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['employee_id'], ['employees.id'], name=op.f('fk_employee_month_attendance_employee_id_employees')),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_employee_month_attendance')),
+    sa.UniqueConstraint('employee_id', 'month', name='uq_employee_month_attendance_employee_month')
+    )
+    op.create_index(op.f('ix_employee_month_attendance_employee_id'), 'employee_month_attendance', ['employee_id'], unique=False)
+    op.create_index(op.f('ix_employee_month_attendance_id'), 'employee_month_attendance', ['id'], unique=False)
+    op.create_index(op.f('ix_employee_month_attendance_month'), 'employee_month_attendance', ['month'], unique=False)
+
+    # Backfill from existing attendance
+    op.execute(MONTH_ATTENDANCE_BACKFILL)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_employee_month_attendance_month'), table_name='employee_month_attendance')
+    op.drop_index(op.f('ix_employee_month_attendance_id'), table_name='employee_month_attendance')
+    op.drop_index(op.f('ix_employee_month_attendance_employee_id'), table_name='employee_month_attendance')
+    op.drop_table('employee_month_attendance')
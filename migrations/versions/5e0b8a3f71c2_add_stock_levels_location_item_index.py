@@ -0,0 +1,26 @@
+"""add stock levels location item index
+
+Revision ID: 5e0b8a3f71c2
+Revises: c6a2f0d9b184
+Create Date: 2026-10-18 16:40:09.513377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0b8a3f71c2'
+down_revision: Union[str, None] = 'c6a2f0d9b184'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_stock_levels_location_item', 'stock_levels', ['location_id', 'item_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_stock_levels_location_item', table_name='stock_levels')
@@ -0,0 +1,62 @@
+"""unique live attendance per employee and day
+
+Revision ID: 8d41c7a5e0f3
+Revises: 3b7e91c4d2a6
+Create Date: 2026-10-18 14:05:12.602914
+
+"""
+import importlib.util
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41c7a5e0f3'
+down_revision: Union[str, None] = '3b7e91c4d2a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _month_attendance_backfill() -> str:
+    """The counter backfill statement from 3b7e91c4d2a6 (revision files are not importable by name)"""
+    path = Path(__file__).with_name('3b7e91c4d2a6_add_employee_month_attendance.py')
+    spec = importlib.util.spec_from_file_location('_month_attendance_revision', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.MONTH_ATTENDANCE_BACKFILL
+
+
+def upgrade() -> None:
+    op.execute("UPDATE attendances SET is_deleted = false WHERE is_deleted IS NULL")
+
+    # Concurrent check-ins could leave duplicates; keep the row with a check-in, then the oldest
+    op.execute("""
+        UPDATE attendances SET is_deleted = true
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY employee_id, attendance_date
+                    ORDER BY (check_in_time IS NULL), id
+                ) AS rn
+                FROM attendances
+                WHERE is_deleted = false
+            ) ranked
+            WHERE rn > 1
+        )
+    """)
+
+    op.create_index(
+        'uq_attendances_employee_date', 'attendances', ['employee_id', 'attendance_date'],
+        unique=True, postgresql_where=sa.text('is_deleted = false')
+    )
+
+    # Counters included the duplicates; recompute them
+    op.execute("DELETE FROM employee_month_attendance")
+    op.execute(_month_attendance_backfill())
+
+
+def downgrade() -> None:
+    op.drop_index('uq_attendances_employee_date', table_name='attendances')
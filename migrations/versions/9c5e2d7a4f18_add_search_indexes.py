@@ -0,0 +1,82 @@
+"""add trigram and full-text search indexes
+
+Revision ID: 9c5e2d7a4f18
+Revises: b7f3c1e8d042
+Create Date: 2026-10-18 19:32:08.417305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c5e2d7a4f18'
+down_revision: Union[str, None] = 'b7f3c1e8d042'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (index name, table, indexed expression) served to substring ILIKE and similarity()
+TRIGRAM_INDEXES = [
+    ('ix_items_name_trgm', 'items', 'name'),
+    ('ix_items_item_code_trgm', 'items', 'item_code'),
+    ('ix_products_name_trgm', 'products', 'name'),
+    ('ix_products_product_code_trgm', 'products', 'product_code'),
+    ('ix_employees_first_name_trgm', 'employees', 'first_name'),
+    ('ix_employees_last_name_trgm', 'employees', 'last_name'),
+    ('ix_employees_full_name_trgm', 'employees', "((first_name || ' ') || last_name)"),
+    ('ix_employees_employee_id_trgm', 'employees', 'employee_id'),
+    ('ix_employees_email_trgm', 'employees', 'email'),
+    ('ix_employees_phone_trgm', 'employees', 'phone'),
+    ('ix_suppliers_name_trgm', 'suppliers', 'name'),
+    ('ix_suppliers_supplier_code_trgm', 'suppliers', 'supplier_code'),
+    ('ix_suppliers_contact_person_trgm', 'suppliers', 'contact_person'),
+    ('ix_categories_name_trgm', 'categories', 'name'),
+    ('ix_locations_name_trgm', 'locations', 'name'),
+    ('ix_departments_name_trgm', 'departments', 'name'),
+    ('ix_purchase_orders_po_number_trgm', 'purchase_orders', 'po_number'),
+    ('ix_shipments_shipment_number_trgm', 'shipments', 'shipment_number'),
+    ('ix_vehicles_vehicle_number_trgm', 'vehicles', 'vehicle_number'),
+]
+
+# Must match search_service._tsvector exactly for the planner to use them
+FULL_TEXT_INDEXES = [
+    ('ix_items_description_fts', 'items', 'description'),
+    ('ix_products_description_fts', 'products', 'description'),
+]
+
+# lower(column) LIKE 'term%' for short typeahead terms, which trigrams cannot serve
+PREFIX_INDEXES = [
+    ('ix_items_name_prefix', 'items', 'name'),
+    ('ix_items_item_code_prefix', 'items', 'item_code'),
+    ('ix_products_name_prefix', 'products', 'name'),
+    ('ix_products_product_code_prefix', 'products', 'product_code'),
+    ('ix_employees_employee_id_prefix', 'employees', 'employee_id'),
+    ('ix_employees_full_name_prefix', 'employees', "((first_name || ' ') || last_name)"),
+    ('ix_suppliers_name_prefix', 'suppliers', 'name'),
+    ('ix_suppliers_supplier_code_prefix', 'suppliers', 'supplier_code'),
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for name, table, expression in TRIGRAM_INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({expression} gin_trgm_ops)")
+
+    for name, table, column in FULL_TEXT_INDEXES:
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+            f"USING gin (to_tsvector('simple'::regconfig, coalesce({column}, '')))"
+        )
+
+    for name, table, expression in PREFIX_INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} (lower({expression}) text_pattern_ops)")
+
+
+def downgrade() -> None:
+    for name, _, _ in PREFIX_INDEXES + FULL_TEXT_INDEXES + TRIGRAM_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
+    # pg_trgm stays installed; other objects may depend on it
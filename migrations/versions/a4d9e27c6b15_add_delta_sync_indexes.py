@@ -0,0 +1,34 @@
+"""add delta sync indexes
+
+Revision ID: a4d9e27c6b15
+Revises: 5e0b8a3f71c2
+Create Date: 2026-10-18 18:12:44.207815
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d9e27c6b15'
+down_revision: Union[str, None] = '5e0b8a3f71c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHANGED_AT = sa.text('coalesce(updated_at, created_at)')
+
+
+def upgrade() -> None:
+    op.create_index('ix_tasks_assignee_changed', 'tasks', ['assigned_to', CHANGED_AT, 'id'], unique=False)
+    op.create_index('ix_task_comments_changed', 'task_comments', [CHANGED_AT, 'id'], unique=False)
+    op.create_index('ix_task_assignments_assignee_changed', 'task_assignments', ['assigned_to', CHANGED_AT, 'id'], unique=False)
+    op.create_index('ix_notification_queue_recipient_changed', 'notification_queue', ['recipient_id', CHANGED_AT, 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notification_queue_recipient_changed', table_name='notification_queue')
+    op.drop_index('ix_task_assignments_assignee_changed', table_name='task_assignments')
+    op.drop_index('ix_task_comments_changed', table_name='task_comments')
+    op.drop_index('ix_tasks_assignee_changed', table_name='tasks')
@@ -0,0 +1,47 @@
+"""add chat message history index
+
+Revision ID: b7f3c1e8d042
+Revises: a4d9e27c6b15
+Create Date: 2026-10-18 18:47:31.550216
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7f3c1e8d042'
+down_revision: Union[str, None] = 'a4d9e27c6b15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_chat_messages_conversation_created', 'chat_messages',
+        ['conversation_id', 'created_at', 'id'], unique=False
+    )
+
+    # Stats are now maintained by add_message; start them from the real history
+    op.execute("""
+        UPDATE chat_conversations c
+        SET message_count = s.message_count,
+            last_message_at = s.last_message_at
+        FROM (
+            SELECT conversation_id, count(*) AS message_count, max(created_at) AS last_message_at
+            FROM chat_messages
+            GROUP BY conversation_id
+        ) s
+        WHERE c.id = s.conversation_id
+    """)
+    op.execute("""
+        UPDATE chat_conversations
+        SET message_count = 0
+        WHERE message_count IS NULL
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_messages_conversation_created', table_name='chat_messages')
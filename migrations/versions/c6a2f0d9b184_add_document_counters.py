@@ -0,0 +1,65 @@
+"""add document counters
+
+Revision ID: c6a2f0d9b184
+Revises: 8d41c7a5e0f3
+Create Date: 2026-10-18 15:21:47.118530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6a2f0d9b184'
+down_revision: Union[str, None] = '8d41c7a5e0f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# document type -> (table, number column, prefix, separator)
+DOCUMENTS = {
+    'PO': ('purchase_orders', 'po_number', 'PO', ''),
+    'GR': ('goods_receipts', 'receipt_number', 'GR', ''),
+    'TR': ('transfers', 'transfer_number', 'TR-', '-'),
+    'RR': ('reorder_requests', 'request_number', 'RR-', '-'),
+    'IC': ('inventory_counts', 'count_number', 'IC-', '-'),
+    'SHP': ('shipments', 'shipment_number', 'SHP-', '-'),
+}
+
+
+def upgrade() -> None:
+    op.create_table('document_counters',
+    sa.Column('document_type', sa.String(length=20), nullable=False),
+    sa.Column('period', sa.Date(), nullable=False),
+    sa.Column('last_value', sa.BigInteger(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('is_deleted', sa.Boolean(), nullable=True),
+    sa.Column('created_by', sa.Integer(), nullable=True),
+    sa.Column('updated_by', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id', name=op.f('pk_document_counters')),
+    sa.UniqueConstraint('document_type', 'period', name='uq_document_counters_type_period')
+    )
+    op.create_index(op.f('ix_document_counters_id'), 'document_counters', ['id'], unique=False)
+
+    # Start each day's counter after the highest number already issued that day
+    for document_type, (table, column, prefix, separator) in DOCUMENTS.items():
+        date_start = len(prefix) + 1
+        sequence_start = date_start + 8 + len(separator)
+        op.execute(f"""
+            INSERT INTO document_counters (document_type, period, last_value, is_deleted)
+            SELECT '{document_type}',
+                   to_date(substr({column}, {date_start}, 8), 'YYYYMMDD'),
+                   max(substr({column}, {sequence_start})::bigint),
+                   false
+            FROM {table}
+            WHERE {column} ~ '^{prefix}[0-9]{{8}}{separator}[0-9]{{3,5}}$'
+            GROUP BY substr({column}, {date_start}, 8)
+        """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_document_counters_id'), table_name='document_counters')
+    op.drop_table('document_counters')
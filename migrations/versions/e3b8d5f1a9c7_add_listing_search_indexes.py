@@ -0,0 +1,50 @@
+"""add search indexes for category, purchase order, goods receipt and user listings
+
+Revision ID: e3b8d5f1a9c7
+Revises: 9c5e2d7a4f18
+Create Date: 2026-10-18 23:05:41.628310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b8d5f1a9c7'
+down_revision: Union[str, None] = '9c5e2d7a4f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# categories.name, purchase_orders.po_number and locations.name are indexed in 9c5e2d7a4f18
+TRIGRAM_INDEXES = [
+    ('ix_goods_receipts_receipt_number_trgm', 'goods_receipts', 'receipt_number'),
+    ('ix_users_email_trgm', 'users', 'email'),
+    ('ix_users_username_trgm', 'users', 'username'),
+    ('ix_users_full_name_trgm', 'users', 'full_name'),
+]
+
+# Must match search_service._tsvector exactly for the planner to use them
+FULL_TEXT_INDEXES = [
+    ('ix_categories_description_fts', 'categories', 'description'),
+    ('ix_purchase_orders_notes_fts', 'purchase_orders', 'notes'),
+    ('ix_goods_receipts_notes_fts', 'goods_receipts', 'notes'),
+]
+
+
+def upgrade() -> None:
+    for name, table, expression in TRIGRAM_INDEXES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({expression} gin_trgm_ops)")
+
+    for name, table, column in FULL_TEXT_INDEXES:
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+            f"USING gin (to_tsvector('simple'::regconfig, coalesce({column}, '')))"
+        )
+
+
+def downgrade() -> None:
+    for name, _, _ in FULL_TEXT_INDEXES + TRIGRAM_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
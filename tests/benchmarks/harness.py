@@ -0,0 +1,165 @@
+"""
+Timing harness for service benchmarks.
+
+Each benchmark runs a coroutine factory a number of times and records latency
+percentiles, SQL statement counts (via app.core.instrumentation) and peak
+Python memory. Results are written as JSON and compared against a stored baseline.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from app.core.instrumentation import start_request_stats
+
+DEFAULT_TOLERANCE = 0.20  # 20% slower than baseline counts as a regression
+MIN_REGRESSION_MS = 2.0  # below this, p95 differences are timer and scheduler jitter
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    iterations: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    mean_ms: float
+    max_ms: float
+    queries_per_iteration: float
+    db_ms_per_iteration: float
+    peak_memory_kb: float
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+async def measure(
+    name: str,
+    fn: Callable[[], Awaitable[Any]],
+    iterations: int = 5,
+    warmup: int = 1,
+) -> BenchmarkResult:
+    """Run `fn` repeatedly for latency and query statistics, then once more for peak memory"""
+    for _ in range(warmup):
+        await fn()
+
+    timings: List[float] = []
+    statements: List[int] = []
+    db_times: List[float] = []
+
+    for _ in range(iterations):
+        stats = start_request_stats(route=f"bench:{name}")
+        started = time.perf_counter()
+        await fn()
+        timings.append((time.perf_counter() - started) * 1000)
+        statements.append(stats.statements)
+        db_times.append(stats.db_time * 1000)
+
+    # tracemalloc slows every allocation, so peak memory comes from one extra untimed call
+    tracemalloc.start()
+    try:
+        await fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    ordered = sorted(timings)
+    return BenchmarkResult(
+        name=name,
+        iterations=iterations,
+        p50_ms=round(_percentile(ordered, 50), 3),
+        p95_ms=round(_percentile(ordered, 95), 3),
+        p99_ms=round(_percentile(ordered, 99), 3),
+        mean_ms=round(statistics.fmean(timings), 3),
+        max_ms=round(ordered[-1], 3),
+        queries_per_iteration=round(statistics.fmean(statements), 2),
+        db_ms_per_iteration=round(statistics.fmean(db_times), 3),
+        peak_memory_kb=round(peak / 1024, 1),
+    )
+
+
+class BenchmarkRecorder:
+    """Collects results for a run and handles JSON output / baseline comparison"""
+
+    def __init__(self, scale: str):
+        self.scale = scale
+        self.results: Dict[str, BenchmarkResult] = {}
+
+    def add(self, result: BenchmarkResult):
+        self.results[result.name] = result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "scale": self.scale,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "results": {name: asdict(result) for name, result in self.results.items()},
+        }
+
+    def write(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2, sort_keys=True)
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_to_baseline(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> List[str]:
+    """Return human-readable regressions (latency or query count) vs. the baseline"""
+    regressions = []
+    if baseline.get("scale") != current.get("scale"):
+        return [f"Baseline scale {baseline.get('scale')} does not match run scale {current.get('scale')}"]
+
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base:
+            continue
+        slower = result["p95_ms"] - base["p95_ms"]
+        if base["p95_ms"] and slower > base["p95_ms"] * tolerance and slower > MIN_REGRESSION_MS:
+            regressions.append(
+                f"{name}: p95 {result['p95_ms']:.1f}ms vs baseline {base['p95_ms']:.1f}ms"
+            )
+        if result["queries_per_iteration"] > base["queries_per_iteration"]:
+            regressions.append(
+                f"{name}: {result['queries_per_iteration']} queries vs baseline {base['queries_per_iteration']}"
+            )
+    return regressions
+
+
+def import_profile(modules: str, cwd: Optional[str] = None) -> Dict[str, Tuple[float, float]]:
+    """Import `modules` (comma separated) in a fresh interpreter; returns {module: (self_ms, cumulative_ms)}"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modules}"],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile = {}
+    for line in completed.stderr.splitlines():
+        # "import time:      1234 |       5678 |   package.module"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = (int(self_us) / 1000, int(cumulative_us) / 1000)
+    return profile
@@ -0,0 +1,80 @@
+import random
+import pytest
+from app.services.engagement.faq_index import FAQDocument, FAQIndex, tokenize
+from tests.benchmarks.harness import BenchmarkRecorder, measure
+
+FAQ_COUNT = 5000
+QUERY_BUDGET_MS = 1.0
+
+WORDS = (
+    "stock item transfer reorder supplier purchase order receipt invoice payment employee salary "
+    "attendance shift leave location warehouse category product recipe price discount report "
+    "export shipment vehicle driver task deadline approval password login account notification"
+).split()
+
+QUERIES = [
+    "How do I transfer stock between locations?",
+    "why was my salary payment late",
+    "reorder point for low stock items",
+    "approve a purchase order from a supplier",
+]
+
+
+def _corpus(seed: int = 42):
+    rng = random.Random(seed)
+    for faq_id in range(1, FAQ_COUNT + 1):
+        question = " ".join(rng.choices(WORDS, k=8))
+        answer = " ".join(rng.choices(WORDS, k=60))
+        terms = {}
+        for weight, text in ((2.0, question), (1.0, answer)):
+            for token in tokenize(text):
+                terms[token] = terms.get(token, 0.0) + weight
+        yield FAQDocument(faq_id, faq_id % 50, faq_id % 3 == 0, rng.randint(0, 10), question, terms)
+
+
+@pytest.mark.asyncio
+async def test_faq_index_query(recorder: BenchmarkRecorder):
+    """Top-5 FAQ retrieval over an in-memory corpus stays under a millisecond"""
+    index = FAQIndex()
+    for doc in _corpus():
+        index._set(doc)
+    queries = iter(QUERIES * 100)
+
+    async def query():
+        return index.search_loaded(next(queries), user_id=7, limit=5)
+
+    assert await query()
+    result = await measure("faq_index.query", query, iterations=200, warmup=20)
+    result.extra["faqs"] = FAQ_COUNT
+    recorder.add(result)
+    assert result.p95_ms < QUERY_BUDGET_MS, f"FAQ query p95 {result.p95_ms}ms over {QUERY_BUDGET_MS}ms"
+
+
+@pytest.mark.asyncio
+async def test_faq_index_query_during_updates(recorder: BenchmarkRecorder):
+    """Queries after a change keep the previous arrays while the rebuild runs in the background"""
+    index = FAQIndex()
+    docs = list(_corpus())
+    for doc in docs:
+        index._set(doc)
+    assert index.search_loaded(QUERIES[0], user_id=7, limit=5)
+    queries = iter(QUERIES * 100)
+    updates = iter(docs * 2)
+
+    async def update_then_query():
+        index._set(next(updates))
+        return index.search_loaded(next(queries), user_id=7, limit=5)
+
+    result = await measure("faq_index.query_during_updates", update_then_query, iterations=200, warmup=20)
+    result.extra["faqs"] = FAQ_COUNT
+    recorder.add(result)
+    assert result.p95_ms < QUERY_BUDGET_MS, f"FAQ query p95 {result.p95_ms}ms over {QUERY_BUDGET_MS}ms"
+
+    added = FAQDocument(FAQ_COUNT + 1, 7, False, 0, "Freezer defrost schedule", {"freezer": 2.0, "defrost": 2.0})
+    index._set(added)
+    assert index.search_loaded("freezer defrost", user_id=7) == []
+    await index._rebuild
+    while index._stale:
+        index.search_loaded("freezer defrost", user_id=7)
+        await index._rebuild
+    assert [hit.faq_id for hit in index.search_loaded("freezer defrost", user_id=7)] == [added.faq_id]
@@ -0,0 +1,67 @@
+import re
+import pytest
+from app.ai.nlp.intent_router import AGENT_KEYWORDS, ENTITY_PATTERNS, INTENT_PATTERNS, IntentRouter
+from tests.benchmarks.harness import BenchmarkRecorder, measure
+
+MESSAGES = [
+    "Check stock of item Tomato 5 kg",
+    "low stock level for apples at the main warehouse",
+    "hire someone: new staff John Smith starting 12/05/2024",
+    "how much stock do we have of product Flour",
+    "generate payroll for staff Alice",
+    "purchase more from supplier Fresh Farms, budget $1,200.50",
+    "order items 10 units",
+    "show me the dashboard summary for last week",
+    "the shipment driver is late with vehicle 12",
+    "please check the current inventory levels for tomatoes and onions at the main warehouse location today",
+]
+BATCH_SIZE = 1000
+
+
+def _legacy(text: str):
+    """The per-pattern loops TextProcessor and AIAgentManager used before the router"""
+    lowered = text.lower()
+    intent = next(
+        (name for name, patterns in INTENT_PATTERNS.items() if any(re.search(p, lowered, re.IGNORECASE) for p in patterns)),
+        "general_query",
+    )
+    entities = tuple(
+        (entity_type, match.group(1).strip(), match.start(), match.end())
+        for entity_type, pattern in ENTITY_PATTERNS.items()
+        for match in re.finditer(pattern, text, re.IGNORECASE)
+    )
+    agent = next((name for name, keywords in AGENT_KEYWORDS.items() if any(k in lowered for k in keywords)), "inventory")
+    return intent, agent, entities
+
+
+def _corpus(size: int):
+    return [f"{MESSAGES[i % len(MESSAGES)]} #{i}" for i in range(size)]
+
+
+@pytest.mark.asyncio
+async def test_intent_router(recorder: BenchmarkRecorder):
+    """Per-message and batch classification cost, cold and cached, against the legacy loops"""
+    router = IntentRouter()
+    corpus = _corpus(BATCH_SIZE)
+    for text in corpus:
+        result = router._classify(text)
+        assert (result.intent, result.agent, result.entities) == _legacy(text), text
+
+    async def legacy_batch():
+        return [_legacy(text) for text in corpus]
+
+    async def cold_batch():
+        router.classify.cache_clear()
+        return router.classify_many(corpus)
+
+    async def cached_batch():
+        return router.classify_many(corpus)
+
+    legacy = await measure("intent_router.legacy_1000", legacy_batch, iterations=20, warmup=2)
+    cold = await measure("intent_router.cold_1000", cold_batch, iterations=20, warmup=2)
+    cached = await measure("intent_router.cached_1000", cached_batch, iterations=20, warmup=2)
+    for result in (legacy, cold, cached):
+        result.extra["messages"] = BATCH_SIZE
+        recorder.add(result)
+
+    assert cold.p50_ms < legacy.p50_ms, f"compiled router {cold.p50_ms}ms vs legacy {legacy.p50_ms}ms per {BATCH_SIZE}"
@@ -0,0 +1,134 @@
+import pytest
+import uuid
+from datetime import date, timedelta
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.v1.endpoints.system.export import export_data
+from app.models.inventory.product import Product
+from app.models.organization.location import Location
+from app.services.dashboard.dashboard_service import DashboardService
+from app.services.hr.attendance_service import AttendanceService
+from app.services.hr.employee_service import EmployeeService
+from app.services.hr.salary_service import SalaryService
+from app.services.inventory.foodics_order_service import FoodicsOrderService
+from app.services.inventory.item_service import ItemService
+from app.services.inventory.stock_movement_service import StockMovementService
+from app.services.purchase.purchase_order_service import PurchaseOrderService
+from app.services.reports.report_service import ReportService
+from tests.benchmarks.harness import BenchmarkRecorder, measure
+
+REPORTS = [
+    "get_stock_levels_report",
+    "get_stock_movements_report",
+    "get_low_stock_alerts_report",
+    "get_purchase_orders_summary_report",
+    "get_demand_forecast_report",
+    "get_attendance_summary_report",
+    "get_salary_summary_report",
+    "get_shipment_tracking_report",
+]
+
+EXPORTS = ["stock_movements", "employees", "stock_levels_report"]
+
+LIST_SERVICES = [
+    ("items", ItemService, "get_items"),
+    ("employees", EmployeeService, "get_employees"),
+    ("stock_movements", StockMovementService, "get_stock_movements"),
+    ("orders", lambda db: FoodicsOrderService(db, "bench"), "get_orders"),
+    ("purchase_orders", PurchaseOrderService, "get_purchase_orders"),
+]
+
+FOODICS_BATCH = 50
+
+
+@pytest.mark.asyncio
+class TestServiceBenchmarks:
+    """Latency, query count and memory of the hot service paths at BENCH_SCALE"""
+
+    async def test_dashboard(self, session: AsyncSession, recorder: BenchmarkRecorder):
+        service = DashboardService(session)
+        recorder.add(await measure("dashboard", service.get_dashboard_data))
+
+    @pytest.mark.parametrize("report", REPORTS)
+    async def test_reports(self, session: AsyncSession, recorder: BenchmarkRecorder, report: str):
+        service = ReportService(session)
+        method = getattr(service, report)
+        recorder.add(await measure(f"report.{report}", lambda: method(page_index=1, page_size=50)))
+
+    @pytest.mark.parametrize("name,service_factory,method", LIST_SERVICES)
+    async def test_paginated_lists(self, session: AsyncSession, recorder: BenchmarkRecorder, name, service_factory, method):
+        service = service_factory(session)
+        list_method = getattr(service, method)
+
+        recorder.add(await measure(f"list.{name}.first_page", lambda: list_method(page_index=1, page_size=100)))
+        recorder.add(await measure(f"list.{name}.deep_page", lambda: list_method(page_index=200, page_size=100)))
+
+    async def test_foodics_order_ingestion(self, session: AsyncSession, recorder: BenchmarkRecorder):
+        location = (await session.execute(select(Location).limit(1))).scalar_one()
+        products = (await session.execute(select(Product.product_guid, Product.name).limit(20))).all()
+        service = FoodicsOrderService(session, "bench")
+        reference = iter(range(10_000_000, 20_000_000))
+
+        async def ingest_batch():
+            for _ in range(FOODICS_BATCH):
+                await service._process_order(
+                    {
+                        "id": str(uuid.uuid4()),
+                        "reference": next(reference),
+                        "status": 4,
+                        "business_date": date.today().isoformat(),
+                        "subtotal_price": 30,
+                        "total_price": 30,
+                        "products": [
+                            {
+                                "product": {"id": str(guid), "name": product_name},
+                                "quantity": 1,
+                                "unit_price": 10,
+                                "total_price": 10,
+                            }
+                            for guid, product_name in products[:3]
+                        ],
+                    },
+                    location,
+                )
+            await session.flush()
+
+        result = await measure("foodics.ingest_50_orders", ingest_batch, iterations=3)
+        result.extra["orders_per_iteration"] = FOODICS_BATCH
+        recorder.add(result)
+
+    async def test_generate_bulk_salary(self, session: AsyncSession, recorder: BenchmarkRecorder):
+        service = SalaryService(session)
+        # A fresh month per iteration so every run generates instead of skipping existing salaries
+        months = iter(range(1, 12))
+
+        async def generate():
+            salary_month = (date.today().replace(day=1) - timedelta(days=31 * next(months))).replace(day=1)
+            await service.generate_bulk_salary(salary_month, None, None, current_user_id=1)
+
+        recorder.add(await measure("salary.generate_bulk", generate, iterations=3))
+
+    async def test_process_daily_attendance(self, session: AsyncSession, recorder: BenchmarkRecorder):
+        service = AttendanceService(session)
+        days = iter(range(0, 30))
+
+        async def process():
+            await service.process_daily_attendance(date.today() - timedelta(days=next(days)), user_id=1)
+
+        recorder.add(await measure("attendance.process_daily", process, iterations=3))
+
+    @pytest.mark.parametrize("entity_type", EXPORTS)
+    async def test_export(self, session: AsyncSession, recorder: BenchmarkRecorder, entity_type: str):
+        async def export():
+            response = await export_data(
+                entity_type=entity_type,
+                format="csv",
+                filename="bench",
+                employee_id=None,
+                session=session,
+                current_user=None,
+            )
+            async for _ in response.body_iterator:
+                pass
+
+        recorder.add(await measure(f"export.{entity_type}", export, iterations=3))
@@ -0,0 +1,47 @@
+import os
+import pytest
+from app.utils.lazy_import import HEAVY_MODULES
+from tests.benchmarks.harness import import_profile
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# Cold import budgets in milliseconds, always enforced. The defaults leave ~40% headroom over a
+# single-core dev box (API ~7.2s, worker ~2.0s under -X importtime); faster runners can tighten
+# them with STARTUP_BUDGET_MS / WORKER_STARTUP_BUDGET_MS
+API_STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "10000"))
+WORKER_STARTUP_BUDGET_MS = float(os.getenv("WORKER_STARTUP_BUDGET_MS", "3000"))
+
+# What uvicorn and a Celery worker import before serving
+WORKER_MODULES = ", ".join([
+    "app.workers.runtime",
+    "app.workers.celery_tasks.hr_tasks",
+    "app.workers.celery_tasks.task_management_tasks",
+    "app.workers.celery_tasks.order_sync_tasks",
+])
+
+ENTRYPOINTS = [
+    ("main", API_STARTUP_BUDGET_MS),
+    (WORKER_MODULES, WORKER_STARTUP_BUDGET_MS),
+]
+
+
+def _slowest(profile, count=15):
+    ranked = sorted(profile.items(), key=lambda entry: entry[1][0], reverse=True)[:count]
+    return "\n".join(f"  {self_ms:8.1f}ms self {cumulative_ms:8.1f}ms total  {name}"
+                     for name, (self_ms, cumulative_ms) in ranked)
+
+
+@pytest.mark.parametrize("modules,budget_ms", ENTRYPOINTS, ids=["api", "worker"])
+def test_startup_budget(modules: str, budget_ms: float):
+    """API and worker entrypoints import within budget and without the heavy optional stacks"""
+    profile = import_profile(modules, cwd=PROJECT_ROOT)
+
+    heavy = sorted(name for name in profile if name.split(".")[0] in HEAVY_MODULES)
+    assert not heavy, f"Heavy modules imported at startup: {', '.join(heavy)}"
+
+    # Each top-level module's cumulative time excludes what earlier ones already imported
+    total_ms = sum(profile[module.strip()][1] for module in modules.split(",") if module.strip() in profile)
+    assert total_ms <= budget_ms, (
+        f"Startup import took {total_ms:.0f}ms (budget {budget_ms:.0f}ms). Slowest modules:\n"
+        f"{_slowest(profile)}"
+    )
@@ -0,0 +1,141 @@
+import pytest
+from datetime import date, datetime, timezone
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.hr.attendance import Attendance
+from app.models.hr.employee import Employee
+from app.models.shared.enums import AttendanceStatus
+from app.schemas.hr.attendance_schema import AttendanceCreate
+from app.services.hr.attendance_service import AttendanceService
+
+USER_ID = 1
+
+
+async def _employee(session: AsyncSession, code: str) -> Employee:
+    employee = Employee(
+        employee_id=code,
+        first_name="Test",
+        last_name=code,
+        email=f"{code.lower()}@example.com",
+        hire_date=date(2020, 1, 1)
+    )
+    session.add(employee)
+    await session.commit()
+    return employee
+
+
+async def _live_rows(session: AsyncSession, employee_id: int, attendance_date: date):
+    result = await session.execute(
+        select(Attendance.status, Attendance.check_in_time)
+        .where(
+            Attendance.employee_id == employee_id,
+            Attendance.attendance_date == attendance_date,
+            Attendance.is_deleted == False
+        )
+    )
+    return result.all()
+
+
+@pytest.mark.asyncio
+class TestDailyAttendance:
+    """process_daily_attendance against check-ins racing the auto-marking"""
+
+    async def test_check_in_during_processing_is_kept(self, db_session: AsyncSession, monkeypatch):
+        """A check-in landing between the existence check and the insert wins; no duplicate, no error"""
+        employee = await _employee(db_session, "RACE001")
+        process_date = date(2024, 3, 4)
+        check_in_time = datetime(2024, 3, 4, 9, 0, tzinfo=timezone.utc)
+
+        service = AttendanceService(db_session)
+        tickets = []
+
+        async def record_ticket(employee_id, attendance_date, requested_by):
+            tickets.append(employee_id)
+
+        upsert = service._upsert_attendance
+
+        async def upsert_after_check_in(values):
+            if values["employee_id"] == employee.id:
+                db_session.add(Attendance(
+                    employee_id=employee.id,
+                    attendance_date=process_date,
+                    check_in_time=check_in_time,
+                    status=AttendanceStatus.CHECKED_IN,
+                    is_deleted=False
+                ))
+                await db_session.flush()
+            return await upsert(values)
+
+        monkeypatch.setattr(service, "_create_absent_ticket", record_ticket)
+        monkeypatch.setattr(service, "_upsert_attendance", upsert_after_check_in)
+
+        result = await service.process_daily_attendance(process_date, USER_ID)
+
+        assert result["date"] == process_date.isoformat()
+        rows = await _live_rows(db_session, employee.id, process_date)
+        assert len(rows) == 1
+        assert rows[0].status == AttendanceStatus.CHECKED_IN
+        assert rows[0].check_in_time is not None
+        assert employee.id not in tickets
+
+    async def test_rerun_does_not_duplicate(self, db_session: AsyncSession, monkeypatch):
+        """Processing the same day twice leaves one auto-marked row per employee"""
+        employee = await _employee(db_session, "RERUN001")
+        process_date = date(2024, 3, 5)
+
+        service = AttendanceService(db_session)
+
+        async def record_ticket(employee_id, attendance_date, requested_by):
+            pass
+
+        monkeypatch.setattr(service, "_create_absent_ticket", record_ticket)
+
+        await service.process_daily_attendance(process_date, USER_ID)
+        first = await _live_rows(db_session, employee.id, process_date)
+        await service.process_daily_attendance(process_date, USER_ID)
+
+        assert len(first) == 1
+        assert first[0].status in (AttendanceStatus.ABSENT, AttendanceStatus.WEEKEND, AttendanceStatus.HOLIDAY)
+        assert await _live_rows(db_session, employee.id, process_date) == first
+
+    async def test_auto_mark_during_check_in_is_replaced(self, db_session: AsyncSession, monkeypatch):
+        """An ABSENT row auto-marked after check-in read the day is filled in and leaves the month counters"""
+        employee = await _employee(db_session, "RACE002")
+        attendance_date = date(2024, 3, 11)
+        service = AttendanceService(db_session)
+
+        load_mark_state = service._load_mark_state
+
+        async def load_then_auto_mark(employee_id, day):
+            state = await load_mark_state(employee_id, day)
+            absent = await service._upsert_attendance(dict(
+                employee_id=employee_id,
+                attendance_date=day,
+                status=AttendanceStatus.ABSENT,
+                is_holiday=False,
+                is_weekend=False,
+                remarks="Auto-marked as absent",
+                created_by=USER_ID
+            ))
+            await service.month_totals.record(absent)
+            await db_session.commit()
+            return state
+
+        monkeypatch.setattr(service, "_load_mark_state", load_then_auto_mark)
+
+        response = await service.mark_attendance(AttendanceCreate(
+            employee_id=employee.id,
+            attendance_date=attendance_date,
+            check_in_time=datetime(2024, 3, 11, 9, 0, tzinfo=timezone.utc)
+        ), USER_ID)
+
+        assert response.check_in_time is not None
+        rows = await _live_rows(db_session, employee.id, attendance_date)
+        assert len(rows) == 1
+        assert rows[0].status != AttendanceStatus.ABSENT
+
+        employee_id = employee.id
+        db_session.expire_all()
+        month = await service.month_totals.get_month(employee_id, attendance_date)
+        assert month.record_count == 1
+        assert month.absent_days == 0
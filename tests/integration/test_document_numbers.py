@@ -0,0 +1,25 @@
+import asyncio
+import pytest
+from datetime import date
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core import document_numbers
+from app.core.config import settings
+from app.core.document_numbers import next_document_number
+
+
+@pytest.mark.asyncio
+class TestDocumentNumbers:
+    """Block-based document number allocation"""
+
+    async def test_concurrent_numbers_are_unique_and_dense(self, pg_session: AsyncSession, monkeypatch):
+        """Concurrent callers share claims and get each number once, even on a connection-bound session"""
+        monkeypatch.setattr(settings, "DOCUMENT_NUMBER_BLOCK_SIZE", 7)
+        day = date(2031, 1, 2)
+        document_numbers._blocks.pop(("TR", day), None)
+
+        numbers = await asyncio.gather(*(next_document_number(pg_session, "TR", day) for _ in range(50)))
+
+        assert len(set(numbers)) == 50
+        sequences = sorted(int(number.rsplit("-", 1)[1]) for number in numbers)
+        assert sequences == list(range(sequences[0], sequences[0] + 50))
+        await document_numbers.dispose_counter_engines()
@@ -0,0 +1,46 @@
+import pytest
+from datetime import datetime, timezone
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.event_sink import EventSink, _decode, _encode
+from app.models.engagement.user_history import UserHistory
+from app.models.shared.enums import HistoryActionType
+
+USER_ID = 1
+
+
+@pytest.mark.asyncio
+class TestEventSink:
+    """Buffered history writes"""
+
+    async def test_close_writes_queued_rows(self, db_session: AsyncSession):
+        """Rows emitted during a request are all in the table once the sink shuts down"""
+        sink = EventSink()
+        for index in range(3):
+            sink.emit(db_session, UserHistory, {
+                "user_id": USER_ID,
+                "action_type": HistoryActionType.CREATE,
+                "resource_type": "SINK_TEST",
+                "resource_id": index,
+                "title": f"Sink row {index}"
+            })
+
+        await sink.close()
+
+        result = await db_session.execute(
+            select(func.count(UserHistory.id)).where(UserHistory.resource_type == "SINK_TEST")
+        )
+        assert result.scalar() == 3
+
+    async def test_spilled_row_round_trip(self):
+        """Enum and datetime values survive the JSON form used for the Redis spill"""
+        row = {
+            "user_id": USER_ID,
+            "action_type": HistoryActionType.UPDATE,
+            "title": "Spilled",
+            "archived_at": datetime(2024, 3, 4, 9, 30, tzinfo=timezone.utc),
+            "resource_id": None
+        }
+
+        encoded = {name: _encode(value) for name, value in row.items()}
+        assert _decode(UserHistory, encoded) == row
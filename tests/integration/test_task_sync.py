@@ -0,0 +1,68 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.exceptions import ValidationError
+from app.models.auth import User
+from app.models.task.task import Task
+from app.models.task.task_type import TaskType
+from app.services.task.task_sync_service import TaskSyncService
+
+
+async def _assigned_task(session: AsyncSession, changed: datetime):
+    """A user with one task assigned to them, last changed at `changed`"""
+    user = User(email="sync@example.com", username="syncuser", full_name="Sync User", hashed_password="x")
+    task_type = TaskType(name="Sync Test", category="INVENTORY")
+    session.add_all([user, task_type])
+    await session.flush()
+
+    task = Task(
+        task_number="TSK-SYNC-1",
+        title="Count the freezer",
+        task_type_id=task_type.id,
+        created_by=user.id,
+        assigned_to=user.id,
+        created_at=changed
+    )
+    session.add(task)
+    await session.commit()
+    return user, task
+
+
+@pytest.mark.asyncio
+class TestTaskSync:
+    """Delta sync cursors over the mobile task streams"""
+
+    async def test_cursor_returns_only_later_changes(self, pg_session: AsyncSession):
+        """A cursor skips rows already sent and turns later deletions into tombstones"""
+        now = datetime.now(timezone.utc)
+        user, task = await _assigned_task(pg_session, now - timedelta(hours=1))
+        service = TaskSyncService(pg_session)
+
+        first = await service.get_changes(user.id)
+        assert [row["id"] for row in first["tasks"]] == [task.id]
+        assert first["deleted"]["tasks"] == []
+
+        unchanged = await service.get_changes(user.id, first["cursor"])
+        assert unchanged["tasks"] == []
+        assert unchanged["deleted"]["tasks"] == []
+
+        task.is_deleted = True
+        task.updated_at = now - timedelta(minutes=30)
+        await pg_session.commit()
+
+        after_delete = await service.get_changes(user.id, first["cursor"])
+        assert after_delete["tasks"] == []
+        assert after_delete["deleted"]["tasks"] == [task.id]
+
+    async def test_recent_changes_are_sent_again(self, pg_session: AsyncSession):
+        """Rows inside the settle window stay ahead of the cursor until they settle"""
+        user, task = await _assigned_task(pg_session, datetime.now(timezone.utc))
+        service = TaskSyncService(pg_session)
+
+        first = await service.get_changes(user.id)
+        again = await service.get_changes(user.id, first["cursor"])
+        assert [row["id"] for row in again["tasks"]] == [task.id]
+
+    async def test_invalid_cursor(self, pg_session: AsyncSession):
+        with pytest.raises(ValidationError):
+            await TaskSyncService(pg_session).get_changes(1, "not-a-cursor")
@@ -0,0 +1,139 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.exceptions import ValidationError
+from app.models.inventory.item import Item
+from app.models.inventory.stock_level import StockLevel
+from app.models.inventory.stock_movement import StockMovement
+from app.models.inventory.transfer import Transfer
+from app.models.inventory.transfer_item import TransferItem
+from app.models.organization.location import Location
+from app.models.shared.enums import StockMovementType, TransferStatus, UnitType
+from app.services.inventory import transfer_service
+from app.services.inventory.transfer_service import TransferService
+
+USER_ID = 1
+
+
+async def _approved_transfer(session: AsyncSession, on_hand: Decimal = Decimal("100"), requested: Decimal = Decimal("10")):
+    """Source stock of `on_hand` and an approved transfer of `requested` to a second location"""
+    source = Location(name="Test Warehouse", location_type="WAREHOUSE")
+    destination = Location(name="Test Branch", location_type="BRANCH")
+    item = Item(name="Test Flour", unit_type=UnitType.KG)
+    session.add_all([source, destination, item])
+    await session.flush()
+
+    session.add(StockLevel(
+        item_id=item.id, location_id=source.id,
+        current_stock=on_hand, reserved_stock=Decimal("0"), available_stock=on_hand
+    ))
+    transfer = Transfer(
+        transfer_number=f"TR-TEST-{item.id}",
+        from_location_id=source.id,
+        to_location_id=destination.id,
+        transfer_date=date.today(),
+        created_by=USER_ID
+    )
+    session.add(transfer)
+    await session.flush()
+    session.add(TransferItem(
+        transfer_id=transfer.id, item_id=item.id, unit_type=UnitType.KG, requested_quantity=requested
+    ))
+    await session.commit()
+
+    await TransferService(session).approve_transfer(transfer.id, USER_ID)
+    return transfer.id, item.id, source.id, destination.id
+
+
+async def _stock(session: AsyncSession, item_id: int, location_id: int):
+    result = await session.execute(
+        select(StockLevel.current_stock, StockLevel.reserved_stock, StockLevel.available_stock)
+        .where(StockLevel.item_id == item_id, StockLevel.location_id == location_id)
+    )
+    return result.one_or_none()
+
+
+async def _movements(session: AsyncSession, transfer_id: int):
+    result = await session.execute(
+        select(StockMovement.location_id, StockMovement.movement_type, StockMovement.quantity)
+        .where(StockMovement.reference_type == 'TRANSFER', StockMovement.reference_id == transfer_id)
+        .order_by(StockMovement.id)
+    )
+    return [tuple(row) for row in result]
+
+
+@pytest.mark.asyncio
+class TestTransferFlow:
+    """Stock effects of approving, sending, receiving and cancelling transfers"""
+
+    async def test_send_then_receive(self, pg_session: AsyncSession):
+        """Sending moves stock out of the source once; receiving books it at the destination"""
+        transfer_id, item_id, source_id, destination_id = await _approved_transfer(pg_session)
+        service = TransferService(pg_session)
+        assert tuple(await _stock(pg_session, item_id, source_id)) == (100, 10, 90)
+
+        await service.send_transfer(transfer_id, {item_id: Decimal("10")}, USER_ID)
+        assert tuple(await _stock(pg_session, item_id, source_id)) == (90, 0, 90)
+
+        with pytest.raises(ValidationError):
+            await service.send_transfer(transfer_id, {item_id: Decimal("10")}, USER_ID)
+        assert tuple(await _stock(pg_session, item_id, source_id)) == (90, 0, 90)
+
+        transfer = await service.receive_transfer(transfer_id, {item_id: Decimal("10")}, USER_ID)
+        assert transfer.status == TransferStatus.COMPLETED
+        assert tuple(await _stock(pg_session, item_id, destination_id)) == (10, 0, 10)
+        assert await _movements(pg_session, transfer_id) == [
+            (source_id, StockMovementType.TRANSFER, 10),
+            (destination_id, StockMovementType.INBOUND, 10),
+        ]
+
+    async def test_receive_requires_send(self, pg_session: AsyncSession):
+        """An approved transfer that was never sent cannot be received"""
+        transfer_id, item_id, _, destination_id = await _approved_transfer(pg_session)
+
+        with pytest.raises(ValidationError):
+            await TransferService(pg_session).receive_transfer(transfer_id, {item_id: Decimal("10")}, USER_ID)
+        assert await _stock(pg_session, item_id, destination_id) is None
+        assert await _movements(pg_session, transfer_id) == []
+
+    async def test_cancel_before_send_releases_reservation(self, pg_session: AsyncSession):
+        """Cancelling an approved transfer only gives back the reservation"""
+        transfer_id, item_id, source_id, _ = await _approved_transfer(pg_session)
+
+        transfer = await TransferService(pg_session).cancel_transfer(transfer_id, "Not needed", USER_ID)
+        assert transfer.status == TransferStatus.CANCELLED
+        assert tuple(await _stock(pg_session, item_id, source_id)) == (100, 0, 100)
+        assert await _movements(pg_session, transfer_id) == []
+
+    async def test_cancel_after_send_returns_shipped_stock(self, pg_session: AsyncSession):
+        """Cancelling a sent transfer reverses the outbound movement instead of releasing the reservation twice"""
+        transfer_id, item_id, source_id, _ = await _approved_transfer(pg_session)
+        service = TransferService(pg_session)
+        await service.send_transfer(transfer_id, {item_id: Decimal("10")}, USER_ID)
+
+        transfer = await service.cancel_transfer(transfer_id, "Truck broke down", USER_ID)
+        assert transfer.status == TransferStatus.CANCELLED
+        assert tuple(await _stock(pg_session, item_id, source_id)) == (100, 0, 100)
+        assert await _movements(pg_session, transfer_id) == [
+            (source_id, StockMovementType.TRANSFER, 10),
+            (source_id, StockMovementType.INBOUND, 10),
+        ]
+
+    async def test_failed_cancel_keeps_reservation(self, pg_session: AsyncSession, monkeypatch):
+        """A cancel that fails part-way leaves the reservation and the status untouched"""
+        transfer_id, item_id, source_id, _ = await _approved_transfer(pg_session)
+        apply_stock_deltas = transfer_service.apply_stock_deltas
+
+        async def apply_then_fail(*args, **kwargs):
+            await apply_stock_deltas(*args, **kwargs)
+            raise RuntimeError("connection lost")
+
+        monkeypatch.setattr(transfer_service, "apply_stock_deltas", apply_then_fail)
+        with pytest.raises(RuntimeError):
+            await TransferService(pg_session).cancel_transfer(transfer_id, "Not needed", USER_ID)
+
+        assert tuple(await _stock(pg_session, item_id, source_id)) == (100, 10, 90)
+        transfer = await TransferService(pg_session).get_transfer_by_id(transfer_id, populate_existing=True)
+        assert transfer.status == TransferStatus.IN_TRANSIT